@@ -0,0 +1,55 @@
+"""
+지난 이벤트 보관 작업: 오래된 이벤트를 압축 파일(ROULETTE_ARCHIVE_DIR)로 옮기고 hot 테이블에서 지운다.
+보관된 이벤트는 목록·조회에 그대로 보이고(파일에서 읽음), 수정하면 자동으로 hot 테이블로 복원된다.
+
+    python archive_events.py --dry-run                   # 대상만 출력
+    python archive_events.py --older-than-days 60 --limit 200
+    python archive_events.py --list
+    python archive_events.py --restore 2026080101
+
+ROULETTE_STORAGE(기본 supabase) 저장소를 그대로 쓴다.
+"""
+import argparse
+import json
+import sys
+import time
+
+from dotenv import load_dotenv
+
+
+def main() -> int:
+    load_dotenv()
+    from standalone_comment_monitor.event_archive import ARCHIVE_AFTER_DAYS, archive_cold_events, restore_event
+    from standalone_comment_monitor.storage import create_storage
+
+    ap = argparse.ArgumentParser(description="Archive cold events to compressed per-event files.")
+    ap.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    ap.add_argument("--limit", type=int, default=None, help="archive at most this many events")
+    ap.add_argument("--dry-run", action="store_true", help="list candidates only")
+    ap.add_argument("--list", action="store_true", help="show archived events")
+    ap.add_argument("--restore", metavar="EVENT_ID", help="move an archived event back to the hot tables")
+    args = ap.parse_args()
+
+    db = create_storage()
+    archive = db.archive
+    if args.list:
+        rows = archive.list_rows(len(archive.event_ids()) or 1)
+        for r in rows:
+            print(f"{r['id']}\t{r.get('event_at') or ''}\t{r['participant_count']}\t{r['bytes']}\t{r.get('title') or ''}")
+        print(json.dumps(archive.stats(), ensure_ascii=False))
+        return 0
+    if args.restore:
+        ok, err = restore_event(db, archive, args.restore)
+        print("restored" if ok else f"restore failed: {err}")
+        return 0 if ok else 1
+
+    t0 = time.perf_counter()
+    result = archive_cold_events(db, archive, args.older_than_days, limit=args.limit, dry_run=args.dry_run)
+    db.flush_writes()
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
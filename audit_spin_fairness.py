@@ -0,0 +1,108 @@
+"""
+스핀 공정성 감사 / 추첨 엔진 처리량 벤치마크.
+
+이벤트 풀(기본: 활성 이벤트)로 서버와 같은 각도 → 섹터 계산을 NumPy 로 수백만 번 돌려
+참가자별 관측 당첨 수를 티켓 비율 기대값과 비교한다 (카이제곱, p-value, |z| 최대, 티켓 수별 1장당 당첨률).
+
+    python audit_spin_fairness.py                          # 활성 이벤트, 100만 스핀
+    python audit_spin_fairness.py --event 2026101801 --spins 5000000 --seed 1
+    python audit_spin_fairness.py --synthetic 1000,100000,1000000 --spins 2000000   # DB 없이 처리량 측정
+    python audit_spin_fairness.py --synthetic 100000 --mode alias                      # 별칭 테이블 추첨 방식
+    python audit_spin_fairness.py --json
+
+운영 중에는 같은 리포트를 GET /api/operator/spin_audit?spins=... 로도 볼 수 있다.
+ROULETTE_STORAGE(기본 supabase) 저장소를 그대로 쓴다. NumPy 필요.
+"""
+import argparse
+import json
+import random
+import sys
+
+from dotenv import load_dotenv
+
+
+def _synthetic_pool(n: int, seed: int):
+    from standalone_comment_monitor.participant_pool import ParticipantPool
+
+    rng = random.Random(seed)
+    return ParticipantPool((f"user{i:07d}", rng.randint(1, 5), None) for i in range(n))
+
+
+def _print_report(title: str, r: dict) -> None:
+    print(f"== {title} [{r.get('mode', '-')}]")
+    if r.get("error"):
+        print(f"  {r['error']}")
+        return
+    p = r["p_value"]
+    print(
+        f"  participants {r['participants']}  tickets {r['tickets']}  spins {r['spins']}  "
+        f"{r['seconds']:.3f}s ({r['spins_per_sec']:,} spins/s)"
+    )
+    print(
+        f"  chi2 {r['chi_square']:.2f}  df {r['df']}  p {'-' if p is None else f'{p:.4f}'}  "
+        f"max|z| {r['max_abs_z']}  min expected {r['min_expected']} ({r['low_expected_cells']} cells < 5)"
+    )
+    if r["crosscheck_mismatches"] or r["zero_ticket_wins"]:
+        print(f"  !! crosscheck/landing mismatches {r['crosscheck_mismatches']}  zero-ticket wins {r['zero_ticket_wins']}")
+    print("  by tickets (observed / expected):")
+    for b in r["by_tickets"]:
+        print(f"    {b['tickets']:>4d} tickets x {b['participants']:<8d} {b['observed']:>10d} / {b['expected']:<14.1f} ratio {b['ratio']}")
+    if r["worst"]:
+        print("  largest deviations:")
+        for w in r["worst"]:
+            print(f"    {w['name']:<20s} t={w['tickets']:<3d} {w['observed']:>8d} / {w['expected']:<12.1f} z {w['z']:+.2f}")
+
+
+def main() -> int:
+    load_dotenv()
+    ap = argparse.ArgumentParser(description="룰렛 스핀 공정성 감사 (NumPy 모의 추첨)")
+    ap.add_argument("--event", help="event id (default: active event)")
+    ap.add_argument("--synthetic", help="comma-separated pool sizes with random 1-5 tickets; no database")
+    ap.add_argument("--spins", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--top", type=int, default=10, help="rows in the largest-deviation list")
+    ap.add_argument("--mode", choices=("angle", "alias", "auto"), help="draw mode (default: ROULETTE_DRAW_MODE)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    from standalone_comment_monitor.spin_audit import SpinAuditUnavailable, audit_pool
+
+    reports = []
+    try:
+        if args.synthetic:
+            for n in (int(x) for x in args.synthetic.split(",") if x.strip()):
+                pool = _synthetic_pool(n, args.seed if args.seed is not None else 7)
+                report = audit_pool(pool, args.spins, seed=args.seed, top=args.top, mode=args.mode)
+                reports.append((f"synthetic n={n}", report))
+        else:
+            from event_utils import normalize_event_id
+            from standalone_comment_monitor.participant_pool import event_pool
+            from standalone_comment_monitor.storage import create_storage
+
+            db = create_storage()
+            key = normalize_event_id(args.event) if args.event else db.get_active_event_id()
+            if not key:
+                print("no active event (use --event)")
+                return 1
+            pool, source, _ = event_pool(db, key, None)
+            if pool is None:
+                print(f"{key}: no participants")
+                return 1
+            report = audit_pool(pool, args.spins, seed=args.seed, top=args.top, mode=args.mode)
+            report.update({"event_key": key, "source": source})
+            reports.append((f"{key} ({source})", report))
+    except SpinAuditUnavailable as e:
+        print(e)
+        return 1
+
+    if args.json:
+        print(json.dumps([r for _, r in reports], ensure_ascii=False, indent=2))
+    else:
+        for title, r in reports:
+            _print_report(title, r)
+    bad = any(r.get("crosscheck_mismatches") or r.get("zero_ticket_wins") for _, r in reports)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+핫 경로 쿼리 계획·지연 벤치마크 (로컬 Postgres, Supabase 키 불필요).
+
+전용 스키마(--schema, 기본 roulette_bench)에 posts / participants / commenters 를 만들고
+이벤트 --events 개(기본 1만), 댓글 작성자 --commenters 행(기본 100만), 참여자 --participants 행을 채운 뒤,
+  before  기본 키만 있는 상태 (20260405 마이그레이션 직후와 같은 모양)
+  after   supabase/migrations/20261018140000_hot_path_indexes.sql 적용 후 (public. → 벤치 스키마로 바꿔 실행)
+에서 앱이 보내는 쿼리의 EXPLAIN (ANALYZE, BUFFERS) 요약과 반복 실행 지연(중앙값/p95)을 비교한다.
+
+    pip install "psycopg[binary]"
+    docker run --rm -e POSTGRES_PASSWORD=pw -p 5432:5432 postgres:15
+    python bench_query_plans.py --dsn postgresql://postgres:pw@localhost:5432/postgres
+    python bench_query_plans.py --dsn ... --events 2000 --commenters 200000 --runs 50 --plans
+
+벤치 스키마는 매번 지우고 다시 만든다 (public 은 건드리지 않음). --keep 이면 끝나도 남긴다.
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_MIGRATION = os.path.join(_BASE_DIR, "supabase", "migrations", "20261018140000_hot_path_indexes.sql")
+
+# 20260405 마이그레이션 직후 모양 (url → id/event_id 이름만 바뀐 상태, 보조 인덱스 없음)
+_SCHEMA_SQL = """
+CREATE TABLE {s}.posts (
+    id TEXT PRIMARY KEY,
+    last_comment_id TEXT,
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    title TEXT,
+    prizes TEXT,
+    winners TEXT,
+    allow_duplicates BOOLEAN DEFAULT TRUE,
+    is_active BOOLEAN DEFAULT FALSE,
+    allowed_list TEXT,
+    memo TEXT,
+    event_at TIMESTAMPTZ
+);
+CREATE TABLE {s}.participants (
+    event_id TEXT,
+    author TEXT,
+    count INTEGER,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE TABLE {s}.commenters (
+    event_id TEXT,
+    author TEXT,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+"""
+
+# 이벤트 ID: 2023-01-01 부터 하루 --per-day 개 (YYYYMMDDNN). 마지막 이벤트가 활성.
+# 자식 행 g 는 이벤트 g % events 에 붙고, 작성자 이름은 g / events (이벤트 안에서 겹치지 않음).
+# psycopg 는 파라미터가 있는 쿼리를 한 문장씩만 실행하므로 목록으로 둔다.
+_FILL_SQL = (
+    """
+INSERT INTO {s}.posts (id, title, updated_at, event_at, is_active, winners)
+SELECT to_char(DATE '2023-01-01' + (g / %(per_day)s), 'YYYYMMDD') || lpad(((g %% %(per_day)s) + 1)::text, 2, '0'),
+       'event ' || g,
+       TIMESTAMPTZ '2023-01-01' + g * INTERVAL '1 hour',
+       TIMESTAMPTZ '2023-01-01' + (g / %(per_day)s) * INTERVAL '1 day',
+       g = %(events)s - 1,
+       'w' || g
+  FROM generate_series(0, %(events)s - 1) AS g
+""",
+    """
+INSERT INTO {s}.participants (event_id, author, count)
+SELECT a.ids[(g %% %(events)s) + 1], 'user' || (g / %(events)s), 1 + (g %% 3)
+  FROM (SELECT array_agg(id ORDER BY id) AS ids FROM {s}.posts) a,
+       generate_series(0, %(participants)s - 1) AS g
+""",
+    """
+INSERT INTO {s}.commenters (event_id, author)
+SELECT a.ids[(g %% %(events)s) + 1], 'user' || (g / %(events)s)
+  FROM (SELECT array_agg(id ORDER BY id) AS ids FROM {s}.posts) a,
+       generate_series(0, %(commenters)s - 1) AS g
+""",
+)
+
+
+def _queries(s: str, sample_id: str, prefix: str, cursor: str) -> List[Tuple[str, str, Dict[str, Any], bool]]:
+    """(이름, SQL, 파라미터, 쓰기 여부 — 쓰기는 롤백). 앱(CommentDatabase) 쿼리와 같은 모양."""
+    return [
+        ("active_event", f"SELECT * FROM {s}.posts WHERE is_active = true LIMIT 1", {}, False),
+        (
+            "deactivate_others",
+            f"UPDATE {s}.posts SET is_active = false WHERE is_active = true AND id <> %(id)s",
+            {"id": sample_id},
+            True,
+        ),
+        ("post_by_id", f"SELECT * FROM {s}.posts WHERE id = %(id)s", {"id": sample_id}, False),
+        ("post_by_id_text (rpc)", f"SELECT * FROM {s}.posts p WHERE p.id::text = %(id)s", {"id": sample_id}, False),
+        ("participants_by_event", f"SELECT * FROM {s}.participants WHERE event_id = %(id)s", {"id": sample_id}, False),
+        ("commenters_by_event", f"SELECT * FROM {s}.commenters WHERE event_id = %(id)s", {"id": sample_id}, False),
+        (
+            "replica_pull",
+            f"SELECT * FROM {s}.posts WHERE updated_at > %(cursor)s ORDER BY updated_at LIMIT 500",
+            {"cursor": cursor},
+            False,
+        ),
+        (
+            "next_event_id",
+            f"SELECT id FROM {s}.posts WHERE id LIKE %(like)s ORDER BY id DESC LIMIT 1",
+            {"like": f"{prefix}%"},
+            False,
+        ),
+        (
+            "participant_upsert",
+            f"INSERT INTO {s}.participants (event_id, author, count) VALUES (%(id)s, 'bench', 1) "
+            f"ON CONFLICT (event_id, author) DO UPDATE SET count = excluded.count",
+            {"id": sample_id},
+            True,
+        ),
+    ]
+
+
+def _plan_summary(lines: List[str]) -> str:
+    """EXPLAIN 출력 → 'Index Scan using x; Execution 0.05 ms' 처럼 노드 종류와 실행 시간만."""
+    nodes = []
+    exec_ms = ""
+    for ln in lines:
+        m = re.match(r"\s*(?:->\s*)?([A-Z][A-Za-z ]+?(?: using \S+)?(?: on \S+(?: \w+)?)?)\s+\(cost", ln)
+        if m:
+            nodes.append(m.group(1).strip())
+        if ln.strip().startswith("Execution Time"):
+            exec_ms = ln.split(":", 1)[1].strip()
+    return "; ".join(nodes[:3]) + (f" [{exec_ms}]" if exec_ms else "")
+
+
+def _run_query(conn, sql: str, params: Dict[str, Any], write: bool, runs: int) -> Tuple[Optional[List[str]], List[float], str]:
+    """(EXPLAIN 줄, 실행 시간들(초), 오류). 쓰기 쿼리는 매번 롤백."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, params)
+            plan = [r[0] for r in cur.fetchall()]
+        conn.rollback()
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                if cur.description:
+                    cur.fetchall()
+            times.append(time.perf_counter() - t0)
+            if write:
+                conn.rollback()
+        conn.rollback()
+        return plan, times, ""
+    except Exception as e:
+        conn.rollback()
+        return None, [], str(e).splitlines()[0]
+
+
+def _pct(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(p * (len(s) - 1))))]
+
+
+def _measure(conn, schema: str, runs: int, show_plans: bool, label: str) -> Dict[str, Dict[str, Any]]:
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT id FROM {schema}.posts ORDER BY id LIMIT 1 OFFSET (SELECT count(*) / 2 FROM {schema}.posts)")
+        sample_id = cur.fetchone()[0]
+        cur.execute(f"SELECT max(updated_at) - INTERVAL '1 day' FROM {schema}.posts")
+        cursor = cur.fetchone()[0]
+    conn.rollback()
+    out: Dict[str, Dict[str, Any]] = {}
+    print(f"\n== {label}")
+    for name, sql, params, write in _queries(schema, sample_id, sample_id[:8], cursor):
+        plan, times, err = _run_query(conn, sql, params, write, runs)
+        if err:
+            out[name] = {"error": err}
+            print(f"  {name:24s} ERROR {err}")
+            continue
+        med = statistics.median(times) * 1000
+        p95 = _pct(times, 0.95) * 1000
+        out[name] = {"median_ms": med, "p95_ms": p95, "plan": _plan_summary(plan)}
+        print(f"  {name:24s} median {med:8.3f} ms  p95 {p95:8.3f} ms  {out[name]['plan']}")
+        if show_plans:
+            for ln in plan:
+                print(f"      {ln}")
+    return out
+
+
+def _apply_migration(conn, schema: str) -> float:
+    with open(_MIGRATION, "r", encoding="utf-8") as f:
+        sql = f.read()
+    sql = sql.replace("public.", f"{schema}.").replace("nspname = 'public'", f"nspname = '{schema}'")
+    sql = sql.replace("table_schema = 'public'", f"table_schema = '{schema}'")
+    t0 = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(sql)
+    conn.commit()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compare hot-path query plans before/after the index migration.")
+    ap.add_argument("--dsn", default=os.getenv("BENCH_PG_DSN"), help="local Postgres DSN (or BENCH_PG_DSN)")
+    ap.add_argument("--schema", default="roulette_bench")
+    ap.add_argument("--events", type=int, default=10_000)
+    ap.add_argument("--per-day", type=int, default=10, help="events per day (ID serials per date)")
+    ap.add_argument("--participants", type=int, default=300_000)
+    ap.add_argument("--commenters", type=int, default=1_000_000)
+    ap.add_argument("--runs", type=int, default=30)
+    ap.add_argument("--plans", action="store_true", help="print full EXPLAIN output")
+    ap.add_argument("--keep", action="store_true", help="keep the bench schema afterwards")
+    args = ap.parse_args()
+    if not args.dsn:
+        raise SystemExit("--dsn (or BENCH_PG_DSN) is required, e.g. postgresql://postgres:pw@localhost:5432/postgres")
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", args.schema) or args.schema == "public":
+        raise SystemExit("--schema must be a plain lowercase identifier other than public")
+    try:
+        import psycopg
+    except ImportError:
+        raise SystemExit('psycopg is required: pip install "psycopg[binary]"')
+
+    s = args.schema
+    with psycopg.connect(args.dsn) as conn:
+        t0 = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {s} CASCADE")
+            cur.execute(f"CREATE SCHEMA {s}")
+            cur.execute(_SCHEMA_SQL.format(s=s))
+            fill = {
+                "events": args.events,
+                "per_day": max(1, min(args.per_day, 99)),
+                "participants": args.participants,
+                "commenters": args.commenters,
+            }
+            for stmt in _FILL_SQL:
+                cur.execute(stmt.format(s=s), fill)
+            for table in ("posts", "participants", "commenters"):
+                cur.execute(f"ANALYZE {s}.{table}")
+        conn.commit()
+        print(
+            f"loaded {args.events} events, {args.participants} participants, {args.commenters} commenters "
+            f"in {time.perf_counter() - t0:.1f}s"
+        )
+
+        before = _measure(conn, s, args.runs, args.plans, "before (primary key only)")
+        took = _apply_migration(conn, s)
+        print(f"\nmigration applied in {took:.1f}s")
+        after = _measure(conn, s, args.runs, args.plans, "after 20261018140000_hot_path_indexes.sql")
+
+        print("\n== median speedup")
+        for name, b in before.items():
+            a = after.get(name, {})
+            if "median_ms" in b and "median_ms" in a and a["median_ms"] > 0:
+                print(f"  {name:24s} {b['median_ms']:8.3f} -> {a['median_ms']:8.3f} ms  x{b['median_ms'] / a['median_ms']:.1f}")
+            else:
+                print(f"  {name:24s} {b.get('error') or b.get('median_ms')} -> {a.get('error') or a.get('median_ms')}")
+
+        if not args.keep:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA {s} CASCADE")
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
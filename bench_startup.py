@@ -0,0 +1,90 @@
+"""
+기동 시간 벤치마크: 스키마 캐시 없음(cold) vs 있음(warm).
+
+매 회 새 파이썬 프로세스에서 comment_dart 를 import(= CommentDatabase 생성·스키마 감지)하고
+Flask test client 로 첫 요청(/guest)을 처리할 때까지의 시간을 잰다.
+
+    python bench_startup.py            # cold/warm 각 3회
+    python bench_startup.py --runs 5 --path /
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import comment_dart
+t1 = time.perf_counter()
+client = comment_dart.app.test_client()
+resp = client.get(PATH)
+t2 = time.perf_counter()
+print("BENCH_RESULT " + json.dumps({
+    "import_sec": t1 - t0,
+    "first_request_sec": t2 - t1,
+    "time_to_first_request_sec": t2 - t0,
+    "status": resp.status_code,
+}))
+"""
+
+
+def _run_once(path: str, cache_path: str) -> dict:
+    env = dict(os.environ)
+    env["SUPABASE_SCHEMA_CACHE_PATH"] = cache_path
+    code = _CHILD.replace("PATH", json.dumps(path))
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("BENCH_RESULT "):
+            return json.loads(line[len("BENCH_RESULT "):])
+    raise RuntimeError(f"benchmark child failed:\n{proc.stderr[-2000:]}")
+
+
+def _summary(label: str, results: list) -> None:
+    ttfr = [r["time_to_first_request_sec"] for r in results]
+    imp = [r["import_sec"] for r in results]
+    print(
+        f"{label:5s} runs={len(results)} "
+        f"import(median)={statistics.median(imp):.3f}s "
+        f"time-to-first-request(median)={statistics.median(ttfr):.3f}s "
+        f"min={min(ttfr):.3f}s max={max(ttfr):.3f}s"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="CommentDatabase 스키마 캐시 기동 벤치마크")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--path", default="/guest", help="첫 요청 경로")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as td:
+        cache_path = os.path.join(td, "schema_cache.json")
+        cold, warm = [], []
+        for _ in range(args.runs):
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            cold.append(_run_once(args.path, cache_path))
+            warm.append(_run_once(args.path, cache_path))
+        _summary("cold", cold)
+        _summary("warm", warm)
+        saved = statistics.median([r["time_to_first_request_sec"] for r in cold]) - statistics.median(
+            [r["time_to_first_request_sec"] for r in warm]
+        )
+        print(f"schema cache saves ~{saved:.3f}s per boot")
+
+
+if __name__ == "__main__":
+    main()
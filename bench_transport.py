@@ -0,0 +1,126 @@
+"""
+Supabase HTTP 전송 계층 벤치마크 (로컬 HTTP 대역 서버, 네트워크/키 불필요).
+
+대역 서버는 새 연결마다 --handshake-ms 만큼 지연해 TLS 핸드셰이크 비용을 흉내 낸다.
+PostgREST 클라이언트(SyncPostgrestClient)로 posts?select=id&limit=1 을 호출하며 비교:
+
+  cold     요청마다 새 클라이언트 (매번 연결+핸드셰이크)
+  pooled   keep-alive 풀 공유, 연속 요청
+  idle     요청 사이에 --idle 초 쉼, keep-warm 없음 (keep-alive 만료 후 재연결)
+  warm     같은 유휴 패턴 + keep-warm ping
+
+    python bench_transport.py
+    python bench_transport.py --runs 50 --handshake-ms 80 --idle 4
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 유휴 시나리오가 빨리 끝나도록 keep-alive 를 짧게 (import 전에 설정)
+os.environ.setdefault("SUPABASE_HTTP_KEEPALIVE_SEC", "3")
+os.environ.setdefault("SUPABASE_HTTP2", "0")
+
+from postgrest import SyncPostgrestClient  # noqa: E402
+
+from standalone_comment_monitor.transport import (  # noqa: E402
+    SupabaseTransport,
+    TransportMetrics,
+    build_http_client,
+)
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    handshake_sec = 0.0
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        # 헤더/본문 분할 전송 + delayed ACK 로 생기는 40ms 지연 제거 (실서버와 비슷하게)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        type(self).connections += 1
+        time.sleep(self.handshake_sec)
+
+    def do_GET(self):
+        body = json.dumps([{"id": "2026101801"}]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _call(client) -> float:
+    t0 = time.perf_counter()
+    SyncPostgrestClient(BASE_URL, http_client=client).table("posts").select("id").limit(1).execute()
+    return time.perf_counter() - t0
+
+
+def _report(label: str, lat: list, connects: int) -> None:
+    print(
+        f"{label:7s} n={len(lat):3d} median={statistics.median(lat) * 1000:7.2f}ms "
+        f"p95={sorted(lat)[int(len(lat) * 0.95) - 1] * 1000:7.2f}ms new_connections={connects}"
+    )
+
+
+def main() -> None:
+    global BASE_URL
+    ap = argparse.ArgumentParser(description="Supabase 전송 계층 벤치마크")
+    ap.add_argument("--runs", type=int, default=30, help="cold/pooled 요청 수")
+    ap.add_argument("--idle-runs", type=int, default=4, help="idle/warm 요청 수")
+    ap.add_argument("--handshake-ms", type=float, default=50.0)
+    ap.add_argument("--idle", type=float, default=4.0, help="idle/warm 요청 간 쉬는 시간(초), keep-alive(3초)보다 길게")
+    args = ap.parse_args()
+
+    _StandIn.handshake_sec = args.handshake_ms / 1000.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # cold: 요청마다 새 클라이언트
+    c0 = _StandIn.connections
+    lat = []
+    for _ in range(args.runs):
+        client = build_http_client(10.0)
+        lat.append(_call(client))
+        client.close()
+    _report("cold", lat, _StandIn.connections - c0)
+
+    # pooled: 공유 풀
+    metrics = TransportMetrics()
+    client = build_http_client(10.0, metrics)
+    c0 = _StandIn.connections
+    lat = [_call(client) for _ in range(args.runs)]
+    _report("pooled", lat, _StandIn.connections - c0)
+    host = metrics.snapshot().get("127.0.0.1", {})
+    print(f"        metrics: requests={host.get('requests')} connects={host.get('connects')} "
+          f"reuse_ratio={host.get('reuse_ratio', 0):.2f}")
+    client.close()
+
+    # idle / warm
+    for label, keepwarm in (("idle", 0.0), ("warm", args.idle / 3)):
+        transport = SupabaseTransport(keepwarm_sec=keepwarm)
+        client = transport.http_client("read")
+        _call(client)
+        transport.start_keepwarm(lambda role: _call(transport.http_client(role)))
+        c0 = _StandIn.connections
+        lat = []
+        for _ in range(args.idle_runs):
+            time.sleep(args.idle)
+            lat.append(_call(client))
+        _report(label, lat, _StandIn.connections - c0)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+당첨자 계산 벤치마크: 기존 선형 calculate_winner_at_angle vs WheelLayout (누적 경계 + 이진 탐색).
+
+참가자 10 ~ 100만 명(티켓 1~5장 무작위)에 대해
+  legacy   섹터 dict 목록 생성 + 섹터마다 DEBUG print + 선형 탐색 (stdout 은 /dev/null 로 보냄)
+  build    WheelLayout 생성 (참가자 집합이 바뀔 때 1회, ParticipantPool 에 캐시)
+  lookup   캐시된 배치에서 각도 → 당첨자
+의 1회당 시간을 재고, 무작위 각도와 섹터 경계 바로 위/아래 각도에서 두 방식의 당첨자가 같은지 확인한다.
+
+    python bench_wheel_layout.py
+    python bench_wheel_layout.py --sizes 10,1000,100000 --runs 5
+"""
+import argparse
+import contextlib
+import math
+import os
+import random
+import statistics
+import time
+
+from standalone_comment_monitor.wheel_layout import WheelLayout
+
+
+def legacy_calculate_winner_at_angle(angle, participants_list):
+    """user-022 이전 comment_dart.calculate_winner_at_angle (비교 기준, 그대로 복사)."""
+    if not participants_list:
+        return "N/A"
+
+    names_local = [p[0] for p in participants_list]
+    counts_local = [p[1] for p in participants_list]
+    total_count_local = sum(counts_local)
+
+    if total_count_local == 0:
+        return names_local[0] if names_local else "N/A"
+
+    print(f"DEBUG: 당첨자 계산에 사용되는 각도: {angle:.2f}°")
+
+    cumulative_angle = 0.0
+    segments = []
+
+    for i, (name, cnt) in enumerate(zip(names_local, counts_local)):
+        portion = cnt / total_count_local
+        sector_size = portion * 360.0
+        sector_start = cumulative_angle
+        sector_end = cumulative_angle + sector_size
+
+        segments.append({
+            'name': name,
+            'start': sector_start,
+            'end': sector_end,
+            'size': sector_size
+        })
+
+        print(f"DEBUG: Sector {i}: {name}, {sector_start:.2f}° ~ {sector_end:.2f}°, size: {sector_size:.2f}°")
+
+        cumulative_angle += sector_size
+
+    normalized_angle = angle % 360
+
+    for segment in segments:
+        if segment['start'] <= normalized_angle < segment['end']:
+            print(f"DEBUG: 당첨자 결정 - {segment['name']} (각도: {normalized_angle:.2f}°)")
+            return segment['name']
+
+    if normalized_angle >= segments[-1]['start'] or normalized_angle < segments[0]['start']:
+        print(f"DEBUG: 경계 조건 처리 - 첫 번째 참가자: {names_local[0]} (각도: {normalized_angle:.2f}°)")
+        return names_local[0]
+
+    print(f"ERROR: 당첨자를 결정할 수 없음 (각도: {normalized_angle:.2f}°)")
+    return names_local[0]
+
+
+def _rows(n: int, rng: random.Random):
+    return [(f"user{i:07d}", rng.randint(1, 5), None) for i in range(n)]
+
+
+def _probe_angles(layout: WheelLayout, rng: random.Random, count: int):
+    """무작위 각도 + 무작위로 고른 섹터 경계의 바로 아래/정확히/바로 위 + 0/360 근처."""
+    angles = [rng.uniform(0, 360) for _ in range(count)]
+    ends = layout.ends
+    for i in rng.sample(range(len(ends)), min(len(ends), count)):
+        e = ends[i]
+        angles += [math.nextafter(e, -math.inf), e, math.nextafter(e, math.inf)]
+    angles += [0.0, math.nextafter(360.0, 0.0), 360.0, 720.5, -0.25]
+    return angles
+
+
+def _time_per_call(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="룰렛 당첨자 계산 벤치마크 (선형 vs 이진 탐색)")
+    ap.add_argument("--sizes", default="10,100,1000,10000,100000,1000000")
+    ap.add_argument("--runs", type=int, default=5, help="legacy/build 반복 횟수 (큰 크기는 자동으로 줄임)")
+    ap.add_argument("--lookups", type=int, default=100_000, help="lookup 측정 횟수")
+    ap.add_argument("--verify", type=int, default=200, help="크기별 비교 각도 수 (legacy 호출 횟수는 크기에 맞게 줄임)")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'n':>9s} {'legacy/spin':>13s} {'build':>11s} {'lookup':>10s} {'speedup':>10s}  check")
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        for n in (int(x) for x in args.sizes.split(",") if x.strip()):
+            rows = _rows(n, rng)
+            runs = max(1, min(args.runs, 2_000_000 // max(n, 1)))
+
+            with contextlib.redirect_stdout(devnull):
+                legacy = _time_per_call(lambda: legacy_calculate_winner_at_angle(rng.uniform(0, 360), rows), runs)
+            build = _time_per_call(lambda: WheelLayout.from_rows(rows), runs)
+
+            layout = WheelLayout.from_rows(rows)
+            angles = [rng.uniform(0, 360) for _ in range(args.lookups)]
+            t0 = time.perf_counter()
+            for a in angles:
+                layout.winner_at(a)
+            lookup = (time.perf_counter() - t0) / len(angles)
+
+            # legacy 는 호출마다 O(n) 이므로 큰 크기에서는 비교 각도를 줄인다
+            probes = _probe_angles(layout, rng, max(3, min(args.verify, 20_000_000 // (n * 50) or 1)))
+            mismatches = 0
+            with contextlib.redirect_stdout(devnull):
+                for a in probes:
+                    if legacy_calculate_winner_at_angle(a, rows) != layout.winner_at(a):
+                        mismatches += 1
+            check = "ok" if not mismatches else f"{mismatches} MISMATCH"
+            print(
+                f"{n:9d} {legacy * 1000:10.3f} ms {build * 1000:8.3f} ms {lookup * 1e6:7.2f} us "
+                f"{legacy / lookup:9.0f}x  {check} ({len(probes)} angles)"
+            )
+
+
+if __name__ == "__main__":
+    main()
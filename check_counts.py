@@ -1,23 +1,22 @@
-import os
-from supabase import create_client
-from dotenv import load_dotenv
+"""
+이벤트별 참가자 / 댓글 작성자 수 확인.
+이벤트 ID 목록 1회 + get_many(in 필터 묶음 조회) 몇 회로 끝난다. (이벤트마다 count 쿼리를 보내지 않음)
+"""
+from standalone_comment_monitor.db_handler import CommentDatabase
+from standalone_comment_monitor.storage import event_sort_key
 
-load_dotenv()
 
 def check_counts():
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
-    supabase = create_client(url, key)
-    
-    res = supabase.table("posts").select("url, last_comment_id").execute()
-    print("Posts:")
-    for post in res.data:
-        p_count = supabase.table("participants").select("count", count="exact").eq("url", post['url']).execute()
-        c_count = supabase.table("commenters").select("count", count="exact").eq("url", post['url']).execute()
-        print(f"URL: {post['url']}")
-        print(f"  Last Comment ID: {post['last_comment_id']}")
-        print(f"  Participants: {p_count.count}")
-        print(f"  Commenters: {c_count.count}")
+    db = CommentDatabase()
+    events = db.get_many(db.get_all_event_ids())
+    print(f"Posts: {len(events)}")
+    for event_id in sorted(events, key=event_sort_key, reverse=True):
+        participants, last_comment_id, commenters = events[event_id][:3]
+        print(f"Event: {event_id}")
+        print(f"  Last Comment ID: {last_comment_id}")
+        print(f"  Participants: {len(participants)}")
+        print(f"  Commenters: {len(commenters)}")
+
 
 if __name__ == "__main__":
     check_counts()
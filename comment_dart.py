@@ -8,7 +8,7 @@ import random
 import datetime
 from urllib.parse import quote
 
-from flask import Flask, render_template, send_from_directory, request, jsonify, Blueprint, redirect, url_for, flash
+from flask import Flask, render_template, send_from_directory, request, jsonify, Blueprint, redirect, url_for, flash, g, Response
 from flask_cors import CORS
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user
 from wtforms import Form, StringField, PasswordField, SubmitField
@@ -16,18 +16,41 @@ from wtforms.validators import DataRequired
 
 from flask_socketio import SocketIO
 
-from standalone_comment_monitor.db_handler import CommentDatabase
-from event_utils import normalize_event_id, format_event_at_display, get_allowed_list as _get_allowed_list_util
+from standalone_comment_monitor import metrics
+from standalone_comment_monitor.active_event import ActiveEventResolver
+from standalone_comment_monitor.participant_pool import (
+    ParticipantPoolCache,
+    event_pool,
+    ko_first_name_key as _ko_first_name_key,
+)
+from standalone_comment_monitor.spin_draw import draw_spin
+from standalone_comment_monitor.storage import create_storage
+from standalone_comment_monitor.wheel_layout import WheelLayout, WheelLayoutRegistry
+from event_utils import (
+    normalize_event_id,
+    format_event_at_display,
+    get_allowed_list as _get_allowed_list_util,
+    parse_allowed_list_text,
+)
 from operator_routes import operator_bp
 
-db = CommentDatabase()
+# ROULETTE_STORAGE=supabase(기본)|memory|sqlite — memory/sqlite 는 네트워크 없이 동작 (부하 테스트·소규모 현장)
+db = create_storage()
+# 활성 이벤트 키는 메모리에서 읽는다. 운영자 활성화는 operator_routes 가 즉시 반영, 외부 변경은 주기 확인.
+active_event = ActiveEventResolver(
+    db.get_active_event_id,
+    cache_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), "active_event.txt"),
+)
+# 이벤트별 정렬·정리된 참가자 풀. 내용이 같으면 렌더/상태 동기화/당첨 확정이 같은 풀을 재사용한다.
+participant_pools = ParticipantPoolCache()
+# 내용 해시로 게시한 원판 배치. 소켓 메시지는 명단 대신 해시만 보내고 클라이언트는 /api/wheel/layout/<hash> 로 받는다.
+wheel_layouts = WheelLayoutRegistry()
 # 과거 monitor_view와 공유하던 메모리 상태 (선택적 동기화)
 event_states = {}
 _EVENT_SYNC_CACHE = {}  # key: event_id -> {"ts": float, "payload": dict}
 _EVENT_SYNC_TTL_SEC = 1.2
 
 HAS_MONITOR = True  # Supabase/DB 이벤트·사전명단 사용
-_LAST_ACTIVE_EVENT_KEY = None  # Supabase 일시 장애 시 활성 이벤트 폴백 캐시
 _RECENT_CONFIRM_GUARD = {}  # key: "<event>::<winner>" -> ts
 _PROCESSED_ROUND_CONFIRM = {}  # key: round_id -> ts
 
@@ -76,55 +99,23 @@ def _is_already_processed_round(round_id: str, ttl_sec: int = 180, register_on_m
     return False
 
 
-def _is_hangul_char(ch: str) -> bool:
-    if not ch:
-        return False
-    code = ord(ch)
-    return (
-        0xAC00 <= code <= 0xD7A3  # Hangul Syllables
-        or 0x1100 <= code <= 0x11FF  # Hangul Jamo
-        or 0x3130 <= code <= 0x318F  # Hangul Compatibility Jamo
-        or 0xA960 <= code <= 0xA97F  # Hangul Jamo Extended-A
-        or 0xD7B0 <= code <= 0xD7FF  # Hangul Jamo Extended-B
-    )
-
-
-def _ko_first_name_key(name: str):
-    """한글 이름을 영문/기타보다 먼저 정렬하기 위한 키."""
-    s = unicodedata.normalize("NFC", str(name or "").strip())
-    if not s:
-        return (2, "")
-    group = 0 if _is_hangul_char(s[0]) else 1
-    return (group, s.casefold())
+def _roulette_pool_from_participants_dict(participants_dict, winners_str, allow_duplicates, event_id=None):
+    """load_participants와 동일 정책의 룰렛 풀. 참가자가 없으면 None."""
+    if not participants_dict:
+        return None
+    return participant_pools.for_participants(event_id, participants_dict, winners_str, allow_duplicates)
 
 
-def _normalize_ticket_count(v):
-    """participants dict 값: 스칼라 또는 (count, created_at) 등 튜플."""
-    if isinstance(v, (tuple, list)):
-        raw = v[0] if v else 0
-    else:
-        raw = v
-    try:
-        return int(raw)
-    except (TypeError, ValueError):
-        return 1
+def _publish_pool_layout(pool, numbered=False):
+    """풀의 원판 배치를 게시하고 해시를 돌려준다 (pool 이 None 이면 빈 배치).
+    numbered=False 는 pairs() 와 같은 실제 이름 명단, True 는 start_game 원판(100명 초과 시 번호).
+    """
+    return wheel_layouts.publish(pool.layout(numbered) if pool is not None else None)
 
 
-def _roulette_pairs_from_participants_dict(participants_dict, winners_str, allow_duplicates):
-    """load_participants와 동일 정책으로 룰렛용 [(이름, 횟수), ...]."""
-    if not participants_dict:
-        return []
-    won_names = []
-    if winners_str:
-        won_names = [w.strip() for w in winners_str.split(',') if w.strip()]
-    policy_allow_duplicates = (allow_duplicates != False)
-    out = []
-    for name, v in participants_dict.items():
-        if not policy_allow_duplicates and name in won_names:
-            continue
-        out.append((name, _normalize_ticket_count(v)))
-    out.sort(key=lambda x: _ko_first_name_key(x[0]))
-    return out
+def _pin_live_game_layouts():
+    """진행 중 게임(games[*]['layout_hash'])이 가리키는 배치를 LRU 에서 고정 (중간 합류자의 start_game 용)."""
+    wheel_layouts.pin(gm.get('layout_hash') for gm in games.values() if isinstance(gm, dict))
 
 
 def _event_at_input_local_value(iso_str):
@@ -167,37 +158,9 @@ def _build_beep_sound_options():
 
 
 def get_active_url():
-    """현재 활성화된 이벤트 URL을 가져옵니다."""
-    global _LAST_ACTIVE_EVENT_KEY
+    """현재 활성화된 이벤트 키 (메모리 값). 조회 실패 시에도 마지막 값 → active_event.txt 순으로 폴백한다."""
     if not HAS_MONITOR: return None
-    cache_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "active_event.txt")
-    try:
-        # DB에서 활성 URL 가져오기
-        uid = db.get_active_event_id()
-        if uid:
-            key = normalize_event_id(uid)
-            _LAST_ACTIVE_EVENT_KEY = key
-            try:
-                with open(cache_file, "w", encoding="utf-8") as f:
-                    f.write(str(key))
-            except Exception:
-                pass
-            return key
-    except Exception:
-        pass
-    # Supabase 일시 오류 시 마지막 성공 이벤트로 폴백 (운영 중 "참여자 없음" 오탐 방지)
-    if _LAST_ACTIVE_EVENT_KEY:
-        return _LAST_ACTIVE_EVENT_KEY
-    try:
-        if os.path.exists(cache_file):
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cached = (f.read() or "").strip()
-            if cached:
-                _LAST_ACTIVE_EVENT_KEY = normalize_event_id(cached)
-                return _LAST_ACTIVE_EVENT_KEY
-    except Exception:
-        pass
-    return None
+    return active_event.get()
 
 
 def _ensure_default_active_event():
@@ -205,7 +168,8 @@ def _ensure_default_active_event():
     if not HAS_MONITOR:
         return
     try:
-        if db.get_active_event_id():
+        # 메모리 활성 키가 있으면 조회하지 않는다 (페이지 렌더마다 is_active 쿼리 방지)
+        if active_event.get():
             return
         evs = db.list_events(limit=1)
         row = evs[0] if evs else None
@@ -215,6 +179,7 @@ def _ensure_default_active_event():
             # load_participants()가 빈 목록으로 떨어지지 않는다.
             ok, err = db.set_active_event_id_blocking(ek)
             if ok:
+                active_event.set(ek)
                 print(f"DEBUG: [ensure_active] Latest event activated: {ek}")
             else:
                 print(f"DEBUG: [ensure_active] activate failed: {err}")
@@ -225,10 +190,32 @@ def _ensure_default_active_event():
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your_secret_key'
 app.config['ROULETTE_DB'] = db
+app.config['ACTIVE_EVENT'] = active_event
+app.config['PARTICIPANT_POOLS'] = participant_pools
+app.config['WHEEL_LAYOUTS'] = wheel_layouts
+
+@app.before_request
+def _metrics_start_timer():
+    g._metrics_t0 = time.perf_counter()
+
+
+@app.after_request
+def _metrics_observe_request(response):
+    t0 = g.pop("_metrics_t0", None)
+    if t0 is not None:
+        # endpoint 이름으로 묶는다 (URL 그대로 쓰면 이벤트 ID 마다 라벨이 늘어남)
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - t0, request.endpoint or "unmatched", request.method, response.status_code
+        )
+    return response
+
 
 @app.after_request
 def add_header(response):
     """모든 응답에 캐시 방지 헤더를 추가하여 브라우저/CDN이 과거 데이터를 보여주는 것을 막습니다."""
+    # 내용 해시 주소(원판 배치)는 내용이 바뀌지 않으므로 캐시를 허용한다
+    if request.endpoint == 'wheel_layout_view':
+        return response
     response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '0'
@@ -242,7 +229,16 @@ def debug_view():
         "supabase_url": os.getenv('SUPABASE_URL', '')[:20] + '...',
         "has_supabase_key": bool(os.getenv('SUPABASE_KEY')),
         "has_monitor": HAS_MONITOR,
-        "db_is_supabase": bool(db.supabase) if HAS_MONITOR else False
+        "db_is_supabase": bool(db.supabase) if HAS_MONITOR else False,
+        "storage_backend": db.backend,
+        "snapshot_cache": db.snapshot_cache_stats() if HAS_MONITOR else None,
+        "write_queue": db.write_queue_stats() if HAS_MONITOR else None,
+        "replica": db.replica_stats() if HAS_MONITOR else None,
+        "transport": db.transport_stats() if HAS_MONITOR else None,
+        "active_event": active_event.stats(),
+        "participant_pools": participant_pools.stats(),
+        "wheel_layouts": wheel_layouts.stats(),
+        "archive": db.archive.stats() if db.archive else None,
     }
     if HAS_MONITOR and db.supabase:
         try:
@@ -253,6 +249,24 @@ def debug_view():
             info['supabase_error'] = str(e)
     return jsonify(info)
 
+@app.route('/api/wheel/layout/<layout_hash>')
+def wheel_layout_view(layout_hash):
+    """게시된 원판 배치 (names / tickets / colors / bounds). 내용 해시 주소라 바뀌지 않으므로 오래 캐시해도 된다."""
+    if request.if_none_match.contains(layout_hash):
+        return Response(status=304, headers={'ETag': f'"{layout_hash}"'})
+    body = wheel_layouts.get(layout_hash)
+    if body is None:
+        return jsonify({'error': 'unknown layout'}), 404
+    resp = Response(body, content_type='application/json; charset=utf-8')
+    resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    resp.headers['ETag'] = f'"{layout_hash}"'
+    return resp
+
+@app.route('/metrics')
+def metrics_view():
+    """Prometheus 텍스트 형식 지표 (저장소·Supabase 요청·라우트·소켓 지연, 캐시 적중률, 접속 수)."""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 app.register_blueprint(operator_bp)
 
 # CORS 설정 추가
@@ -330,8 +344,10 @@ def guest_view():
     if HAS_MONITOR:
         _ensure_default_active_event()
     active_url = get_active_url() if HAS_MONITOR else None
-    p_data = load_participants(active_event_id=active_url)
-    p_list = p_data if p_data else []
+    p_pool = load_participant_pool(active_event_id=active_url)
+    p_list = p_pool.roulette_rows() if p_pool is not None else []
+    # 페이지에 이미 그린 원판 배치의 해시 (첫 스핀에서 같은 해시면 클라이언트가 다시 받지 않음)
+    wheel_layout_hash = _publish_pool_layout(p_pool, numbered=True)
     
     # colors 리스트 생성
     p_colors = []
@@ -370,17 +386,11 @@ def guest_view():
             all_confirmed_names |= set(won_names)
 
         allowed_dict = get_allowed_list(active_url) if active_url else get_allowed_list()
-        allowed_info = []
-        for name, tickets in allowed_dict.items():
-            name_norm = unicodedata.normalize('NFC', name.strip())
-            is_confirmed = name_norm in all_confirmed_names
-            allowed_info.append({
-                'name': name_norm,
-                'tickets': tickets,
-                'is_confirmed': is_confirmed
-            })
-        # 정렬: 항상 가나다순 고정 (체크 상태 변경으로 위치가 이동하지 않게)
-        allowed_info.sort(key=lambda x: _ko_first_name_key(x['name']))
+        # 정렬: 항상 가나다순 고정 (체크 상태 변경으로 위치가 이동하지 않게) — 정렬된 전체 명단 풀 재사용
+        allowed_info = [
+            {'name': name_norm, 'tickets': tickets, 'is_confirmed': name_norm in all_confirmed_names}
+            for name_norm, tickets in participant_pools.for_allowed(active_url, allowed_dict).pairs()
+        ]
         if not allowed_info and p_list:
             for p in p_list:
                 name_norm = unicodedata.normalize("NFC", str(p[0]).strip())
@@ -409,6 +419,7 @@ def guest_view():
 
     return render_template('index.html',
                            participants=p_list,
+                           wheel_layout_hash=wheel_layout_hash,
                            confirmed_names=list(all_confirmed_set), # ✅ 표시용
                            colors=p_colors,
                            user=None,
@@ -428,36 +439,14 @@ def guest_view():
                            supabase_rt_anon_key=supabase_rt_anon_key,
                            roulette_closed_message=_roulette_closed_message_for_event(active_url, title))
     
-def _roulette_list_from_allowed_dict(allowed_dict, winners_str, allow_duplicates):
-    """사전 명단(dict)에서 룰렛용 (이름, 티켓수, created_at) 리스트를 만듭니다."""
-    won_names = []
-    if winners_str:
-        won_names = [unicodedata.normalize('NFC', w.strip()) for w in winners_str.split(',') if w.strip()]
-    policy_allow_duplicates = (allow_duplicates != False)
-    participants = []
-    for name, tickets in allowed_dict.items():
-        name_norm = unicodedata.normalize('NFC', str(name).strip())
-        if not policy_allow_duplicates and name_norm in won_names:
-            continue
-        try:
-            t = int(tickets)
-        except (TypeError, ValueError):
-            t = 1
-        participants.append((name_norm, t, None))
-    participants.sort(key=lambda x: _ko_first_name_key(x[0]))
-    if len(participants) > 100:
-        participants = [(f"{i+1}", p[1], p[2]) for i, p in enumerate(participants)]
-    return participants
-
-
 # ----- 참가자 로딩 함수 (가나다순 정렬 추가) -----
-def load_participants(filename="participants.txt", active_event_id=None):
+def load_participant_pool(active_event_id=None):
     """
-    참가자 데이터를 로드합니다. 
+    룰렛 풀(ParticipantPool)을 찾습니다. 없으면 None.
     1. 활성화된 이벤트가 있으면 DB에서 가져옵니다 (Render 대응).
     2. 확정 참가자(participants 테이블)가 비어 있어도 사전 명단(allowed_list)이 있으면 그걸 룰렛 풀로 사용합니다.
        (댓글 수집 없이 명단만 올린 경우 원판·추첨이 동작하도록)
-    3. DB에 데이터가 없거나 활성화된 이벤트가 없으면 빈 목록을 반환합니다.
+    같은 참가자·당첨자 상태면 이전 요청에서 만든 풀(원판 배치 포함)을 그대로 씁니다.
     """
     if HAS_MONITOR:
         try:
@@ -467,44 +456,29 @@ def load_participants(filename="participants.txt", active_event_id=None):
                 _ensure_default_active_event()
                 active_url = get_active_url()
             if active_url:
-                participants_dict, _, _, _, _, _, winners_str, allow_duplicates, _, _ = db.get_data(active_url)
-                if participants_dict:
-                    # [추가] 중복 당첨 비허용 시 기존 당첨자 명단 제외
-                    won_names = []
-                    if winners_str:
-                        won_names = [w.strip() for w in winners_str.split(',') if w.strip()]
-                    
-                    policy_allow_duplicates = (allow_duplicates != False)
-                    
-                    # 룰렛 엔진용 리스트 형식으로 변환: (이름, 횟수, 시간)
-                    participants = []
-                    for name, v in participants_dict.items():
-                        if not policy_allow_duplicates and name in won_names:
-                            print(f"DEBUG: [Filter] Skipping previous winner: {name}")
-                            continue
-
-                        count = _normalize_ticket_count(v)
-                        created_at = v[1] if isinstance(v, (tuple, list)) and len(v) > 1 else None
-                        participants.append((name, count, created_at))
-                    
-                    participants.sort(key=lambda x: _ko_first_name_key(x[0]))
-                    
-                    # 별명 100개 이상이면 숫자로 대체 (기존 로직 유지)
-                    if len(participants) > 100:
-                        participants = [(f"{i+1}", p[1], p[2]) for i, p in enumerate(participants)]
-                    
-                    print(f"DEBUG: Loaded {len(participants)} participants from DB for {active_url}")
-                    return participants
-
-                allowed_dict = get_allowed_list(active_url)
-                if allowed_dict:
-                    participants = _roulette_list_from_allowed_dict(allowed_dict, winners_str, allow_duplicates)
-                    print(f"DEBUG: Loaded {len(participants)} participants from allowed_list fallback for {active_url}")
-                    return participants
+                # 룰렛 엔진용 (이름, 횟수, 시간). 중복 당첨 비허용이면 기당첨자 제외, 100명 초과면 번호로 대체.
+                pool, source, source_count = event_pool(db, active_url, participant_pools)
+                if source == "participants":
+                    skipped = source_count - len(pool)
+                    if skipped:
+                        print(f"DEBUG: [Filter] Skipped {skipped} previous winner(s)")
+                    print(f"DEBUG: Loaded {len(pool)} participants from DB for {active_url}")
+                elif source == "allowed":
+                    print(f"DEBUG: Loaded {len(pool)} participants from allowed_list fallback for {active_url}")
+                return pool
         except Exception as e:
             print(f"DEBUG: Error loading participants from DB: {e}")
 
-    return []
+    return None
+
+
+def load_participants(filename="participants.txt", active_event_id=None):
+    """
+    참가자 데이터를 로드합니다. [(원판 표시 이름, 횟수, 시간), ...] (load_participant_pool 참고)
+    DB에 데이터가 없거나 활성화된 이벤트가 없으면 빈 목록을 반환합니다.
+    """
+    pool = load_participant_pool(active_event_id)
+    return pool.roulette_rows() if pool is not None else []
 
 # 전역 변수 제거 (함수 내에서 동적 로드)
 # participants = load_participants()
@@ -515,8 +489,10 @@ def index():
     if HAS_MONITOR:
         _ensure_default_active_event()
     active_url = get_active_url() if HAS_MONITOR else None
-    p_data = load_participants(active_event_id=active_url)
-    p_list = p_data if p_data else []
+    p_pool = load_participant_pool(active_event_id=active_url)
+    p_list = p_pool.roulette_rows() if p_pool is not None else []
+    # 페이지에 이미 그린 원판 배치의 해시 (첫 스핀에서 같은 해시면 클라이언트가 다시 받지 않음)
+    wheel_layout_hash = _publish_pool_layout(p_pool, numbered=True)
     confirmed_names = [unicodedata.normalize('NFC', p[0].strip()) for p in p_list] if p_list else []
     
     # colors 리스트 생성
@@ -554,17 +530,11 @@ def index():
             all_confirmed_names |= set(won_names)
 
         allowed_dict = get_allowed_list(active_url) if active_url else get_allowed_list()
-        allowed_info = []
-        for name, tickets in allowed_dict.items():
-            name_norm = unicodedata.normalize('NFC', name.strip())
-            is_confirmed = name_norm in all_confirmed_names
-            allowed_info.append({
-                'name': name_norm,
-                'tickets': tickets,
-                'is_confirmed': is_confirmed
-            })
-        # 정렬: 항상 가나다순 고정 (체크 상태 변경으로 위치가 이동하지 않게)
-        allowed_info.sort(key=lambda x: _ko_first_name_key(x['name']))
+        # 정렬: 항상 가나다순 고정 (체크 상태 변경으로 위치가 이동하지 않게) — 정렬된 전체 명단 풀 재사용
+        allowed_info = [
+            {'name': name_norm, 'tickets': tickets, 'is_confirmed': name_norm in all_confirmed_names}
+            for name_norm, tickets in participant_pools.for_allowed(active_url, allowed_dict).pairs()
+        ]
         # posts.allowed_list 가 비어 있어도 participants 테이블에만 명단이 있을 수 있음
         if not allowed_info and p_list:
             for p in p_list:
@@ -604,6 +574,7 @@ def index():
         supabase_rt_anon_key = os.getenv('SUPABASE_ANON_KEY', '') or ''
         return render_template('index.html',
                              participants=p_list,
+                             wheel_layout_hash=wheel_layout_hash,
                              confirmed_names=list(all_confirmed_set), # ✅ 표시용
                              colors=p_colors,
                              user=current_user,
@@ -674,10 +645,11 @@ def _persist_roulette_closed_title(event_id: str, closed: bool) -> bool:
     if not event_id:
         return False
     try:
-        participants, last_id, _, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at = db.get_data(
+        participants, last_id, _, title, prizes, memo, _, allow_duplicates, allowed_list, event_at = db.get_data(
             event_id, include_commenters=False
         )
         next_title = _apply_ended_title_prefix(title) if closed else _remove_ended_title_prefix(title)
+        # winners 는 넘기지 않는다 (읽어 둔 값으로 다시 쓰면 그 사이 확정된 당첨자가 사라질 수 있음)
         ok, err_detail = db.save_data_blocking(
             event_id,
             dict(participants or {}),
@@ -685,7 +657,6 @@ def _persist_roulette_closed_title(event_id: str, closed: bool) -> bool:
             title=next_title,
             prizes=prizes or "",
             memo=memo or "",
-            winners=winners or "",
             allow_duplicates=bool(allow_duplicates) if allow_duplicates is not None else False,
             allowed_list=allowed_list or "",
             event_at=event_at,
@@ -712,6 +683,7 @@ def _roulette_closed_message_for_event(event_id: str, title: str) -> str:
 
 @socketio.on('connect')
 def handle_connect():
+    metrics.SOCKET_CONNECTED.inc()
     print("Client connected:", request.sid)
 
 
@@ -723,18 +695,22 @@ def monitor_page_redirect():
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    metrics.SOCKET_CONNECTED.dec()
     print("Client disconnected:", request.sid)
 
 @socketio.on('reset_game')
+@metrics.timed_socket_event('reset_game')
 def handle_reset_game():
     print("Game reset request received - clearing all game states")
     global games
     # 모든 게임 상태 초기화
     games.clear()
+    _pin_live_game_layouts()
     socketio.emit('game_reset_complete', namespace='/')
 
 
 @socketio.on('end_roulette_event')
+@metrics.timed_socket_event('end_roulette_event')
 def handle_end_roulette_event(data=None):
     """운영자: 현장에서 룰렛 추첨을 완전히 종료 (원판 안내 + 시작/+1분 차단)."""
     if not current_user.is_authenticated:
@@ -756,6 +732,7 @@ def handle_end_roulette_event(data=None):
     _persist_roulette_closed_title(active_url, True)
     global games
     games.clear()
+    _pin_live_game_layouts()
     # game_reset_complete 는 보내지 않음(잠깐 시작 버튼이 풀리는 깜빡임 방지). 클라이언트가 roulette_event_ended 로 UI 정리.
     socketio.emit(
         'roulette_event_ended',
@@ -766,6 +743,7 @@ def handle_end_roulette_event(data=None):
 
 
 @socketio.on('cancel_roulette_event')
+@metrics.timed_socket_event('cancel_roulette_event')
 def handle_cancel_roulette_event(data=None):
     """운영자: 현장 종료 안내를 걷어 다시 룰렛 운영 가능 상태로."""
     if not current_user.is_authenticated:
@@ -802,6 +780,7 @@ def handle_cancel_roulette_event(data=None):
 
 
 @socketio.on('start_rotation')
+@metrics.timed_socket_event('start_rotation')
 def handle_start_rotation(data):
     """
     data = { time: "HH:MM:SS" } (UTC 기준)
@@ -874,33 +853,36 @@ def handle_start_rotation(data):
     # 총 지속시간도 저장 (추가)
     game['total_duration'] = duration
     
-    # 최종 회전 각도 미리 결정 (720~1440도 사이 랜덤)
-    # 정확한 계산을 위해 소수점 자리까지 유지
-    final_angle = random.uniform(720, 1440)
-    
-    # 화살표는 12시 방향(0도)에 고정됨
-    # 전체 회전 각도 저장
-    game['current_angle'] = final_angle
-    
-    # 화살표가 가리키는 실제 각도 계산 (0도가 12시 방향)
-    # 원판이 시계 방향으로 회전하면, 화살표의 상대적 위치는 반시계 방향으로 이동하는 효과
-    # 정확한 모듈로 연산 적용 후 정규화
-    relative_angle = (360 - (final_angle % 360)) % 360
-    
-    print(f"DEBUG: 최종 회전 각도: {final_angle:.2f}°, 상대 각도: {relative_angle:.2f}°")
-    
     # 현재 참가자 데이터 로드
-    p_data = load_participants()
-    p_list = p_data if p_data else []
+    pool = load_participant_pool()
+    p_list = pool.roulette_rows() if pool is not None else []
     
     if not p_list:
         print("DEBUG: No participants available for rotation.")
         socketio.emit('error', {'message': '참여자가 없습니다. 댓글을 확인해주세요.'}, namespace='/', to=request.sid)
         return
 
-    # 정확한 당첨자 계산 (화살표가 가리키는 섹터의 참가자)
-    winner = calculate_winner_at_angle(relative_angle, p_list)
+    # 최종 회전 각도(720~1440도)와 당첨자 결정 (ROULETTE_DRAW_MODE, spin_draw 참고)
+    # angle: 각도를 먼저 뽑고 화살표(12시 고정)가 가리키는 섹터의 참가자가 당첨
+    # alias: 별칭 테이블로 당첨자를 먼저 뽑고 그 섹터 안의 각도로 회전 (대규모 풀용)
+    spin = draw_spin(pool)
+    final_angle = spin.final_angle
+    relative_angle = spin.relative_angle
+    winner = spin.winner
+    # 전체 회전 각도 저장
+    game['current_angle'] = final_angle
+
+    start_deg, end_deg = pool.layout().sector(spin.index)
+    print(f"DEBUG: 최종 회전 각도: {final_angle:.2f}°, 상대 각도: {relative_angle:.2f}°")
+    print(
+        f"DEBUG: 당첨자 결정 [{spin.mode}] - {winner} "
+        f"(섹터 {spin.index}/{len(p_list)}, {start_deg:.4f}° ~ {end_deg:.4f}°)"
+    )
+    if not spin.landed:
+        print(f"DEBUG: [draw] 섹터가 너무 좁아 finalAngle 이 섹터 {spin.index} 경계 밖에 걸림 (당첨자는 유지)")
     game['final_winner'] = winner
+    # 이 스핀의 원판 배치 (중간 합류자에게 보내는 start_game 도 같은 해시를 쓴다)
+    game['layout_hash'] = _publish_pool_layout(pool, numbered=True)
     round_id = f"{active_url or 'noevent'}:{int(time.time() * 1000)}:{random.randint(1000, 9999)}"
     game['round_id'] = round_id
     
@@ -909,6 +891,7 @@ def handle_start_rotation(data):
 
     # 이 부분 추가: 게임 정보를 'global_game' 키에 복사
     games['global_game'] = game.copy()
+    _pin_live_game_layouts()
     
     # 클라이언트에게 모든 정보를 한 번에 전송
     socketio.emit('start_game', {
@@ -920,7 +903,8 @@ def handle_start_rotation(data):
         # [VIBE RULE] 클라이언트가 수신 지연(ms)을 계산하는 기준 시각 (동적 보정용)
         'sent_unix_ms': int(time.time() * 1000),
         'target_unix_ms': int((time.time() + max(0.0, duration)) * 1000),
-        'participants': p_list # 정확한 명단 동기화
+        # 정확한 명단 동기화: 명단 대신 배치 해시 (처음 보는 해시면 클라이언트가 /api/wheel/layout 에서 받음)
+        'layout_hash': game['layout_hash'],
     }, namespace='/')
         
     # 모든 클라이언트에게 게임 상태 정보 브로드캐스트
@@ -946,6 +930,7 @@ def handle_start_rotation(data):
     socketio.start_background_task(schedule_end_notification)
 
 @socketio.on('confirm_winner')
+@metrics.timed_socket_event('confirm_winner')
 def handle_confirm_winner(data=None):
     """
     애니메이션 완료 후 당첨자 확인 이벤트 처리
@@ -978,11 +963,11 @@ def handle_confirm_winner(data=None):
         latest_game = None
         latest_time = None
         
-        for gid, g in games.items():
-            if isinstance(g, dict) and g.get('target_time') and g.get('final_winner'):
-                if latest_time is None or g['target_time'] > latest_time:
-                    latest_time = g['target_time']
-                    latest_game = g
+        for gid, gm in games.items():
+            if isinstance(gm, dict) and gm.get('target_time') and gm.get('final_winner'):
+                if latest_time is None or gm['target_time'] > latest_time:
+                    latest_time = gm['target_time']
+                    latest_game = gm
         
         if latest_game:
             game_obj = latest_game
@@ -1017,64 +1002,51 @@ def handle_confirm_winner(data=None):
                 if _should_skip_duplicate_confirm(active_url, winner):
                     print(f"DEBUG: Duplicate confirm suppressed for {active_url} / {winner}")
                     return
-                # 1. 현재 데이터 모두 가져오기 (덮어쓰기 방지)
-                dataset = db.get_data(active_url)
-                if not dataset:
-                    print(f"WARNING: No dataset for {active_url}. Skipping confirmation.")
-                    socketio.emit('error', {'message': '이벤트 데이터를 찾을 수 없습니다.'}, namespace='/', to=request.sid)
-                    return
-
-                participants, last_id, all_commenters, title, prizes, memo, current_winners_str, allow_duplicates, _, _ = dataset
-                participants = dict(participants) if participants else {}
-
-                # 확정 참가자 행이 비어 있어도 사전 명단만 있으면 동일 풀로 복원 (원판·추첨과 일치)
-                if not participants:
-                    allowed_dict = get_allowed_list(active_url)
-                    if allowed_dict:
-                        for name, tickets in allowed_dict.items():
-                            name_norm = unicodedata.normalize('NFC', str(name).strip())
-                            try:
-                                t = int(tickets)
-                            except (TypeError, ValueError):
-                                t = 1
-                            participants[name_norm] = (t, None)
-                        won_prev = []
-                        if current_winners_str:
-                            won_prev = [unicodedata.normalize('NFC', w.strip()) for w in current_winners_str.split(',') if w.strip()]
-                        if allow_duplicates is False:
-                            for wn in won_prev:
-                                participants.pop(wn, None)
-                        print(f"DEBUG: Hydrated {len(participants)} participants from allowed_list for confirm_winner")
-
-                if not participants:
-                    print(f"WARNING: No participants found for {active_url}. Skipping confirmation.")
-                    socketio.emit('error', {'message': '이벤트 데이터를 찾을 수 없습니다.'}, namespace='/', to=request.sid)
-                    return
+                # 1~3. 당첨 기록 추가 + (중복 비허용이면) 참가자 제거 + 확정 후 상태 조회를 저장소 호출 1회로
+                #      (Supabase: confirm_winner RPC 1회 — 발표에 쓰는 posts 필드·댓글 작성자도 함께 돌려받는다)
+                confirm_round_id = req_round_id or str((game_obj or {}).get('round_id') or '')
+                confirmed = db.confirm_winner(active_url, winner, round_id=confirm_round_id or None,
+                                              angle=(game_obj or {}).get('current_angle'))
+                if confirmed is not None:
+                    participants = dict(confirmed['participants'] or {})
+                    new_winners_str = confirmed['winners']
+                    allow_duplicates = confirmed['allow_duplicates']
+                    title, prizes, memo = confirmed['title'], confirmed['prizes'], confirmed['memo']
+                    allowed_list_text = confirmed['allowed_list']
+                    all_commenters = confirmed['commenters'] or []
+                    print(f"DEBUG: Saved winners to DB: {new_winners_str}")
+                else:
+                    # 저장 실패: 발표는 계속하되 화면에는 이번 확정을 반영한다. (표시용으로 한 번 읽음)
+                    print(f"WARNING: confirm_winner failed for {active_url} / {winner}")
+                    (participants, _, all_commenters, title, prizes, memo, current_winners_str,
+                     allow_duplicates, allowed_list_text, _) = db.get_data(active_url)
+                    participants = dict(participants or {})
+                    all_commenters = all_commenters or []
+                    if not allow_duplicates:
+                        participants.pop(winner, None)
+                    new_winners_str = ','.join([w for w in (current_winners_str or '').split(',') if w] + [winner])
+                current_winners = new_winners_str.split(',') if new_winners_str else []
+                allowed_list = parse_allowed_list_text(allowed_list_text or "")
+
+                # 확정 참가자 행이 비어 있어도 사전 명단만 있으면 동일 풀로 복원 (원판·추첨과 일치).
+                # 확정 뒤라 이번 당첨자도 기당첨자에 들어 있어, 확정 전에 복원하고 지운 것과 같은 풀이 된다.
+                if not participants and allowed_list:
+                    for name, tickets in allowed_list.items():
+                        name_norm = unicodedata.normalize('NFC', str(name).strip())
+                        try:
+                            t = int(tickets)
+                        except (TypeError, ValueError):
+                            t = 1
+                        participants[name_norm] = (t, None)
+                    if allow_duplicates is False:
+                        for wn in current_winners:
+                            participants.pop(unicodedata.normalize('NFC', wn.strip()), None)
+                    print(f"DEBUG: Hydrated {len(participants)} participants from allowed_list for confirm_winner")
+                    if participants:
+                        # 복원한 참가자 풀은 DB에도 남겨 다음 라운드와 일치시킨다.
+                        db.save_data(active_url, participants, None)
 
                 print(f"DEBUG: Policy - Allow Duplicates: {allow_duplicates}, Participants count: {len(participants)}")
-                
-                current_winners = []
-                if current_winners_str:
-                    current_winners = current_winners_str.split(',')
-                
-                # 2. 새 당첨자 추가 (중복 허용 여부와 무관하게 당첨 내역에는 추가)
-                current_winners.append(winner)
-                new_winners_str = ','.join(current_winners)
-                
-                # [추가] 중복 당첨 비허용 시 참가자 명단에서 제거
-                if not allow_duplicates:
-                    if winner in participants:
-                        del participants[winner]
-                        print(f"DEBUG: Removed winner '{winner}' from participants (No Duplicates Policy)")
-                        # [중요] DB에서도 즉시 삭제하여 실시간 동기화 시 다시 나타나지 않게 함
-                        db.delete_participant(active_url, winner)
-                
-                # 3. 저장 (기존 데이터 보존하며 winners 및 participants 업데이트)
-                db.save_data(active_url, participants, last_id if last_id else '', 
-                             title=title, prizes=prizes, memo=memo, 
-                             winners=new_winners_str, allow_duplicates=allow_duplicates)
-                    
-                print(f"DEBUG: Saved winners to DB: {new_winners_str}")
 
                 # 4. 실시간 설정 브로드캐스트 (당첨자 명단 및 모든 설정 갱신을 위해)
                 # event_id/url 은 JSON에서 숫자로 직렬화되면 클라이언트 문자열 키와 !== 로 새 이벤트 오인 → 강제 새로고침 되므로 문자열로 통일
@@ -1110,11 +1082,11 @@ def handle_confirm_winner(data=None):
                 
                 # [추가] 참가자 명단 변경 사항 브로드캐스트 (실시간 UI 갱신용)
                 # 중복 비허용 시 제거된 명단을 전송하고, 중복 허용 시에도 당첨자 배지 상태 동기화를 위해 전송
-                p_list_for_roulette = [(name, _normalize_ticket_count(v)) for name, v in participants.items()]
-                p_list_for_roulette.sort(key=lambda x: _ko_first_name_key(x[0]))
+                roulette_pool = _roulette_pool_from_participants_dict(
+                    participants, new_winners_str, allow_duplicates, event_id=active_url
+                )
                 
-                # [중요] 전체 활동 목록(full_commenter_list)을 DB에서 가져와서 배지 정보 추가
-                allowed_list = get_allowed_list(active_url)
+                # [중요] 전체 활동 목록(full_commenter_list)에 배지 정보 추가 (확정 결과의 사전 명단·댓글 작성자 사용)
                 full_commenter_data = []
                 for c in all_commenters:
                     author = c.get('name') if isinstance(c, dict) else c
@@ -1126,7 +1098,7 @@ def handle_confirm_winner(data=None):
                     })
                 
                 socketio.emit('update_participants', {
-                    'participants': p_list_for_roulette,
+                    'layout_hash': _publish_pool_layout(roulette_pool),
                     # 중복 비허용이면 현재 참여자만 체크, 허용이면 기당첨자도 체크
                     'confirmed_all': (
                         list(set(participants.keys()) | set(current_winners))
@@ -1160,6 +1132,7 @@ def handle_confirm_winner(data=None):
         socketio.emit('error', {'message': '당첨자 정보를 찾을 수 없습니다.'}, namespace='/', to=request.sid)
 
 @socketio.on('request_game_status')
+@metrics.timed_socket_event('request_game_status')
 def handle_request_game_status():
     """
     클라이언트(특히 게스트)가 접속했을 때 현재 게임 상태 정보를 요청
@@ -1206,20 +1179,20 @@ def handle_request_game_status():
                         winners = cached.get('winners', winners)
                         allow_duplicates = cached.get('allow_duplicates', allow_duplicates)
 
-                    p_list_for_roulette = []
+                    roulette_pool = None
                     if participants_dict:
-                        p_list_for_roulette = _roulette_pairs_from_participants_dict(
-                            participants_dict, winners, allow_duplicates
+                        roulette_pool = _roulette_pool_from_participants_dict(
+                            participants_dict, winners, allow_duplicates, event_id=active_url
                         )
                     else:
                         # 저장 직후 participants 테이블이 비어도 allowed_list로 즉시 복원
                         allowed_dict = get_allowed_list(active_url)
                         if allowed_dict:
-                            restored = _roulette_list_from_allowed_dict(allowed_dict, winners, allow_duplicates)
-                            p_list_for_roulette = [(name, int(count)) for name, count, _ in restored]
-                            p_list_for_roulette.sort(key=lambda x: _ko_first_name_key(x[0]))
+                            roulette_pool = participant_pools.for_allowed(
+                                active_url, allowed_dict, winners, allow_duplicates
+                            )
 
-                    p_names = [name for name, _ in p_list_for_roulette]
+                    p_names = list(roulette_pool.names) if roulette_pool is not None else []
                     won_names = [w.strip() for w in winners.split(',') if w.strip()] if winners else []
                     # 중복 비허용이면 현재 참여자만 체크, 허용이면 기당첨자도 체크
                     confirmed_all = (
@@ -1228,28 +1201,14 @@ def handle_request_game_status():
                     )
 
                     # 명단 UI는 항상 "전체 사전 명단"을 우선 사용(중복비허용 시 당첨자를 체크 해제로만 표현)
-                    participant_display_list = []
+                    display_pool = None
                     allowed_dict_ui = get_allowed_list(active_url)
                     if allowed_dict_ui:
-                        for name, tickets in allowed_dict_ui.items():
-                            nm = unicodedata.normalize("NFC", str(name).strip())
-                            try:
-                                t = int(tickets)
-                            except (TypeError, ValueError):
-                                t = 1
-                            participant_display_list.append((nm, t))
-                        participant_display_list.sort(
-                            key=lambda x: _ko_first_name_key(x[0])
-                        )
+                        # 표시용은 당첨자 제외 없이 전체 명단 (allow_duplicates=True 풀)
+                        display_pool = participant_pools.for_allowed(active_url, allowed_dict_ui)
                     elif participants_dict:
                         # 하위 호환: allowed_list 가 없을 때만 participants 로 표시
-                        for name, v in participants_dict.items():
-                            participant_display_list.append(
-                                (name, _normalize_ticket_count(v))
-                            )
-                        participant_display_list.sort(
-                            key=lambda x: _ko_first_name_key(x[0])
-                        )
+                        display_pool = participant_pools.for_participants(active_url, participants_dict)
 
                     active_event_data = {
                         'title': title,
@@ -1257,8 +1216,9 @@ def handle_request_game_status():
                         'memo': memo,
                         'winners': winners,
                         'allow_duplicates': bool(allow_duplicates) if allow_duplicates is not None else False,
-                        'participants': p_list_for_roulette,
-                        'participant_display_list': participant_display_list,
+                        # 원판 명단(participants)·표시 명단(participant_display_list)은 배치 해시로 보낸다
+                        'layout_hash': _publish_pool_layout(roulette_pool),
+                        'display_layout_hash': _publish_pool_layout(display_pool),
                         'confirmed_all': confirmed_all,
                         'current_url': active_url,
                         'current_event_id': active_url,
@@ -1312,6 +1272,7 @@ def handle_request_game_status():
                 'winner': active_game.get('final_winner'),
                 'round_id': active_game.get('round_id', ''),
                 'sound_profile': active_game.get('sound_profile', ''),
+                'layout_hash': active_game.get('layout_hash'),
                 # [VIBE RULE] 요청-응답 지연 측정 기준값 (브라우저별 동적 시간보정 공통)
                 'sent_unix_ms': int(time.time() * 1000),
                 'target_unix_ms': int((time.time() + max(0.0, duration_left)) * 1000),
@@ -1348,62 +1309,9 @@ def calculate_winner_at_angle(angle, participants_list):
     """
     특정 각도에서의 당첨자를 계산하는 함수
     angle: 0도는 12시 방향, 시계방향으로 증가
+    participants_list: [(이름, 횟수, ...), ...]. 스핀 경로는 풀에 캐시된 pool.layout() 을 바로 쓴다.
     """
-    if not participants_list:
-        return "N/A"
-        
-    names_local = [p[0] for p in participants_list]
-    counts_local = [p[1] for p in participants_list]
-    total_count_local = sum(counts_local)
-    
-    if total_count_local == 0:
-        return names_local[0] if names_local else "N/A"
-
-    print(f"DEBUG: 당첨자 계산에 사용되는 각도: {angle:.2f}°")
-    
-    # 각 섹터 배치를 계산하기 위한 설정
-    cumulative_angle = 0.0
-    
-    # 각 참가자의 세그먼트 정보를 먼저 계산하고 저장
-    segments = []
-    
-    for i, (name, cnt) in enumerate(zip(names_local, counts_local)):
-        portion = cnt / total_count_local
-        sector_size = portion * 360.0
-        sector_start = cumulative_angle
-        sector_end = cumulative_angle + sector_size
-        
-        # 세그먼트 정보 저장
-        segments.append({
-            'name': name,
-            'start': sector_start,
-            'end': sector_end,
-            'size': sector_size
-        })
-        
-        # 디버깅 정보 출력
-        print(f"DEBUG: Sector {i}: {name}, {sector_start:.2f}° ~ {sector_end:.2f}°, size: {sector_size:.2f}°")
-        
-        cumulative_angle += sector_size
-    
-    # 입력 각도를 0-360 범위로 정규화
-    normalized_angle = angle % 360
-    
-    # 세그먼트별로 검사 - 정확한 범위 검사
-    for segment in segments:
-        # 화살표가 현재 세그먼트 내에 있는지 확인 (시작 경계도 포함)
-        if segment['start'] <= normalized_angle < segment['end']:
-            print(f"DEBUG: 당첨자 결정 - {segment['name']} (각도: {normalized_angle:.2f}°)")
-            return segment['name']
-    
-    # 경계 조건 처리 (360도/0도 근처)
-    if normalized_angle >= segments[-1]['start'] or normalized_angle < segments[0]['start']:
-        print(f"DEBUG: 경계 조건 처리 - 첫 번째 참가자: {names_local[0]} (각도: {normalized_angle:.2f}°)")
-        return names_local[0]
-    
-    # 여기까지 오면 오류 상황
-    print(f"ERROR: 당첨자를 결정할 수 없음 (각도: {normalized_angle:.2f}°)")
-    return names_local[0]  # 기본값으로 첫 번째 참가자 반환
+    return WheelLayout.from_rows(participants_list or []).winner_at(angle)
 
 # [수정됨] 시간 전송 로직 수정 (threading.Thread 제거하고 socketio 백그라운드 태스크 사용)
 def send_current_time():
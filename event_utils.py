@@ -118,7 +118,7 @@ def get_allowed_list(db, event_key: Optional[str] = None) -> Dict[str, int]:
     if not event_key:
         return {}
     try:
-        _, _, _, _, _, _, _, _, allowed_list_content, _ = db.get_data(event_key)
+        _, _, _, _, _, _, _, _, allowed_list_content, _ = db.get_data(event_key, include_commenters=False)
         if allowed_list_content:
             return parse_allowed_list_text(allowed_list_content)
     except Exception as e:
@@ -0,0 +1,489 @@
+"""
+SQLite(comments.db 형식) → Supabase 대량 이전. 지난 이벤트 아카이브를 몇 분 안에 옮기고, 중간에 끊겨도 이어서 한다.
+
+- 스트리밍: rowid 기준 키셋 페이지로 읽는다 (fetchall 없음, 메모리는 배치 크기만큼).
+- 매핑: 레거시 url 컬럼 → posts.id / participants·commenters.event_id (normalize_event_id 로 canonical 화).
+  posts.is_active 는 옮기지 않는다 (아카이브 이전이 현재 활성 이벤트를 바꾸면 안 됨).
+- 적응형 배치: 응답이 --target-sec 안이면 키우고, 느리거나 실패하면 줄인다. 실패한 배치는 반으로 나눠 재시도.
+- 테이블별 동시 upsert 는 --workers 개까지. 부모(posts)를 다 옮긴 뒤 자식 테이블을 옮긴다 (FK).
+- 대상에 winners 테이블(20261018110000_winners_log.sql)이 있으면 posts.winners 문자열은 보내지 않고,
+  posts 다음 단계(winners)에서 문자열을 기록 행으로 넣는다 (INSERT 트리거가 posts.winners 를 다시 만든다).
+  이미 기록이 있는 이벤트는 건너뛰므로 다시 실행해도 중복되지 않는다. (--key-column id 스키마만)
+- participants / commenters 의 id 가 default 없는 정수 컬럼이면 reserve_id_block RPC
+  (20261018100000_reserve_id_block.sql)로 예약한 블록에서 id 를 채운다. RPC 가 없으면 해당 배치에서 멈춘다.
+- 체크포인트(--checkpoint, 기본 <db>.migrate.json): 앞에서부터 빈틈없이 끝난 마지막 rowid.
+  재실행하면 그 다음부터. 처음부터 다시 하려면 --restart.
+
+    python migrate_sqlite_to_supabase.py
+    python migrate_sqlite_to_supabase.py --db old/comments.db --tables participants,commenters --workers 6
+    python migrate_sqlite_to_supabase.py --dry-run          # 읽기·매핑 속도만 (Supabase 호출 없음)
+    python migrate_sqlite_to_supabase.py --key-column url   # 20260405 마이그레이션 전 스키마
+
+SUPABASE_URL / SUPABASE_KEY 는 .env 에서 읽는다. upsert 이므로 같은 구간을 다시 보내도 안전하다.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from event_utils import normalize_event_id
+from standalone_comment_monitor.circuit_breaker import backoff_delay
+from standalone_comment_monitor.id_allocator import IdBlockAllocator, block_start_from_rpc
+from standalone_comment_monitor.storage import split_winners
+from standalone_comment_monitor.supabase_schema import id_sql_type_from_rows
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_DB = os.path.join(_BASE_DIR, "standalone_comment_monitor", "comments.db")
+
+# 부모 먼저 (participants/commenters → posts FK). winners 는 posts 원본에서 만든다.
+TABLES = ("posts", "winners", "participants", "commenters")
+# 대상 테이블 → 읽을 SQLite 테이블 (다르면)
+_SOURCE_TABLES = {"winners": "posts"}
+
+# Supabase 로 보내는 컬럼 (SQLite 에 있는 것만). is_active 는 일부러 제외.
+_POST_COLUMNS = (
+    "last_comment_id",
+    "updated_at",
+    "title",
+    "prizes",
+    "winners",
+    "allow_duplicates",
+    "allowed_list",
+    "memo",
+    "event_at",
+)
+_CHILD_COLUMNS = {"participants": ("author", "count", "created_at"), "commenters": ("author", "created_at")}
+_BOOL_COLUMNS = {"allow_duplicates"}
+# 이벤트 키 IN (...) 조회 1회당 키 수 (URL 길이 제한 고려)
+_KEY_CHUNK = 100
+
+_MAX_ATTEMPTS = 4
+_BACKOFF_BASE_SEC = 0.5
+_BACKOFF_CAP_SEC = 8.0
+
+
+def map_row(table: str, row: Dict[str, Any], key_column: str) -> Optional[Dict[str, Any]]:
+    """SQLite 행 → Supabase 행. 키가 비어 있으면 None (건너뜀)."""
+    raw_key = row.get("url", row.get("id" if table == "posts" else "event_id"))
+    key = normalize_event_id(str(raw_key).strip()) if raw_key is not None else None
+    if not key:
+        return None
+    if table == "posts":
+        out = {key_column: key}
+        cols = _POST_COLUMNS
+    else:
+        out = {("event_id" if key_column == "id" else "url"): key}
+        cols = _CHILD_COLUMNS[table]
+        if not str(row.get("author") or "").strip():
+            return None
+    for c in cols:
+        if c in row:
+            v = row[c]
+            out[c] = bool(v) if c in _BOOL_COLUMNS and v is not None else v
+    return out
+
+
+def winner_rows(post: Dict[str, Any], now: str) -> List[Dict[str, Any]]:
+    """map_row 한 posts 행 → winners 기록 행 (문자열 순서대로, 시각은 posts.updated_at — 20261018110000 백필과 같음)."""
+    return [
+        {"event_id": post["id"], "winner": name, "created_at": post.get("updated_at") or now}
+        for name in split_winners(post.get("winners"))
+    ]
+
+
+def conflict_target(table: str, key_column: str) -> str:
+    if table == "posts":
+        return key_column
+    return f"{'event_id' if key_column == 'id' else 'url'},author"
+
+
+def dedupe(rows: List[Dict[str, Any]], conflict: str) -> List[Dict[str, Any]]:
+    """한 배치 안에 같은 충돌 키가 두 번 있으면 PostgREST upsert 가 실패한다 → 뒤의 행만 남긴다."""
+    cols = conflict.split(",")
+    by_key: Dict[Tuple, Dict[str, Any]] = {}
+    for r in rows:
+        by_key[tuple(r.get(c) for c in cols)] = r
+    return list(by_key.values())
+
+
+class AdaptiveBatch:
+    """AIMD 배치 크기: 빠르면 +25%, 느리면 -25%, 실패하면 절반."""
+
+    def __init__(self, size: int, min_size: int, max_size: int, target_sec: float):
+        self.min_size = max(1, int(min_size))
+        self.max_size = max(self.min_size, int(max_size))
+        self.size = min(self.max_size, max(self.min_size, int(size)))
+        self.target_sec = float(target_sec)
+        self._lock = threading.Lock()
+
+    def success(self, rows: int, seconds: float) -> None:
+        with self._lock:
+            if seconds > self.target_sec:
+                self.size = max(self.min_size, int(self.size * 0.75))
+            elif rows >= self.size // 2:
+                # 작은 꼬리 배치가 빨랐다고 키우지는 않는다
+                self.size = min(self.max_size, int(self.size * 1.25) + 1)
+
+    def failure(self) -> None:
+        with self._lock:
+            self.size = max(self.min_size, self.size // 2)
+
+
+class Checkpoint:
+    """테이블별 진행 상황. 파일은 임시 파일에 쓰고 교체 (중간에 죽어도 깨지지 않게)."""
+
+    def __init__(self, path: str, source: str, key_column: str):
+        self.path = path
+        self.doc: Dict[str, Any] = {"source": source, "key_column": key_column, "tables": {}}
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                doc = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if doc.get("source") != self.doc["source"] or doc.get("key_column") != self.doc["key_column"]:
+            raise SystemExit(
+                f"체크포인트 {self.path} 는 다른 원본/키 컬럼용입니다 "
+                f"({doc.get('source')}, {doc.get('key_column')}). --restart 또는 --checkpoint 로 다른 파일을 지정하세요."
+            )
+        self.doc["tables"] = doc.get("tables") or {}
+        return True
+
+    def table(self, name: str) -> Dict[str, Any]:
+        return self.doc["tables"].setdefault(name, {"last_rowid": 0, "rows": 0, "done": False})
+
+    def advance(self, name: str, last_rowid: int, rows: int, done: bool = False) -> None:
+        with self._lock:
+            t = self.table(name)
+            t["last_rowid"] = int(last_rowid)
+            t["rows"] = int(t.get("rows", 0)) + int(rows)
+            t["done"] = bool(done)
+            t["updated_at"] = time.time()
+            self._save()
+
+    def _save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.doc, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+def stream_batches(
+    conn: sqlite3.Connection, table: str, after_rowid: int, size: Callable[[], int]
+) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+    """(첫 rowid, 마지막 rowid, 행들) — rowid 키셋 페이지. 배치 크기는 매번 size() 로 다시 읽는다."""
+    last = after_rowid
+    while True:
+        cur = conn.execute(f"SELECT rowid AS _rowid, * FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?", (last, size()))
+        rows = [dict(r) for r in cur.fetchall()]
+        if not rows:
+            return
+        first = rows[0]["_rowid"]
+        last = rows[-1]["_rowid"]
+        yield first, last, rows
+
+
+class _Watermark:
+    """순서 없이 끝나는 배치들 중 앞에서부터 빈틈없이 끝난 구간의 끝 rowid."""
+
+    def __init__(self, start: int):
+        self.value = start
+        self._order: List[int] = []  # 제출 순서의 배치 마지막 rowid
+        self._done: Dict[int, int] = {}  # 마지막 rowid → 행 수
+
+    def submitted(self, last_rowid: int) -> None:
+        self._order.append(last_rowid)
+
+    def completed(self, last_rowid: int, rows: int) -> Tuple[bool, int]:
+        """완료 기록 후 (워터마크가 움직였는지, 새로 확정된 행 수)."""
+        self._done[last_rowid] = rows
+        moved, settled = False, 0
+        while self._order and self._order[0] in self._done:
+            head = self._order.pop(0)
+            settled += self._done.pop(head)
+            self.value = head
+            moved = True
+        return moved, settled
+
+
+class Migrator:
+    def __init__(
+        self,
+        client: Any,
+        conn: sqlite3.Connection,
+        checkpoint: Checkpoint,
+        key_column: str = "id",
+        workers: int = 4,
+        batch: Optional[AdaptiveBatch] = None,
+        progress_sec: float = 5.0,
+    ):
+        self.client = client  # None 이면 dry-run
+        self.conn = conn
+        self.checkpoint = checkpoint
+        self.key_column = key_column
+        self.workers = max(1, int(workers))
+        self.batch = batch or AdaptiveBatch(500, 50, 2000, 2.0)
+        self.progress_sec = float(progress_sec)
+        # detect_schema() 가 채운다 (dry-run 에서는 둘 다 꺼 둔다)
+        self.winners_table = False
+        self.int_id_tables: set = set()
+        self._id_alloc = IdBlockAllocator(self.batch.max_size)
+
+    def detect_schema(self) -> None:
+        """대상 Supabase 의 winners 테이블 유무와 자식 테이블 id 타입을 확인한다."""
+        if self.client is None:
+            return
+
+        def probe(table: str) -> Optional[List[Dict[str, Any]]]:
+            try:
+                return self.client.table(table).select("id").limit(1).execute().data or []
+            except Exception:
+                return None
+
+        self.winners_table = self.key_column == "id" and probe("winners") is not None
+        for table in _CHILD_COLUMNS:
+            rows = probe(table)
+            if rows is not None and id_sql_type_from_rows(rows) == "int":
+                self.int_id_tables.add(table)
+        print(
+            f"DEBUG: [migrate] schema: winners_table={self.winners_table}, "
+            f"integer_id_tables={sorted(self.int_id_tables) or '-'}"
+        )
+
+    def _reserve_id_block(self, table: str, size: int) -> int:
+        res = self.client.rpc("reserve_id_block", {"p_table": table, "p_count": size}).execute()
+        return block_start_from_rpc(res.data)
+
+    def _upsert(self, table: str, rows: List[Dict[str, Any]], conflict: str) -> None:
+        if self.client is None or not rows:
+            return
+        q = self.client.table(table)
+        if table == "winners":
+            q.insert(rows).execute()
+        elif table == "commenters":
+            q.upsert(rows, on_conflict=conflict, ignore_duplicates=True).execute()
+        else:
+            q.upsert(rows, on_conflict=conflict).execute()
+
+    def _send(self, table: str, rows: List[Dict[str, Any]], conflict: str, split: bool = True) -> None:
+        """재시도(지터 백오프) 후에도 실패하면 반으로 나눠 각각 보낸다. 1행까지(split=False 면 바로) 실패하면 예외."""
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            t0 = time.perf_counter()
+            try:
+                self._upsert(table, rows, conflict)
+                self.batch.success(len(rows), time.perf_counter() - t0)
+                return
+            except Exception as e:
+                self.batch.failure()
+                if attempt == _MAX_ATTEMPTS or (split and len(rows) > self.batch.size):
+                    print(f"DEBUG: [migrate] {table} {len(rows)} rows failed (attempt {attempt}): {e}")
+                    break
+                time.sleep(getattr(e, "retry_after", None) or backoff_delay(attempt, _BACKOFF_BASE_SEC, _BACKOFF_CAP_SEC))
+        if not split:
+            raise RuntimeError(f"{table}: {len(rows)} rows could not be written")
+        if len(rows) <= 1:
+            raise RuntimeError(f"{table}: row could not be written: {rows[:1]}")
+        mid = len(rows) // 2
+        self._send(table, rows[:mid], conflict)
+        self._send(table, rows[mid:], conflict)
+
+    def _process(self, table: str, rows: List[Dict[str, Any]], conflict: str) -> int:
+        if table == "winners":
+            return self._process_winners(rows)
+        mapped = [m for m in (map_row(table, r, self.key_column) for r in rows) if m is not None]
+        mapped = dedupe(mapped, conflict)
+        if table == "posts" and self.winners_table:
+            # 문자열은 winners 단계의 INSERT 트리거가 만든다 (여기서 넣으면 두 번 붙는다)
+            for m in mapped:
+                m.pop("winners", None)
+        if table in self.int_id_tables and self.client is not None and mapped:
+            # 재시도·분할 전송에도 같은 id 를 쓰도록 보내기 전에 채운다
+            for m, rid in zip(mapped, self._id_alloc.allocate(table, len(mapped), self._reserve_id_block)):
+                m["id"] = rid
+        self._send(table, mapped, conflict)
+        return len(rows)
+
+    def _process_winners(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        posts 원본 행의 winners 문자열 → winners 기록 행. 기록이 이미 있는 이벤트는 건너뛴다 (재실행·앱이 먼저 기록).
+        넣기 전에 posts.winners 를 비워 트리거가 기록만으로 문자열을 만들게 하고, 배치의 기록은 INSERT 한 번(원자적)으로 넣는다.
+        """
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        by_event: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            post = map_row("posts", r, "id")
+            if post is not None:
+                by_event[post["id"]] = winner_rows(post, now)
+        keys = [k for k, v in by_event.items() if v]
+        if self.client is None or not keys:
+            return len(rows)
+        logged: set = set()
+        for i in range(0, len(keys), _KEY_CHUNK):
+            res = self.client.table("winners").select("event_id").in_("event_id", keys[i : i + _KEY_CHUNK]).execute()
+            logged.update(str(x["event_id"]) for x in res.data or [])
+        todo = [k for k in keys if k not in logged]
+        if not todo:
+            return len(rows)
+        for i in range(0, len(todo), _KEY_CHUNK):
+            self.client.table("posts").update({"winners": ""}).in_("id", todo[i : i + _KEY_CHUNK]).execute()
+        # 반만 들어간 이벤트가 생기면 재실행 때 건너뛰게 되므로 나눠 보내지 않는다
+        self._send("winners", [w for k in todo for w in by_event[k]], "", split=False)
+        return len(rows)
+
+    def migrate_table(self, table: str) -> Dict[str, Any]:
+        state = self.checkpoint.table(table)
+        if state.get("done"):
+            print(f"DEBUG: [migrate] {table}: already done ({state.get('rows', 0)} rows), skip")
+            return {"table": table, "rows": 0, "seconds": 0.0, "skipped": True}
+        if table == "winners" and not self.winners_table:
+            # 다음 실행에서 테이블이 생겼을 수 있으므로 done 으로 기록하지 않는다
+            print("DEBUG: [migrate] winners: no winners table in target, skip (posts.winners string was sent)")
+            return {"table": table, "rows": 0, "seconds": 0.0, "skipped": True}
+        source = _SOURCE_TABLES.get(table, table)
+        exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (source,)).fetchone()
+        if not exists:
+            print(f"DEBUG: [migrate] {table}: {source} not in source db, skip")
+            return {"table": table, "rows": 0, "seconds": 0.0, "skipped": True}
+
+        start = int(state.get("last_rowid") or 0)
+        remaining = self.conn.execute(f"SELECT COUNT(*) FROM {source} WHERE rowid > ?", (start,)).fetchone()[0]
+        conflict = conflict_target(table, self.key_column)
+        print(f"DEBUG: [migrate] {table}: {remaining} rows to go (from rowid {start})")
+
+        mark = _Watermark(start)
+        done_rows = 0
+        t0 = time.perf_counter()
+        last_report = t0
+        inflight: Dict[Future, Tuple[int, int]] = {}
+
+        def settle(futs) -> None:
+            nonlocal done_rows, last_report
+            for fut in futs:
+                last_rowid, _ = inflight.pop(fut)
+                n = fut.result()  # 실패는 여기서 그대로 올라가 체크포인트를 더 밀지 않는다
+                moved, settled = mark.completed(last_rowid, n)
+                done_rows += n
+                if moved:
+                    self.checkpoint.advance(table, mark.value, settled)
+            now = time.perf_counter()
+            if now - last_report >= self.progress_sec:
+                last_report = now
+                rate = done_rows / max(1e-9, now - t0)
+                eta = (remaining - done_rows) / rate if rate > 0 else 0
+                print(
+                    f"DEBUG: [migrate] {table}: {done_rows}/{remaining} rows, {rate:,.0f} rows/s, "
+                    f"batch {self.batch.size}, eta {eta:.0f}s"
+                )
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"migrate-{table}") as pool:
+            try:
+                for first, last, rows in stream_batches(self.conn, source, start, lambda: self.batch.size):
+                    while len(inflight) >= self.workers:
+                        finished, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+                        settle(finished)
+                    mark.submitted(last)
+                    inflight[pool.submit(self._process, table, rows, conflict)] = (last, len(rows))
+                while inflight:
+                    finished, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+                    settle(finished)
+            except BaseException:
+                for fut in inflight:
+                    fut.cancel()
+                raise
+
+        self.checkpoint.advance(table, mark.value, 0, done=True)
+        seconds = time.perf_counter() - t0
+        rate = done_rows / seconds if seconds > 0 else 0.0
+        print(f"DEBUG: [migrate] {table}: {done_rows} rows in {seconds:.1f}s ({rate:,.0f} rows/s)")
+        return {"table": table, "rows": done_rows, "seconds": round(seconds, 3), "rows_per_sec": round(rate, 1)}
+
+    def run(self, tables: List[str]) -> List[Dict[str, Any]]:
+        self.detect_schema()
+        return [self.migrate_table(t) for t in tables]
+
+
+def _supabase_client(workers: int) -> Any:
+    from supabase import ClientOptions, create_client
+
+    from standalone_comment_monitor.transport import build_http_client
+
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        raise SystemExit("SUPABASE_URL / SUPABASE_KEY 가 필요합니다 (.env).")
+    # 대량 upsert 는 앱 기본 타임아웃보다 길게, 풀은 동시 배치 수만큼
+    http = build_http_client(60.0, pool_size=max(2, workers), pool_name="migrate")
+    return create_client(url, key, options=ClientOptions(httpx_client=http))
+
+
+def main() -> int:
+    load_dotenv()
+    ap = argparse.ArgumentParser(description="Stream a comments.db-style SQLite file into Supabase (resumable).")
+    ap.add_argument("--db", default=_DEFAULT_DB, help="source SQLite file")
+    ap.add_argument("--tables", default=",".join(TABLES), help="comma separated, migrated in this order")
+    ap.add_argument("--checkpoint", default=None, help="checkpoint file (default: <db>.migrate.json)")
+    ap.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    ap.add_argument("--key-column", choices=("id", "url"), default="id", help="posts key column in Supabase")
+    ap.add_argument("--workers", type=int, default=4, help="concurrent upserts per table")
+    ap.add_argument("--batch", type=int, default=500, help="initial batch size")
+    ap.add_argument("--min-batch", type=int, default=50)
+    ap.add_argument("--max-batch", type=int, default=2000)
+    ap.add_argument("--target-sec", type=float, default=2.0, help="shrink batches slower than this")
+    ap.add_argument("--progress-sec", type=float, default=5.0)
+    ap.add_argument("--dry-run", action="store_true", help="read and map only, no Supabase calls")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"SQLite DB not found: {args.db}")
+        return 1
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+    unknown = [t for t in tables if t not in TABLES]
+    if unknown:
+        print(f"Unknown tables: {unknown} (supported: {', '.join(TABLES)})")
+        return 1
+    tables.sort(key=TABLES.index)
+
+    source = os.path.abspath(args.db)
+    cp_path = args.checkpoint or f"{args.db}.migrate.json"
+    checkpoint = Checkpoint(cp_path, source, args.key_column)
+    if not args.restart and checkpoint.load():
+        print(f"Resuming from {cp_path}: {json.dumps(checkpoint.doc['tables'], ensure_ascii=False)}")
+
+    conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    client = None if args.dry_run else _supabase_client(args.workers)
+    migrator = Migrator(
+        client,
+        conn,
+        checkpoint,
+        key_column=args.key_column,
+        workers=args.workers,
+        batch=AdaptiveBatch(args.batch, args.min_batch, args.max_batch, args.target_sec),
+        progress_sec=args.progress_sec,
+    )
+    t0 = time.perf_counter()
+    try:
+        results = migrator.run(tables)
+    except Exception as e:
+        print(f"Migration stopped: {e}")
+        print(f"Checkpoint saved to {cp_path}; rerun the same command to resume.")
+        return 1
+    finally:
+        conn.close()
+    total = sum(r["rows"] for r in results)
+    seconds = time.perf_counter() - t0
+    print(json.dumps({"tables": results, "rows": total, "seconds": round(seconds, 3)}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
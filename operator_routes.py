@@ -13,6 +13,10 @@ from event_utils import (
     normalize_event_id,
     parse_participants_csv_bytes,
 )
+from standalone_comment_monitor.participant_pool import event_pool
+from standalone_comment_monitor.spin_audit import SPIN_AUDIT_MAX_SPINS, SpinAuditUnavailable, audit_pool
+from standalone_comment_monitor.spin_draw import DRAW_MODES
+from standalone_comment_monitor.storage import next_event_cursor
 
 operator_bp = Blueprint("operator", __name__, url_prefix="/api/operator")
 
@@ -20,6 +24,28 @@ operator_bp = Blueprint("operator", __name__, url_prefix="/api/operator")
 def _db():
     return current_app.config["ROULETTE_DB"]
 
+def _active():
+    """메모리 활성 이벤트 해석기 (comment_dart.ActiveEventResolver)."""
+    return current_app.config["ACTIVE_EVENT"]
+
+
+def _pools():
+    """이벤트별 참가자 풀 캐시 (comment_dart.participant_pools)."""
+    return current_app.config["PARTICIPANT_POOLS"]
+
+
+def _wheel_layouts():
+    """게시된 원판 배치 (comment_dart.wheel_layouts). 소켓 메시지에는 해시만 싣는다."""
+    return current_app.config["WHEEL_LAYOUTS"]
+
+
+def _activate(key: str) -> Tuple[bool, Optional[str]]:
+    """활성 이벤트 변경. 성공하면 메모리 활성 키도 즉시 바꾼다 (다음 요청부터 조회 없이 새 키)."""
+    ok, err = _db().set_active_event_id_blocking(key)
+    if ok:
+        _active().set(key)
+    return ok, err
+
 def _socketio():
     return current_app.config.get("SOCKETIO")
 
@@ -49,17 +75,6 @@ def _broadcast_active_event_changed(event_key: Optional[str]):
         print(f"DEBUG: [operator broadcast] failed: {e}")
 
 
-def _normalize_participant_count(raw_value) -> int:
-    if isinstance(raw_value, (tuple, list)):
-        raw = raw_value[0] if raw_value else 0
-    else:
-        raw = raw_value
-    try:
-        return int(raw)
-    except (TypeError, ValueError):
-        return 1
-
-
 def _broadcast_event_snapshot(
     event_key: Optional[str],
     *,
@@ -77,9 +92,9 @@ def _broadcast_event_snapshot(
     if not sio or not event_key:
         return
     ek = str(event_key)
-    p_dict = dict(participants or {})
-    p_list = [(str(name), _normalize_participant_count(v)) for name, v in p_dict.items()]
-    p_list.sort(key=lambda row: row[0].casefold())
+    # 원판·상태 동기화와 같은 가나다순 풀 (내용이 같으면 재정렬 없음)
+    pool = _pools().for_participants(ek, participants)
+    p_list = pool.pairs()
     winner_list = [w.strip() for w in str(winners or "").split(",") if w and w.strip()]
     if allow_duplicates is False:
         confirmed_all = [name for name, _ in p_list]
@@ -108,7 +123,7 @@ def _broadcast_event_snapshot(
             "update_participants",
             {
                 "event_id": ek,
-                "participants": p_list,
+                "layout_hash": _wheel_layouts().publish(pool.layout(numbered=False)),
                 "confirmed_all": confirmed_all,
             },
             namespace="/",
@@ -178,7 +193,7 @@ def _register_new_from_operator_form(
     )
     if not ok:
         return None, err_detail or "save failed"
-    ok_act, err_act = _db().set_active_event_id_blocking(key)
+    ok_act, err_act = _activate(key)
     if not ok_act:
         return None, err_act or "activate failed"
     return key, None
@@ -187,15 +202,17 @@ def _register_new_from_operator_form(
 @operator_bp.get("/events")
 @login_required
 def api_list_events():
-    limit = min(int(request.args.get("limit", 40)), 100)
-    rows = _db().list_events(limit=limit)
-    return jsonify({"events": rows})
+    """이벤트 ID 최신순 한 페이지. 다음 페이지는 ?before=<next_cursor> (마지막 페이지면 next_cursor 가 null)."""
+    limit = max(1, min(int(request.args.get("limit", 40)), 100))
+    before = (request.args.get("before") or "").strip() or None
+    rows = _db().list_events(limit=limit, before=before)
+    return jsonify({"events": rows, "next_cursor": next_event_cursor(rows, limit)})
 
 
 @operator_bp.get("/active")
 @login_required
 def api_active():
-    key = _db().get_active_event_id()
+    key = _active().get()
     if not key:
         return jsonify({"active": None})
     key = normalize_event_id(key)
@@ -220,7 +237,7 @@ def api_active():
 def api_save():
     data = request.get_json(silent=True) or {}
     raw = (data.get("event_key") or "").strip()
-    key = raw or _db().get_active_event_id()
+    key = raw or _active().get()
     if not key:
         # 선택/활성 ID 없음: 「저장」만 눌러도 폼으로 첫 이벤트 자동 생성
         new_key, err_detail = _register_new_from_operator_form(data, keep_title=True)
@@ -238,7 +255,9 @@ def api_save():
         title = _ensure_new_title_prefix(title)
     prizes = data["prizes"] if "prizes" in data else pr
     memo = data["memo"] if "memo" in data else m0
-    winners = data["winners"] if "winners" in data else (w0 or "")
+    # 폼에 winners 가 없으면 건드리지 않는다 (읽어 둔 값으로 다시 쓰면 그 사이 확정된 당첨자가 사라질 수 있음)
+    winners_in = data["winners"] if "winners" in data else None
+    winners = winners_in if winners_in is not None else (w0 or "")
     allow_duplicates = bool(data["allow_duplicates"]) if "allow_duplicates" in data else bool(ad0)
     allowed_list = data["allowed_list_text"] if "allowed_list_text" in data else al0
     if "event_at" in data:
@@ -257,7 +276,7 @@ def api_save():
         title=title,
         prizes=prizes,
         memo=memo,
-        winners=winners,
+        winners=winners_in,
         allow_duplicates=allow_duplicates,
         allowed_list=allowed_list,
         event_at=event_at,
@@ -265,10 +284,10 @@ def api_save():
     if not ok:
         return _operator_storage_error_response(err_detail)
     # 이미 활성 이벤트면 재활성화 쿼리를 생략해 저장 응답 지연을 줄인다.
-    current_active = _db().get_active_event_id()
+    current_active = _active().get()
     if normalize_event_id(current_active) != key:
         # 저장 시점에 해당 이벤트를 활성화하여 실제 운영 화면 반영 기준을 일원화
-        ok_act, err_act = _db().set_active_event_id_blocking(key)
+        ok_act, err_act = _activate(key)
         if not ok_act:
             return _operator_storage_error_response(err_act)
     # 활성이 달랐다가 맞춰진 경우뿐 아니, 처음부터 동일해도 게스트(SSR)는 소켓 없으면 갱신 못 하므로 항상 한 번 송신
@@ -299,6 +318,8 @@ def api_new():
         return jsonify(
             {"error": "이벤트 생성에 실패했습니다. 잠시 후 다시 시도해 주세요."}
         ), 503
+    # create_internal_event 가 새 이벤트를 활성화했다.
+    _active().set(key)
     return jsonify({"ok": True, "event_key": key})
 
 
@@ -332,7 +353,7 @@ def api_reset_winners():
     """선택 이벤트 내용을 복제하되 당첨자만 초기화하여 새 ID로 생성/활성화."""
     data = request.get_json(silent=True) or {}
     raw = (data.get("event_key") or "").strip()
-    source_key = normalize_event_id(raw) if raw else _db().get_active_event_id()
+    source_key = normalize_event_id(raw) if raw else _active().get()
     if not source_key:
         return jsonify({"error": "초기화할 event_key 가 없습니다."}), 400
 
@@ -358,7 +379,7 @@ def api_reset_winners():
     if not ok_save:
         return _operator_storage_error_response(err_save)
 
-    ok_act, err_act = _db().set_active_event_id_blocking(new_key)
+    ok_act, err_act = _activate(new_key)
     if not ok_act:
         return _operator_storage_error_response(err_act)
     _broadcast_active_event_changed(new_key)
@@ -390,7 +411,7 @@ def api_delete():
         return jsonify({"error": "event_key 필요"}), 400
     key = normalize_event_id(raw)
 
-    active_key = _db().get_active_event_id()
+    active_key = _active().get()
     active_key = normalize_event_id(active_key) if active_key else None
 
     ok_del, err_del = _db().clear_data_blocking(key)
@@ -404,7 +425,7 @@ def api_delete():
             row = rows[0] or {}
             next_active_key = row.get("id") or row.get("url")
             if next_active_key:
-                ok_act, err_act = _db().set_active_event_id_blocking(next_active_key)
+                ok_act, err_act = _activate(next_active_key)
                 if not ok_act:
                     return _operator_storage_error_response(err_act)
                 _broadcast_active_event_changed(next_active_key)
@@ -427,7 +448,7 @@ def api_select():
     if not key or not str(key).strip():
         return jsonify({"error": "event_key 필요"}), 400
     key = normalize_event_id(str(key).strip())
-    ok, err_detail = _db().set_active_event_id_blocking(key)
+    ok, err_detail = _activate(key)
     if not ok:
         return _operator_storage_error_response(err_detail)
     _broadcast_active_event_changed(key)
@@ -457,7 +478,7 @@ def api_activate():
     if not key:
         return jsonify({"error": "event_key 필요"}), 400
     key = normalize_event_id(key.strip())
-    ok, err_detail = _db().set_active_event_id_blocking(key)
+    ok, err_detail = _activate(key)
     if not ok:
         return _operator_storage_error_response(err_detail)
     _broadcast_active_event_changed(key)
@@ -481,14 +502,31 @@ def api_upload_csv():
 @operator_bp.post("/snapshot")
 @login_required
 def api_snapshot():
-    """과거 이벤트 내용을 폼에 채우기 위한 읽기 전용 스냅샷."""
+    """
+    과거 이벤트 내용을 폼에 채우기 위한 읽기 전용 스냅샷.
+    event_key 하나, 또는 event_keys 목록(히스토리·관리 도구용, posts 필드만 한 번에 조회)을 받는다.
+    """
     data = request.get_json(silent=True) or {}
+    keys = data.get("event_keys")
+    if isinstance(keys, list):
+        keys = [normalize_event_id(str(k).strip()) for k in keys if str(k or "").strip()]
+        if not keys:
+            return jsonify({"error": "event_keys 필요"}), 400
+        if len(keys) > 500:
+            return jsonify({"error": "event_keys 는 500개까지"}), 400
+        rows = _db().get_many(keys, fields=())
+        return jsonify({"snapshots": {k: _snapshot_payload(k, v) for k, v in rows.items()}})
     key = data.get("event_key")
     if not key:
         return jsonify({"error": "event_key 필요"}), 400
     key = normalize_event_id(key.strip())
-    _, _, _, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at = _db().get_data(key)
-    return jsonify({
+    return jsonify(_snapshot_payload(key, _db().get_many([key], fields=()).get(key)))
+
+
+def _snapshot_payload(key: str, row: Optional[tuple]) -> dict:
+    """get_data 튜플 → 스냅샷 응답 (없는 이벤트는 빈 값)."""
+    _, _, _, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at = row or (None,) * 10
+    return {
         "event_key": key,
         "title": title or "",
         "prizes": prizes or "",
@@ -497,7 +535,7 @@ def api_snapshot():
         "allow_duplicates": bool(allow_duplicates),
         "allowed_list_text": allowed_list or "",
         "event_at": event_at or "",
-    })
+    }
 
 
 @operator_bp.post("/winners/reset")
@@ -506,7 +544,7 @@ def api_winners_reset():
     """현재(또는 지정) 이벤트의 당첨자만 초기화. (같은 event_key 유지)"""
     data = request.get_json(silent=True) or {}
     raw = (data.get("event_key") or "").strip()
-    key = normalize_event_id(raw) if raw else _db().get_active_event_id()
+    key = normalize_event_id(raw) if raw else _active().get()
     if not key:
         return jsonify({"error": "event_key 필요"}), 400
 
@@ -529,6 +567,9 @@ def api_winners_reset():
                 rebuilt[nm] = (t, None)
             participants = rebuilt
 
+    ok, err_detail = _db().clear_winners_blocking(key)
+    if not ok:
+        return _operator_storage_error_response(err_detail)
     ok, err_detail = _db().save_data_blocking(
         key,
         participants,
@@ -558,13 +599,30 @@ def api_winners_reset():
     return jsonify({"ok": True, "event_key": key, "winners": ""})
 
 
+@operator_bp.get("/winners")
+@login_required
+def api_winners_log():
+    """당첨 기록 증분 조회: after_id 이후 행만 (id 오름차순). 다음 호출에는 응답의 last_id 를 넘긴다."""
+    raw = (request.args.get("event_key") or "").strip()
+    key = normalize_event_id(raw) if raw else _active().get()
+    if not key:
+        return jsonify({"error": "event_key 필요"}), 400
+    try:
+        after_id = max(0, int(request.args.get("after_id", 0)))
+    except (TypeError, ValueError):
+        return jsonify({"error": "after_id 는 정수여야 합니다."}), 400
+    rows = _db().get_winners(key, after_id=after_id)
+    last_id = rows[-1]["id"] if rows else after_id
+    return jsonify({"event_key": key, "winners": rows, "last_id": last_id})
+
+
 @operator_bp.post("/winners/delete")
 @login_required
 def api_winners_delete():
     """현재(또는 지정) 이벤트의 당첨자 목록에서 선택 항목 1개만 제거."""
     data = request.get_json(silent=True) or {}
     raw = (data.get("event_key") or "").strip()
-    key = normalize_event_id(raw) if raw else _db().get_active_event_id()
+    key = normalize_event_id(raw) if raw else _active().get()
     if not key:
         return jsonify({"error": "event_key 필요"}), 400
 
@@ -577,13 +635,18 @@ def api_winners_delete():
         key, include_commenters=False
     )
     participants = dict(participants or {})
-    winner_list = [w.strip() for w in str(winners or "").split(",") if w and w.strip()]
-    if winner_index < 0 or winner_index >= len(winner_list):
+    # 화면의 순번은 아직 반영 대기 중인 확정까지 포함하므로 먼저 반영을 마친다.
+    _db().flush_writes(5.0)
+    winner_rows = _db().get_winners(key)
+    if winner_index < 0 or winner_index >= len(winner_rows):
         return jsonify({"error": "유효한 당첨자 인덱스가 아닙니다."}), 400
 
-    removed_winner = unicodedata.normalize("NFC", winner_list[winner_index])
-    del winner_list[winner_index]
-    new_winners = ",".join(winner_list)
+    removed_row = winner_rows.pop(winner_index)
+    removed_winner = unicodedata.normalize("NFC", str(removed_row.get("winner") or "").strip())
+    new_winners = ",".join(str(r.get("winner") or "").strip() for r in winner_rows)
+    ok, err_detail = _db().delete_winner_blocking(key, removed_row["id"])
+    if not ok:
+        return _operator_storage_error_response(err_detail)
 
     # 중복 비허용 정책에서 당첨자를 지웠다면 다시 참가자 풀에 복원
     if allow_duplicates is False and removed_winner:
@@ -597,21 +660,9 @@ def api_winners_delete():
                     restored_tickets = 1
         if removed_winner not in participants:
             participants[removed_winner] = (restored_tickets, None)
-
-    ok, err_detail = _db().save_data_blocking(
-        key,
-        participants,
-        last_id or "",
-        title=title or "",
-        prizes=prizes or "",
-        memo=memo or "",
-        winners=new_winners,
-        allow_duplicates=bool(allow_duplicates),
-        allowed_list=allowed_list or "",
-        event_at=event_at,
-    )
-    if not ok:
-        return _operator_storage_error_response(err_detail)
+            ok, err_detail = _db().save_data_blocking(key, participants, None)
+            if not ok:
+                return _operator_storage_error_response(err_detail)
 
     _broadcast_event_snapshot(
         key,
@@ -624,3 +675,42 @@ def api_winners_delete():
         force_winners_sync=True,
     )
     return jsonify({"ok": True, "event_key": key, "winners": new_winners})
+
+
+@operator_bp.get("/spin_audit")
+@login_required
+def api_spin_audit():
+    """
+    활성(또는 ?event_key=) 이벤트 풀로 스핀을 ?spins= 번(기본 100만, 최대 SPIN_AUDIT_MAX_SPINS) 모의 추첨해
+    참가자별 관측/기대 당첨 수와 카이제곱 결과를 돌려준다. 읽기 전용 (DB·게임 상태를 바꾸지 않음).
+    ?mode=angle|alias|auto 로 추첨 방식을 고를 수 있다 (기본 ROULETTE_DRAW_MODE).
+    """
+    raw = (request.args.get("event_key") or "").strip()
+    key = normalize_event_id(raw) if raw else _active().get()
+    if not key:
+        return jsonify({"error": "활성 이벤트 없음"}), 400
+    try:
+        spins = int(request.args.get("spins", 1_000_000))
+        seed = int(request.args["seed"]) if request.args.get("seed") else None
+        top = max(0, min(int(request.args.get("top", 10)), 100))
+    except ValueError:
+        return jsonify({"error": "spins / seed / top 은 정수"}), 400
+    if not 1 <= spins <= SPIN_AUDIT_MAX_SPINS:
+        return jsonify({"error": f"spins 는 1 ~ {SPIN_AUDIT_MAX_SPINS}"}), 400
+    mode = (request.args.get("mode") or "").strip().lower() or None
+    if mode and mode not in DRAW_MODES:
+        return jsonify({"error": f"mode 는 {', '.join(DRAW_MODES)}"}), 400
+
+    pool, source, _ = event_pool(_db(), key, _pools())
+    if pool is None or not len(pool):
+        return jsonify({"error": "참가자 없음", "event_key": key}), 404
+    try:
+        report = audit_pool(pool, spins, seed=seed, top=top, mode=mode)
+    except SpinAuditUnavailable as e:
+        return jsonify({"error": str(e)}), 501
+    report.update({"event_key": key, "source": source})
+    print(
+        f"DEBUG: [spin audit] {key} [{report['mode']}] n={report['participants']} spins={spins} "
+        f"chi2={report['chi_square']} p={report['p_value']} {report['spins_per_sec']}/s"
+    )
+    return jsonify(report)
@@ -0,0 +1,127 @@
+"""
+활성 이벤트 키를 메모리에 들고 있는 해석기.
+
+- get(): 메모리 값을 바로 돌려준다 (요청마다 is_active 조회를 하지 않음). 첫 호출만 저장소를 동기 조회한다.
+- refresh_sec 가 지나면 백그라운드 스레드 1개가 저장소를 다시 확인해 외부 변경(대시보드·다른 프로세스)을 반영한다.
+- set(key): 운영자 활성화 경로가 성공 직후 호출한다 → 다음 요청부터 즉시 새 키.
+- active_event.txt 는 키가 바뀔 때만 쓴다. 저장소 조회가 실패한 기동 직후에는 이 파일 값으로 버틴다.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from event_utils import normalize_event_id
+
+# 외부 변경 확인 주기(초)
+_ACTIVE_EVENT_REFRESH_SEC = float(os.getenv("ACTIVE_EVENT_REFRESH_SEC", "5"))
+
+
+class ActiveEventResolver:
+    def __init__(
+        self,
+        lookup: Callable[[], Optional[str]],
+        cache_file: Optional[str] = None,
+        refresh_sec: float = _ACTIVE_EVENT_REFRESH_SEC,
+    ):
+        self._lookup = lookup
+        self.cache_file = cache_file
+        self.refresh_sec = float(refresh_sec)
+        self._lock = threading.Lock()
+        self._key: Optional[str] = None
+        self._checked_at = 0.0  # 0: 아직 저장소를 확인하지 않음
+        self._refreshing = False
+        self._pid = os.getpid()
+        self.lookups = 0
+        self.lookup_errors = 0
+        self.changes = 0
+        self.file_writes = 0
+
+    def get(self) -> Optional[str]:
+        if self._pid != os.getpid():
+            # fork 이후: 부모에서 돌던 갱신 스레드는 없으므로 플래그를 풀어 준다.
+            self._pid = os.getpid()
+            self._refreshing = False
+        if self._checked_at == 0.0:
+            self.refresh()
+            if self._key is None:
+                self._load_file()
+            return self._key
+        if time.time() - self._checked_at >= self.refresh_sec:
+            self._refresh_in_background()
+        return self._key
+
+    def set(self, key: Optional[str]) -> None:
+        """활성 키 갱신 (운영자 활성화 성공 직후 / 주기 확인 결과). 바뀐 경우에만 파일을 쓴다."""
+        key = normalize_event_id(str(key)) if key else None
+        with self._lock:
+            self._checked_at = time.time()
+            if key == self._key:
+                return
+            prev, self._key = self._key, key
+            self.changes += 1
+        print(f"DEBUG: [active event] {prev} -> {key}")
+        self._write_file(key)
+
+    def refresh(self) -> Optional[str]:
+        """저장소에서 다시 확인 (동기). 조회 실패·활성 없음이면 마지막 값을 유지한다."""
+        self.lookups += 1
+        try:
+            uid = self._lookup()
+        except Exception as e:
+            self.lookup_errors += 1
+            print(f"DEBUG: [active event] lookup failed: {e}")
+            uid = None
+        if uid:
+            self.set(uid)
+        else:
+            self._checked_at = time.time()
+        return self._key
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="active-event-refresh", daemon=True).start()
+
+    def _load_file(self) -> None:
+        if not self.cache_file:
+            return
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    cached = (f.read() or "").strip()
+                if cached:
+                    with self._lock:
+                        self._key = normalize_event_id(cached)
+        except Exception as e:
+            print(f"DEBUG: [active event] cache file read failed: {e}")
+
+    def _write_file(self, key: Optional[str]) -> None:
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                f.write(str(key or ""))
+            self.file_writes += 1
+        except Exception as e:
+            print(f"DEBUG: [active event] cache file write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "key": self._key,
+            "refresh_sec": self.refresh_sec,
+            "age_sec": round(time.time() - self._checked_at, 2) if self._checked_at else None,
+            "lookups": self.lookups,
+            "lookup_errors": self.lookup_errors,
+            "changes": self.changes,
+            "file_writes": self.file_writes,
+        }
@@ -0,0 +1,1097 @@
+"""
+CommentDatabase 의 asyncio 버전 (supabase AsyncClient + httpx.AsyncClient 풀).
+
+서로 기다릴 필요 없는 요청은 한 번에 보낸다.
+- get_data: posts(키·대체 키)·participants·commenters 를 동시에 조회 (RPC 배포 시 RPC 1회)
+- save: posts 를 먼저 쓰고(자식 FK), 참가자 변경분과 댓글 작성자 추가를 동시에 진행
+- clear / 활성 이벤트 변경: 서로 겹치지 않는 행을 건드리는 요청을 동시에 진행
+- get_many: 여러 이벤트의 posts·자식 행을 in 필터 청크로 동시에 조회
+- 당첨 기록: winners 테이블이 있으면 INSERT/DELETE(posts.winners 는 트리거), 확정은 confirm_winner RPC 1회.
+  없으면 posts.winners 문자열을 다시 저장한다 (EventStorage 기본 구현과 같은 규칙).
+반환 모양은 CommentDatabase 와 같다. 같은 이벤트에 대한 쓰기는 이벤트별 asyncio.Lock 으로 순서를 지킨다.
+
+    db = await AsyncCommentDatabase.create()
+    data = await db.get_data(event_id)
+    ok, err = await db.save_data_blocking(event_id, participants, last_id, commenters)
+    await db.aclose()
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
+
+from event_utils import event_at_to_date_prefix_ymd
+
+from .circuit_breaker import BreakerRegistry, backoff_delay
+from .db_handler import (
+    _ACTIVE_WRITE_KEY,
+    _BLOCKING_SAVE_ATTEMPTS,
+    _DELETE_CHUNK,
+    _EVENT_FETCH_MODE,
+    _ID_BLOCK_SIZE,
+    _IN_CHUNK,
+    _REPLICA_PAGE,
+    _ROW_STATE_TTL_SEC,
+    _SCHEMA_CACHE_PATH,
+    _SCHEMA_CACHE_TTL_SEC,
+    _SNAPSHOT_CACHE_TTL_SEC,
+    _WRITE_QUEUE_BASE_DELAY,
+    _WRITE_QUEUE_MAX_ATTEMPTS,
+    _WRITE_QUEUE_MAX_DELAY,
+    _append_debug_log,
+)
+from .id_allocator import IdBlockAllocator, block_start_from_rpc
+from .row_state import PersistedRowState
+from .schema_cache import load_schema_profile, save_schema_profile, schema_fingerprint
+from .snapshot_cache import EventSnapshotCache, empty_snapshot, snapshot_to_tuple
+from .storage import EVENT_PAGE_MAX, EventStorage, EventTuple, get_many_fields, split_winners, trim_event_tuple
+from .supabase_schema import (
+    PROBE_COLUMNS,
+    SCHEMA_PROFILE_ATTRS,
+    SupabaseSchemaMixin,
+    fill_integer_ids,
+    id_sql_type_from_rows,
+    profile_from_columns,
+)
+from .transport import ROLE_TIMEOUTS, TransportMetrics, build_async_http_client
+
+load_dotenv()
+
+
+class AsyncCommentDatabase(SupabaseSchemaMixin):
+    """Supabase 저장소 (asyncio). 생성은 `await AsyncCommentDatabase.create()`."""
+
+    backend = "supabase-async"
+
+    def __init__(
+        self,
+        supabase_url: str,
+        read_client: AsyncClient,
+        write_client: AsyncClient,
+        http_clients: List[httpx.AsyncClient],
+        metrics: TransportMetrics,
+        breakers: Optional[BreakerRegistry] = None,
+    ):
+        self.supabase_url = supabase_url
+        self._read = read_client
+        self._write = write_client
+        self._http_clients = http_clients
+        self._metrics = metrics
+        self._breakers = breakers or BreakerRegistry()
+        self._init_schema_defaults()
+        self._snapshots = EventSnapshotCache(_SNAPSHOT_CACHE_TTL_SEC)
+        self._row_state = PersistedRowState(_ROW_STATE_TTL_SEC)
+        self._id_alloc = IdBlockAllocator(_ID_BLOCK_SIZE)
+        self._event_rpc_available: Optional[bool] = None
+        self._event_list_rpc_available: Optional[bool] = None
+        self._confirm_rpc_available: Optional[bool] = None
+        # 이벤트별 쓰기 순서 / 정수 id 채번(max(id) 폴백 시) 직렬화
+        self._write_locks: Dict[str, asyncio.Lock] = {}
+        self._id_locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._writes_ok = 0
+        self._writes_failed = 0
+        self._last_active_event_id: Optional[str] = None
+
+    @classmethod
+    async def create(cls) -> "AsyncCommentDatabase":
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_KEY")
+        if not (supabase_url and supabase_key):
+            raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in the environment.")
+        url = supabase_url.strip("'\"")
+        key = supabase_key.strip("'\"")
+        metrics = TransportMetrics()
+        breakers = BreakerRegistry()
+        read_http = build_async_http_client(ROLE_TIMEOUTS["read"], metrics, pool_name="read", breakers=breakers)
+        write_http = build_async_http_client(ROLE_TIMEOUTS["write"], metrics, pool_name="write", breakers=breakers)
+        try:
+            read_client, write_client = await asyncio.gather(
+                acreate_client(url, key, options=AsyncClientOptions(httpx_client=read_http)),
+                acreate_client(url, key, options=AsyncClientOptions(httpx_client=write_http)),
+            )
+        except Exception as e:
+            await asyncio.gather(read_http.aclose(), write_http.aclose())
+            raise RuntimeError(f"Supabase async client initialization failed: {e}") from e
+        print(f"DEBUG: [Supabase async] Storage: {supabase_url}")
+        db = cls(supabase_url, read_client, write_client, [read_http, write_http], metrics, breakers)
+        await db._load_schema()
+        return db
+
+    async def aclose(self) -> None:
+        """진행 중인 백그라운드 쓰기를 마치고 HTTP 풀을 닫는다."""
+        await self.flush_writes()
+        await asyncio.gather(*(c.aclose() for c in self._http_clients), return_exceptions=True)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ----- 스키마 감지 -----
+    async def _column_exists(self, table: str, column: str) -> bool:
+        try:
+            await self._read.table(table).select(column).limit(1).execute()
+            return True
+        except Exception:
+            return False
+
+    async def _infer_child_id_sql_type(self, table: str) -> str:
+        try:
+            r = await self._read.table(table).select("id").limit(1).execute()
+            return id_sql_type_from_rows(r.data or [])
+        except Exception as e:
+            print(f"DEBUG: [infer id type {table}] {e}")
+        return "int"
+
+    async def _probe_schema_profile(self) -> Dict[str, Any]:
+        """컬럼 유무를 한 번에 동시 프로브한 뒤, id 컬럼이 있는 자식 테이블의 id 타입을 동시에 확인한다."""
+        found = await asyncio.gather(*(self._column_exists(t, c) for t, c in PROBE_COLUMNS))
+        has = dict(zip(PROBE_COLUMNS, found))
+        id_tables = [t for t in ("participants", "commenters") if has.get((t, "id"), False)]
+        id_types = dict(zip(id_tables, await asyncio.gather(*(self._infer_child_id_sql_type(t) for t in id_tables))))
+        return profile_from_columns(lambda t, c: has.get((t, c), False), lambda t: id_types.get(t, "int"))
+
+    async def _load_schema(self) -> None:
+        """CommentDatabase._load_schema 와 같은 캐시 파일을 공유한다. 캐시가 유효하면 재검증은 백그라운드 태스크로."""
+        fingerprint = schema_fingerprint(self.supabase_url)
+        cached = load_schema_profile(_SCHEMA_CACHE_PATH, fingerprint, _SCHEMA_CACHE_TTL_SEC)
+        if cached and all(a in cached for a in SCHEMA_PROFILE_ATTRS):
+            self._apply_schema_profile(cached)
+            self._print_schema("cache")
+            self._spawn(self._revalidate_schema(fingerprint))
+            return
+        self._apply_schema_profile(await self._probe_schema_profile())
+        self._print_schema("probe")
+        save_schema_profile(_SCHEMA_CACHE_PATH, fingerprint, self._schema_profile())
+
+    async def _revalidate_schema(self, fingerprint: str) -> None:
+        try:
+            fresh = await self._probe_schema_profile()
+        except Exception as e:
+            print(f"DEBUG: [schema revalidate] {e}")
+            return
+        if fresh != self._schema_profile():
+            self._apply_schema_profile(fresh)
+            self._snapshots.invalidate()
+            self._print_schema("revalidated")
+        save_schema_profile(_SCHEMA_CACHE_PATH, fingerprint, fresh)
+
+    # ----- 조회 -----
+    async def get_data(self, event_id: str, include_commenters: bool = True) -> EventTuple:
+        cached = self._snapshots.get(event_id, include_commenters)
+        if cached is not None:
+            return cached
+        token = self._snapshots.begin_fill(event_id)
+        try:
+            data = await self._fetch_event_data(event_id, include_commenters)
+        except Exception as e:
+            print(f"DEBUG: [get_data Supabase Error] {e}")
+            stale = self._snapshots.get(event_id, include_commenters, allow_stale=True)
+            return stale if stale is not None else snapshot_to_tuple(empty_snapshot())
+        self._snapshots.fill(event_id, token, data, include_commenters)
+        return data
+
+    async def get_many(self, event_ids: Iterable[str], fields: Optional[Iterable[str]] = None) -> Dict[str, EventTuple]:
+        """CommentDatabase.get_many 와 같은 결과. in 필터 청크·키 컬럼·자식 테이블 조회를 동시에 보낸다."""
+        wanted = get_many_fields(fields)
+        include_commenters = "commenters" in wanted
+        out: Dict[str, EventTuple] = {}
+        todo: List[str] = []
+        for ek in dict.fromkeys(str(e) for e in event_ids if e):
+            cached = self._snapshots.get(ek, include_commenters)
+            if cached is not None:
+                out[ek] = trim_event_tuple(cached, wanted)
+            else:
+                todo.append(ek)
+        if not todo:
+            return out
+        fill = "participants" in wanted
+        tokens = {ek: self._snapshots.begin_fill(ek) for ek in todo} if fill else {}
+        try:
+            posts = await self._fetch_posts_many(todo)
+            found = list(posts)
+            children = await asyncio.gather(
+                *(
+                    self._select_in(table, fk, found, order_col) if table else asyncio.sleep(0, [])
+                    for table, fk, order_col in self._child_tables_many(wanted, found)
+                )
+            )
+        except Exception as e:
+            print(f"DEBUG: [get_many Supabase Error] {e}")
+            return out
+        p_by_event = self._group_child_rows(children[0], self._participant_fk_col)
+        c_by_event = self._group_child_rows(children[1], self._commenter_fk_col)
+        for ek, post in posts.items():
+            data = self._event_tuple_from_rows(
+                [post], p_by_event.get(ek, []), c_by_event.get(ek, []), include_commenters
+            )
+            if fill:
+                self._snapshots.fill(ek, tokens[ek], data, include_commenters)
+            out[ek] = data
+        return out
+
+    async def _select_in(
+        self, table: str, col: str, values: List[str], order_col: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """col IN (values) 전체 행. _IN_CHUNK 개씩 나눈 청크를 동시에, 청크 안은 _REPLICA_PAGE 행씩 이어서 읽는다."""
+
+        async def _chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+            rows: List[Dict[str, Any]] = []
+            start = 0
+            while True:
+                q = self._read.table(table).select("*").in_(col, chunk)
+                if order_col:
+                    q = q.order(order_col)
+                page = (await q.range(start, start + _REPLICA_PAGE - 1).execute()).data or []
+                rows.extend(page)
+                if len(page) < _REPLICA_PAGE:
+                    return rows
+                start += _REPLICA_PAGE
+
+        chunks = await asyncio.gather(*(_chunk(values[i : i + _IN_CHUNK]) for i in range(0, len(values), _IN_CHUNK)))
+        return [r for rows in chunks for r in rows]
+
+    async def _fetch_posts_many(self, event_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """키 컬럼과 (혼재 스키마면) 대체 컬럼을 동시에 조회하고 키 컬럼 결과를 우선한다."""
+        alt_col = self._post_alt_key_col()
+        jobs = [self._select_in("posts", self._post_key_col, event_ids, self._post_key_col)]
+        if alt_col:
+            jobs.append(self._select_in("posts", alt_col, event_ids, alt_col))
+        results = await asyncio.gather(*jobs)
+        posts = self._pick_posts_many(event_ids, results[0])
+        if alt_col:
+            for k, v in self._pick_posts_many(event_ids, results[1], alt_col).items():
+                posts.setdefault(k, v)
+        return posts
+
+    def _event_rpc_usable(self) -> bool:
+        if _EVENT_FETCH_MODE == "sequential" or self._event_rpc_available is False:
+            return False
+        return (
+            self._post_key_col == "id"
+            and self._participant_fk_col == "event_id"
+            and self._commenter_fk_col == "event_id"
+        )
+
+    async def _fetch_event_rows_rpc(self, event_id: str, include_commenters: bool):
+        try:
+            res = await self._read.rpc(
+                "get_event_snapshot",
+                {"p_event_id": event_id, "p_include_commenters": bool(include_commenters)},
+            ).execute()
+        except Exception as e:
+            if not self._is_missing_function_error(e):
+                raise
+            print("DEBUG: [get_data] get_event_snapshot RPC not deployed; using concurrent fetch")
+            self._event_rpc_available = False
+            return None
+        self._event_rpc_available = True
+        payload = res.data or {}
+        if isinstance(payload, list):
+            payload = payload[0] if payload else {}
+        return (
+            payload.get("posts") or [],
+            payload.get("participants") or [],
+            payload.get("commenters") or [],
+        )
+
+    def _post_lookups(self, event_id: str, limit: Optional[int] = None) -> list:
+        """posts 조회 코루틴: 키 컬럼 + (id/url 혼재 스키마면) 대체 컬럼."""
+        cols = [self._post_key_col]
+        if self._post_has_id_col and self._post_has_url_col:
+            cols.append("url" if self._post_key_col == "id" else "id")
+        out = []
+        for col in cols:
+            q = self._read.table("posts").select("*").eq(col, event_id)
+            if limit:
+                q = q.limit(limit)
+            out.append(q.execute())
+        return out
+
+    async def _fetch_event_rows_concurrent(self, event_id: str, include_commenters: bool):
+        """posts 키/대체 키·participants·commenters 를 동시에 조회. posts 가 없으면 자식 행은 버린다."""
+        post_jobs = self._post_lookups(event_id)
+        child_jobs = [self._read.table("participants").select("*").eq(self._participant_fk_col, event_id).execute()]
+        if include_commenters:
+            child_jobs.append(self._read.table("commenters").select("*").eq(self._commenter_fk_col, event_id).execute())
+        results = await asyncio.gather(*post_jobs, *child_jobs)
+        post_results, child_results = results[: len(post_jobs)], results[len(post_jobs) :]
+        post_rows = next((r.data for r in post_results if r.data), [])
+        if not post_rows:
+            return [], [], []
+        p_rows = child_results[0].data or []
+        c_rows = (child_results[1].data or []) if include_commenters else []
+        return post_rows, p_rows, c_rows
+
+    async def _fetch_event_data(self, event_id: str, include_commenters: bool = True) -> EventTuple:
+        row_token = self._row_state.token(event_id)
+        rows = None
+        if self._event_rpc_usable():
+            rows = await self._fetch_event_rows_rpc(event_id, include_commenters)
+        if rows is None:
+            rows = await self._fetch_event_rows_concurrent(event_id, include_commenters)
+        post_rows, p_rows, c_rows = rows
+        if post_rows:
+            print(f"DEBUG: [get_data] Fetching data from Supabase (async) for {event_id}")
+            self._row_state.seed("participants", event_id, self._row_map(p_rows), row_token)
+            if include_commenters:
+                self._row_state.seed("commenters", event_id, self._row_map(c_rows), row_token)
+        else:
+            print(f"DEBUG: [get_data] No post in Supabase for {event_id}")
+        return self._event_tuple_from_rows(post_rows, p_rows, c_rows, include_commenters)
+
+    async def get_post_snapshot(self, event_id: str) -> Tuple:
+        """반환: (last_comment_id, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at)"""
+        cached = self._snapshots.get(event_id, include_commenters=False)
+        if cached is not None:
+            _, last_id, _, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at = cached
+            return (last_id, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at)
+        try:
+            results = await asyncio.gather(*self._post_lookups(event_id, limit=1))
+            row = next((r.data[0] for r in results if r.data), None)
+            if not row:
+                return (None, None, None, None, None, None, None, None)
+            event_at = row.get("event_at")
+            if event_at is None:
+                event_at = row.get("updated_at")
+            return (
+                row.get("last_comment_id"),
+                row.get("title"),
+                row.get("prizes"),
+                row.get("memo"),
+                row.get("winners"),
+                row.get("allow_duplicates"),
+                row.get("allowed_list"),
+                event_at,
+            )
+        except Exception as e:
+            print(f"DEBUG: [get_post_snapshot] Supabase error: {e}")
+            return (None, None, None, None, None, None, None, None)
+
+    async def get_active_event_id(self) -> Optional[str]:
+        try:
+            res = await self._read.table("posts").select(self._post_select_cols()).eq("is_active", True).limit(1).execute()
+            k = (self._row_event_key(res.data[0]) or None) if res.data else None
+            self._last_active_event_id = k
+            return k
+        except Exception as e:
+            print(f"DEBUG: [get_active_event_id Supabase Error] {e}")
+        return self._last_active_event_id
+
+    async def get_all_event_ids(self) -> List[str]:
+        try:
+            res = await self._read.table("posts").select(self._post_select_cols()).execute()
+            return [k for k in (self._row_event_key(r) for r in (res.data or [])) if k]
+        except Exception:
+            return []
+
+    async def list_events(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        limit = max(1, min(int(limit), EVENT_PAGE_MAX))
+        try:
+            rows = await self._list_events_rpc(limit, before) if self._event_list_rpc_usable() else None
+            if rows is None:
+                rows = await self._list_events_select(limit, before)
+            return EventStorage._finalize_event_rows(rows)
+        except Exception as e:
+            print(f"DEBUG: [list_events] Supabase error: {e}")
+            return []
+
+    async def _list_events_rpc(self, limit: int, before: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        try:
+            res = await self._read.rpc("list_events_page", {"p_before": before, "p_limit": limit}).execute()
+        except Exception as e:
+            if not self._is_missing_function_error(e):
+                raise
+            print("DEBUG: [list_events] list_events_page RPC not deployed; using keyset select")
+            self._event_list_rpc_available = False
+            return None
+        self._event_list_rpc_available = True
+        return self._event_list_rows_from_rpc(res.data)
+
+    async def _list_events_select(self, limit: int, before: Optional[str]) -> List[Dict[str, Any]]:
+        """숫자 ID 구간과 레거시 키 구간을 동시에 조회해 앞 구간부터 채운다."""
+
+        def _range_query(numeric: bool, lt: Optional[str]):
+            q = self._read.table("posts").select(self._event_list_select_cols())
+            return self._event_list_range_filter(q, numeric, lt).limit(limit).execute()
+
+        results = await asyncio.gather(*(_range_query(n, lt) for n, lt in self._event_list_ranges(before)))
+        rows = [self._event_list_row(r) for res in results for r in (res.data or [])]
+        return rows[:limit]
+
+    async def next_event_id(self, event_at_iso: Optional[str] = None) -> str:
+        """오늘 날짜(YYYYMMDD) + 2자리 일련번호. 오늘 접두의 최신 ID 한 건만 조회한다."""
+        _ = event_at_iso
+        prefix = event_at_to_date_prefix_ymd(None)
+        max_serial = 0
+        try:
+            res = (
+                await self._read.table("posts")
+                .select(self._post_key_col)
+                .like(self._post_key_col, f"{prefix}%")
+                .order(self._post_key_col, desc=True)
+                .limit(1)
+                .execute()
+            )
+            for row in res.data or []:
+                uid = str(self._row_event_key(row) or "")
+                if len(uid) == 10 and uid.startswith(prefix) and uid[8:].isdigit():
+                    max_serial = max(max_serial, int(uid[8:]))
+        except Exception as e:
+            print(f"DEBUG: [next_event_id] Supabase: {e}")
+        return f"{prefix}{(max_serial + 1):02d}"
+
+    async def create_internal_event(
+        self, template_key: str = None, event_at_iso: Optional[str] = None
+    ) -> Optional[str]:
+        """EventStorage.create_internal_event 와 같은 규칙. 템플릿 조회와 다음 ID 계산을 동시에 한다."""
+        title, prizes, memo = "새 룰렛 이벤트", "", ""
+        allow_duplicates, allowed_list_str = False, None
+        template_event_at = event_at_iso
+        if template_key:
+            templates, key = await asyncio.gather(
+                self.get_many([template_key], fields=()), self.next_event_id(event_at_iso)
+            )
+            template = templates.get(str(template_key)) or snapshot_to_tuple(empty_snapshot())
+            _, _, _, t0, pr, m0, _w0, ad0, al0, ea0 = template
+            title = (t0 or "이벤트").strip() + " (복사)"
+            prizes = pr or ""
+            memo = m0 or ""
+            allow_duplicates = bool(ad0) if ad0 is not None else False
+            allowed_list_str = al0
+            if template_event_at is None:
+                template_event_at = ea0
+        else:
+            key = await self.next_event_id(event_at_iso)
+        save_event_at = template_event_at or datetime.now().replace(microsecond=0).isoformat()
+        ok_save, _ = await self.save_data_blocking(
+            key,
+            None,
+            "",
+            title=title,
+            prizes=prizes,
+            memo=memo,
+            winners="",
+            allow_duplicates=allow_duplicates,
+            allowed_list=allowed_list_str,
+            event_at=save_event_at,
+        )
+        if not ok_save:
+            return None
+        ok_act, _ = await self.set_active_event_id_blocking(key)
+        if not ok_act:
+            return None
+        return key
+
+    # ----- 쓰기 -----
+    async def _run_write(self, kind: str, key: str, payload: Any, max_attempts: int) -> Tuple[bool, Optional[str]]:
+        """
+        key(이벤트) 단위로 순서를 지켜 반영한다. 스냅샷 캐시에는 호출부가 이미 반영해 두었고,
+        최종 실패하면 해당 이벤트 캐시를 버린다 (CommentDatabase 쓰기 큐와 같은 규칙).
+        """
+        self._snapshots.begin_write(key)
+        lock = self._write_locks.setdefault(key, asyncio.Lock())
+        last_err: Optional[str] = None
+        ok = False
+        try:
+            async with lock:
+                for attempt in range(max_attempts):
+                    try:
+                        await self._apply_write(kind, key, payload)
+                        ok = True
+                        break
+                    except Exception as e:
+                        last_err = str(e)
+                        if attempt + 1 >= max_attempts:
+                            break
+                        if not self._breakers.try_retry():
+                            print(f"DEBUG: [Supabase async] retry budget exhausted; giving up {kind} {key}")
+                            break
+                        delay = backoff_delay(attempt + 1, _WRITE_QUEUE_BASE_DELAY, _WRITE_QUEUE_MAX_DELAY)
+                        await asyncio.sleep(max(delay, float(getattr(e, "retry_after", 0.0) or 0.0)))
+        finally:
+            self._snapshots.end_write(key, ok)
+        if ok:
+            self._writes_ok += 1
+        else:
+            self._writes_failed += 1
+            _append_debug_log(f"[Supabase Sync Failed] {kind} {key}: {last_err}")
+            print(f"DEBUG: [Supabase Sync Skip] {kind} {key}: {last_err}")
+        return ok, last_err
+
+    async def _apply_write(self, kind: str, key: str, payload: Any) -> None:
+        if kind == "save":
+            await self._save_core(**payload)
+        elif kind == "delete_participant":
+            await self._delete_participant_core(key, payload)
+        elif kind == "clear":
+            await self._clear_core(key)
+        elif kind == "active":
+            await self._active_event_core(payload)
+        elif kind == "winner_add":
+            await self._winner_add_core(key, payload)
+        elif kind == "winner_delete":
+            await self._winner_delete_core(key, payload)
+        elif kind == "winner_import":
+            await self._winner_import_core(key, payload)
+        elif kind == "confirm_winner":
+            await self._confirm_winner_core(key, payload)
+        else:
+            raise ValueError(f"unknown write kind: {kind}")
+
+    async def flush_writes(self, timeout: Optional[float] = None) -> bool:
+        """진행 중인 백그라운드 쓰기가 모두 끝날 때까지 기다린다."""
+        pending = [t for t in self._tasks if not t.done()]
+        if not pending:
+            return True
+        done, not_done = await asyncio.wait(pending, timeout=timeout)
+        return not not_done
+
+    def save_data(
+        self,
+        event_id: str,
+        participants_dict,
+        last_comment_id,
+        all_commenters=None,
+        title=None,
+        prizes=None,
+        memo=None,
+        winners=None,
+        allow_duplicates=None,
+        allowed_list=None,
+        event_at=None,
+    ) -> asyncio.Task:
+        """캐시에 즉시 반영하고 원격 쓰기는 백그라운드 태스크로 (실행 중인 이벤트 루프 안에서 호출)."""
+        payload = self._save_payload(
+            event_id,
+            participants_dict,
+            last_comment_id,
+            all_commenters,
+            title,
+            prizes,
+            memo,
+            winners,
+            allow_duplicates,
+            allowed_list,
+            event_at,
+        )
+        self._snapshot_apply_save(**{k: v for k, v in payload.items() if k != "is_active"})
+        return self._spawn(self._run_write("save", event_id, payload, _WRITE_QUEUE_MAX_ATTEMPTS))
+
+    async def save_data_blocking(
+        self,
+        event_id: str,
+        participants_dict,
+        last_comment_id,
+        all_commenters=None,
+        title=None,
+        prizes=None,
+        memo=None,
+        winners=None,
+        allow_duplicates=None,
+        allowed_list=None,
+        event_at=None,
+        is_active: Optional[bool] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        payload = self._save_payload(
+            event_id,
+            participants_dict,
+            last_comment_id,
+            all_commenters,
+            title,
+            prizes,
+            memo,
+            winners,
+            allow_duplicates,
+            allowed_list,
+            event_at,
+            is_active,
+        )
+        self._snapshot_apply_save(**{k: v for k, v in payload.items() if k != "is_active"})
+        return await self._run_write("save", event_id, payload, _BLOCKING_SAVE_ATTEMPTS)
+
+    async def _save_core(
+        self,
+        event_id,
+        participants_dict,
+        last_comment_id,
+        all_commenters,
+        title,
+        prizes,
+        memo,
+        winners,
+        allow_duplicates,
+        allowed_list,
+        event_at,
+        is_active: Optional[bool] = None,
+    ) -> None:
+        post_data = self._build_post_data(
+            event_id,
+            last_comment_id,
+            title,
+            prizes,
+            memo,
+            winners,
+            allow_duplicates,
+            allowed_list,
+            event_at,
+            is_active,
+        )
+        # 자식 행이 posts 를 FK 로 참조할 수 있으므로 posts 먼저
+        await self._save_post_row_resilient(event_id, post_data)
+        jobs = []
+        if participants_dict:
+            jobs.append(self._save_participant_delta(event_id, participants_dict))
+        if all_commenters:
+            jobs.append(self._save_commenter_delta(event_id, all_commenters))
+        if jobs:
+            await asyncio.gather(*jobs)
+
+    async def _save_post_row_resilient(self, event_id: str, post_data: Dict[str, Any]) -> None:
+        """ON CONFLICT 제약이 없으면 존재 여부(키·대체 키 동시 조회)를 확인해 update/insert 로 대체."""
+        try:
+            await self._write.table("posts").upsert(post_data, on_conflict=self._post_key_col).execute()
+            return
+        except Exception as e:
+            if not self._is_on_conflict_constraint_error(e):
+                raise
+            print(
+                "DEBUG: [posts save fallback] ON CONFLICT unavailable; "
+                f"fallback to select+update/insert ({self._post_key_col})"
+            )
+        mixed = self._post_has_id_col and self._post_has_url_col and self._post_key_col == "id"
+        cols = [self._post_key_col] + (["url"] if mixed else [])
+        try:
+            found = await asyncio.gather(
+                *(self._write.table("posts").select(c).eq(c, event_id).limit(1).execute() for c in cols)
+            )
+            exists = any(r.data for r in found)
+        except Exception:
+            exists = False
+        if not exists:
+            try:
+                await self._write.table("posts").insert(post_data).execute()
+                return
+            except Exception:
+                pass  # insert 경합/중복키 충돌 시 update 재시도
+        await self._write.table("posts").update(post_data).eq(self._post_key_col, event_id).execute()
+        if mixed:
+            try:
+                await self._write.table("posts").update(post_data).eq("url", event_id).execute()
+            except Exception:
+                pass
+
+    async def _persisted_rows(self, table: str, event_id: str) -> Dict[str, Dict[str, Any]]:
+        rows = self._row_state.get(table, event_id)
+        if rows is not None:
+            return rows
+        if table == "participants":
+            fk = self._participant_fk_col
+            sel_cols = ["author", "count"]
+            has_id, has_ct = self._participant_has_id_col, self._participant_has_created_at_col
+        else:
+            fk = self._commenter_fk_col
+            sel_cols = ["author"]
+            has_id, has_ct = self._commenter_has_id_col, self._commenter_has_created_at_col
+        if has_id:
+            sel_cols.insert(0, "id")
+        if has_ct:
+            sel_cols.append("created_at")
+        token = self._row_state.token(event_id)
+        sel = await self._write.table(table).select(",".join(sel_cols)).eq(fk, event_id).execute()
+        rows = self._row_map(sel.data or [])
+        self._row_state.seed(table, event_id, rows, token)
+        return rows
+
+    async def _reserve_id_block(self, table: str, size: int) -> int:
+        res = await self._write.rpc("reserve_id_block", {"p_table": table, "p_count": size}).execute()
+        return block_start_from_rpc(res.data)
+
+    async def _allocate_ids(self, table: str, n: int) -> List[int]:
+        ids = self._id_alloc.take(table, n)
+        while len(ids) < n:
+            size = self._id_alloc.reserve_size(n - len(ids))
+            self._id_alloc.add_block(table, await self._reserve_id_block(table, size), size)
+            ids.extend(self._id_alloc.take(table, n - len(ids)))
+        return ids
+
+    async def _assign_ids_by_max_scan(self, table: str, batch: List[Dict[str, Any]]) -> None:
+        cur = 0
+        try:
+            r = await self._write.table(table).select("id").order("id", desc=True).limit(1).execute()
+            if r.data and r.data[0].get("id") is not None:
+                cur = int(r.data[0]["id"])
+        except Exception as e:
+            print(f"DEBUG: [max id {table}] {e}")
+        fill_integer_ids(batch, cur)
+
+    async def _upsert_chunks(self, table: str, rows: List[Dict[str, Any]], size: int, **kwargs) -> None:
+        """
+        정수 id 를 앱이 채우는 테이블이면 reserve_id_block 예약 블록에서 채번한다.
+        RPC 가 없으면 max(id) 조회~upsert 를 테이블 단위로 직렬화한다 (동시 저장끼리 같은 id 를 잡지 않도록).
+        """
+        id_col = self._participant_has_id_col if table == "participants" else self._commenter_has_id_col
+        id_type = self._participant_id_sql_type if table == "participants" else self._commenter_id_sql_type
+        chunks = [rows[i : i + size] for i in range(0, len(rows), size)]
+        missing = [r for r in rows if r.get("id") is None] if (id_col and id_type == "int") else []
+        if missing and self._id_alloc.enabled:
+            try:
+                for row, rid in zip(missing, await self._allocate_ids(table, len(missing))):
+                    row["id"] = rid
+                missing = []
+            except Exception as e:
+                if not self._is_missing_function_error(e):
+                    raise
+                print("DEBUG: [id allocator] reserve_id_block RPC not deployed; using max(id) scan")
+                self._id_alloc.enabled = False
+        if missing:
+            async with self._id_locks.setdefault(table, asyncio.Lock()):
+                await self._assign_ids_by_max_scan(table, missing)
+                await asyncio.gather(*(self._write.table(table).upsert(c, **kwargs).execute() for c in chunks))
+            return
+        await asyncio.gather(*(self._write.table(table).upsert(c, **kwargs).execute() for c in chunks))
+
+    async def _save_participant_delta(self, event_id: str, participants_dict: Dict[str, Any]) -> None:
+        """CommentDatabase 와 같은 변경분 규칙. upsert 청크와 빠진 작성자 delete 는 서로 겹치지 않아 동시에 보낸다."""
+        fk = self._participant_fk_col
+        persisted = await self._persisted_rows("participants", event_id)
+        p_batch, removed, n_wanted = self._plan_participant_delta(event_id, participants_dict, persisted)
+        removed_authors = [persisted[sk]["author"] for sk in removed]
+        try:
+            await asyncio.gather(
+                self._upsert_chunks("participants", p_batch, 500, on_conflict=f"{fk},author"),
+                *(
+                    self._write.table("participants")
+                    .delete()
+                    .eq(fk, event_id)
+                    .in_("author", removed_authors[i : i + _DELETE_CHUNK])
+                    .execute()
+                    for i in range(0, len(removed_authors), _DELETE_CHUNK)
+                ),
+            )
+        except Exception:
+            self._row_state.invalidate(event_id)
+            raise
+        if p_batch or removed:
+            print(
+                f"DEBUG: [participants delta] {event_id}: upsert={len(p_batch)} delete={len(removed)} "
+                f"unchanged={n_wanted - len(p_batch)}"
+            )
+        self._row_state.apply("participants", event_id, self._row_map(p_batch), removed)
+
+    async def _save_commenter_delta(self, event_id: str, all_commenters: List[Any]) -> None:
+        fk = self._commenter_fk_col
+        persisted = await self._persisted_rows("commenters", event_id)
+        c_batch = self._plan_commenter_inserts(event_id, all_commenters, persisted)
+        if not c_batch:
+            return
+        try:
+            await self._upsert_chunks(
+                "commenters", c_batch, 1000, on_conflict=f"{fk},author", ignore_duplicates=True
+            )
+        except Exception:
+            self._row_state.invalidate(event_id)
+            raise
+        print(f"DEBUG: [commenters delta] {event_id}: insert={len(c_batch)} known={len(persisted)}")
+        self._row_state.apply("commenters", event_id, self._row_map(c_batch))
+
+    async def clear_data_blocking(self, event_id: str) -> Tuple[bool, Optional[str]]:
+        self._snapshots.apply_clear(event_id)
+        return await self._run_write("clear", event_id, None, _BLOCKING_SAVE_ATTEMPTS)
+
+    def clear_data(self, event_id: str) -> asyncio.Task:
+        self._snapshots.apply_clear(event_id)
+        return self._spawn(self._run_write("clear", event_id, None, _WRITE_QUEUE_MAX_ATTEMPTS))
+
+    async def _clear_core(self, event_id: str) -> None:
+        # 자식 테이블 두 곳은 동시에, posts 는 FK 때문에 마지막에
+        await asyncio.gather(
+            self._write.table("participants").delete().eq(self._participant_fk_col, event_id).execute(),
+            self._write.table("commenters").delete().eq(self._commenter_fk_col, event_id).execute(),
+        )
+        await self._write.table("posts").delete().eq(self._post_key_col, event_id).execute()
+        self._row_state.reset(event_id)
+
+    def delete_participant(self, event_id: str, author: str) -> asyncio.Task:
+        self._snapshots.apply_delete_participant(event_id, author)
+        return self._spawn(self._run_write("delete_participant", event_id, author, _WRITE_QUEUE_MAX_ATTEMPTS))
+
+    async def _delete_participant_core(self, event_id: str, author: str) -> None:
+        await self._write.table("participants").delete().eq(self._participant_fk_col, event_id).eq(
+            "author", author
+        ).execute()
+        self._row_state.apply("participants", event_id, deleted=[self._norm_author_key(author)])
+
+    def set_active_event_id(self, event_id: Optional[str]) -> asyncio.Task:
+        return self._spawn(self._run_write("active", _ACTIVE_WRITE_KEY, event_id, _WRITE_QUEUE_MAX_ATTEMPTS))
+
+    async def set_active_event_id_blocking(self, event_id: Optional[str]) -> Tuple[bool, Optional[str]]:
+        ok, err = await self._run_write("active", _ACTIVE_WRITE_KEY, event_id, _BLOCKING_SAVE_ATTEMPTS)
+        if ok:
+            self._last_active_event_id = event_id
+        return ok, err
+
+    async def _active_event_core(self, event_id: Optional[str]) -> None:
+        if not self._post_has_is_active_col:
+            return
+        # 기존 활성 행 끄기(event_id 제외) → 대상 행 켜기 순서로 (동기 경로와 같음).
+        # posts_one_active_idx(활성 행 1개 부분 유니크 인덱스) 때문에 켜기가 먼저 닿으면 유니크 위반이다.
+        # 대상 행은 update 만 한다 (insert/upsert 는 최소 필드 중복 행을 만들 수 있음).
+        off = self._write.table("posts").update({"is_active": False}).eq("is_active", True)
+        if event_id:
+            off = off.neq(self._post_key_col, event_id)
+        await off.execute()
+        if event_id:
+            await self._write.table("posts").update({"is_active": True}).eq(self._post_key_col, event_id).execute()
+            print(f"DEBUG: [SupabaseSync] Active event id set to: {event_id}")
+
+    # ----- 당첨 기록 (winners 테이블, 없으면 posts.winners 문자열 재저장) -----
+    def append_winner(
+        self, event_id: str, winner: str, round_id: Optional[str] = None, angle: Optional[float] = None
+    ) -> asyncio.Task:
+        if not self._has_winners_table:
+            return self._spawn(self._save_winner_names(event_id, lambda names: names + [winner], blocking=False))
+        self._snapshots.apply_winner(event_id, winner)
+        row = {
+            "event_id": event_id,
+            "round_id": round_id or None,
+            "winner": winner,
+            "angle": angle,
+            "created_at": datetime.now().isoformat(),
+        }
+        return self._spawn(self._run_write("winner_add", event_id, row, _WRITE_QUEUE_MAX_ATTEMPTS))
+
+    async def _winner_add_core(self, event_id: str, row: Dict[str, Any]) -> None:
+        # INSERT 1회. posts.winners 는 DB 트리거가 덧붙인다.
+        if row.get("round_id"):
+            # 다른 워커가 같은 라운드를 먼저 기록했으면 무시된다(빈 응답) → 캐시에 덧붙인 값을 버린다.
+            res = (
+                await self._write.table("winners")
+                .upsert(row, on_conflict="event_id,round_id", ignore_duplicates=True)
+                .execute()
+            )
+            if not (res.data or []):
+                self._snapshots.invalidate(event_id)
+        else:
+            await self._write.table("winners").insert(row).execute()
+
+    async def confirm_winner(
+        self, event_id: str, winner: str, round_id: Optional[str] = None, angle: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        confirm_winner RPC 1회로 기록 추가 + 참가자 제거 + 새 상태 조회 (CommentDatabase.confirm_winner 와 같은 반환).
+        같은 이벤트의 앞선 쓰기보다 먼저 반영되지 않도록 이벤트 쓰기 락을 거친다.
+        """
+        if not self._confirm_rpc_usable():
+            return await self._confirm_winner_fallback(event_id, winner, round_id, angle)
+        payload = {"winner": winner, "round_id": round_id or None, "angle": angle, "result": None}
+        ok, last_err = await self._run_write("confirm_winner", event_id, payload, _BLOCKING_SAVE_ATTEMPTS)
+        if not ok:
+            _append_debug_log(f"[Blocking confirm_winner failed] {event_id} / {winner}: {last_err}")
+            print(f"DEBUG: [confirm_winner] failed: {last_err}")
+            return None
+        if payload["result"] is None:
+            # RPC 미배포로 판명: 기록 추가 + 참가자 삭제로
+            return await self._confirm_winner_fallback(event_id, winner, round_id, angle)
+        return payload["result"]
+
+    async def _confirm_winner_fallback(
+        self, event_id: str, winner: str, round_id: Optional[str], angle: Optional[float]
+    ) -> Dict[str, Any]:
+        participants, _, commenters, title, prizes, memo, winners, allow_duplicates, allowed_list, _ = (
+            await self.get_data(event_id)
+        )
+        participants = dict(participants or {})
+        if not allow_duplicates and winner in participants:
+            del participants[winner]
+            self.delete_participant(event_id, winner)
+        self.append_winner(event_id, winner, round_id=round_id, angle=angle)
+        return {
+            "inserted": True,
+            "participants": participants,
+            "winners": ",".join(split_winners(winners) + [winner]),
+            "allow_duplicates": bool(allow_duplicates),
+            "title": title,
+            "prizes": prizes,
+            "memo": memo,
+            "allowed_list": allowed_list,
+            "commenters": list(commenters or []),
+        }
+
+    async def _confirm_winner_core(self, event_id: str, payload: Dict[str, Any]) -> None:
+        """결과는 payload["result"] 에 남긴다 (RPC 미배포면 None 그대로)."""
+        winner = payload["winner"]
+        try:
+            res = await self._write.rpc(
+                "confirm_winner",
+                {
+                    "p_event_id": event_id,
+                    "p_winner": winner,
+                    "p_round_id": payload["round_id"],
+                    "p_angle": payload["angle"],
+                },
+            ).execute()
+        except Exception as e:
+            if not self._is_missing_function_error(e):
+                raise
+            print("DEBUG: [confirm_winner] confirm_winner RPC not deployed; using winners insert + participant delete")
+            self._confirm_rpc_available = False
+            return
+        self._confirm_rpc_available = True
+        data = res.data or {}
+        if isinstance(data, list):
+            data = data[0] if data else {}
+        participants, _, commenters, title, prizes, memo, winners, allow_duplicates, allowed_list, _ = (
+            self._event_tuple_from_rows(
+                data.get("posts") or [], data.get("participants") or [], data.get("commenters") or [], True
+            )
+        )
+        self._snapshots.apply_save(event_id, {"winners": winners}, participants=participants)
+        if data.get("removed"):
+            self._snapshots.apply_delete_participant(event_id, winner)
+            self._row_state.apply("participants", event_id, deleted=[self._norm_author_key(winner)])
+        payload["result"] = {
+            "inserted": bool(data.get("inserted")),
+            "participants": participants,
+            "winners": winners or "",
+            "allow_duplicates": allow_duplicates,
+            "title": title,
+            "prizes": prizes,
+            "memo": memo,
+            "allowed_list": allowed_list,
+            "commenters": commenters,
+        }
+
+    async def get_winners(self, event_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """당첨 기록 [{"id", "event_id", "round_id", "winner", "angle", "created_at"}] (id 오름차순, after_id 초과만)."""
+        if not self._has_winners_table:
+            names = split_winners((await self.get_post_snapshot(event_id))[4])
+            return [
+                {"id": i, "event_id": event_id, "round_id": None, "winner": name, "angle": None, "created_at": None}
+                for i, name in enumerate(names, start=1)
+                if i > after_id
+            ]
+        try:
+            res = (
+                await self._read.table("winners")
+                .select("id,event_id,round_id,winner,angle,created_at")
+                .eq("event_id", event_id)
+                .gt("id", int(after_id or 0))
+                .order("id")
+                .execute()
+            )
+            return res.data or []
+        except Exception as e:
+            print(f"DEBUG: [get_winners] Supabase error: {e}")
+            return []
+
+    async def delete_winner_blocking(self, event_id: str, winner_id: int) -> Tuple[bool, Optional[str]]:
+        if self._has_winners_table:
+            return await self._winner_write_blocking("winner_delete", event_id, int(winner_id))
+        names = split_winners((await self.get_post_snapshot(event_id))[4])
+        if not 1 <= int(winner_id) <= len(names):
+            return False, f"winner id {winner_id} not found"
+        del names[int(winner_id) - 1]
+        return await self._save_winner_names(event_id, lambda _: names)
+
+    async def clear_winners_blocking(self, event_id: str) -> Tuple[bool, Optional[str]]:
+        if self._has_winners_table:
+            return await self._winner_write_blocking("winner_delete", event_id, None)
+        return await self._save_winner_names(event_id, lambda _: [])
+
+    async def import_winners_blocking(self, event_id: str, rows: List[Dict[str, Any]]) -> Tuple[bool, Optional[str]]:
+        """기록 행 [{"winner", "round_id", "angle", "created_at"}] 을 순서대로 덧붙인다 (보관 이벤트 복원용)."""
+        if not rows:
+            return True, None
+        if self._has_winners_table:
+            return await self._winner_write_blocking("winner_import", event_id, [dict(r) for r in rows])
+        return await self._save_winner_names(event_id, lambda names: names + [str(r["winner"]) for r in rows])
+
+    async def _save_winner_names(self, event_id: str, change, blocking: bool = True) -> Tuple[bool, Optional[str]]:
+        """winners 테이블이 없을 때: posts.winners 문자열을 읽어 change(이름 목록) 결과로 다시 저장한다."""
+        names = change(split_winners((await self.get_post_snapshot(event_id))[4]))
+        if blocking:
+            return await self.save_data_blocking(event_id, None, None, winners=",".join(names))
+        return await self.save_data(event_id, None, None, winners=",".join(names))
+
+    async def _winner_write_blocking(self, kind: str, event_id: str, payload: Any) -> Tuple[bool, Optional[str]]:
+        ok, last_err = await self._run_write(kind, event_id, payload, _BLOCKING_SAVE_ATTEMPTS)
+        if ok:
+            return True, None
+        _append_debug_log(f"[Blocking {kind} failed after {_BLOCKING_SAVE_ATTEMPTS} tries] {event_id}: {last_err}")
+        print(f"DEBUG: [{kind}] failed: {last_err}")
+        return False, last_err
+
+    async def _winner_import_core(self, event_id: str, rows: List[Dict[str, Any]]) -> None:
+        """기록 행을 INSERT 1회로 (created_at·round_id·angle 원래 값 유지). posts.winners 는 INSERT 트리거가 덧붙인다."""
+        now_iso = datetime.now().isoformat()
+        batch = [
+            {
+                "event_id": event_id,
+                "round_id": r.get("round_id") or None,
+                "winner": r["winner"],
+                "angle": r.get("angle"),
+                "created_at": r.get("created_at") or now_iso,
+            }
+            for r in rows
+        ]
+        await self._write.table("winners").upsert(
+            batch, on_conflict="event_id,round_id", ignore_duplicates=True
+        ).execute()
+        await self._apply_winners_from_log(event_id)
+
+    async def _winner_delete_core(self, event_id: str, winner_id: Optional[int]) -> None:
+        """winner_id 가 None 이면 이벤트의 기록 전체 삭제. posts.winners 는 DB 트리거가 다시 만든다."""
+        q = self._write.table("winners").delete().eq("event_id", event_id)
+        if winner_id is not None:
+            res = await q.eq("id", winner_id).execute()
+            if not (res.data or []):
+                raise ValueError(f"winner id {winner_id} not found")
+        else:
+            await q.execute()
+        await self._apply_winners_from_log(event_id)
+
+    async def _apply_winners_from_log(self, event_id: str) -> None:
+        # 트리거와 같은 값을 캐시에 반영 (삭제·복원은 드물어 한 번 다시 읽는다)
+        winners = ",".join(r["winner"] for r in await self.get_winners(event_id))
+        self._snapshots.apply_save(event_id, {"winners": winners})
+
+    async def update_timestamp(self, event_id: str) -> None:
+        ts = datetime.now().isoformat()
+        try:
+            await self._write.table("posts").update({"updated_at": ts}).eq(self._post_key_col, event_id).execute()
+            if "event_at" not in self._post_opt_cols:
+                self._snapshots.invalidate(event_id)
+        except Exception as e:
+            print(f"DEBUG: [update_timestamp Supabase] {e}")
+
+    # ----- 진단 -----
+    def invalidate_snapshot(self, event_id: Optional[str] = None) -> None:
+        self._snapshots.invalidate(event_id)
+        self._row_state.invalidate(event_id)
+
+    def snapshot_cache_stats(self) -> Dict[str, Any]:
+        out = self._snapshots.stats()
+        out["row_state"] = self._row_state.stats()
+        return out
+
+    def write_queue_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": sum(1 for t in self._tasks if not t.done()),
+            "completed": self._writes_ok,
+            "failed": self._writes_failed,
+            "id_allocator": self._id_alloc.stats(),
+        }
+
+    def transport_stats(self) -> Dict[str, Any]:
+        return {
+            "timeouts_sec": dict(ROLE_TIMEOUTS),
+            "hosts": self._metrics.snapshot(),
+            "breakers": self._breakers.stats(),
+        }
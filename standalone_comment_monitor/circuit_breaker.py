@@ -0,0 +1,321 @@
+"""
+Supabase 호출 보호: 테이블·작업별 서킷 브레이커, 전역 재시도 예산, 지터 백오프.
+
+- 브레이커는 HTTP 전송 계층(BreakerTransport)에서 요청마다 확인한다. 키는 "<table>:<read|write|call>".
+- 연속 실패(전송 오류·타임아웃·5xx·429)가 임계값을 넘으면 열린다(open). 열린 동안은 요청을 보내지 않고
+  CircuitOpenError 로 즉시 실패시켜, 호출부가 캐시/복제본으로 넘어가게 한다 (스레드가 타임아웃을 기다리지 않음).
+- open 시간이 지나면 반열림(half-open): 시험 요청 1건만 보내고 성공하면 닫고, 실패하면 더 길게 다시 연다.
+- 재시도 예산: 최근 window 동안의 재시도 수를 요청 수의 ratio(최소 min_per_sec)로 묶어, 장애 때 재시도가 부하를 키우지 않게 한다.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+from .metrics import observe_supabase_request
+
+# 연속 실패 몇 번에 열지
+_BREAKER_FAILURES = int(os.getenv("SUPABASE_BREAKER_FAILURES", "5"))
+# 처음 열리는 시간(초). 반열림 시험이 실패할 때마다 두 배, 최대 _BREAKER_OPEN_MAX_SEC
+_BREAKER_OPEN_SEC = float(os.getenv("SUPABASE_BREAKER_OPEN_SEC", "5"))
+_BREAKER_OPEN_MAX_SEC = float(os.getenv("SUPABASE_BREAKER_OPEN_MAX_SEC", "60"))
+# 재시도 예산: 요청 대비 재시도 비율 / 요청이 적을 때 보장하는 초당 재시도 수 / 집계 구간(초)
+_RETRY_BUDGET_RATIO = float(os.getenv("SUPABASE_RETRY_BUDGET_RATIO", "0.2"))
+_RETRY_BUDGET_MIN_PER_SEC = float(os.getenv("SUPABASE_RETRY_BUDGET_MIN_PER_SEC", "0.5"))
+_RETRY_BUDGET_WINDOW_SEC = 10.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """브레이커가 열려 요청을 보내지 않았다. retry_after: 다시 시도해 볼 만한 시점까지 남은 초."""
+
+    def __init__(self, key: str, retry_after: float, request: Optional[httpx.Request] = None):
+        super().__init__(f"circuit open: {key} (retry in {retry_after:.1f}s)", request=request)
+        self.key = key
+        self.retry_after = retry_after
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """attempt 번째 실패 후 대기(초): 지수 백오프의 절반 + 나머지 절반 범위의 무작위 (여러 워커가 동시에 몰리지 않게)."""
+    d = min(cap, base * (2 ** max(0, attempt - 1)))
+    return d / 2 + random.uniform(0, d / 2)
+
+
+class CircuitBreaker:
+    """키 하나의 상태. 스레드 안전."""
+
+    def __init__(
+        self,
+        key: str,
+        failures: int = _BREAKER_FAILURES,
+        open_sec: float = _BREAKER_OPEN_SEC,
+        open_max_sec: float = _BREAKER_OPEN_MAX_SEC,
+    ):
+        self.key = key
+        self.failure_threshold = max(1, int(failures))
+        self.base_open_sec = float(open_sec)
+        self.open_max_sec = float(open_max_sec)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._consecutive = 0
+        self._open_sec = self.base_open_sec
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def retry_after(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        return max(0.0, self._opened_at + self._open_sec - now)
+
+    def allow(self) -> bool:
+        """요청을 보내도 되는지. 반열림이면 시험 요청 1건만 통과시킨다."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.time()
+            if self.state == OPEN and self.retry_after(now) <= 0:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            # 결과를 못 받은 시험 요청(취소 등)이 오래되면 새 시험 요청을 허용
+            if self.state == HALF_OPEN and (
+                not self._probe_in_flight or now - self._probe_started > self.open_max_sec
+            ):
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self._consecutive = 0
+            if self.state != CLOSED:
+                print(f"DEBUG: [circuit] {self.key} closed")
+            self.state = CLOSED
+            self._open_sec = self.base_open_sec
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._consecutive += 1
+            if self.state == HALF_OPEN:
+                # 시험 요청 실패: 더 길게 다시 연다
+                self._open_sec = min(self._open_sec * 2, self.open_max_sec)
+                self._trip()
+            elif self.state == CLOSED and self._consecutive >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.time()
+        self._probe_in_flight = False
+        self.opened += 1
+        print(f"DEBUG: [circuit] {self.key} open for {self._open_sec:.1f}s after {self._consecutive} failures")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._consecutive,
+                "retry_after_sec": round(self.retry_after(), 2) if self.state != CLOSED else 0.0,
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "opened": self.opened,
+            }
+
+
+class RetryBudget:
+    """최근 window 초 동안 재시도 수 ≤ max(요청 수 × ratio, min_per_sec × window). 스레드 안전."""
+
+    def __init__(
+        self,
+        ratio: float = _RETRY_BUDGET_RATIO,
+        min_per_sec: float = _RETRY_BUDGET_MIN_PER_SEC,
+        window_sec: float = _RETRY_BUDGET_WINDOW_SEC,
+    ):
+        self.ratio = float(ratio)
+        self.min_per_sec = float(min_per_sec)
+        self.window_sec = float(window_sec)
+        self._lock = threading.Lock()
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.granted = 0
+        self.denied = 0
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_sec
+        for q in (self._requests, self._retries):
+            while q and q[0] < cutoff:
+                q.popleft()
+
+    def _limit(self) -> float:
+        return max(len(self._requests) * self.ratio, self.min_per_sec * self.window_sec)
+
+    def record_request(self) -> None:
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_retry(self) -> bool:
+        """재시도해도 되면 예산을 1 쓰고 True."""
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            if len(self._retries) >= self._limit():
+                self.denied += 1
+                return False
+            self._retries.append(now)
+            self.granted += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.time())
+            return {
+                "window_sec": self.window_sec,
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "limit": round(self._limit(), 2),
+                "granted": self.granted,
+                "denied": self.denied,
+            }
+
+
+class BreakerRegistry:
+    """키별 브레이커 + 전역 재시도 예산. gunicorn fork 후에는 부모 상태(락 포함)를 버리고 새로 시작한다."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.budget = RetryBudget()
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            self._reset()
+
+    def get(self, key: str) -> CircuitBreaker:
+        self._check_pid()
+        b = self._breakers.get(key)
+        if b is None:
+            with self._lock:
+                b = self._breakers.setdefault(key, CircuitBreaker(key))
+        return b
+
+    def try_retry(self) -> bool:
+        self._check_pid()
+        return self.budget.try_retry()
+
+    def open_circuit(self, op: str) -> Optional[CircuitBreaker]:
+        """op(read/write/call) 작업 중 열려 있는 브레이커 하나 (없으면 None). 반열림은 시험 중이므로 제외."""
+        self._check_pid()
+        for key, b in list(self._breakers.items()):
+            if key.endswith(":" + op) and b.state == OPEN and b.retry_after() > 0:
+                return b
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        self._check_pid()
+        return {
+            "circuits": {k: b.stats() for k, b in sorted(self._breakers.items())},
+            "retry_budget": self.budget.stats(),
+        }
+
+
+def request_key(request: httpx.Request) -> str:
+    """PostgREST 요청 → 브레이커 키. /rest/v1/<table> 는 조회(GET/HEAD)와 쓰기로, /rest/v1/rpc/<fn> 은 함수별로."""
+    parts = [p for p in request.url.path.split("/") if p]
+    if "rpc" in parts and parts.index("rpc") + 1 < len(parts):
+        return f"rpc/{parts[parts.index('rpc') + 1]}:call"
+    target = parts[-1] if parts else "-"
+    return f"{target}:{'read' if request.method in ('GET', 'HEAD') else 'write'}"
+
+
+def _is_failure(response: httpx.Response) -> bool:
+    return response.status_code >= 500 or response.status_code == 429
+
+
+def _outcome(response: httpx.Response) -> str:
+    return f"{response.status_code // 100}xx"
+
+
+class BreakerTransport(httpx.BaseTransport):
+    """httpx 전송 래퍼: 요청 전 브레이커 확인, 결과로 브레이커·재시도 예산·요청 지연 지표 갱신."""
+
+    def __init__(self, inner: httpx.BaseTransport, registry: BreakerRegistry):
+        self._inner = inner
+        self._registry = registry
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        breaker = self._registry.get(key)
+        if not breaker.allow():
+            observe_supabase_request(key, 0.0, "circuit_open")
+            raise CircuitOpenError(key, breaker.retry_after(), request=request)
+        self._registry.budget.record_request()
+        t0 = time.perf_counter()
+        try:
+            response = self._inner.handle_request(request)
+        except Exception:
+            observe_supabase_request(key, time.perf_counter() - t0, "error")
+            breaker.record_failure()
+            raise
+        observe_supabase_request(key, time.perf_counter() - t0, _outcome(response))
+        if _is_failure(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncBreakerTransport(httpx.AsyncBaseTransport):
+    """BreakerTransport 의 비동기 버전."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, registry: BreakerRegistry):
+        self._inner = inner
+        self._registry = registry
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        breaker = self._registry.get(key)
+        if not breaker.allow():
+            observe_supabase_request(key, 0.0, "circuit_open")
+            raise CircuitOpenError(key, breaker.retry_after(), request=request)
+        self._registry.budget.record_request()
+        t0 = time.perf_counter()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except Exception:
+            observe_supabase_request(key, time.perf_counter() - t0, "error")
+            breaker.record_failure()
+            raise
+        observe_supabase_request(key, time.perf_counter() - t0, _outcome(response))
+        if _is_failure(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
@@ -1,56 +1,114 @@
 import os
 import time
-import uuid
-import unicodedata
 from datetime import datetime
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Iterable, Tuple, Optional
 
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 from postgrest.exceptions import APIError
 
 from event_utils import event_at_to_date_prefix_ymd
 from dotenv import load_dotenv
 import threading
 
+from .id_allocator import IdBlockAllocator, block_start_from_rpc
+from .row_state import PersistedRowState
+from .schema_cache import load_schema_profile, save_schema_profile, schema_fingerprint
+from .sqlite_replica import SQLiteReplica
+from .storage import (
+    EVENT_PAGE_MAX,
+    GET_MANY_FIELDS,
+    EventStorage,
+    EventTuple,
+    get_many_fields,
+    trim_event_tuple,
+)
+from .supabase_schema import (
+    SCHEMA_PROFILE_ATTRS,
+    SupabaseSchemaMixin,
+    fill_integer_ids,
+    id_sql_type_from_rows,
+    profile_from_columns,
+)
+from .transport import SupabaseTransport
+from .snapshot_cache import EventSnapshotCache, empty_snapshot, snapshot_to_tuple
+from .write_queue import WriteBehindQueue, WriteOp
+
 load_dotenv()
 
 # 운영자 저장은 응답 지연을 줄이되, 저장 실패는 명확히 실패로 반환
 _BLOCKING_SAVE_ATTEMPTS = 1
-_BLOCKING_SAVE_BASE_DELAY = 0.2
-_BLOCKING_SAVE_MAX_DELAY = 0.8
-
-
-def retry_supabase(func):
-    """Supabase 작업 재시도 데코레이터"""
-
-    def wrapper(*args, **kwargs):
-        max_retries = 3
-        base_delay = 1.0
-        for i in range(max_retries):
-            try:
-                return func(*args, **kwargs)
-            except Exception as e:
-                if i < max_retries - 1:
-                    time.sleep(base_delay * (2 ** i))
-                    continue
-
-                try:
-                    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                    log_file = os.path.join(base_dir, "monitor_debug.log")
-                    with open(log_file, "a", encoding="utf-8") as f:
-                        f.write(
-                            f"[{datetime.now()}] ERROR: [Supabase Sync Failed] {func.__name__}: {str(e)}\n"
-                        )
-                except Exception:
-                    pass
-                print(f"DEBUG: [Supabase Sync Skip] {e}")
-                return None
-
-    return wrapper
-
 
-class CommentDatabase:
-    """Supabase 전용 저장소. 로컬 SQLite는 사용하지 않습니다. SUPABASE_URL / SUPABASE_KEY 필수."""
+# 백그라운드 쓰기 큐: 재시도 횟수 / 백오프 / 전체 대기 한도(넘으면 제출 측이 잠시 대기)
+_WRITE_QUEUE_MAX_ATTEMPTS = int(os.getenv("SUPABASE_WRITE_MAX_ATTEMPTS", "3"))
+_WRITE_QUEUE_BASE_DELAY = 1.0
+_WRITE_QUEUE_MAX_DELAY = 4.0
+_WRITE_QUEUE_MAX_PENDING = int(os.getenv("SUPABASE_WRITE_QUEUE_MAX", "200"))
+_WRITE_QUEUE_PUT_TIMEOUT_SEC = 5.0
+# 활성 이벤트 전환은 이벤트와 무관한 전역 쓰기라 별도 키로 직렬화한다.
+_ACTIVE_WRITE_KEY = "__active__"
+
+# 자식 행 기준선(마지막 반영 상태) 유지 시간. 지나면 저장 직전에 원격 행을 다시 읽는다.
+_ROW_STATE_TTL_SEC = float(os.getenv("SUPABASE_ROW_STATE_TTL_SEC", "60"))
+# author IN (...) 삭제 1회당 작성자 수 (URL 길이 제한 고려)
+_DELETE_CHUNK = 100
+
+# 정수 id 스키마: reserve_id_block RPC 로 한 번에 예약하는 id 개수
+_ID_BLOCK_SIZE = int(os.getenv("SUPABASE_ID_BLOCK_SIZE", "500"))
+
+# get_data 스냅샷 캐시 유지 시간(초). 로컬 쓰기는 즉시 반영되므로 외부(대시보드·스크립트) 변경 반영 지연만 좌우한다.
+_SNAPSHOT_CACHE_TTL_SEC = float(os.getenv("SUPABASE_SNAPSHOT_TTL_SEC", "5"))
+
+# 이벤트 조회 방식: auto(get_event_snapshot RPC 우선, 미배포 시 순차 조회) | sequential
+_EVENT_FETCH_MODE = os.getenv("SUPABASE_EVENT_FETCH_MODE", "auto").strip().lower()
+
+# 스키마 감지 결과 캐시 파일. 빈 문자열이면 캐시를 쓰지 않고 매 기동 시 프로브한다.
+_SCHEMA_CACHE_PATH = os.getenv(
+    "SUPABASE_SCHEMA_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".schema_cache.json"),
+)
+_SCHEMA_CACHE_TTL_SEC = float(os.getenv("SUPABASE_SCHEMA_CACHE_TTL_SEC", "86400"))
+
+# 로컬 SQLite 읽기 복제본 파일. 비우면(기본) 사용하지 않고 모든 조회가 Supabase 로 간다.
+_REPLICA_PATH = os.getenv("SUPABASE_REPLICA_PATH", "").strip()
+# 복제본 갱신 주기(초): posts.updated_at 커서 이후 변경분 + 활성 이벤트 확인
+_REPLICA_PULL_SEC = float(os.getenv("SUPABASE_REPLICA_PULL_SEC", "5"))
+# 원격 posts 키 목록과 비교해 지워진(삭제·보관) 이벤트를 복제본에서도 지우는 주기(초)
+_REPLICA_RECONCILE_SEC = float(os.getenv("SUPABASE_REPLICA_RECONCILE_SEC", "300"))
+# 하이드레이션/변경분 조회 1회당 행 수 (PostgREST 기본 max-rows)
+_REPLICA_PAGE = 1000
+# get_many: in 필터 한 번에 넣는 이벤트 수 (요청 URL 길이 제한)
+_IN_CHUNK = int(os.getenv("SUPABASE_IN_CHUNK", "100"))
+
+def _filter_value(value: Any) -> str:
+    """PostgREST or=(...) 안의 값: 큰따옴표로 감싸 쉼표·괄호·점이 섞인 키도 그대로 비교되게 한다."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+_DEBUG_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "monitor_debug.log")
+_debug_log_lock = threading.Lock()
+_debug_log_file = None
+_debug_log_pid: Optional[int] = None
+
+
+def _append_debug_log(line: str) -> None:
+    """monitor_debug.log 에 한 줄 추가. 파일은 프로세스당 한 번만 연다 (장애 때 실패마다 open/close 하지 않음)."""
+    global _debug_log_file, _debug_log_pid
+    try:
+        with _debug_log_lock:
+            if _debug_log_file is None or _debug_log_pid != os.getpid():
+                # fork 후에는 부모의 파일 객체(버퍼 포함)를 쓰지 않고 새로 연다.
+                _debug_log_file = open(_DEBUG_LOG_PATH, "a", encoding="utf-8")
+                _debug_log_pid = os.getpid()
+            _debug_log_file.write(f"[{datetime.now()}] ERROR: {line}\n")
+            _debug_log_file.flush()
+    except Exception:
+        pass
+
+
+class CommentDatabase(SupabaseSchemaMixin, EventStorage):
+    """Supabase 저장소 (EventStorage 운영 구현). SUPABASE_URL / SUPABASE_KEY 필수."""
+
+    backend = "supabase"
 
     def __init__(self, db_path: str = None):
         # db_path: 과거 시그니처 호환용, 무시됩니다.
@@ -65,55 +123,110 @@ class CommentDatabase:
                 "Local SQLite fallback has been removed."
             )
 
+        # 읽기/쓰기 풀을 나눈 HTTP 전송 계층 (keep-alive, 역할별 타임아웃, keep-warm, 연결 지표)
+        self._transport = SupabaseTransport()
+        self._tls = threading.local()
+        self._clients_pid: Optional[int] = None
+        self._read_client: Optional[Client] = None
+        self._write_client: Optional[Client] = None
         try:
-            self.supabase: Client = create_client(
-                self.supabase_url.strip("'\""), self.supabase_key.strip("'\"")
-            )
+            self._build_clients()
         except Exception as e:
             raise RuntimeError(f"Supabase client initialization failed: {e}") from e
 
         print(f"DEBUG: [Supabase] Storage: {self.supabase_url}")
-        self._post_key_col = "id"
-        self._participant_fk_col = "event_id"
-        self._commenter_fk_col = "event_id"
-        self._post_has_id_col = False
-        self._post_has_url_col = False
-        self._post_has_is_active_col = False
-        self._post_opt_cols: List[str] = []
-        self._participant_has_id_col = False
-        self._commenter_has_id_col = False
-        self._participant_has_created_at_col = False
-        self._commenter_has_created_at_col = False
-        self._participant_id_sql_type = "int"
-        self._commenter_id_sql_type = "int"
-        self._detect_schema_columns()
+        self._init_schema_defaults()
+        self._snapshots = EventSnapshotCache(_SNAPSHOT_CACHE_TTL_SEC)
+        self._last_active_event_id: Optional[str] = None
+        self._row_state = PersistedRowState(_ROW_STATE_TTL_SEC)
+        self._id_alloc = IdBlockAllocator(_ID_BLOCK_SIZE)
+        # 모든 쓰기(save/delete/clear/active)는 단일 워커 큐를 거친다 → 이벤트별 순서 보장 + 연속 저장 병합
+        self._writes = WriteBehindQueue(
+            self._apply_write,
+            merge={"save": self._merge_save_payload, "active": lambda _old, new: new},
+            on_done=self._on_write_done,
+            max_pending=_WRITE_QUEUE_MAX_PENDING,
+            max_attempts=_WRITE_QUEUE_MAX_ATTEMPTS,
+            base_delay=_WRITE_QUEUE_BASE_DELAY,
+            max_delay=_WRITE_QUEUE_MAX_DELAY,
+            put_timeout_sec=_WRITE_QUEUE_PUT_TIMEOUT_SEC,
+            name="supabase-writes",
+            retry_budget=self._transport.breakers,
+        )
+        # get_event_snapshot RPC 배포 여부 (None: 아직 모름)
+        self._event_rpc_available: Optional[bool] = None
+        self._confirm_rpc_available: Optional[bool] = None
+        # list_events_page RPC 배포 여부 (None: 아직 모름)
+        self._event_list_rpc_available: Optional[bool] = None
+        self._load_schema()
+        # 로컬 SQLite 읽기 복제본 (선택)
+        self._replica: Optional[SQLiteReplica] = None
+        self._replica_hydrated = False
+        self._replica_thread: Optional[threading.Thread] = None
+        self._replica_pid: Optional[int] = None
+        self._replica_lock = threading.Lock()
+        self._replica_reconciled_at = 0.0
+        if _REPLICA_PATH:
+            self._init_replica(_REPLICA_PATH)
+
+    # ----- Supabase 클라이언트 (읽기/쓰기 분리) -----
+    def _build_clients(self) -> None:
+        url = self.supabase_url.strip("'\"")
+        key = self.supabase_key.strip("'\"")
+        self._read_client = create_client(
+            url, key, options=ClientOptions(httpx_client=self._transport.http_client("read"))
+        )
+        self._write_client = create_client(
+            url, key, options=ClientOptions(httpx_client=self._transport.http_client("write"))
+        )
+        self._clients_pid = os.getpid()
 
-    @staticmethod
-    def _norm_author_key(name: Any) -> str:
-        return unicodedata.normalize("NFC", str(name).strip())
+    @property
+    def supabase(self) -> Client:
+        """쓰기 큐 워커에서는 쓰기 풀(긴 타임아웃), 그 외에는 읽기 풀 클라이언트. fork 된 프로세스에서는 새로 만든다."""
+        if self._clients_pid != os.getpid():
+            self._build_clients()
+        if getattr(self._tls, "writing", False):
+            return self._write_client
+        return self._read_client
+
+    def _keepwarm_ping(self, role: str) -> None:
+        client = self._write_client if role == "write" else self._read_client
+        client.table("posts").select(self._post_key_col).limit(1).execute()
+
+    def transport_stats(self) -> Dict[str, Any]:
+        return self._transport.stats()
 
     def _infer_child_id_sql_type(self, table: str) -> str:
-        """id 컬럼 실제 타입 추정. 정수 PK면 신규 행에 UUID를 넣으면 안 됨(22P02)."""
         try:
             r = self.supabase.table(table).select("id").limit(1).execute()
-            row = (r.data or [None])[0]
-            if not row:
-                return "int"
-            v = row.get("id")
-            if isinstance(v, int) and not isinstance(v, bool):
-                return "int"
-            if isinstance(v, str) and len(v) == 36 and v.count("-") == 4:
-                return "uuid"
-            if v is not None:
-                return "uuid"
+            return id_sql_type_from_rows(r.data or [])
         except Exception as e:
             print(f"DEBUG: [infer id type {table}] {e}")
         return "int"
 
+    def _reserve_id_block(self, table: str, size: int) -> int:
+        res = self.supabase.rpc("reserve_id_block", {"p_table": table, "p_count": size}).execute()
+        return block_start_from_rpc(res.data)
+
     def _assign_missing_integer_ids(self, table: str, batch: List[Dict[str, Any]]) -> None:
-        """정수 id + DB default 없음: NOT NULL(23502) 방지를 위해 테이블 전역 max(id) 뒤로 순번 부여."""
+        """
+        정수 id + DB default 없음: NOT NULL(23502) 방지를 위해 id 를 채운다.
+        reserve_id_block RPC 가 있으면 예약 블록에서(보통 왕복 0회), 없으면 테이블 전역 max(id) 뒤로 순번 부여.
+        """
         if not batch:
             return
+        if self._id_alloc.enabled:
+            missing = [r for r in batch if r.get("id") is None]
+            try:
+                for row, rid in zip(missing, self._id_alloc.allocate(table, len(missing), self._reserve_id_block)):
+                    row["id"] = rid
+                return
+            except Exception as e:
+                if not self._is_missing_function_error(e):
+                    raise
+                print("DEBUG: [id allocator] reserve_id_block RPC not deployed; using max(id) scan")
+                self._id_alloc.enabled = False
         cur = 0
         try:
             r = (
@@ -127,25 +240,7 @@ class CommentDatabase:
                 cur = int(r.data[0]["id"])
         except Exception as e:
             print(f"DEBUG: [max id {table}] {e}")
-        used: set = set()
-        for row in batch:
-            rid = row.get("id")
-            if rid is None:
-                continue
-            try:
-                iv = int(rid)
-                cur = max(cur, iv)
-                used.add(iv)
-            except (TypeError, ValueError):
-                pass
-        for row in batch:
-            if row.get("id") is not None:
-                continue
-            cur += 1
-            while cur in used:
-                cur += 1
-            row["id"] = cur
-            used.add(cur)
+        fill_integer_ids(batch, cur)
 
     def _column_exists(self, table: str, column: str) -> bool:
         try:
@@ -159,65 +254,42 @@ class CommentDatabase:
         except Exception:
             return False
 
+    def _probe_schema_profile(self) -> Dict[str, Any]:
+        """컬럼 유무·id 타입을 Supabase에 직접 물어본다. (self 상태는 바꾸지 않음)"""
+        return profile_from_columns(self._column_exists, self._infer_child_id_sql_type)
+
     def _detect_schema_columns(self) -> None:
-        # posts: id(신규) 또는 url(레거시)
-        self._post_has_id_col = self._column_exists("posts", "id")
-        self._post_has_url_col = self._column_exists("posts", "url")
-        if not self._post_has_id_col and self._post_has_url_col:
-            self._post_key_col = "url"
-        self._post_has_is_active_col = self._column_exists("posts", "is_active")
-        self._post_opt_cols = [
-            c
-            for c in ["event_at", "title", "updated_at", "prizes", "winners", "is_active", "memo", "allow_duplicates"]
-            if self._column_exists("posts", c)
-        ]
-        # participants/commenters: event_id(신규) 또는 url(레거시)
-        if not self._column_exists("participants", "event_id") and self._column_exists("participants", "url"):
-            self._participant_fk_col = "url"
-        if not self._column_exists("commenters", "event_id") and self._column_exists("commenters", "url"):
-            self._commenter_fk_col = "url"
-        self._participant_has_id_col = self._column_exists("participants", "id")
-        self._commenter_has_id_col = self._column_exists("commenters", "id")
-        self._participant_has_created_at_col = self._column_exists("participants", "created_at")
-        self._commenter_has_created_at_col = self._column_exists("commenters", "created_at")
-        if self._participant_has_id_col:
-            self._participant_id_sql_type = self._infer_child_id_sql_type("participants")
-        if self._commenter_has_id_col:
-            self._commenter_id_sql_type = self._infer_child_id_sql_type("commenters")
-        print(
-            "DEBUG: [Supabase schema] "
-            f"posts.{self._post_key_col}, "
-            f"participants.{self._participant_fk_col}, "
-            f"commenters.{self._commenter_fk_col}, "
-            f"posts_cols={self._post_opt_cols}, "
-            f"participant_row_id={self._participant_has_id_col}, "
-            f"commenter_row_id={self._commenter_has_id_col}, "
-            f"participant_id_type={self._participant_id_sql_type}, "
-            f"commenter_id_type={self._commenter_id_sql_type}"
-        )
+        self._apply_schema_profile(self._probe_schema_profile())
+        self._print_schema("probe")
 
-    def _post_select_cols(self, extra: Optional[List[str]] = None) -> str:
-        cols: List[str] = []
-        if self._post_has_id_col:
-            cols.append("id")
-        if self._post_has_url_col:
-            cols.append("url")
-        if not cols:
-            cols.append(self._post_key_col)
-        if extra:
-            cols.extend(extra)
-        return ",".join(cols)
+    def _load_schema(self) -> None:
+        """
+        로컬 스키마 캐시가 유효하면 즉시 적용(프로브 0회)하고 백그라운드에서 재검증한다.
+        없거나 만료/지문 불일치면 기존처럼 동기 프로브 후 캐시에 저장한다.
+        """
+        fingerprint = schema_fingerprint(self.supabase_url)
+        cached = load_schema_profile(_SCHEMA_CACHE_PATH, fingerprint, _SCHEMA_CACHE_TTL_SEC)
+        if cached and all(a in cached for a in SCHEMA_PROFILE_ATTRS):
+            self._apply_schema_profile(cached)
+            self._print_schema("cache")
+            threading.Thread(
+                target=self._revalidate_schema, args=(fingerprint,), daemon=True
+            ).start()
+            return
+        self._detect_schema_columns()
+        save_schema_profile(_SCHEMA_CACHE_PATH, fingerprint, self._schema_profile())
 
-    @staticmethod
-    def _is_on_conflict_constraint_error(err: Exception) -> bool:
-        msg = str(err).lower()
-        return (
-            "42p10" in msg
-            or (
-                "on conflict" in msg
-                and ("no unique" in msg or "no unique or exclusion constraint" in msg)
-            )
-        )
+    def _revalidate_schema(self, fingerprint: str) -> None:
+        try:
+            fresh = self._probe_schema_profile()
+        except Exception as e:
+            print(f"DEBUG: [schema revalidate] {e}")
+            return
+        if fresh != self._schema_profile():
+            self._apply_schema_profile(fresh)
+            self._snapshots.invalidate()
+            self._print_schema("revalidated")
+        save_schema_profile(_SCHEMA_CACHE_PATH, fingerprint, fresh)
 
     def _save_post_row_resilient(self, event_id: str, post_data: Dict[str, Any]) -> None:
         """ON CONFLICT 제약이 없어도 posts 저장이 실패하지 않도록 폴백."""
@@ -277,51 +349,344 @@ class CommentDatabase:
                     except Exception:
                         pass
 
-    def _row_event_key(self, row: Dict[str, Any]) -> Optional[str]:
-        if not isinstance(row, dict):
+    # ----- 로컬 SQLite 읽기 복제본 -----
+    def _init_replica(self, path: str) -> None:
+        try:
+            self._replica = SQLiteReplica(path)
+        except Exception as e:
+            print(f"DEBUG: [replica] open failed ({path}): {e}")
+            return
+        # 이전 기동에서 채운 사본이 있으면 Supabase 장애 중에도 바로 읽을 수 있다.
+        self._replica_hydrated = self._replica.is_hydrated()
+        try:
+            self._hydrate_replica()
+        except Exception as e:
+            state = "serving previous local copy" if self._replica_hydrated else "reads go to Supabase"
+            print(f"DEBUG: [replica] hydrate failed ({state}): {e}")
+
+    def _select_all_rows(
+        self,
+        table: str,
+        order_col: Optional[str],
+        in_col: Optional[str] = None,
+        in_values: Optional[List[str]] = None,
+        cols: str = "*",
+    ) -> List[Dict[str, Any]]:
+        """_REPLICA_PAGE 행씩 끝까지 읽는다. in_col 을 주면 in_col IN (in_values) 행만."""
+        out: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            q = self.supabase.table(table).select(cols)
+            if in_col:
+                q = q.in_(in_col, in_values or [])
+            if order_col:
+                q = q.order(order_col)
+            rows = q.range(start, start + _REPLICA_PAGE - 1).execute().data or []
+            out.extend(rows)
+            if len(rows) < _REPLICA_PAGE:
+                return out
+            start += _REPLICA_PAGE
+
+    def _select_in(self, table: str, col: str, values: List[str], order_col: Optional[str]) -> List[Dict[str, Any]]:
+        """col IN (values) 전체 행. 값은 _IN_CHUNK 개씩 나눠 보낸다."""
+        out: List[Dict[str, Any]] = []
+        for i in range(0, len(values), _IN_CHUNK):
+            out.extend(self._select_all_rows(table, order_col, col, values[i : i + _IN_CHUNK]))
+        return out
+
+    def _fetch_children_many(
+        self, event_ids: List[str], wanted
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+        """여러 이벤트의 participants / commenters 행 → (event_id → 행 목록) 2개."""
+        out: List[Dict[str, List[Dict[str, Any]]]] = []
+        for table, fk, order_col in self._child_tables_many(wanted, event_ids):
+            out.append(self._group_child_rows(self._select_in(table, fk, event_ids, order_col), fk) if table else {})
+        return out[0], out[1]
+
+    def _fetch_posts_many(self, event_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """요청한 event_id → 대표 posts 행. id/url 혼재 스키마면 못 찾은 키만 대체 컬럼으로 한 번 더."""
+        key_rows = self._select_in("posts", self._post_key_col, event_ids, self._post_key_col)
+        posts = self._pick_posts_many(event_ids, key_rows)
+        missing = [ek for ek in event_ids if ek not in posts]
+        alt_col = self._post_alt_key_col()
+        if missing and alt_col:
+            posts.update(self._pick_posts_many(missing, self._select_in("posts", alt_col, missing, alt_col), alt_col))
+        return posts
+
+    @staticmethod
+    def _max_updated_at(rows) -> Optional[str]:
+        """커서 후보. event_at 컬럼이 없는 스키마는 updated_at 에 행사 시각(미래)을 넣으므로 현재 시각 이후 값은 제외."""
+        now_iso = datetime.now().isoformat()
+        vals = [str(r.get("updated_at")) for r in rows if r.get("updated_at") is not None]
+        vals = [v for v in vals if v <= now_iso]
+        return max(vals) if vals else None
+
+    def _hydrate_replica(self) -> None:
+        """기동 시 posts/participants/commenters 전체를 내려받아 로컬 사본을 교체한다."""
+        t0 = time.perf_counter()
+        posts = self._group_post_rows(self._select_all_rows("posts", self._post_key_col))
+        children: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for table, fk, has_id in (
+            ("participants", self._participant_fk_col, self._participant_has_id_col),
+            ("commenters", self._commenter_fk_col, self._commenter_has_id_col),
+        ):
+            children[table] = self._group_child_rows(self._select_all_rows(table, "id" if has_id else None), fk)
+        self._replica.hydrate(
+            posts, children["participants"], children["commenters"], self._max_updated_at(posts.values())
+        )
+        # 전체 적재라 커서의 키 부분은 없다 (첫 pull 은 커서 시각과 같은 행부터 다시 읽는다)
+        self._replica.set_meta("cursor_id", None)
+        self._replica_reconciled_at = time.time()
+        self._replica_hydrated = True
+        print(
+            f"DEBUG: [replica] hydrated {len(posts)} events "
+            f"({sum(len(v) for v in children['participants'].values())} participants, "
+            f"{sum(len(v) for v in children['commenters'].values())} commenters) "
+            f"in {time.perf_counter() - t0:.2f}s"
+        )
+
+    def _replica_ready(self) -> bool:
+        """복제본에서 읽어도 되는지. 갱신 스레드는 첫 조회에서 띄운다 (fork 된 워커 포함)."""
+        if self._replica is None:
+            return False
+        if self._replica_pid != os.getpid() or not (self._replica_thread and self._replica_thread.is_alive()):
+            with self._replica_lock:
+                if self._replica_pid != os.getpid() or not (
+                    self._replica_thread and self._replica_thread.is_alive()
+                ):
+                    self._replica_pid = os.getpid()
+                    self._replica_thread = threading.Thread(
+                        target=self._replica_pull_loop, name="replica-pull", daemon=True
+                    )
+                    self._replica_thread.start()
+        return self._replica_hydrated
+
+    def _replica_apply(self, fn) -> None:
+        """원격 쓰기 성공 후 같은 변경을 복제본에 반영. 실패해도 원격 쓰기 결과에는 영향 없음."""
+        if self._replica is None:
+            return
+        try:
+            fn(self._replica)
+        except Exception as e:
+            print(f"DEBUG: [replica] local apply failed: {e}")
+
+    def _replica_pull_loop(self) -> None:
+        while True:
+            time.sleep(_REPLICA_PULL_SEC)
+            try:
+                if self._replica_hydrated:
+                    self._replica_pull_once()
+                else:
+                    self._hydrate_replica()
+            except Exception as e:
+                print(f"DEBUG: [replica] pull failed (serving local copy): {e}")
+
+    def _replica_pull_once(self) -> None:
+        """
+        posts 를 (updated_at, 키) 커서 이후부터 현재 시각까지 키셋 페이지로 읽어 바뀐 이벤트를 통째로 다시 읽고, 활성 이벤트를 맞춘다.
+        updated_at 이 현재 시각 이후인 행(event_at 없는 스키마의 행사 시각)은 그 시각이 지날 때까지 건너뛴다.
+        _REPLICA_RECONCILE_SEC 마다 원격 키 목록과 비교해 지워진 이벤트는 지우고 빠진 이벤트는 채운다
+        (updated_at 커서로는 삭제와 미래 시각 행이 보이지 않음).
+        """
+        rep = self._replica
+        if "updated_at" in self._post_opt_cols:
+            until = datetime.now().isoformat()
+            while True:
+                page = self._replica_changed_page(rep.get_meta("cursor"), rep.get_meta("cursor_id"), until)
+                self._replica_store_changed(page)
+                if page:
+                    last = page[-1]
+                    last_key = last.get(self._post_key_col)
+                    rep.set_meta("cursor", str(last["updated_at"]))
+                    rep.set_meta("cursor_id", None if last_key is None else str(last_key))
+                if len(page) < _REPLICA_PAGE:
+                    break
+        if self._post_has_is_active_col:
+            res = self.supabase.table("posts").select(self._post_select_cols()).eq("is_active", True).limit(1).execute()
+            active = self._row_event_key(res.data[0]) if res.data else None
+            active = str(active) if active else None
+            if active and rep.event_rows(active, include_commenters=False) is None:
+                # 커서에 아직 안 잡힌 행(미래 시각 updated_at)이 활성화된 경우
+                self._replica_store_changed(list(self._fetch_posts_many([active]).values()))
+            if active != rep.active_event_id():
+                rep.set_active(active)
+        if time.time() - self._replica_reconciled_at >= _REPLICA_RECONCILE_SEC:
+            self._reconcile_replica()
+        rep.set_meta("last_pull_at", datetime.now().isoformat())
+
+    def _replica_changed_page(
+        self, cursor: Optional[str], cursor_id: Optional[str], until: str
+    ) -> List[Dict[str, Any]]:
+        """(updated_at, 키) > (cursor, cursor_id) 이고 updated_at <= until 인 posts 행 한 페이지 (커서 순)."""
+        key = self._post_key_col
+        q = self.supabase.table("posts").select("*").lte("updated_at", until)
+        if cursor and cursor_id is not None:
+            c, cid = _filter_value(cursor), _filter_value(cursor_id)
+            q = q.or_(f"updated_at.gt.{c},and(updated_at.eq.{c},{key}.gt.{cid})")
+        elif cursor:
+            q = q.gte("updated_at", cursor)
+        return q.order("updated_at").order(key).limit(_REPLICA_PAGE).execute().data or []
+
+    def _replica_store_changed(self, rows: List[Dict[str, Any]]) -> None:
+        rep = self._replica
+        changed_posts = self._group_post_rows(rows)
+        if not changed_posts:
+            return
+        tokens = {event_id: rep.version(event_id) for event_id in changed_posts}
+        # 바뀐 이벤트들의 자식 행은 in 필터로 한꺼번에 읽는다 (이벤트마다 조회하지 않음)
+        p_by_event, c_by_event = self._fetch_children_many(list(changed_posts), GET_MANY_FIELDS)
+        for event_id, post in changed_posts.items():
+            p_rows = p_by_event.get(event_id, [])
+            c_rows = c_by_event.get(event_id, [])
+            if rep.store_event(event_id, post, p_rows, c_rows, tokens[event_id]):
+                # 다른 프로세스의 변경일 수 있으므로 메모리 스냅샷도 버린다 (로컬 쓰기 대기 중이면 유지).
+                if not self._snapshots.has_pending_write(event_id):
+                    self._snapshots.invalidate(event_id)
+
+    def _reconcile_replica(self) -> None:
+        """
+        원격 posts 에 없는 로컬 이벤트(다른 프로세스가 지우거나 보관한 이벤트)를 복제본에서 지우고,
+        로컬에 없는 원격 이벤트(커서 뒤의 미래 시각 행 등)는 읽어 채운다.
+        """
+        rep = self._replica
+        # 원격 목록을 읽는 동안 로컬에서 새로 쓴 이벤트는 지우지 않도록 버전을 먼저 잡아 둔다
+        tokens = {event_id: rep.version(event_id) for event_id in rep.event_ids()}
+        rows = self._select_all_rows("posts", self._post_key_col, cols=self._post_select_cols())
+        remote = {str(k) for k in (self._row_event_key(r) for r in rows) if k}
+        dropped = [ek for ek, token in tokens.items() if ek not in remote and rep.clear_event(ek, token)]
+        for event_id in dropped:
+            if not self._snapshots.has_pending_write(event_id):
+                self._snapshots.invalidate(event_id)
+        missing = sorted(remote - set(tokens))
+        if missing:
+            self._replica_store_changed(list(self._fetch_posts_many(missing).values()))
+        self._replica_reconciled_at = time.time()
+        if dropped or missing:
+            print(
+                f"DEBUG: [replica] reconcile: dropped {len(dropped)} events missing remotely {dropped[:5]}, "
+                f"added {len(missing)} {missing[:5]}"
+            )
+
+    def replica_stats(self) -> Optional[Dict[str, Any]]:
+        if self._replica is None:
             return None
-        rid = row.get("id")
-        rurl = row.get("url")
-        rk = row.get(self._post_key_col)
-        return rid or rurl or rk
+        out = self._replica.stats()
+        out["ready"] = self._replica_hydrated
+        out["puller_alive"] = bool(self._replica_thread and self._replica_thread.is_alive())
+        return out
+
+    # ----- 스냅샷 캐시 (get_data 앞단) -----
+    def _enqueue_write(
+        self, kind: str, event_id: str, payload: Any, wait: bool = False
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        쓰기 큐에 넣는다. 스냅샷 캐시에는 호출부가 이미 반영해 둔 상태이며,
+        반영이 끝날 때까지 캐시 값을 유지하고 최종 실패하면 해당 이벤트 캐시를 버린다.
+        """
+        if wait:
+            # 쓰기 브레이커가 열려 있으면 큐에서 기다리지 않고 바로 실패를 돌려준다 (운영자 화면이 타임아웃까지 멈추지 않게).
+            # 호출부가 캐시에 미리 반영해 둔 값은 저장되지 않았으므로 버린다.
+            breaker = self._transport.breakers.open_circuit("write")
+            if breaker is not None:
+                self._snapshots.invalidate(event_id)
+                return False, f"circuit open: {breaker.key} (retry in {breaker.retry_after():.1f}s)"
+        self._snapshots.begin_write(event_id)
+        self._transport.start_keepwarm(self._keepwarm_ping)
+        return self._writes.submit(
+            kind,
+            event_id,
+            payload,
+            wait=wait,
+            max_attempts=_BLOCKING_SAVE_ATTEMPTS if wait else None,
+        )
+
+    def _apply_write(self, kind: str, key: str, payload: Any) -> None:
+        """쓰기 큐 워커에서 실행. 예외는 큐가 재시도/실패 처리한다."""
+        self._tls.writing = True
+        try:
+            if kind == "save":
+                self._sync_save_supabase_core(**payload)
+            elif kind == "delete_participant":
+                self._sync_delete_p_supabase_core(key, payload)
+            elif kind == "clear":
+                self._sync_clear_supabase_core(key)
+            elif kind == "active":
+                self._sync_active_event_supabase_core(payload)
+            elif kind == "winner_add":
+                self._sync_winner_add_core(key, payload)
+            elif kind == "winner_delete":
+                self._sync_winner_delete_core(key, payload)
+            elif kind == "winner_import":
+                self._sync_winner_import_core(key, payload)
+            elif kind == "confirm_winner":
+                self._sync_confirm_winner_core(key, payload)
+            else:
+                raise ValueError(f"unknown write kind: {kind}")
+        finally:
+            self._tls.writing = False
+
+    def _on_write_done(self, op: WriteOp) -> None:
+        for _ in range(op.submissions):
+            self._snapshots.end_write(op.key, op.ok)
+        if not op.ok and not op.waiters:
+            # 대기 중인 호출자가 있는 op(blocking)는 호출부가 직접 기록한다.
+            _append_debug_log(f"[Supabase Sync Failed] {op.kind} {op.key}: {op.error}")
+            print(f"DEBUG: [Supabase Sync Skip] {op.kind} {op.key}: {op.error}")
+
+    @staticmethod
+    def _merge_save_payload(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        """같은 이벤트의 연속 save 를 하나로 합친다. 나중 값(None 제외)이 이긴다. (participants_dict 는 전체 집합이므로 통째로 교체)"""
+        merged = dict(old)
+        for k, v in new.items():
+            if v is None:
+                continue
+            if k == "participants_dict" and not v:
+                # 빈 dict 는 '참가자 변경 없음' 이므로 앞선 저장의 참가자를 유지
+                continue
+            if k == "all_commenters" and old.get(k):
+                merged[k] = list(old[k]) + list(v)
+            else:
+                merged[k] = v
+        return merged
+
+    def write_queue_stats(self) -> Dict[str, Any]:
+        out = self._writes.stats()
+        out["id_allocator"] = self._id_alloc.stats()
+        return out
+
+    def flush_writes(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 백그라운드 쓰기가 모두 반영될 때까지 기다린다."""
+        return self._writes.flush(timeout)
+
+    def invalidate_snapshot(self, event_id: Optional[str] = None) -> None:
+        """외부 변경(실시간 구독·관리 스크립트 등)을 알게 됐을 때 캐시를 버린다. None이면 전체."""
+        self._snapshots.invalidate(event_id)
+        self._row_state.invalidate(event_id)
+
+    def snapshot_cache_stats(self) -> Dict[str, Any]:
+        out = self._snapshots.stats()
+        out["row_state"] = self._row_state.stats()
+        return out
 
     def clear_data(self, event_id: str):
-        threading.Thread(target=self._sync_clear_supabase, args=(event_id,), daemon=True).start()
+        self._snapshots.apply_clear(event_id)
+        self._enqueue_write("clear", event_id, None)
 
     def _sync_clear_supabase_core(self, event_id):
         self.supabase.table("participants").delete().eq(self._participant_fk_col, event_id).execute()
         self.supabase.table("commenters").delete().eq(self._commenter_fk_col, event_id).execute()
         self.supabase.table("posts").delete().eq(self._post_key_col, event_id).execute()
-
-    @retry_supabase
-    def _sync_clear_supabase(self, event_id):
-        self._sync_clear_supabase_core(event_id)
-        return True
+        self._row_state.reset(event_id)
+        self._replica_apply(lambda r: r.clear_event(event_id))
 
     def clear_data_blocking(self, event_id: str) -> Tuple[bool, Optional[str]]:
-        last_err: Optional[str] = None
-        for attempt in range(_BLOCKING_SAVE_ATTEMPTS):
-            try:
-                self._sync_clear_supabase_core(event_id)
-                return True, None
-            except Exception as e:
-                last_err = str(e)
-                if attempt < _BLOCKING_SAVE_ATTEMPTS - 1:
-                    delay = min(
-                        _BLOCKING_SAVE_BASE_DELAY * (2**attempt),
-                        _BLOCKING_SAVE_MAX_DELAY,
-                    )
-                    time.sleep(delay)
-        try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            log_file = os.path.join(base_dir, "monitor_debug.log")
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(
-                    f"[{datetime.now()}] ERROR: [Blocking clear failed after "
-                    f"{_BLOCKING_SAVE_ATTEMPTS} tries] clear_data_blocking: {last_err}\n"
-                )
-        except Exception:
-            pass
+        self._snapshots.apply_clear(event_id)
+        ok, last_err = self._enqueue_write("clear", event_id, None, wait=True)
+        if ok:
+            return True, None
+        _append_debug_log(
+            f"[Blocking clear failed after {_BLOCKING_SAVE_ATTEMPTS} tries] clear_data_blocking: {last_err}"
+        )
         print(f"DEBUG: [clear_data_blocking] failed: {last_err}")
         return False, last_err
 
@@ -339,23 +704,21 @@ class CommentDatabase:
         allowed_list=None,
         event_at=None,
     ):
-        threading.Thread(
-            target=self._sync_save_supabase,
-            args=(
-                event_id,
-                participants_dict,
-                last_comment_id,
-                all_commenters,
-                title,
-                prizes,
-                memo,
-                winners,
-                allow_duplicates,
-                allowed_list,
-                event_at,
-            ),
-            daemon=True,
-        ).start()
+        payload = self._save_payload(
+            event_id,
+            participants_dict,
+            last_comment_id,
+            all_commenters,
+            title,
+            prizes,
+            memo,
+            winners,
+            allow_duplicates,
+            allowed_list,
+            event_at,
+        )
+        self._snapshot_apply_save(**{k: v for k, v in payload.items() if k != "is_active"})
+        self._enqueue_write("save", event_id, payload)
 
     def _sync_save_supabase_core(
         self,
@@ -372,161 +735,135 @@ class CommentDatabase:
         event_at,
         is_active: Optional[bool] = None,
     ):
-        post_data = {self._post_key_col: event_id, "updated_at": datetime.now().isoformat()}
-        if self._post_has_id_col:
-            post_data["id"] = event_id
-        if self._post_has_url_col:
-            post_data["url"] = event_id
-        if is_active is not None and self._post_has_is_active_col:
-            post_data["is_active"] = is_active
-        if title is not None:
-            post_data["title"] = title
-        if prizes is not None:
-            post_data["prizes"] = prizes
-        if memo is not None:
-            post_data["memo"] = memo
-        if winners is not None:
-            post_data["winners"] = winners
-        if allowed_list is not None:
-            post_data["allowed_list"] = allowed_list
-        if allow_duplicates is not None:
-            post_data["allow_duplicates"] = allow_duplicates
-        if last_comment_id is not None:
-            post_data["last_comment_id"] = last_comment_id
-        # event_at 저장 정책
-        # 1) event_at 컬럼이 있으면 정상 저장
-        # 2) 컬럼이 없으면 updated_at에 대체 저장하여 운영자가 수정한 행사 시간이 유지되게 함
-        if event_at is not None:
-            if "event_at" in self._post_opt_cols:
-                post_data["event_at"] = event_at
-            elif "updated_at" in self._post_opt_cols:
-                post_data["updated_at"] = event_at
-
+        post_data = self._build_post_data(
+            event_id,
+            last_comment_id,
+            title,
+            prizes,
+            memo,
+            winners,
+            allow_duplicates,
+            allowed_list,
+            event_at,
+            is_active,
+        )
         self._save_post_row_resilient(event_id, post_data)
 
         if participants_dict:
-            author_to_pid: Dict[str, Any] = {}
-            author_to_ct: Dict[str, Any] = {}
-            if self._participant_has_id_col or self._participant_has_created_at_col:
-                try:
-                    sel_cols = ["author"]
-                    if self._participant_has_id_col:
-                        sel_cols.insert(0, "id")
-                    if self._participant_has_created_at_col:
-                        sel_cols.append("created_at")
-                    sel = (
-                        self.supabase.table("participants")
-                        .select(",".join(sel_cols))
-                        .eq(self._participant_fk_col, event_id)
-                        .execute()
-                    )
-                    for pr in sel.data or []:
-                        a = pr.get("author")
-                        if a is None:
-                            continue
-                        sk = self._norm_author_key(a)
-                        if self._participant_has_id_col:
-                            pid = pr.get("id")
-                            if pid is not None:
-                                author_to_pid[sk] = pid
-                        if self._participant_has_created_at_col and pr.get("created_at") is not None:
-                            author_to_ct[sk] = pr.get("created_at")
-                except Exception as e:
-                    print(f"DEBUG: [participants row prefetch] {e}")
-
-            p_batch = []
-            for author, v in participants_dict.items():
-                count = v[0] if isinstance(v, (tuple, list)) else v
-                row: Dict[str, Any] = {
-                    self._participant_fk_col: event_id,
-                    "author": author,
-                    "count": count,
-                }
-                if self._participant_has_id_col:
-                    pid = author_to_pid.get(self._norm_author_key(author))
-                    if pid is not None:
-                        row["id"] = pid
-                    elif self._participant_id_sql_type == "uuid":
-                        row["id"] = str(uuid.uuid4())
-                if self._participant_has_created_at_col:
-                    ct = author_to_ct.get(self._norm_author_key(author))
-                    row["created_at"] = ct if ct is not None else datetime.now().isoformat()
-                p_batch.append(row)
+            self._save_participant_delta(event_id, participants_dict)
+        if all_commenters:
+            self._save_commenter_delta(event_id, all_commenters)
+
+        if self._replica is not None:
+            now_iso = datetime.now().isoformat()
+            p_rows = None
+            if participants_dict:
+                p_rows = [
+                    {"author": a, "count": v[0] if isinstance(v, (tuple, list)) else v, "created_at": now_iso}
+                    for a, v in participants_dict.items()
+                ]
+            c_rows = None
+            if all_commenters:
+                c_rows = [
+                    {"author": item["name"] if isinstance(item, dict) else item, "created_at": now_iso}
+                    for item in all_commenters
+                ]
+            self._replica_apply(lambda r: r.apply_save(event_id, post_data, p_rows, c_rows))
+
+    # ----- 자식 행 변경분 저장 -----
+    def _persisted_rows(self, table: str, event_id: str) -> Dict[str, Dict[str, Any]]:
+        """마지막으로 반영된 행 상태. 기준선이 없으면(첫 저장·TTL 만료) 한 번 읽어 채운다."""
+        rows = self._row_state.get(table, event_id)
+        if rows is not None:
+            return rows
+        if table == "participants":
+            fk = self._participant_fk_col
+            sel_cols = ["author", "count"]
+            has_id, has_ct = self._participant_has_id_col, self._participant_has_created_at_col
+        else:
+            fk = self._commenter_fk_col
+            sel_cols = ["author"]
+            has_id, has_ct = self._commenter_has_id_col, self._commenter_has_created_at_col
+        if has_id:
+            sel_cols.insert(0, "id")
+        if has_ct:
+            sel_cols.append("created_at")
+        token = self._row_state.token(event_id)
+        sel = self.supabase.table(table).select(",".join(sel_cols)).eq(fk, event_id).execute()
+        rows = self._row_map(sel.data or [])
+        self._row_state.seed(table, event_id, rows, token)
+        return rows
+
+    def _save_participant_delta(self, event_id: str, participants_dict: Dict[str, Any]) -> None:
+        """
+        participants_dict 를 이벤트의 전체 참가자 집합으로 보고 기준선과 비교해
+        새 작성자/티켓 수가 바뀐 작성자만 upsert, 빠진 작성자는 묶어서 delete 한다.
+        """
+        fk = self._participant_fk_col
+        persisted = self._persisted_rows("participants", event_id)
+        p_batch, removed, n_wanted = self._plan_participant_delta(event_id, participants_dict, persisted)
+
+        try:
             if self._participant_has_id_col and self._participant_id_sql_type == "int":
-                self._assign_missing_integer_ids("participants", p_batch)
+                self._assign_missing_integer_ids("participants", [r for r in p_batch if r.get("id") is None])
             for i in range(0, len(p_batch), 500):
                 self.supabase.table("participants").upsert(
-                    p_batch[i : i + 500], on_conflict=f"{self._participant_fk_col},author"
+                    p_batch[i : i + 500], on_conflict=f"{fk},author"
                 ).execute()
-
-        if all_commenters:
-            name_to_cid: Dict[str, Any] = {}
-            name_to_c_ct: Dict[str, Any] = {}
-            if self._commenter_has_id_col or self._commenter_has_created_at_col:
-                try:
-                    c_sel_cols = ["author"]
-                    if self._commenter_has_id_col:
-                        c_sel_cols.insert(0, "id")
-                    if self._commenter_has_created_at_col:
-                        c_sel_cols.append("created_at")
-                    sel_c = (
-                        self.supabase.table("commenters")
-                        .select(",".join(c_sel_cols))
-                        .eq(self._commenter_fk_col, event_id)
-                        .execute()
-                    )
-                    for cr in sel_c.data or []:
-                        a = cr.get("author")
-                        if a is None:
-                            continue
-                        sk = self._norm_author_key(a)
-                        if self._commenter_has_id_col:
-                            cid = cr.get("id")
-                            if cid is not None:
-                                name_to_cid[sk] = cid
-                        if self._commenter_has_created_at_col and cr.get("created_at") is not None:
-                            name_to_c_ct[sk] = cr.get("created_at")
-                except Exception as e:
-                    print(f"DEBUG: [commenters row prefetch] {e}")
-
-            c_batch = []
-            for item in all_commenters:
-                name = item["name"] if isinstance(item, dict) else item
-                crow: Dict[str, Any] = {self._commenter_fk_col: event_id, "author": name}
-                if self._commenter_has_id_col:
-                    cid = name_to_cid.get(self._norm_author_key(name))
-                    if cid is not None:
-                        crow["id"] = cid
-                    elif self._commenter_id_sql_type == "uuid":
-                        crow["id"] = str(uuid.uuid4())
-                if self._commenter_has_created_at_col:
-                    cct = name_to_c_ct.get(self._norm_author_key(name))
-                    crow["created_at"] = cct if cct is not None else datetime.now().isoformat()
-                c_batch.append(crow)
+            removed_authors = [persisted[sk]["author"] for sk in removed]
+            for i in range(0, len(removed_authors), _DELETE_CHUNK):
+                self.supabase.table("participants").delete().eq(fk, event_id).in_(
+                    "author", removed_authors[i : i + _DELETE_CHUNK]
+                ).execute()
+        except Exception:
+            # 일부 청크만 반영됐을 수 있으므로 기준선을 버리고 다음 저장에서 다시 읽는다.
+            self._row_state.invalidate(event_id)
+            raise
+        if p_batch or removed:
+            print(
+                f"DEBUG: [participants delta] {event_id}: upsert={len(p_batch)} delete={len(removed)} "
+                f"unchanged={n_wanted - len(p_batch)}"
+            )
+        self._row_state.apply("participants", event_id, self._row_map(p_batch), removed)
+
+    def _save_commenter_delta(self, event_id: str, all_commenters: List[Any]) -> None:
+        """댓글 작성자는 누적 목록이므로 기준선에 없는 작성자만 insert 한다 (수정·삭제 없음)."""
+        fk = self._commenter_fk_col
+        persisted = self._persisted_rows("commenters", event_id)
+        c_batch = self._plan_commenter_inserts(event_id, all_commenters, persisted)
+        if not c_batch:
+            return
+        try:
             if self._commenter_has_id_col and self._commenter_id_sql_type == "int":
                 self._assign_missing_integer_ids("commenters", c_batch)
             for i in range(0, len(c_batch), 1000):
+                # 다른 프로세스가 먼저 넣은 작성자는 건드리지 않는다.
                 self.supabase.table("commenters").upsert(
-                    c_batch[i : i + 1000], on_conflict=f"{self._commenter_fk_col},author"
+                    c_batch[i : i + 1000], on_conflict=f"{fk},author", ignore_duplicates=True
                 ).execute()
+        except Exception:
+            self._row_state.invalidate(event_id)
+            raise
+        print(f"DEBUG: [commenters delta] {event_id}: insert={len(c_batch)} known={len(persisted)}")
+        self._row_state.apply("commenters", event_id, self._row_map(c_batch))
 
-    @retry_supabase
-    def _sync_save_supabase(
+    def save_data_blocking(
         self,
-        event_id,
+        event_id: str,
         participants_dict,
         last_comment_id,
-        all_commenters,
-        title,
-        prizes,
-        memo,
-        winners,
-        allow_duplicates,
-        allowed_list,
-        event_at,
+        all_commenters=None,
+        title=None,
+        prizes=None,
+        memo=None,
+        winners=None,
+        allow_duplicates=None,
+        allowed_list=None,
+        event_at=None,
         is_active: Optional[bool] = None,
-    ):
-        self._sync_save_supabase_core(
+    ) -> Tuple[bool, Optional[str]]:
+        """운영자 API 등 응답 전에 반드시 커밋해야 할 때 사용. (성공, 마지막 오류 메시지)"""
+        payload = self._save_payload(
             event_id,
             participants_dict,
             last_comment_id,
@@ -540,60 +877,14 @@ class CommentDatabase:
             event_at,
             is_active,
         )
-        return True
-
-    def save_data_blocking(
-        self,
-        event_id: str,
-        participants_dict,
-        last_comment_id,
-        all_commenters=None,
-        title=None,
-        prizes=None,
-        memo=None,
-        winners=None,
-        allow_duplicates=None,
-        allowed_list=None,
-        event_at=None,
-        is_active: Optional[bool] = None,
-    ) -> Tuple[bool, Optional[str]]:
-        """운영자 API 등 응답 전에 반드시 커밋해야 할 때 사용. (성공, 마지막 오류 메시지)"""
-        last_err: Optional[str] = None
-        for attempt in range(_BLOCKING_SAVE_ATTEMPTS):
-            try:
-                self._sync_save_supabase_core(
-                    event_id,
-                    participants_dict,
-                    last_comment_id,
-                    all_commenters,
-                    title,
-                    prizes,
-                    memo,
-                    winners,
-                    allow_duplicates,
-                    allowed_list,
-                    event_at,
-                    is_active,
-                )
-                return True, None
-            except Exception as e:
-                last_err = str(e)
-                if attempt < _BLOCKING_SAVE_ATTEMPTS - 1:
-                    delay = min(
-                        _BLOCKING_SAVE_BASE_DELAY * (2**attempt),
-                        _BLOCKING_SAVE_MAX_DELAY,
-                    )
-                    time.sleep(delay)
-        try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            log_file = os.path.join(base_dir, "monitor_debug.log")
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(
-                    f"[{datetime.now()}] ERROR: [Blocking save failed after "
-                    f"{_BLOCKING_SAVE_ATTEMPTS} tries] save_data_blocking: {last_err}\n"
-                )
-        except Exception:
-            pass
+        self._snapshot_apply_save(**{k: v for k, v in payload.items() if k != "is_active"})
+        # 같은 이벤트의 앞선 백그라운드 저장이 나중에 덮어쓰지 않도록 큐 순서대로 반영하고 기다린다.
+        ok, last_err = self._enqueue_write("save", event_id, payload, wait=True)
+        if ok:
+            return True, None
+        _append_debug_log(
+            f"[Blocking save failed after {_BLOCKING_SAVE_ATTEMPTS} tries] save_data_blocking: {last_err}"
+        )
         print(f"DEBUG: [save_data_blocking] failed: {last_err}")
         return False, last_err
 
@@ -602,96 +893,149 @@ class CommentDatabase:
         event_id: str,
         include_commenters: bool = True,
     ) -> Tuple[Dict, str, List, str, str, str, str, bool, str, Optional[str]]:
-        """Supabase에서 이벤트 데이터 로드."""
-        participants = {}
-        all_commenters = []
-        last_id, title, prizes, memo, winners, allowed_list_str = None, None, None, None, "", None
-        allow_duplicates = False
-        event_at_str: Optional[str] = None
-
-        def _best_post_row(rows):
-            """중복 rows가 있을 때 가장 최신/완전한 행을 고른다."""
-            if not rows:
-                return None
-            if len(rows) == 1:
-                return rows[0]
-
-            def _score(r):
-                title_len = len(str(r.get("title") or "").strip())
-                prizes_len = len(str(r.get("prizes") or "").strip())
-                memo_len = len(str(r.get("memo") or "").strip())
-                winners_len = len(str(r.get("winners") or "").strip())
-                allowed_len = len(str(r.get("allowed_list") or "").strip())
-                active_bonus = 1 if bool(r.get("is_active", False)) else 0
-                updated = str(r.get("updated_at") or r.get("event_at") or "")
-                # 완성도 우선 + 최신성 보조
-                return (
-                    winners_len + prizes_len + memo_len + title_len + allowed_len,
-                    active_bonus,
-                    updated,
-                )
-
-            return max(rows, key=_score)
-
+        """이벤트 데이터 로드. 스냅샷 캐시에 있으면 메모리에서, 없으면 Supabase에서 읽어 캐시에 채운다."""
+        cached = self._snapshots.get(event_id, include_commenters)
+        if cached is not None:
+            return cached
+        self._transport.start_keepwarm(self._keepwarm_ping)
+        token = self._snapshots.begin_fill(event_id)
         try:
-            res = self.supabase.table("posts").select("*").eq(self._post_key_col, event_id).execute()
-            if not (res.data or []) and self._post_has_id_col and self._post_has_url_col:
-                alt_col = "url" if self._post_key_col == "id" else "id"
-                res = self.supabase.table("posts").select("*").eq(alt_col, event_id).execute()
-            if res.data:
-                print(f"DEBUG: [get_data] Fetching data from Supabase for {event_id}")
-                post = _best_post_row(res.data)
-                last_id = post.get("last_comment_id")
-                title = post.get("title")
-                prizes = post.get("prizes")
-                memo = post.get("memo")
-                winners = post.get("winners", "")
-                allow_duplicates = bool(post.get("allow_duplicates", False))
-                allowed_list_str = post.get("allowed_list")
-                ea = post.get("event_at")
-                if ea is not None:
-                    event_at_str = str(ea) if not isinstance(ea, str) else ea
-                elif post.get("updated_at") is not None:
-                    # event_at 미구성 스키마 대응: 화면 표시용 fallback
-                    u = post.get("updated_at")
-                    event_at_str = str(u) if not isinstance(u, str) else u
-
-                p_res = self.supabase.table("participants").select("*").eq(self._participant_fk_col, event_id).execute()
-                for p in p_res.data or []:
-                    participants[p["author"]] = (p["count"], p.get("created_at"))
-
-                if include_commenters:
-                    c_res = self.supabase.table("commenters").select("*").eq(self._commenter_fk_col, event_id).execute()
-                    for c in c_res.data or []:
-                        all_commenters.append(
-                            {"name": c["author"], "created_at": c.get("created_at")}
-                        )
-            else:
-                print(f"DEBUG: [get_data] No post in Supabase for {event_id}")
+            data = self._fetch_event_data(event_id, include_commenters)
         except Exception as e:
             print(f"DEBUG: [get_data Supabase Error] {e}")
+            # 장애(서킷 open 포함) 중에는 만료된 캐시라도 빈 이벤트보다 낫다.
+            stale = self._snapshots.get(event_id, include_commenters, allow_stale=True)
+            return stale if stale is not None else snapshot_to_tuple(empty_snapshot())
+        self._snapshots.fill(event_id, token, data, include_commenters)
+        return data
 
+    def get_many(self, event_ids: Iterable[str], fields: Optional[Iterable[str]] = None) -> Dict[str, EventTuple]:
+        """
+        여러 이벤트를 한 번에 (EventStorage.get_many). 캐시에 없는 이벤트만 in 필터로 읽는다:
+        posts 1회 + 자식 테이블별 1회 (이벤트 _IN_CHUNK 개 / 행 _REPLICA_PAGE 개마다 1회 추가).
+        """
+        wanted = get_many_fields(fields)
+        include_commenters = "commenters" in wanted
+        out: Dict[str, EventTuple] = {}
+        todo: List[str] = []
+        for ek in dict.fromkeys(str(e) for e in event_ids if e):
+            cached = self._snapshots.get(ek, include_commenters)
+            if cached is not None:
+                out[ek] = trim_event_tuple(cached, wanted)
+            else:
+                todo.append(ek)
+        if not todo:
+            return out
+        if self._replica_ready():
+            for ek in todo:
+                rows = self._replica.event_rows(ek, include_commenters)
+                if rows and rows[0]:
+                    out[ek] = trim_event_tuple(self._event_tuple_from_rows(*rows, include_commenters), wanted)
+            return out
+        # 참가자까지 읽은 결과만 get_data 와 같은 모양이라 캐시에 채운다
+        fill = "participants" in wanted
+        tokens = {ek: self._snapshots.begin_fill(ek) for ek in todo} if fill else {}
+        try:
+            posts = self._fetch_posts_many(todo)
+            p_by_event, c_by_event = self._fetch_children_many(list(posts), wanted)
+        except Exception as e:
+            print(f"DEBUG: [get_many Supabase Error] {e}")
+            return out
+        for ek, post in posts.items():
+            data = self._event_tuple_from_rows(
+                [post], p_by_event.get(ek, []), c_by_event.get(ek, []), include_commenters
+            )
+            if fill:
+                self._snapshots.fill(ek, tokens[ek], data, include_commenters)
+            out[ek] = data
+        return out
+
+    def _event_rpc_usable(self) -> bool:
+        """get_event_snapshot RPC는 신규 스키마(posts.id / 자식 event_id) 기준으로 작성되어 있다."""
+        if _EVENT_FETCH_MODE == "sequential" or self._event_rpc_available is False:
+            return False
         return (
-            participants,
-            last_id,
-            all_commenters,
-            title,
-            prizes,
-            memo,
-            winners,
-            allow_duplicates,
-            allowed_list_str,
-            event_at_str,
+            self._post_key_col == "id"
+            and self._participant_fk_col == "event_id"
+            and self._commenter_fk_col == "event_id"
         )
 
-    def set_active_event_id(self, event_id: Optional[str]):
-        threading.Thread(
-            target=self._sync_active_event_supabase, args=(event_id,), daemon=True
-        ).start()
+    def _fetch_event_rows_rpc(self, event_id: str, include_commenters: bool):
+        """RPC 1회로 (posts rows, participants rows, commenters rows). RPC 미배포면 None."""
+        try:
+            res = self.supabase.rpc(
+                "get_event_snapshot",
+                {"p_event_id": event_id, "p_include_commenters": bool(include_commenters)},
+            ).execute()
+        except Exception as e:
+            if not self._is_missing_function_error(e):
+                raise
+            print("DEBUG: [get_data] get_event_snapshot RPC not deployed; using sequential fetch")
+            self._event_rpc_available = False
+            return None
+        self._event_rpc_available = True
+        payload = res.data or {}
+        if isinstance(payload, list):
+            payload = payload[0] if payload else {}
+        return (
+            payload.get("posts") or [],
+            payload.get("participants") or [],
+            payload.get("commenters") or [],
+        )
 
-    def set_active_url(self, url: Optional[str]):
-        """하위 호환: 활성 이벤트 id 설정."""
-        self.set_active_event_id(url)
+    def _fetch_event_rows_sequential(self, event_id: str, include_commenters: bool):
+        """posts → participants → commenters 순차 조회 (레거시 스키마/RPC 미배포 폴백)."""
+        res = self.supabase.table("posts").select("*").eq(self._post_key_col, event_id).execute()
+        if not (res.data or []) and self._post_has_id_col and self._post_has_url_col:
+            alt_col = "url" if self._post_key_col == "id" else "id"
+            res = self.supabase.table("posts").select("*").eq(alt_col, event_id).execute()
+        post_rows = res.data or []
+        if not post_rows:
+            return [], [], []
+        p_res = self.supabase.table("participants").select("*").eq(self._participant_fk_col, event_id).execute()
+        c_rows: List[Dict[str, Any]] = []
+        if include_commenters:
+            c_res = self.supabase.table("commenters").select("*").eq(self._commenter_fk_col, event_id).execute()
+            c_rows = c_res.data or []
+        return post_rows, p_res.data or [], c_rows
+
+    def _fetch_event_rows_remote(self, event_id: str, include_commenters: bool):
+        rows = None
+        if self._event_rpc_usable():
+            rows = self._fetch_event_rows_rpc(event_id, include_commenters)
+        if rows is None:
+            rows = self._fetch_event_rows_sequential(event_id, include_commenters)
+        return rows
+
+    def _fetch_event_data(
+        self,
+        event_id: str,
+        include_commenters: bool = True,
+    ) -> Tuple[Dict, str, List, str, str, str, str, bool, str, Optional[str]]:
+        """Supabase에서 이벤트 데이터 로드. 조회 오류는 호출부(get_data)로 전파한다."""
+        row_token = self._row_state.token(event_id)
+        rows = None
+        source = "Supabase"
+        if self._replica_ready():
+            rows = self._replica.event_rows(event_id, include_commenters)
+            source = "replica"
+        if rows is None:
+            rows = self._fetch_event_rows_remote(event_id, include_commenters)
+            source = "Supabase"
+        post_rows, p_rows, c_rows = rows
+
+        if post_rows:
+            print(f"DEBUG: [get_data] Fetching data from {source} for {event_id}")
+            # 읽은 행을 저장 기준선으로 재사용 → 다음 save 가 prefetch 없이 변경분만 보낸다.
+            self._row_state.seed("participants", event_id, self._row_map(p_rows), row_token)
+            if include_commenters:
+                self._row_state.seed("commenters", event_id, self._row_map(c_rows), row_token)
+        else:
+            print(f"DEBUG: [get_data] No post in Supabase for {event_id}")
+        return self._event_tuple_from_rows(post_rows, p_rows, c_rows, include_commenters)
+
+    def set_active_event_id(self, event_id: Optional[str]):
+        self._writes.submit("active", _ACTIVE_WRITE_KEY, event_id)
 
     def _sync_active_event_supabase_core(self, event_id: Optional[str]):
         if not self._post_has_is_active_col:
@@ -710,6 +1054,7 @@ class CommentDatabase:
             # 이후 조회 시 값이 사라진 것처럼 보일 수 있다.
             self.supabase.table("posts").update({"is_active": True}).eq(self._post_key_col, event_id).execute()
             print(f"DEBUG: [SupabaseSync] Active event id set to: {event_id}")
+        self._replica_apply(lambda r: r.set_active(event_id))
 
     def get_post_snapshot(
         self, event_id: str
@@ -718,9 +1063,17 @@ class CommentDatabase:
         posts 테이블의 메타 필드만 빠르게 조회한다.
         반환: (last_comment_id, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at)
         """
+        cached = self._snapshots.get(event_id, include_commenters=False)
+        if cached is not None:
+            _, last_id, _, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at = cached
+            return (last_id, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at)
         try:
-            res = self.supabase.table("posts").select("*").eq(self._post_key_col, event_id).limit(1).execute()
-            row = (res.data or [None])[0]
+            local = self._replica.event_rows(event_id, False) if self._replica_ready() else None
+            if local is not None:
+                row = local[0][0]
+            else:
+                res = self.supabase.table("posts").select("*").eq(self._post_key_col, event_id).limit(1).execute()
+                row = (res.data or [None])[0]
             if not row and self._post_has_id_col and self._post_has_url_col:
                 alt_col = "url" if self._post_key_col == "id" else "id"
                 res2 = self.supabase.table("posts").select("*").eq(alt_col, event_id).limit(1).execute()
@@ -744,53 +1097,36 @@ class CommentDatabase:
             print(f"DEBUG: [get_post_snapshot] Supabase error: {e}")
             return (None, None, None, None, None, None, None, None)
 
-    @retry_supabase
-    def _sync_active_event_supabase(self, event_id: Optional[str]):
-        self._sync_active_event_supabase_core(event_id)
-        return True
-
     def set_active_event_id_blocking(self, event_id: Optional[str]) -> Tuple[bool, Optional[str]]:
-        last_err: Optional[str] = None
-        for attempt in range(_BLOCKING_SAVE_ATTEMPTS):
-            try:
-                self._sync_active_event_supabase_core(event_id)
-                return True, None
-            except Exception as e:
-                last_err = str(e)
-                if attempt < _BLOCKING_SAVE_ATTEMPTS - 1:
-                    delay = min(
-                        _BLOCKING_SAVE_BASE_DELAY * (2**attempt),
-                        _BLOCKING_SAVE_MAX_DELAY,
-                    )
-                    time.sleep(delay)
-        try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            log_file = os.path.join(base_dir, "monitor_debug.log")
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(
-                    f"[{datetime.now()}] ERROR: [Blocking active sync failed after "
-                    f"{_BLOCKING_SAVE_ATTEMPTS} tries] set_active_event_id_blocking: {last_err}\n"
-                )
-        except Exception:
-            pass
+        ok, last_err = self._writes.submit(
+            "active", _ACTIVE_WRITE_KEY, event_id, wait=True, max_attempts=_BLOCKING_SAVE_ATTEMPTS
+        )
+        if ok:
+            self._last_active_event_id = event_id
+            return True, None
+        _append_debug_log(
+            f"[Blocking active sync failed after {_BLOCKING_SAVE_ATTEMPTS} tries] "
+            f"set_active_event_id_blocking: {last_err}"
+        )
         print(f"DEBUG: [set_active_event_id_blocking] failed: {last_err}")
         return False, last_err
 
     def get_active_event_id(self) -> Optional[str]:
+        if self._replica_ready():
+            return self._replica.active_event_id()
         try:
             res = self.supabase.table("posts").select(self._post_select_cols()).eq("is_active", True).limit(1).execute()
-            if res.data:
-                k = self._row_event_key(res.data[0])
-                if k:
-                    return k
+            k = self._row_event_key(res.data[0]) if res.data else None
+            self._last_active_event_id = k
+            return k
         except Exception as e:
             print(f"DEBUG: [get_active_event_id Supabase Error] {e}")
-        return None
-
-    def get_active_url(self) -> Optional[str]:
-        return self.get_active_event_id()
+        # 조회 실패(서킷 open 등): 마지막으로 확인한 값으로 버틴다.
+        return self._last_active_event_id
 
     def get_all_event_ids(self) -> List[str]:
+        if self._replica_ready():
+            return self._replica.event_ids()
         try:
             res = self.supabase.table("posts").select(self._post_select_cols()).execute()
             out: List[str] = []
@@ -802,57 +1138,241 @@ class CommentDatabase:
         except Exception:
             return []
 
-    def get_all_urls(self) -> List[str]:
-        return self.get_all_event_ids()
-
     def delete_participant(self, event_id: str, author: str):
-        threading.Thread(
-            target=self._sync_delete_p_supabase, args=(event_id, author), daemon=True
-        ).start()
+        self._snapshots.apply_delete_participant(event_id, author)
+        self._enqueue_write("delete_participant", event_id, author)
 
-    @retry_supabase
-    def _sync_delete_p_supabase(self, event_id, author):
+    def _sync_delete_p_supabase_core(self, event_id, author):
         self.supabase.table("participants").delete().eq(self._participant_fk_col, event_id).eq(
             "author", author
         ).execute()
+        self._row_state.apply("participants", event_id, deleted=[self._norm_author_key(author)])
+        self._replica_apply(lambda r: r.delete_participant(event_id, author))
+
+    # ----- 당첨 기록 (winners 테이블, 없으면 EventStorage 기본 구현: posts.winners 문자열 재저장) -----
+    def append_winner(
+        self, event_id: str, winner: str, round_id: Optional[str] = None, angle: Optional[float] = None
+    ):
+        if not self._has_winners_table:
+            return super().append_winner(event_id, winner, round_id, angle)
+        self._snapshots.apply_winner(event_id, winner)
+        row = {
+            "event_id": event_id,
+            "round_id": round_id or None,
+            "winner": winner,
+            "angle": angle,
+            "created_at": datetime.now().isoformat(),
+        }
+        self._enqueue_write("winner_add", event_id, row)
+
+    def _sync_winner_add_core(self, event_id: str, row: Dict[str, Any]) -> None:
+        # INSERT 1회. posts.winners 는 DB 트리거가 덧붙인다.
+        if row.get("round_id"):
+            # 다른 워커가 같은 라운드를 먼저 기록했으면 무시된다(빈 응답) → 캐시에 덧붙인 값을 버린다.
+            res = (
+                self.supabase.table("winners")
+                .upsert(row, on_conflict="event_id,round_id", ignore_duplicates=True)
+                .execute()
+            )
+            if not (res.data or []):
+                self._snapshots.invalidate(event_id)
+                return
+        else:
+            self.supabase.table("winners").insert(row).execute()
+        self._replica_apply(lambda r: r.append_winner(event_id, row["winner"]))
+
+    def confirm_winner(
+        self, event_id: str, winner: str, round_id: Optional[str] = None, angle: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        confirm_winner RPC 1회로 기록 추가 + 참가자 제거 + 새 상태(posts 필드·참가자·댓글 작성자) 조회.
+        같은 이벤트의 앞선 쓰기(큐)보다 먼저 반영되지 않도록 쓰기 큐를 거쳐 기다린다.
+        """
+        if not self._confirm_rpc_usable():
+            return super().confirm_winner(event_id, winner, round_id, angle)
+        payload = {"winner": winner, "round_id": round_id or None, "angle": angle, "result": None}
+        ok, last_err = self._enqueue_write("confirm_winner", event_id, payload, wait=True)
+        if not ok:
+            _append_debug_log(f"[Blocking confirm_winner failed] {event_id} / {winner}: {last_err}")
+            print(f"DEBUG: [confirm_winner] failed: {last_err}")
+            return None
+        if payload["result"] is None:
+            # RPC 미배포로 판명: 기존 방식으로 (큐가 순서를 지킨다)
+            return super().confirm_winner(event_id, winner, round_id, angle)
+        return payload["result"]
+
+    def _sync_confirm_winner_core(self, event_id: str, payload: Dict[str, Any]) -> None:
+        """쓰기 큐 워커에서 실행. 결과는 payload["result"] 에 남긴다 (RPC 미배포면 None 그대로)."""
+        winner = payload["winner"]
+        try:
+            res = self.supabase.rpc(
+                "confirm_winner",
+                {
+                    "p_event_id": event_id,
+                    "p_winner": winner,
+                    "p_round_id": payload["round_id"],
+                    "p_angle": payload["angle"],
+                },
+            ).execute()
+        except Exception as e:
+            if not self._is_missing_function_error(e):
+                raise
+            print("DEBUG: [confirm_winner] confirm_winner RPC not deployed; using winners insert + participant delete")
+            self._confirm_rpc_available = False
+            return
+        self._confirm_rpc_available = True
+        data = res.data or {}
+        if isinstance(data, list):
+            data = data[0] if data else {}
+        participants, _, commenters, title, prizes, memo, winners, allow_duplicates, allowed_list, _ = (
+            self._event_tuple_from_rows(
+                data.get("posts") or [], data.get("participants") or [], data.get("commenters") or [], True
+            )
+        )
+        # RPC 가 돌려준 값이 원격 상태 그대로이므로 캐시·기준선·복제본을 맞춘다.
+        self._snapshots.apply_save(event_id, {"winners": winners}, participants=participants)
+        if data.get("removed"):
+            # 마지막 참가자가 빠져 빈 집합이면 apply_save 가 참가자를 건드리지 않으므로 따로 지운다.
+            self._snapshots.apply_delete_participant(event_id, winner)
+            self._row_state.apply("participants", event_id, deleted=[self._norm_author_key(winner)])
+            self._replica_apply(lambda r: r.delete_participant(event_id, winner))
+        if data.get("inserted"):
+            self._replica_apply(lambda r: r.append_winner(event_id, winner))
+        payload["result"] = {
+            "inserted": bool(data.get("inserted")),
+            "participants": participants,
+            "winners": winners or "",
+            "allow_duplicates": allow_duplicates,
+            "title": title,
+            "prizes": prizes,
+            "memo": memo,
+            "allowed_list": allowed_list,
+            "commenters": commenters,
+        }
+
+    def get_winners(self, event_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        if not self._has_winners_table:
+            return super().get_winners(event_id, after_id)
+        try:
+            res = (
+                self.supabase.table("winners")
+                .select("id,event_id,round_id,winner,angle,created_at")
+                .eq("event_id", event_id)
+                .gt("id", int(after_id or 0))
+                .order("id")
+                .execute()
+            )
+            return res.data or []
+        except Exception as e:
+            print(f"DEBUG: [get_winners] Supabase error: {e}")
+            return []
+
+    def delete_winner_blocking(self, event_id: str, winner_id: int) -> Tuple[bool, Optional[str]]:
+        if not self._has_winners_table:
+            return super().delete_winner_blocking(event_id, winner_id)
+        return self._winner_write_blocking("winner_delete", event_id, int(winner_id))
+
+    def clear_winners_blocking(self, event_id: str) -> Tuple[bool, Optional[str]]:
+        if not self._has_winners_table:
+            return super().clear_winners_blocking(event_id)
+        return self._winner_write_blocking("winner_delete", event_id, None)
+
+    def import_winners_blocking(self, event_id: str, rows: List[Dict[str, Any]]) -> Tuple[bool, Optional[str]]:
+        if not self._has_winners_table:
+            return super().import_winners_blocking(event_id, rows)
+        if not rows:
+            return True, None
+        return self._winner_write_blocking("winner_import", event_id, [dict(r) for r in rows])
+
+    def _winner_write_blocking(self, kind: str, event_id: str, payload: Any) -> Tuple[bool, Optional[str]]:
+        ok, last_err = self._enqueue_write(kind, event_id, payload, wait=True)
+        if ok:
+            return True, None
+        _append_debug_log(f"[Blocking {kind} failed after {_BLOCKING_SAVE_ATTEMPTS} tries] {event_id}: {last_err}")
+        print(f"DEBUG: [{kind}] failed: {last_err}")
+        return False, last_err
+
+    def _sync_winner_import_core(self, event_id: str, rows: List[Dict[str, Any]]) -> None:
+        """기록 행을 INSERT 1회로 (created_at·round_id·angle 원래 값 유지). posts.winners 는 INSERT 트리거가 순서대로 덧붙인다."""
+        now_iso = datetime.now().isoformat()
+        batch = [
+            {
+                "event_id": event_id,
+                "round_id": r.get("round_id") or None,
+                "winner": r["winner"],
+                "angle": r.get("angle"),
+                "created_at": r.get("created_at") or now_iso,
+            }
+            for r in rows
+        ]
+        self.supabase.table("winners").upsert(batch, on_conflict="event_id,round_id", ignore_duplicates=True).execute()
+        winners = ",".join(r["winner"] for r in self.get_winners(event_id))
+        self._snapshots.apply_save(event_id, {"winners": winners})
+        self._replica_apply(lambda r: r.apply_save(event_id, {"winners": winners}))
+
+    def _sync_winner_delete_core(self, event_id: str, winner_id: Optional[int]) -> None:
+        """winner_id 가 None 이면 이벤트의 기록 전체 삭제. posts.winners 는 DB 트리거가 다시 만든다."""
+        q = self.supabase.table("winners").delete().eq("event_id", event_id)
+        if winner_id is not None:
+            res = q.eq("id", winner_id).execute()
+            if not (res.data or []):
+                raise ValueError(f"winner id {winner_id} not found")
+        else:
+            q.execute()
+        # 트리거와 같은 값을 캐시/복제본에 반영 (삭제는 드물어 한 번 다시 읽는다)
+        winners = ",".join(r["winner"] for r in self.get_winners(event_id))
+        self._snapshots.apply_save(event_id, {"winners": winners})
+        self._replica_apply(lambda r: r.apply_save(event_id, {"winners": winners}))
 
     def update_timestamp(self, event_id: str):
         ts = datetime.now().isoformat()
         try:
             self.supabase.table("posts").update({"updated_at": ts}).eq(self._post_key_col, event_id).execute()
+            if "event_at" not in self._post_opt_cols:
+                # event_at 대체 표시값(updated_at)이 바뀌었으므로 스냅샷을 버린다.
+                self._snapshots.invalidate(event_id)
         except Exception as e:
             print(f"DEBUG: [update_timestamp Supabase] {e}")
 
-    def list_events(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def list_events(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        limit = max(1, min(int(limit), EVENT_PAGE_MAX))
         try:
-            sel_cols = self._post_select_cols(self._post_opt_cols)
-            q = self.supabase.table("posts").select(sel_cols)
-            if "updated_at" in self._post_opt_cols:
-                q = q.order("updated_at", desc=True)
-            res = q.limit(limit).execute()
-            rows = res.data or []
-            for r in rows:
-                rid = self._row_event_key(r)
-                r["id"] = rid
-                r["url"] = rid
-                # 프론트에서 기대하는 필드는 없어도 키를 맞춰준다.
-                for c in ["event_at", "title", "updated_at", "prizes", "winners", "is_active", "memo", "allow_duplicates"]:
-                    r.setdefault(c, None)
-                # event_at 컬럼이 없는 프로젝트에서는 updated_at으로 대체 표시
-                if not r.get("event_at") and r.get("updated_at"):
-                    r["event_at"] = r.get("updated_at")
-
-            # 서버에서도 ID(YYYYMMDDNN) 최신순으로 고정 정렬
-            def _id_num(row: Dict[str, Any]) -> int:
-                v = str((row or {}).get("id") or (row or {}).get("url") or "")
-                return int(v) if (len(v) == 10 and v.isdigit()) else 0
-
-            rows.sort(key=_id_num, reverse=True)
-            return rows
+            if self._replica_ready():
+                rows = self._replica.list_event_page(limit, before)
+            else:
+                rows = self._list_events_rpc(limit, before) if self._event_list_rpc_usable() else None
+                if rows is None:
+                    rows = self._list_events_select(limit, before)
+            # 프론트 기대 키 채움 (정렬은 서버에서 ID 내림차순으로 끝나 있다)
+            return self._finalize_event_rows(rows)
         except Exception as e:
             print(f"DEBUG: [list_events] Supabase error: {e}")
             return []
 
+    def _list_events_rpc(self, limit: int, before: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """list_events_page RPC 1회: 목록 컬럼 + 참여자/당첨자 수. RPC 미배포면 None."""
+        try:
+            res = self.supabase.rpc("list_events_page", {"p_before": before, "p_limit": limit}).execute()
+        except Exception as e:
+            if not self._is_missing_function_error(e):
+                raise
+            print("DEBUG: [list_events] list_events_page RPC not deployed; using keyset select")
+            self._event_list_rpc_available = False
+            return None
+        self._event_list_rpc_available = True
+        return self._event_list_rows_from_rpc(res.data)
+
+    def _list_events_select(self, limit: int, before: Optional[str]) -> List[Dict[str, Any]]:
+        """posts 직접 조회: 키 내림차순 + 커서 미만 (keyset). 참여자 수는 채우지 않는다."""
+        rows: List[Dict[str, Any]] = []
+        for numeric, lt in self._event_list_ranges(before):
+            q = self.supabase.table("posts").select(self._event_list_select_cols())
+            res = self._event_list_range_filter(q, numeric, lt).limit(limit - len(rows)).execute()
+            rows.extend(self._event_list_row(r) for r in (res.data or []))
+            if len(rows) >= limit:
+                break
+        return rows
+
     def next_event_id(self, event_at_iso: Optional[str] = None) -> str:
         # 운영 규칙: 이벤트 ID는 항상 "오늘 날짜(YYYYMMDD) + 2자리 일련번호"를 사용한다.
         # event_at 값은 표시용으로만 쓰고, ID 날짜 접두에는 반영하지 않는다.
@@ -887,43 +1407,3 @@ class CommentDatabase:
             print(f"DEBUG: [next_event_id] Supabase: {e}")
 
         return f"{prefix}{(max_serial + 1):02d}"
-
-    def next_event_code(self) -> str:
-        return self.next_event_id(None)
-
-    def create_internal_event(
-        self, template_key: str = None, event_at_iso: Optional[str] = None
-    ) -> Optional[str]:
-        title, prizes, memo, winners = "새 룰렛 이벤트", "", "", ""
-        allow_duplicates, allowed_list_str = False, None
-        template_event_at = event_at_iso
-        if template_key:
-            _, _, _, t0, pr, m0, w0, ad0, al0, ea0 = self.get_data(template_key)
-            title = (t0 or "이벤트").strip() + " (복사)"
-            prizes = pr or ""
-            memo = m0 or ""
-            winners = ""
-            allow_duplicates = bool(ad0) if ad0 is not None else False
-            allowed_list_str = al0
-            if template_event_at is None:
-                template_event_at = ea0
-        key = self.next_event_id(template_event_at)
-        save_event_at = template_event_at or datetime.now().replace(microsecond=0).isoformat()
-        ok_save, _ = self.save_data_blocking(
-            key,
-            None,
-            "",
-            title=title,
-            prizes=prizes,
-            memo=memo,
-            winners=winners,
-            allow_duplicates=allow_duplicates,
-            allowed_list=allowed_list_str,
-            event_at=save_event_at,
-        )
-        if not ok_save:
-            return None
-        ok_act, _ = self.set_active_event_id_blocking(key)
-        if not ok_act:
-            return None
-        return key
@@ -0,0 +1,486 @@
+"""
+지난 이벤트 보관(아카이브): 오래된 이벤트를 이벤트별 압축 파일로 옮기고 hot 테이블(posts/participants/commenters)에서 지운다.
+
+- EventArchive: <dir>/<이벤트>.<해시>.json.gz 파일 + index.json(이벤트별 목록 행 1개).
+  다른 프로세스(archive_events.py)가 index 를 바꾸면 mtime 을 보고 다시 읽는다.
+- attach_archive(storage, archive): create_storage() 가 붙인다.
+  · 조회(get_data / get_many / list_events / get_all_event_ids): 보관된 이벤트는 파일에서 돌려준다 (DB 조회 없음).
+  · 쓰기(save_data, 당첨 확정 등): 보관된 이벤트면 먼저 hot 테이블로 복원한 뒤 원래 쓰기를 한다.
+    복원은 이벤트별 락 안에서 한 번만 하고, 실패하면 쓰기를 하지 않는다 (*_blocking 은 (False, 오류) 반환).
+- archive_cold_events(): 오래된 이벤트를 골라 파일 → index 등록 → hot 테이블 삭제 순서로 옮긴다.
+  삭제가 실패하면 index 에서 다시 빼서 hot 테이블 쪽을 그대로 쓴다.
+  posts 행을 지우면 winners_cleanup_post 트리거가 당첨 기록(winners 테이블)도 지우므로, 기록 행(라운드·각도·시각)을
+  문서의 winners_log 에 함께 담고 복원 때 import_winners_blocking 으로 다시 넣는다.
+
+ROULETTE_ARCHIVE_DIR 는 재배포에도 남는 디스크여야 한다 (보관된 이벤트의 유일한 사본).
+"""
+import functools
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .storage import (
+    EVENT_PAGE_MAX,
+    EventStorage,
+    EventTuple,
+    _event_tuple,
+    event_sort_key,
+    get_many_fields,
+    split_winners,
+    trim_event_tuple,
+)
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 보관 파일 디렉터리
+_ARCHIVE_DIR = os.getenv("ROULETTE_ARCHIVE_DIR", os.path.join(_BASE_DIR, "event_archive"))
+# archive_events.py 기본 기준: 이벤트 날짜·마지막 수정이 모두 이 일수보다 오래된 이벤트
+ARCHIVE_AFTER_DAYS = int(os.getenv("ROULETTE_ARCHIVE_AFTER_DAYS", "30"))
+# 다른 프로세스가 바꾼 index.json 을 확인하는 최소 간격(초)
+_INDEX_RECHECK_SEC = 2.0
+# 최근 읽은 보관 문서를 메모리에 두는 개수
+_DOC_CACHE_SIZE = 16
+
+_ARCHIVE_FORMAT = 1
+
+# 쓰기 전에 복원이 필요한 메서드 (첫 인자가 event_id)
+_RESTORE_BEFORE = (
+    "save_data",
+    "save_data_blocking",
+    "clear_data",
+    "clear_data_blocking",
+    "delete_participant",
+    "set_active_event_id",
+    "set_active_event_id_blocking",
+    "update_timestamp",
+    "append_winner",
+    "confirm_winner",
+    "delete_winner_blocking",
+    "clear_winners_blocking",
+    "import_winners_blocking",
+)
+
+
+def _file_name(event_id: str) -> str:
+    # 카페 URL 키도 파일명이 되도록 치환 + 충돌 방지 해시
+    readable = re.sub(r"[^0-9A-Za-z._-]+", "_", event_id).strip("._")[:80] or "event"
+    return f"{readable}.{hashlib.sha1(event_id.encode('utf-8')).hexdigest()[:8]}.json.gz"
+
+
+def _date10(value: Any) -> str:
+    """ISO/SQLite 시각 문자열 → 'YYYY-MM-DD' (문자열 비교용). 모르면 ''."""
+    s = str(value or "").strip()
+    return s[:10] if len(s) >= 10 and s[4] == "-" and s[7] == "-" else ""
+
+
+def event_doc(
+    event_id: str, data: EventTuple, updated_at: Any = None, winner_rows: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """get_data 튜플 (+ get_winners 행) → 보관 문서."""
+    participants, last_id, commenters, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at = data
+    p_rows = []
+    for author, v in (participants or {}).items():
+        if isinstance(v, (tuple, list)):
+            p_rows.append({"author": author, "count": v[0] if v else 1, "created_at": v[1] if len(v) > 1 else None})
+        else:
+            p_rows.append({"author": author, "count": v, "created_at": None})
+    c_rows = [
+        {"author": c.get("name"), "created_at": c.get("created_at")} if isinstance(c, dict) else {"author": c, "created_at": None}
+        for c in (commenters or [])
+    ]
+    return {
+        "format": _ARCHIVE_FORMAT,
+        "event_id": event_id,
+        "archived_at": datetime.now().replace(microsecond=0).isoformat(),
+        "post": {
+            "last_comment_id": last_id,
+            "title": title,
+            "prizes": prizes,
+            "memo": memo,
+            "winners": winners,
+            "allow_duplicates": allow_duplicates,
+            "allowed_list": allowed_list,
+            "event_at": event_at,
+            "updated_at": updated_at,
+        },
+        "participants": p_rows,
+        "commenters": c_rows,
+        "winners_log": [
+            {k: w.get(k) for k in ("winner", "round_id", "angle", "created_at")} for w in (winner_rows or [])
+        ],
+    }
+
+
+def doc_winner_rows(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """복원할 당첨 기록 행. winners_log 가 없는 이전 보관 파일은 posts.winners 문자열로 만든다."""
+    rows = doc.get("winners_log")
+    if rows is None:
+        rows = [
+            {"winner": name, "round_id": None, "angle": None, "created_at": None}
+            for name in split_winners(doc["post"].get("winners"))
+        ]
+    return rows
+
+
+def doc_to_tuple(doc: Dict[str, Any], include_commenters: bool = True) -> EventTuple:
+    return _event_tuple(doc["post"], doc["participants"], doc["commenters"] if include_commenters else [])
+
+
+def index_row(doc: Dict[str, Any], file_name: str, size: int) -> Dict[str, Any]:
+    """list_events 행 모양 + 보관 정보."""
+    post = doc["post"]
+    return {
+        "id": doc["event_id"],
+        "event_at": post.get("event_at"),
+        "title": post.get("title"),
+        "updated_at": post.get("updated_at"),
+        "is_active": False,
+        "allow_duplicates": post.get("allow_duplicates"),
+        "participant_count": len(doc["participants"]),
+        "winner_count": len(split_winners(post.get("winners"))),
+        "archived": True,
+        "archived_at": doc["archived_at"],
+        "file": file_name,
+        "bytes": size,
+    }
+
+
+class EventArchive:
+    """보관 파일과 index. 스레드 안전."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or _ARCHIVE_DIR
+        self.index_path = os.path.join(self.directory, "index.json")
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._index_mtime = 0.0
+        self._checked_at = 0.0
+        self._docs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._event_locks: Dict[str, threading.RLock] = {}
+        self.reads = 0
+        self.doc_hits = 0
+        self._reload_index()
+
+    # ----- index -----
+    def _reload_index(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.index_path)
+        except OSError:
+            mtime = 0.0
+        if mtime == self._index_mtime:
+            return
+        index: Dict[str, Dict[str, Any]] = {}
+        if mtime:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    index = (json.load(f) or {}).get("events") or {}
+            except (OSError, ValueError) as e:
+                print(f"DEBUG: [archive] index read failed: {e}")
+                return
+        self._index = index
+        self._index_mtime = mtime
+        self._docs.clear()
+
+    def _fresh(self) -> None:
+        now = time.time()
+        if now - self._checked_at < _INDEX_RECHECK_SEC:
+            return
+        with self._lock:
+            self._checked_at = now
+            self._reload_index()
+
+    def _write_index(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": _ARCHIVE_FORMAT, "events": self._index}, f, ensure_ascii=False, indent=1, default=str)
+        os.replace(tmp, self.index_path)
+        self._index_mtime = os.path.getmtime(self.index_path)
+
+    def event_lock(self, event_id: str) -> threading.RLock:
+        """이벤트별 보관·복원 락 (같은 이벤트를 두 스레드가 동시에 옮기지 않게)."""
+        with self._lock:
+            lock = self._event_locks.get(str(event_id))
+            if lock is None:
+                lock = self._event_locks[str(event_id)] = threading.RLock()
+            return lock
+
+    def has(self, event_id: Optional[str]) -> bool:
+        if not event_id:
+            return False
+        self._fresh()
+        return str(event_id) in self._index
+
+    def event_ids(self) -> List[str]:
+        self._fresh()
+        return list(self._index.keys())
+
+    def list_rows(self, limit: int, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """보관 이벤트 목록 행 (event_sort_key 내림차순, before 커서 이후)."""
+        self._fresh()
+        with self._lock:
+            rows = [dict(r) for r in self._index.values()]
+        if before:
+            cursor = event_sort_key(before)
+            rows = [r for r in rows if event_sort_key(r["id"]) < cursor]
+        rows.sort(key=lambda r: event_sort_key(r["id"]), reverse=True)
+        for r in rows:
+            r["url"] = r["id"]
+        return rows[:limit]
+
+    # ----- 파일 -----
+    def write(self, event_id: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """파일만 쓴다 (index 미등록). commit() 전까지 조회 경로에는 보이지 않는다."""
+        os.makedirs(self.directory, exist_ok=True)
+        name = _file_name(event_id)
+        path = os.path.join(self.directory, name)
+        raw = json.dumps(doc, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(raw)
+        os.replace(tmp, path)
+        return index_row(doc, name, os.path.getsize(path))
+
+    def commit(self, event_id: str, row: Dict[str, Any]) -> None:
+        with self._lock:
+            self._reload_index()
+            self._index[str(event_id)] = row
+            self._write_index()
+
+    def forget(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """index 에서만 뺀다 (파일은 남김). 빠진 행을 돌려준다."""
+        with self._lock:
+            self._reload_index()
+            row = self._index.pop(str(event_id), None)
+            if row is not None:
+                self._write_index()
+            self._docs.pop(str(event_id), None)
+            return row
+
+    def discard_file(self, event_id: str) -> None:
+        try:
+            os.remove(os.path.join(self.directory, _file_name(str(event_id))))
+        except OSError:
+            pass
+
+    def read(self, event_id: str) -> Optional[Dict[str, Any]]:
+        ek = str(event_id)
+        with self._lock:
+            doc = self._docs.get(ek)
+            if doc is not None:
+                self._docs.move_to_end(ek)
+                self.doc_hits += 1
+                return doc
+        path = os.path.join(self.directory, _file_name(ek))
+        try:
+            with gzip.open(path, "rb") as f:
+                doc = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"DEBUG: [archive] read failed for {ek}: {e}")
+            return None
+        with self._lock:
+            self.reads += 1
+            self._docs[ek] = doc
+            while len(self._docs) > _DOC_CACHE_SIZE:
+                self._docs.popitem(last=False)
+        return doc
+
+    def stats(self) -> Dict[str, Any]:
+        self._fresh()
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "events": len(self._index),
+                "bytes": sum(int(r.get("bytes") or 0) for r in self._index.values()),
+                "reads": self.reads,
+                "doc_hits": self.doc_hits,
+            }
+
+
+def restore_event(storage: EventStorage, archive: EventArchive, event_id: str) -> Tuple[bool, Optional[str]]:
+    """보관 이벤트를 hot 테이블로 되돌린다 (posts·참가자·댓글 → 당첨 기록). 성공하면 파일을 지우고, 실패하면 index 를 되돌린다."""
+    doc = archive.read(event_id)
+    if doc is None:
+        return False, f"archive file missing for {event_id}"
+    row = archive.forget(event_id)
+    post = doc["post"]
+    participants = {p["author"]: (p.get("count"), p.get("created_at")) for p in doc["participants"]}
+    commenters = [{"name": c["author"], "created_at": c.get("created_at")} for c in doc["commenters"]]
+    ok, err = storage.save_data_blocking(
+        event_id,
+        participants,
+        post.get("last_comment_id") or "",
+        all_commenters=commenters,
+        title=post.get("title"),
+        prizes=post.get("prizes"),
+        memo=post.get("memo"),
+        allow_duplicates=post.get("allow_duplicates"),
+        allowed_list=post.get("allowed_list"),
+        event_at=post.get("event_at"),
+    )
+    if ok:
+        # posts.winners 는 기록에서 만든다 (winners 테이블이면 INSERT 트리거, 아니면 문자열 저장)
+        ok, err = storage.import_winners_blocking(event_id, doc_winner_rows(doc))
+    if not ok:
+        if row is not None:
+            archive.commit(event_id, row)
+        print(f"DEBUG: [archive] restore failed for {event_id}: {err}")
+        return False, err
+    archive.discard_file(event_id)
+    print(f"DEBUG: [archive] restored {event_id} ({len(participants)} participants)")
+    return True, None
+
+
+def attach_archive(storage: EventStorage, archive: EventArchive) -> EventStorage:
+    """storage 인스턴스의 조회·쓰기 메서드를 보관 이벤트를 아는 래퍼로 바꾼다 (instrument_storage 와 같은 방식)."""
+    get_data = storage.get_data
+    get_post_snapshot = storage.get_post_snapshot
+    get_many = storage.get_many
+    list_events = storage.list_events
+    get_all_event_ids = storage.get_all_event_ids
+    clear_data_blocking = storage.clear_data_blocking
+
+    def archived_get_data(event_id: str, include_commenters: bool = True) -> EventTuple:
+        if archive.has(event_id):
+            doc = archive.read(event_id)
+            if doc is not None:
+                return doc_to_tuple(doc, include_commenters)
+        return get_data(event_id, include_commenters=include_commenters)
+
+    def archived_get_post_snapshot(event_id: str) -> Tuple:
+        if archive.has(event_id):
+            doc = archive.read(event_id)
+            if doc is not None:
+                _, last_id, _, title, prizes, memo, winners, allow_dup, allowed_list, event_at = doc_to_tuple(doc, False)
+                return (last_id, title, prizes, memo, winners, allow_dup, allowed_list, event_at)
+        return get_post_snapshot(event_id)
+
+    def archived_get_many(event_ids: Iterable[str], fields: Optional[Iterable[str]] = None) -> Dict[str, EventTuple]:
+        wanted = get_many_fields(fields)
+        ids = list(dict.fromkeys(str(e) for e in event_ids if e))
+        cold = [e for e in ids if archive.has(e)]
+        out = get_many([e for e in ids if e not in cold], fields=fields) if len(cold) < len(ids) else {}
+        for ek in cold:
+            doc = archive.read(ek)
+            if doc is not None:
+                out[ek] = trim_event_tuple(doc_to_tuple(doc, "commenters" in wanted), wanted)
+        return out
+
+    def archived_list_events(limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        limit = max(1, min(int(limit), EVENT_PAGE_MAX))
+        rows = list_events(limit, before)
+        extra = archive.list_rows(limit, before)
+        if not extra:
+            return rows
+        # 두 목록 모두 같은 커서 이후 상위 limit 개라 합쳐서 다시 자르면 전체의 상위 limit 개가 된다
+        merged = rows + extra
+        merged.sort(key=lambda r: event_sort_key(r.get("id")), reverse=True)
+        return merged[:limit]
+
+    def archived_event_ids() -> List[str]:
+        return list(dict.fromkeys(list(get_all_event_ids()) + archive.event_ids()))
+
+    def restoring(fn, name: str):
+        blocking = name.endswith("_blocking")
+
+        @functools.wraps(fn)
+        def wrapper(event_id, *args, **kwargs):
+            if event_id and archive.has(event_id):
+                ek = str(event_id)
+                with archive.event_lock(ek):
+                    # 락을 기다리는 동안 다른 스레드가 복원했으면 다시 넣지 않는다 (당첨 기록 중복 방지)
+                    if archive.has(ek):
+                        ok, err = restore_event(storage, archive, ek)
+                        if not ok:
+                            print(f"DEBUG: [archive] {name} skipped for {ek}: restore failed")
+                            return (False, f"restore: {err}") if blocking else None
+            return fn(event_id, *args, **kwargs)
+
+        return wrapper
+
+    storage.get_data = archived_get_data
+    storage.get_post_snapshot = archived_get_post_snapshot
+    storage.get_many = archived_get_many
+    storage.list_events = archived_list_events
+    storage.get_all_event_ids = archived_event_ids
+    for name in _RESTORE_BEFORE:
+        fn = getattr(storage, name, None)
+        if callable(fn):
+            setattr(storage, name, restoring(fn, name))
+    storage.archive = archive
+    # archive_cold_events 가 index 등록 뒤 hot 행을 지울 때 쓴다 (복원 래퍼를 거치지 않음)
+    storage.hot_clear_data_blocking = clear_data_blocking
+    return storage
+
+
+def archive_cold_events(
+    storage: EventStorage,
+    archive: EventArchive,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    이벤트 날짜(event_at)·마지막 수정(updated_at)·ID 날짜가 모두 기준일보다 이전이고 활성이 아닌 이벤트를 보관한다.
+    기준은 최소 1일 (오늘 날짜 ID 는 next_event_id 가 새로 내줄 수 있으므로 건드리지 않는다).
+    """
+    days = max(1, int(older_than_days))
+    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    active = storage.get_active_event_id()
+    storage.flush_writes()
+
+    candidates: List[Dict[str, Any]] = []
+    before: Optional[str] = None
+    while True:
+        rows = storage.list_events(EVENT_PAGE_MAX, before)
+        for r in rows:
+            ek = str(r.get("id") or "")
+            if not ek or r.get("archived") or r.get("is_active") or ek == active:
+                continue
+            dates = [_date10(r.get("event_at")), _date10(r.get("updated_at"))]
+            if len(ek) == 10 and ek.isdigit():
+                dates.append(f"{ek[:4]}-{ek[4:6]}-{ek[6:8]}")
+            known = [d for d in dates if d]
+            if known and max(known) < cutoff:
+                candidates.append(r)
+        if len(rows) < EVENT_PAGE_MAX:
+            break
+        before = rows[-1].get("id")
+    if limit is not None:
+        candidates = candidates[: max(0, int(limit))]
+
+    result: Dict[str, Any] = {"cutoff": cutoff, "candidates": len(candidates), "archived": [], "failed": [], "bytes": 0}
+    if dry_run:
+        result["archived"] = [r["id"] for r in candidates]
+        return result
+    for r in candidates:
+        ek = str(r["id"])
+        try:
+            data = storage.get_data(ek, include_commenters=True)
+            doc = event_doc(ek, data, updated_at=r.get("updated_at"), winner_rows=storage.get_winners(ek))
+            row = archive.write(ek, doc)
+        except Exception as e:
+            result["failed"].append({"id": ek, "error": f"export: {e}"})
+            continue
+        hot_clear = getattr(storage, "hot_clear_data_blocking", storage.clear_data_blocking)
+        with archive.event_lock(ek):
+            # index 먼저: 삭제 도중·직후의 조회도 보관 문서로 답하고, 쓰기는 락을 기다렸다가 복원 후 진행한다
+            archive.commit(ek, row)
+            ok, err = hot_clear(ek)
+            if not ok:
+                archive.forget(ek)
+                archive.discard_file(ek)
+        if not ok:
+            result["failed"].append({"id": ek, "error": f"delete: {err}"})
+            continue
+        result["archived"].append(ek)
+        result["bytes"] += row["bytes"]
+        print(f"DEBUG: [archive] {ek}: {row['participant_count']} participants, {row['bytes']} bytes")
+    return result
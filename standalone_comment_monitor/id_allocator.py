@@ -0,0 +1,95 @@
+"""정수 id 스키마용 hi-lo 채번기: DB(reserve_id_block RPC)에서 id 블록을 예약해 두고 메모리에서 나눠 준다."""
+import os
+import threading
+from typing import Any, Callable, Dict, List
+
+
+def block_start_from_rpc(data: Any) -> int:
+    """reserve_id_block 응답(스칼라 / [스칼라] / [{"reserve_id_block": n}]) → 블록 시작 id."""
+    if isinstance(data, list):
+        data = data[0] if data else None
+    if isinstance(data, dict):
+        data = next(iter(data.values()), None)
+    if data is None:
+        raise ValueError("reserve_id_block returned no value")
+    return int(data)
+
+
+class IdBlockAllocator:
+    """
+    테이블별 예약 블록 [next, end). 스레드 안전.
+    - 블록 예약은 DB 의 원자적 카운터가 맡으므로 여러 워커 프로세스가 같은 id 를 받지 않는다.
+    - fork 된 프로세스는 부모의 블록을 물려받으면 부모와 같은 id 를 내주게 되므로 버리고 새로 예약한다.
+    - 쓰이지 않은 블록 잔여분(재시작·fork)은 빈 번호로 남는다. id 는 유일성만 보장한다.
+    """
+
+    def __init__(self, block_size: int = 500):
+        self.block_size = max(1, int(block_size))
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, List[int]] = {}  # table -> [next, end)
+        self._pid = os.getpid()
+        self.reservations = 0
+        self.issued = 0
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            self._blocks = {}
+            self._pid = os.getpid()
+
+    def take(self, table: str, n: int) -> List[int]:
+        """예약된 블록에서 최대 n 개. 모자라면 있는 만큼만 돌려준다 (I/O 없음)."""
+        with self._lock:
+            self._check_pid()
+            blk = self._blocks.get(table)
+            if not blk or n <= 0:
+                return []
+            start = blk[0]
+            stop = min(blk[1], start + n)
+            blk[0] = stop
+            if stop >= blk[1]:
+                self._blocks.pop(table, None)
+            self.issued += stop - start
+            return list(range(start, stop))
+
+    def reserve_size(self, shortfall: int) -> int:
+        """모자란 개수를 채우고도 남도록 예약할 블록 크기."""
+        return max(self.block_size, int(shortfall))
+
+    def add_block(self, table: str, start: int, size: int) -> None:
+        with self._lock:
+            self._check_pid()
+            self.reservations += 1
+            # 동시에 예약한 다른 호출의 잔여분이 있으면 버려진다 (빈 번호가 될 뿐 중복은 없음)
+            self._blocks[table] = [int(start), int(start) + int(size)]
+
+    def allocate(self, table: str, n: int, reserve: Callable[[str, int], int]) -> List[int]:
+        """
+        n 개의 id. 블록이 모자라면 reserve(table, size) → 새 블록 시작 id 로 예약한다.
+        같은 테이블을 동시에 채번하는 스레드끼리 블록을 나눠 쓰도록 예약 뒤 다시 take 한다.
+        """
+        ids = self.take(table, n)
+        while len(ids) < n:
+            size = self.reserve_size(n - len(ids))
+            start = reserve(table, size)
+            self.add_block(table, start, size)
+            ids.extend(self.take(table, n - len(ids)))
+        return ids
+
+    def invalidate(self, table: str = None) -> None:
+        """id 충돌(외부에서 카운터를 건너뛰어 넣은 행 등)이 의심될 때 남은 블록을 버린다."""
+        with self._lock:
+            if table is None:
+                self._blocks.clear()
+            else:
+                self._blocks.pop(table, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "block_size": self.block_size,
+                "reservations": self.reservations,
+                "issued": self.issued,
+                "remaining": {t: b[1] - b[0] for t, b in self._blocks.items()},
+            }
@@ -0,0 +1,296 @@
+"""
+프로세스 내 지연/호출 지표와 Prometheus 텍스트 출력 (/metrics). 외부 패키지 없이 동작한다.
+
+- 저장소 메서드 호출: roulette_storage_call_seconds{backend, method, outcome}
+- Supabase HTTP 요청: roulette_supabase_request_seconds{table, op, outcome} (BreakerTransport 에서 기록)
+- Flask 라우트: roulette_http_request_seconds{endpoint, method, status}
+- Socket.IO 핸들러: roulette_socketio_event_seconds{event, outcome} + 접속 수 게이지
+- 캐시 적중률·쓰기 큐·복제본·서킷 상태는 수집 시점에 저장소 stats() 에서 읽는다 (collector).
+
+지표는 프로세스별이다. gunicorn 워커가 1개(gunicorn_config.py)라 그대로 전체 값이 된다.
+"""
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 초 단위 히스토그램 경계 (Supabase 왕복 수십 ms ~ 타임아웃 수 초)
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# collector 가 돌려주는 한 지표: (이름, 타입, 설명, [(라벨 dict, 값)])
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: Sequence[Any]) -> Tuple[str, ...]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labelvalues)}")
+        return tuple(str(v) for v in labelvalues)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._render_samples()
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labelvalues: Any) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = _DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, seconds: float, *labelvalues: Any) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = [0.0] * (len(self.buckets) + 2)
+                self._series[key] = s
+            for i, le in enumerate(self.buckets):
+                if seconds <= le:
+                    s[i] += 1
+            s[-2] += seconds
+            s[-1] += 1
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        out: List[str] = []
+        for key, s in items:
+            for i, le in enumerate(self.buckets):
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, ('le', _num(le)))} {int(s[i])}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(s[-2])}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {int(s[-1])}")
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: List[_Metric] = []
+        self._collectors: Dict[str, Callable[[], Iterable[MetricFamily]]] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def set_collector(self, name: str, fn: Callable[[], Iterable[MetricFamily]]) -> None:
+        """수집 시점에 값을 읽어 오는 함수 등록 (캐시·큐 stats 처럼 이미 다른 곳에서 세고 있는 값). 같은 name 은 교체."""
+        with self._lock:
+            self._collectors[name] = fn
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        for fn in collectors:
+            try:
+                families = list(fn())
+            except Exception as e:
+                print(f"DEBUG: [metrics] collector error: {e}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_num(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STORAGE_CALL_SECONDS = REGISTRY.register(
+    Histogram(
+        "roulette_storage_call_seconds",
+        "EventStorage method latency by backend, method and outcome (ok|fail|error).",
+        ("backend", "method", "outcome"),
+    )
+)
+SUPABASE_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "roulette_supabase_request_seconds",
+        "Supabase (PostgREST) HTTP request latency by table, operation and outcome.",
+        ("table", "op", "outcome"),
+    )
+)
+HTTP_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "roulette_http_request_seconds",
+        "Flask route latency by endpoint, method and status.",
+        ("endpoint", "method", "status"),
+    )
+)
+SOCKET_EVENT_SECONDS = REGISTRY.register(
+    Histogram(
+        "roulette_socketio_event_seconds",
+        "Socket.IO handler latency by event and outcome (ok|error).",
+        ("event", "outcome"),
+    )
+)
+SOCKET_CONNECTED = REGISTRY.register(Gauge("roulette_socketio_connected_clients", "Connected Socket.IO clients."))
+SOCKET_CONNECTED.set(0)
+
+
+def observe_supabase_request(key: str, seconds: float, outcome: str) -> None:
+    """key: circuit_breaker.request_key 형식 "<table>:<op>"."""
+    table, _, op = key.rpartition(":")
+    SUPABASE_REQUEST_SECONDS.observe(seconds, table or key, op, outcome)
+
+
+def _call_outcome(result: Any) -> str:
+    # blocking 쓰기는 예외 대신 (False, 오류) 를 돌려준다.
+    if isinstance(result, tuple) and len(result) == 2 and result[0] is False:
+        return "fail"
+    return "ok"
+
+
+def _timed_method(fn: Callable, backend: str, method: str) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        outcome = "error"
+        try:
+            result = fn(*args, **kwargs)
+            outcome = _call_outcome(result)
+            return result
+        finally:
+            STORAGE_CALL_SECONDS.observe(time.perf_counter() - t0, backend, method, outcome)
+
+    return wrapper
+
+
+def instrument_storage(storage: Any, methods: Iterable[str]) -> Any:
+    """storage 인스턴스의 공개 메서드를 시간 측정 래퍼로 바꾸고, stats 기반 collector 를 등록한다."""
+    backend = getattr(storage, "backend", type(storage).__name__)
+    for name in methods:
+        fn = getattr(storage, name, None)
+        if callable(fn):
+            setattr(storage, name, _timed_method(fn, backend, name))
+    REGISTRY.set_collector("storage", lambda: storage_families(storage))
+    return storage
+
+
+def timed_socket_event(event: str) -> Callable[[Callable], Callable]:
+    """Socket.IO 핸들러 지연 측정. @socketio.on(...) 바로 아래에 붙인다."""
+
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                SOCKET_EVENT_SECONDS.observe(time.perf_counter() - t0, event, outcome)
+
+        return wrapper
+
+    return deco
+
+
+def storage_families(storage: Any) -> List[MetricFamily]:
+    """저장소 stats() 들 → 지표. 백엔드에 없는 항목(None)은 건너뛴다."""
+    out: List[MetricFamily] = []
+    cache = storage.snapshot_cache_stats()
+    if cache:
+        out.append(("roulette_snapshot_cache_hits_total", "counter", "Snapshot cache hits.", [({}, cache["hits"])]))
+        out.append(("roulette_snapshot_cache_misses_total", "counter", "Snapshot cache misses.", [({}, cache["misses"])]))
+        out.append(
+            ("roulette_snapshot_cache_hit_ratio", "gauge", "Snapshot cache hit ratio.", [({}, cache["hit_ratio"])])
+        )
+        out.append(("roulette_snapshot_cache_entries", "gauge", "Cached event snapshots.", [({}, cache["entries"])]))
+    queue = storage.write_queue_stats()
+    if queue:
+        if "depth" in queue:
+            out.append(("roulette_write_queue_depth", "gauge", "Pending write-behind operations.", [({}, queue["depth"])]))
+        samples = [({"result": k}, queue[k]) for k in ("completed", "failed", "coalesced", "retries") if k in queue]
+        out.append(("roulette_write_queue_ops_total", "counter", "Write-behind operations by result.", samples))
+    replica = storage.replica_stats()
+    if replica and "reads" in replica:
+        out.append(("roulette_replica_reads_total", "counter", "Reads served by the SQLite replica.", [({}, replica["reads"])]))
+    transport = storage.transport_stats()
+    breakers = (transport or {}).get("breakers")
+    if breakers:
+        states = [
+            ({"circuit": k, "state": st}, 1.0 if b["state"] == st else 0.0)
+            for k, b in breakers["circuits"].items()
+            for st in ("closed", "open", "half_open")
+        ]
+        out.append(("roulette_circuit_state", "gauge", "Circuit breaker state (1 for the current state).", states))
+        budget = breakers["retry_budget"]
+        out.append(
+            (
+                "roulette_retry_budget_total",
+                "counter",
+                "Retry budget decisions.",
+                [({"result": "granted"}, budget["granted"]), ({"result": "denied"}, budget["denied"])],
+            )
+        )
+    return out
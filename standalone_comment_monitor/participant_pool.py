@@ -0,0 +1,246 @@
+"""
+룰렛 참가자 풀: 이벤트 참가자 집합을 한 번만 정렬·정리해 두고 렌더/추첨/브로드캐스트가 같이 쓴다.
+
+- ParticipantPool: 불변. 이름(intern, 가나다순), 티켓 수 배열, 누적합(prefix), created_at.
+  중복 당첨 비허용이면 기당첨자는 만들 때 뺀다. 원판 배치(WheelLayout)·별칭 테이블도 풀마다 한 번만 만든다.
+- ParticipantPoolCache: 이벤트별 최근 풀. 참가자·당첨자·정책 내용이 같으면 다시 만들지 않는다.
+  (get_data 는 호출마다 컨테이너를 복사해 주므로 객체 동일성 대신 내용 지문으로 비교한다.)
+"""
+import sys
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from event_utils import parse_allowed_list_text
+
+from .spin_draw import AliasTable
+from .wheel_layout import WheelLayout
+
+# 이름이 이만큼을 넘으면 원판에는 이름 대신 번호를 쓴다 (load_participants 기존 규칙)
+NUMBERED_LABEL_THRESHOLD = 100
+
+
+def _is_hangul_char(ch: str) -> bool:
+    if not ch:
+        return False
+    code = ord(ch)
+    return (
+        0xAC00 <= code <= 0xD7A3  # Hangul Syllables
+        or 0x1100 <= code <= 0x11FF  # Hangul Jamo
+        or 0x3130 <= code <= 0x318F  # Hangul Compatibility Jamo
+        or 0xA960 <= code <= 0xA97F  # Hangul Jamo Extended-A
+        or 0xD7B0 <= code <= 0xD7FF  # Hangul Jamo Extended-B
+    )
+
+
+def ko_first_name_key(name: str):
+    """한글 이름을 영문/기타보다 먼저 정렬하기 위한 키."""
+    s = unicodedata.normalize("NFC", str(name or "").strip())
+    if not s:
+        return (2, "")
+    group = 0 if _is_hangul_char(s[0]) else 1
+    return (group, s.casefold())
+
+
+def ticket_count(v) -> int:
+    """participants dict 값: 스칼라 또는 (count, created_at) 등 튜플."""
+    if isinstance(v, (tuple, list)):
+        raw = v[0] if v else 0
+    else:
+        raw = v
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return 1
+
+
+def excludes_winners(allow_duplicates: Any) -> bool:
+    """중복 당첨 비허용 여부. 기존 `allow_duplicates != False` 정책 그대로 (None 은 허용)."""
+    return allow_duplicates == False  # noqa: E712 — 0 도 비허용으로 본다
+
+
+def _winner_names(winners: Optional[str], nfc: bool) -> FrozenSet[str]:
+    names = (w.strip() for w in str(winners or "").split(","))
+    if nfc:
+        names = (unicodedata.normalize("NFC", w) for w in names)
+    return frozenset(w for w in names if w)
+
+
+class ParticipantPool:
+    """가나다순으로 정렬된 참가자 열. 만든 뒤에는 바꾸지 않는다 (여러 요청·스레드가 같이 읽음)."""
+
+    __slots__ = ("names", "tickets", "prefix", "created_at", "total", "_pairs", "_rows", "_name_set", "_layout", "_name_layout", "_alias")
+
+    def __init__(self, entries: Iterable[Tuple[str, int, Any]]):
+        ordered = sorted(entries, key=lambda e: ko_first_name_key(e[0]))
+        self.names: Tuple[str, ...] = tuple(sys.intern(str(e[0])) for e in ordered)
+        self.tickets = array("q", (int(e[1]) for e in ordered))
+        self.created_at: Tuple[Any, ...] = tuple(e[2] for e in ordered)
+        # prefix[i] = 앞의 i 명 티켓 합. prefix[-1] == total
+        self.prefix = array("q", [0])
+        acc = 0
+        for t in self.tickets:
+            acc += t
+            self.prefix.append(acc)
+        self.total = acc
+        self._pairs: Optional[Tuple[Tuple[str, int], ...]] = None
+        self._rows: Optional[Tuple[Tuple[str, int, Any], ...]] = None
+        self._name_set: Optional[FrozenSet[str]] = None
+        self._layout: Optional[WheelLayout] = None
+        self._name_layout: Optional[WheelLayout] = None
+        self._alias: Optional[AliasTable] = None
+
+    @classmethod
+    def from_participants(
+        cls, participants: Optional[Dict[str, Any]], winners: Optional[str] = "", allow_duplicates: Any = True
+    ) -> "ParticipantPool":
+        """participants 테이블 dict(이름 → (count, created_at)). 중복 비허용이면 기당첨자 제외."""
+        skip = _winner_names(winners, nfc=False) if excludes_winners(allow_duplicates) else frozenset()
+        return cls(
+            (name, ticket_count(v), v[1] if isinstance(v, (tuple, list)) and len(v) > 1 else None)
+            for name, v in (participants or {}).items()
+            if name not in skip
+        )
+
+    @classmethod
+    def from_allowed(
+        cls, allowed: Optional[Dict[str, Any]], winners: Optional[str] = "", allow_duplicates: Any = True
+    ) -> "ParticipantPool":
+        """사전 명단 dict(이름 → 티켓 수). 이름은 NFC 정규화."""
+        skip = _winner_names(winners, nfc=True) if excludes_winners(allow_duplicates) else frozenset()
+        entries = []
+        for name, tickets in (allowed or {}).items():
+            nm = unicodedata.normalize("NFC", str(name).strip())
+            if nm in skip:
+                continue
+            try:
+                t = int(tickets)
+            except (TypeError, ValueError):
+                t = 1
+            entries.append((nm, t, None))
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def pairs(self) -> List[Tuple[str, int]]:
+        """[(이름, 티켓 수), ...] — 소켓 update_participants / 원판 동기화용."""
+        if self._pairs is None:
+            self._pairs = tuple(zip(self.names, self.tickets))
+        return list(self._pairs)
+
+    def roulette_rows(self) -> List[Tuple[str, int, Any]]:
+        """[(원판 표시 이름, 티켓 수, created_at), ...]. NUMBERED_LABEL_THRESHOLD 명을 넘으면 이름 대신 1부터 번호."""
+        if self._rows is None:
+            if len(self.names) > NUMBERED_LABEL_THRESHOLD:
+                labels: Iterable[str] = (str(i + 1) for i in range(len(self.names)))
+            else:
+                labels = self.names
+            self._rows = tuple(zip(labels, self.tickets, self.created_at))
+        return list(self._rows)
+
+    def name_set(self) -> FrozenSet[str]:
+        if self._name_set is None:
+            self._name_set = frozenset(self.names)
+        return self._name_set
+
+    def layout(self, numbered: bool = True) -> WheelLayout:
+        """원판 배치. numbered=True: roulette_rows() 표시 이름 그대로 (스핀 당첨자 계산·start_game 용).
+        numbered=False: 실제 이름 (pairs() 와 같은 명단 — update_participants / game_status 용).
+        NUMBERED_LABEL_THRESHOLD 이하이면 둘은 같은 객체다.
+        """
+        if self._layout is None:
+            labels = [r[0] for r in self.roulette_rows()]
+            self._layout = WheelLayout(labels, self.tickets)
+            self._name_layout = (
+                self._layout if len(self.names) <= NUMBERED_LABEL_THRESHOLD else WheelLayout(self.names, self.tickets)
+            )
+        return self._layout if numbered else self._name_layout
+
+    def alias_table(self) -> AliasTable:
+        """티켓 가중치 별칭 테이블 (ROULETTE_DRAW_MODE=alias 추첨용). 칸 번호 = layout() 섹터 번호."""
+        if self._alias is None:
+            self._alias = AliasTable(self.tickets)
+        return self._alias
+
+
+def _fingerprint(source: Optional[Dict[str, Any]], winners: Optional[str], exclude: bool) -> Tuple:
+    # 당첨자 문자열은 제외 정책일 때만 결과에 영향을 준다
+    items = tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in (source or {}).items())
+    return (len(items), hash(items), str(winners or "") if exclude else "")
+
+
+class ParticipantPoolCache:
+    """(종류, 이벤트, 당첨자 제외 여부) 별 마지막 풀 1개. 최근 max_events 개만 유지. 스레드 안전.
+
+    당첨자 제외 여부를 키에 넣어 원판용(제외) 풀과 명단 표시용(전체) 풀이 서로 밀어내지 않게 한다.
+    """
+
+    def __init__(self, max_events: int = 64):
+        self.max_events = max(1, int(max_events))
+        self._lock = threading.Lock()
+        self._pools: "OrderedDict[Tuple[str, str, bool], Tuple[Tuple, ParticipantPool]]" = OrderedDict()
+        self.hits = 0
+        self.builds = 0
+
+    def _get(self, kind: str, event_id: Optional[str], source, winners, allow_duplicates) -> ParticipantPool:
+        exclude = excludes_winners(allow_duplicates)
+        fp = _fingerprint(source, winners, exclude)
+        key = (kind, str(event_id or ""), exclude)
+        with self._lock:
+            hit = self._pools.get(key)
+            if hit is not None and hit[0] == fp:
+                self._pools.move_to_end(key)
+                self.hits += 1
+                return hit[1]
+        build = ParticipantPool.from_allowed if kind == "allowed" else ParticipantPool.from_participants
+        pool = build(source, winners, allow_duplicates)
+        with self._lock:
+            self.builds += 1
+            self._pools[key] = (fp, pool)
+            self._pools.move_to_end(key)
+            while len(self._pools) > self.max_events:
+                self._pools.popitem(last=False)
+        return pool
+
+    def for_participants(
+        self, event_id: Optional[str], participants: Optional[Dict[str, Any]], winners: Optional[str] = "", allow_duplicates: Any = True
+    ) -> ParticipantPool:
+        return self._get("participants", event_id, participants, winners, allow_duplicates)
+
+    def for_allowed(
+        self, event_id: Optional[str], allowed: Optional[Dict[str, Any]], winners: Optional[str] = "", allow_duplicates: Any = True
+    ) -> ParticipantPool:
+        return self._get("allowed", event_id, allowed, winners, allow_duplicates)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"events": len(self._pools), "hits": self.hits, "builds": self.builds}
+
+
+def event_pool(
+    db, event_id: Optional[str], pools: Optional[ParticipantPoolCache] = None
+) -> Tuple[Optional[ParticipantPool], str, int]:
+    """이벤트의 룰렛 풀 (load_participants 규칙): 확정 참가자, 없으면 사전 명단(allowed_list).
+
+    (풀 또는 None, 출처 'participants' | 'allowed' | '', 당첨자 제외 전 인원). pools 가 있으면 캐시를 거친다.
+    """
+    if not event_id:
+        return None, "", 0
+    participants, _, _, _, _, _, winners, allow_duplicates, allowed_text, _ = db.get_data(event_id)
+    if participants:
+        if pools is not None:
+            pool = pools.for_participants(event_id, participants, winners, allow_duplicates)
+        else:
+            pool = ParticipantPool.from_participants(participants, winners, allow_duplicates)
+        return pool, "participants", len(participants)
+    allowed = parse_allowed_list_text(allowed_text) if allowed_text else {}
+    if allowed:
+        if pools is not None:
+            pool = pools.for_allowed(event_id, allowed, winners, allow_duplicates)
+        else:
+            pool = ParticipantPool.from_allowed(allowed, winners, allow_duplicates)
+        return pool, "allowed", len(allowed)
+    return None, "", 0
@@ -0,0 +1,91 @@
+"""이벤트별로 마지막으로 DB에 반영된 자식 행(participants/commenters) 상태. save 시 변경분만 보내기 위한 기준선."""
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+# 작성자 정규화 키 → {"author": 원본 작성자, "id", "count", "created_at"}
+RowMap = Dict[str, Dict[str, Any]]
+
+
+class PersistedRowState:
+    """
+    (table, event_id) → 마지막으로 확인된 원격 행 상태.
+    - 조회(get_data)나 저장 직전 prefetch 결과로 채우고, 쓰기가 성공하면 변경분을 반영한다.
+    - 조회 도중 쓰기가 끼어들면(버전 불일치) 조회 결과로 덮어쓰지 않는다.
+    - 다른 프로세스의 변경을 오래 놓치지 않도록 TTL 이 지나면 버리고 다시 prefetch 한다.
+    """
+
+    def __init__(self, ttl_sec: float = 60.0):
+        self.ttl_sec = float(ttl_sec)
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Dict[str, Any]] = {}  # (table, event_id) -> {"ts", "rows"}
+        self._versions: Dict[str, int] = {}
+
+    def token(self, event_id: str) -> int:
+        """원격 조회 직전에 호출. 반환 토큰을 seed()에 넘긴다."""
+        with self._lock:
+            return self._versions.get(event_id, 0)
+
+    def get(self, table: str, event_id: str) -> Optional[RowMap]:
+        with self._lock:
+            entry = self._entries.get((table, event_id))
+            if not entry:
+                return None
+            if (time.time() - entry["ts"]) >= self.ttl_sec:
+                self._entries.pop((table, event_id), None)
+                return None
+            return {k: dict(v) for k, v in entry["rows"].items()}
+
+    def seed(self, table: str, event_id: str, rows: RowMap, token: Optional[int] = None) -> None:
+        with self._lock:
+            if token is not None and self._versions.get(event_id, 0) != token:
+                return
+            self._entries[(table, event_id)] = {
+                "ts": time.time(),
+                "rows": {k: dict(v) for k, v in rows.items()},
+            }
+
+    def apply(
+        self,
+        table: str,
+        event_id: str,
+        upserted: Optional[RowMap] = None,
+        deleted: Optional[Iterable[str]] = None,
+    ) -> None:
+        """쓰기 성공 후 호출. 기준선이 없으면 버전만 올린다."""
+        with self._lock:
+            self._versions[event_id] = self._versions.get(event_id, 0) + 1
+            entry = self._entries.get((table, event_id))
+            if not entry:
+                return
+            rows = entry["rows"]
+            for k in deleted or ():
+                rows.pop(k, None)
+            for k, v in (upserted or {}).items():
+                rows[k] = dict(v)
+
+    def reset(self, event_id: str) -> None:
+        """clear 직후: 자식 행이 하나도 없음을 안다."""
+        with self._lock:
+            self._versions[event_id] = self._versions.get(event_id, 0) + 1
+            now = time.time()
+            for table in ("participants", "commenters"):
+                self._entries[(table, event_id)] = {"ts": now, "rows": {}}
+
+    def invalidate(self, event_id: Optional[str] = None) -> None:
+        with self._lock:
+            if event_id is None:
+                for k in {ev for _t, ev in self._entries.keys()}:
+                    self._versions[k] = self._versions.get(k, 0) + 1
+                self._entries.clear()
+                return
+            self._versions[event_id] = self._versions.get(event_id, 0) + 1
+            for table in ("participants", "commenters"):
+                self._entries.pop((table, event_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "events": len({ev for _t, ev in self._entries.keys()}),
+                "rows": sum(len(e["rows"]) for e in self._entries.values()),
+            }
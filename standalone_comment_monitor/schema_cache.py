@@ -0,0 +1,62 @@
+"""Supabase 스키마 감지 결과(컬럼 유무·id 타입)를 로컬 파일에 보관해 재시작 시 프로브를 건너뛴다."""
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_MIGRATIONS_DIR = os.path.join(_BASE_DIR, "supabase", "migrations")
+
+# 파일 형식이 바뀌면 올린다 (이전 캐시는 자동 무시).
+_PROFILE_FORMAT = 1
+
+
+def schema_fingerprint(supabase_url: str) -> str:
+    """
+    스키마 지문: 프로젝트 URL + 배포된 마이그레이션 파일 목록.
+    새 마이그레이션이 추가되거나 다른 프로젝트를 가리키면 캐시가 무효가 된다.
+    """
+    h = hashlib.sha256()
+    h.update(f"v{_PROFILE_FORMAT}|{(supabase_url or '').strip()}".encode("utf-8"))
+    try:
+        for name in sorted(os.listdir(_MIGRATIONS_DIR)):
+            if name.endswith(".sql"):
+                h.update(b"|" + name.encode("utf-8"))
+    except OSError:
+        pass
+    return h.hexdigest()[:16]
+
+
+def load_schema_profile(path: str, fingerprint: str, ttl_sec: float) -> Optional[Dict[str, Any]]:
+    """지문이 같고 TTL 이내인 프로필만 돌려준다."""
+    if not path:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(doc, dict) or doc.get("fingerprint") != fingerprint:
+        return None
+    try:
+        age = time.time() - float(doc.get("saved_at", 0))
+    except (TypeError, ValueError):
+        return None
+    if age < 0 or age > ttl_sec:
+        return None
+    profile = doc.get("profile")
+    return profile if isinstance(profile, dict) else None
+
+
+def save_schema_profile(path: str, fingerprint: str, profile: Dict[str, Any]) -> None:
+    if not path:
+        return
+    doc = {"fingerprint": fingerprint, "saved_at": time.time(), "profile": profile}
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"DEBUG: [schema cache] save failed: {e}")
@@ -0,0 +1,209 @@
+"""이벤트별 get_data 스냅샷 write-through 캐시 (프로세스 메모리)."""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# get_data 반환 튜플과 동일한 순서
+SNAPSHOT_FIELDS = (
+    "participants",
+    "last_comment_id",
+    "commenters",
+    "title",
+    "prizes",
+    "memo",
+    "winners",
+    "allow_duplicates",
+    "allowed_list",
+    "event_at",
+)
+
+
+def empty_snapshot() -> Dict[str, Any]:
+    """posts 행이 없을 때 get_data 가 돌려주는 기본값과 동일한 스냅샷."""
+    return {
+        "participants": {},
+        "last_comment_id": None,
+        "commenters": [],
+        "title": None,
+        "prizes": None,
+        "memo": None,
+        "winners": "",
+        "allow_duplicates": False,
+        "allowed_list": None,
+        "event_at": None,
+    }
+
+
+def snapshot_from_tuple(data: Tuple, commenters_loaded: bool = True) -> Dict[str, Any]:
+    snap = dict(zip(SNAPSHOT_FIELDS, data))
+    snap["participants"] = dict(snap["participants"] or {})
+    snap["commenters"] = list(snap["commenters"] or []) if commenters_loaded else None
+    return snap
+
+
+def snapshot_to_tuple(snap: Dict[str, Any]) -> Tuple:
+    """호출부가 자유롭게 수정해도 캐시가 오염되지 않도록 컨테이너는 복사해서 돌려준다."""
+    out = dict(snap)
+    out["participants"] = dict(snap.get("participants") or {})
+    out["commenters"] = list(snap.get("commenters") or [])
+    return tuple(out[f] for f in SNAPSHOT_FIELDS)
+
+
+class EventSnapshotCache:
+    """
+    event_id → get_data 스냅샷.
+    - 로컬 쓰기(save/delete/clear)는 캐시에 즉시 반영(write-through)하고 버전을 올린다.
+    - 조회 도중 쓰기가 끼어들면(버전 불일치) 조회 결과는 버린다 → 쓰기 이후 읽기는 항상 쓰기를 본다.
+    - 백그라운드 쓰기가 진행 중인 이벤트는 TTL이 지나도 원격 값으로 덮어쓰지 않는다.
+    """
+
+    def __init__(self, ttl_sec: float = 5.0):
+        self.ttl_sec = float(ttl_sec)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}  # event_id -> {"ts", "snap"}
+        self._versions: Dict[str, int] = {}
+        self._pending_writes: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ----- 조회 -----
+    def version(self, event_id: str) -> int:
+        with self._lock:
+            return self._versions.get(event_id, 0)
+
+    def get(self, event_id: str, include_commenters: bool = True, allow_stale: bool = False) -> Optional[Tuple]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(event_id)
+            fresh = bool(entry) and (
+                allow_stale
+                or self._pending_writes.get(event_id, 0) > 0
+                or (now - entry["ts"]) < self.ttl_sec
+            )
+            if not fresh or (include_commenters and entry["snap"]["commenters"] is None):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return snapshot_to_tuple(entry["snap"])
+
+    def begin_fill(self, event_id: str) -> int:
+        """원격 조회 직전에 호출. 반환 토큰을 fill()에 넘긴다."""
+        return self.version(event_id)
+
+    def fill(self, event_id: str, token: int, data: Tuple, commenters_loaded: bool = True) -> None:
+        with self._lock:
+            if self._versions.get(event_id, 0) != token:
+                return
+            if self._pending_writes.get(event_id, 0) > 0:
+                return
+            self._entries[event_id] = {
+                "ts": time.time(),
+                "snap": snapshot_from_tuple(data, commenters_loaded),
+            }
+
+    # ----- 쓰기 반영 -----
+    def _bump(self, event_id: str) -> None:
+        self._versions[event_id] = self._versions.get(event_id, 0) + 1
+
+    def apply_save(
+        self,
+        event_id: str,
+        post_fields: Dict[str, Any],
+        participants: Optional[Dict[str, Tuple[Any, Any]]] = None,
+        commenters: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        save_data 와 같은 병합 규칙으로 캐시를 갱신한다.
+        post_fields: 값이 지정된(None 아님) posts 필드만.
+        participants: 작성자 → (count, created_at). 이벤트의 전체 참가자 집합으로 교체하되 기존 created_at 은 보존.
+        commenters: 추가된 댓글 작성자 [{"name", "created_at"}] (이미 있으면 무시).
+        캐시에 항목이 없으면 무효화만 한다.
+        """
+        with self._lock:
+            self._bump(event_id)
+            entry = self._entries.get(event_id)
+            if not entry:
+                return
+            snap = entry["snap"]
+            for k, v in post_fields.items():
+                if k in snap:
+                    snap[k] = v
+            if participants:
+                cur = snap["participants"]
+                nxt = {}
+                for author, (count, created_at) in participants.items():
+                    prev = cur.get(author)
+                    prev_ct = prev[1] if isinstance(prev, (tuple, list)) and len(prev) > 1 else None
+                    nxt[author] = (count, prev_ct if prev_ct is not None else created_at)
+                snap["participants"] = nxt
+            if commenters and snap["commenters"] is not None:
+                known = {c.get("name") for c in snap["commenters"] if isinstance(c, dict)}
+                for c in commenters:
+                    if c.get("name") not in known:
+                        snap["commenters"].append(dict(c))
+                        known.add(c.get("name"))
+
+    def apply_winner(self, event_id: str, winner: str) -> None:
+        """당첨자 1건 추가: winners 문자열 끝에 덧붙인다 (DB 트리거의 posts.winners 갱신과 같은 규칙)."""
+        with self._lock:
+            self._bump(event_id)
+            entry = self._entries.get(event_id)
+            if entry:
+                cur = entry["snap"].get("winners") or ""
+                entry["snap"]["winners"] = f"{cur},{winner}" if cur else winner
+
+    def apply_delete_participant(self, event_id: str, author: str) -> None:
+        with self._lock:
+            self._bump(event_id)
+            entry = self._entries.get(event_id)
+            if entry:
+                entry["snap"]["participants"].pop(author, None)
+
+    def apply_clear(self, event_id: str) -> None:
+        with self._lock:
+            self._bump(event_id)
+            self._entries[event_id] = {"ts": time.time(), "snap": empty_snapshot()}
+
+    def invalidate(self, event_id: Optional[str] = None) -> None:
+        with self._lock:
+            if event_id is None:
+                for k in list(self._entries.keys()):
+                    self._bump(k)
+                self._entries.clear()
+                return
+            self._bump(event_id)
+            self._entries.pop(event_id, None)
+
+    # ----- 백그라운드 쓰기 추적 -----
+    def begin_write(self, event_id: str) -> None:
+        with self._lock:
+            self._pending_writes[event_id] = self._pending_writes.get(event_id, 0) + 1
+
+    def has_pending_write(self, event_id: str) -> bool:
+        with self._lock:
+            return self._pending_writes.get(event_id, 0) > 0
+
+    def end_write(self, event_id: str, ok: bool) -> None:
+        with self._lock:
+            n = self._pending_writes.get(event_id, 0) - 1
+            if n > 0:
+                self._pending_writes[event_id] = n
+            else:
+                self._pending_writes.pop(event_id, None)
+            if not ok:
+                # 원격 반영 실패: 캐시에만 남은 값을 버리고 다음 조회에서 원격 상태를 다시 읽는다.
+                self._bump(event_id)
+                self._entries.pop(event_id, None)
+            elif event_id in self._entries:
+                self._entries[event_id]["ts"] = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+                "pending_writes": sum(self._pending_writes.values()),
+            }
@@ -0,0 +1,212 @@
+"""
+스핀 공정성 감사: 서버 추첨 경로를 NumPy 로 수백만 번 돌려 참가자별 당첨 횟수를 티켓 비율 기대값과 비교한다.
+
+스핀 1회 = handle_start_rotation 과 같은 계산
+    final_angle    = uniform(720, 1440)
+    relative_angle = (360 - final_angle % 360) % 360
+    winner         = WheelLayout 섹터 (ends 에 대해 bisect_right, 끝을 넘으면 0번)
+을 배열 단위로 한다 (np.searchsorted(side="right") == bisect_right). 난수는 NumPy PCG64 라서 서버의
+random.uniform(메르센 트위스터) 과 값은 다르지만 같은 균등분포이고, 섹터 판정은 배치의 경계 배열을 그대로 쓴다.
+결과 첫 몇 천 스핀은 WheelLayout.index_at 으로 한 번 더 계산해 두 경로가 같은지도 확인한다.
+
+mode="alias" 면 ParticipantPool.alias_table() 의 prob/alias 배열로 같은 별칭 추첨을 배열 단위로 하고,
+스칼라 draw_spin 몇 천 번으로 finalAngle 이 당첨자 섹터에 떨어지는지(landed) 확인한다.
+
+NumPy 는 선택 의존성이다 (없으면 SpinAuditUnavailable).
+"""
+import math
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from .participant_pool import ParticipantPool
+from .spin_draw import draw_spin, resolve_mode
+
+# 요청 한 번에 돌릴 수 있는 최대 스핀 수 (운영자 API). CLI 는 제한 없음.
+SPIN_AUDIT_MAX_SPINS = int(os.getenv("SPIN_AUDIT_MAX_SPINS", "5000000"))
+# 한 번에 만드는 난수 배열 크기 (메모리 ~ 배치 × 24 바이트)
+_BATCH = 1_000_000
+# 스칼라 경로와 대조할 스핀 수
+_CROSSCHECK_SPINS = 2000
+
+
+class SpinAuditUnavailable(RuntimeError):
+    """NumPy 가 설치되지 않음."""
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise SpinAuditUnavailable('spin audit needs numpy: pip install numpy')
+    return np
+
+
+def chi_square_sf(x: float, df: int) -> float:
+    """카이제곱 상위 꼬리 확률 P(X >= x) = Q(df/2, x/2) (정규화 상위 불완전 감마, SciPy 없이)."""
+    if df <= 0:
+        return float("nan")
+    if x <= 0:
+        return 1.0
+    a = df / 2.0
+    z = x / 2.0
+    log_front = a * math.log(z) - z - math.lgamma(a)
+    if z < a + 1.0:
+        # 급수: P(a, z), Q = 1 - P
+        term = total = 1.0 / a
+        n = a
+        for _ in range(100000):
+            n += 1.0
+            term *= z / n
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_front))
+    # 연분수 (Lentz): Q(a, z)
+    tiny = 1e-300
+    b = z + 1.0 - a
+    c = 1.0 / tiny
+    d = 1.0 / b
+    h = d
+    for i in range(1, 100000):
+        an = -i * (i - a)
+        b += 2.0
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return min(1.0, math.exp(log_front) * h)
+
+
+def simulate_wins(
+    pool: ParticipantPool, spins: int, seed: Optional[int] = None, mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """spins 번 추첨. {'mode', 'wins': 참가자별 당첨 수 ndarray, 'seconds', 'crosscheck_mismatches'}."""
+    np = _numpy()
+    layout = pool.layout()
+    n = len(layout)
+    mode = resolve_mode(n, mode) if layout.total else "angle"
+    wins = np.zeros(n, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    t0 = time.perf_counter()
+    if mode == "alias":
+        table = pool.alias_table()
+        prob = np.frombuffer(table.prob, dtype=np.int64)
+        alias = np.frombuffer(table.alias, dtype=np.int64)
+    else:
+        ends = np.frombuffer(layout.ends, dtype=np.float64) if len(layout.ends) else np.zeros(0)
+    done = 0
+    while done < spins:
+        size = min(_BATCH, spins - done)
+        if mode == "alias":
+            cell = rng.integers(0, n, size)
+            idx = np.where(rng.integers(0, table.total, size) < prob[cell], cell, alias[cell])
+        else:
+            final_angle = rng.uniform(720.0, 1440.0, size)
+            relative = (360.0 - np.mod(final_angle, 360.0)) % 360.0
+            if layout.total:
+                idx = np.searchsorted(ends, relative, side="right")
+                idx[idx >= n] = 0
+            else:
+                idx = np.zeros(size, dtype=np.int64)
+            if done == 0:
+                for a, i in zip(relative[:_CROSSCHECK_SPINS].tolist(), idx[:_CROSSCHECK_SPINS].tolist()):
+                    if layout.index_at(a) != i:
+                        mismatches += 1
+        wins += np.bincount(idx, minlength=n)
+        done += size
+    seconds = time.perf_counter() - t0
+    if mode == "alias":
+        scalar_rng = random.Random(seed)
+        mismatches = sum(1 for _ in range(_CROSSCHECK_SPINS) if not draw_spin(pool, "alias", scalar_rng).landed)
+    return {"mode": mode, "wins": wins, "seconds": seconds, "crosscheck_mismatches": mismatches}
+
+
+def audit_pool(
+    pool: ParticipantPool, spins: int, seed: Optional[int] = None, top: int = 10, mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """관측 당첨 수 vs 기대값(spins × 티켓 비율) 리포트. 카이제곱은 기대값 > 0 인 참가자만 쓴다.
+
+    mode 는 spin_draw 추첨 방식 (None 이면 ROULETTE_DRAW_MODE).
+    """
+    np = _numpy()
+    spins = max(1, int(spins))
+    n = len(pool)
+    report: Dict[str, Any] = {"participants": n, "tickets": int(pool.total), "spins": spins, "seed": seed}
+    if not n:
+        report["error"] = "no participants"
+        return report
+
+    sim = simulate_wins(pool, spins, seed, mode)
+    report["mode"] = sim["mode"]
+    wins = sim["wins"]
+    tickets = np.frombuffer(pool.tickets, dtype=np.int64).astype(np.float64)
+    # 기대 확률은 섹터 각도 비율 (= 티켓 비율). 티켓 합이 0 이면 서버는 항상 첫 번째 참가자.
+    if pool.total:
+        prob = tickets / float(pool.total)
+    else:
+        prob = np.zeros(n)
+        prob[0] = 1.0
+    expected = prob * spins
+    live = expected > 0
+    chi2 = float((((wins - expected) ** 2)[live] / expected[live]).sum())
+    df = int(live.sum()) - 1
+    z = np.zeros(n)
+    sd = np.sqrt(expected * (1.0 - prob))
+    ok = sd > 0
+    z[ok] = (wins[ok] - expected[ok]) / sd[ok]
+    dead_wins = int(wins[~live].sum())
+
+    labels = pool.layout().labels
+    order = np.argsort(-np.abs(z))[: max(0, int(top))]
+    worst: List[Dict[str, Any]] = [
+        {
+            "index": int(i),
+            "name": pool.names[i],
+            "label": labels[i],
+            "tickets": int(pool.tickets[i]),
+            "observed": int(wins[i]),
+            "expected": round(float(expected[i]), 3),
+            "z": round(float(z[i]), 3),
+        }
+        for i in order
+    ]
+
+    # 티켓 수별 묶음: 참가자가 많아 1인당 기대값이 작을 때도 "티켓 k 장의 1장당 당첨률" 은 비교할 수 있다
+    by_tickets = []
+    for t in np.unique(tickets):
+        sel = tickets == t
+        obs = int(wins[sel].sum())
+        exp = float(expected[sel].sum())
+        by_tickets.append({
+            "tickets": int(t),
+            "participants": int(sel.sum()),
+            "observed": obs,
+            "expected": round(exp, 3),
+            "ratio": round(obs / exp, 5) if exp else None,
+        })
+
+    min_expected = float(expected[live].min()) if live.any() else 0.0
+    report.update({
+        "chi_square": round(chi2, 4),
+        "df": df,
+        "p_value": chi_square_sf(chi2, df) if df > 0 else None,
+        # 기대값 5 미만 칸이 있으면 카이제곱 근사가 부정확 → 스핀 수를 늘리거나 by_tickets 를 본다
+        "min_expected": round(min_expected, 3),
+        "low_expected_cells": int((expected[live] < 5).sum()),
+        "max_abs_z": round(float(np.abs(z).max()), 3),
+        "zero_ticket_wins": dead_wins,
+        "crosscheck_mismatches": sim["crosscheck_mismatches"],
+        "seconds": round(sim["seconds"], 4),
+        "spins_per_sec": int(spins / sim["seconds"]) if sim["seconds"] > 0 else None,
+        "worst": worst,
+        "by_tickets": by_tickets,
+    })
+    return report
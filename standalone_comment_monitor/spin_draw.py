@@ -0,0 +1,111 @@
+"""
+스핀 추첨 방식.
+
+- angle (기본): 최종 회전 각도를 uniform(720, 1440) 으로 먼저 정하고, 화살표가 가리키는 섹터의 참가자가 당첨.
+- alias: 당첨자를 티켓 가중치 별칭 테이블(Walker/Vose)로 O(1) 에 먼저 뽑고, 그 참가자 섹터 안의 균등한 각도로
+  finalAngle 을 만든다 (클라이언트 애니메이션이 같은 섹터에 멈추도록). 정수 티켓으로 계산해 가중치가 정확하고,
+  섹터가 아주 얇아도 당첨 확률이 부동소수점 경계에 좌우되지 않는다.
+- auto: 참가자가 ROULETTE_ALIAS_MIN_ENTRANTS 명 이상이면 alias, 아니면 angle.
+
+두 방식 모두 당첨 확률은 티켓 비율이다. 별칭 테이블은 ParticipantPool.alias_table() 이 풀마다 한 번만 만든다.
+"""
+import os
+import random
+from array import array
+from typing import Iterable, NamedTuple, Optional
+
+# ROULETTE_DRAW_MODE=angle(기본)|alias|auto
+DRAW_MODE = (os.getenv("ROULETTE_DRAW_MODE") or "angle").strip().lower()
+ALIAS_MIN_ENTRANTS = int(os.getenv("ROULETTE_ALIAS_MIN_ENTRANTS", "100000"))
+DRAW_MODES = ("angle", "alias", "auto")
+
+
+class AliasTable:
+    """Vose 별칭 테이블 (정수 버전). 칸 i 를 고르고 r < prob[i] 이면 i, 아니면 alias[i]. r 은 [0, total) 정수.
+
+    weights[i] * n 을 total 과 비교하므로 확률이 정확히 weights[i] / total 이다.
+    """
+
+    __slots__ = ("prob", "alias", "total")
+
+    def __init__(self, weights: Iterable[int]):
+        scaled = array("q", (max(0, int(w)) for w in weights))
+        n = len(scaled)
+        self.total = sum(scaled)
+        self.prob = array("q", [self.total]) * n
+        self.alias = array("q", range(n))
+        if not n or not self.total:
+            return
+        for i in range(n):
+            scaled[i] *= n
+        small = [i for i in range(n) if scaled[i] < self.total]
+        large = [i for i in range(n) if scaled[i] >= self.total]
+        while small and large:
+            s = small.pop()
+            g = large[-1]
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= self.total - scaled[s]
+            if scaled[g] < self.total:
+                small.append(large.pop())
+        # 남은 칸은 자기 자신 100% (정수 계산이라 오차로 남는 칸은 없지만 방어적으로)
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng=random) -> int:
+        """당첨 칸 번호. 티켓 합이 0 이면 0 (angle 방식의 첫 번째 참가자 규칙과 같음)."""
+        n = len(self.prob)
+        if not n:
+            return -1
+        if not self.total:
+            return 0
+        i = rng.randrange(n)
+        return i if rng.randrange(self.total) < self.prob[i] else self.alias[i]
+
+
+class SpinResult(NamedTuple):
+    mode: str
+    index: int
+    winner: str
+    final_angle: float
+    relative_angle: float
+    # alias 방식에서 섹터가 float 해상도보다 좁아 finalAngle 이 정확히 그 섹터에 떨어지지 않은 경우 False
+    landed: bool
+
+
+def relative_angle_of(final_angle: float) -> float:
+    """화살표(12시 고정)가 가리키는 원판 각도. 원판이 시계 방향으로 돌면 화살표는 반시계로 이동한 효과."""
+    return (360 - (final_angle % 360)) % 360
+
+
+def resolve_mode(entrants: int, mode: Optional[str] = None) -> str:
+    m = (mode or DRAW_MODE or "angle").strip().lower()
+    if m == "auto":
+        return "alias" if entrants >= ALIAS_MIN_ENTRANTS else "angle"
+    return m if m in DRAW_MODES else "angle"
+
+
+def draw_spin(pool, mode: Optional[str] = None, rng=random) -> SpinResult:
+    """pool(ParticipantPool) 에서 한 번 추첨. 참가자가 없으면 index -1."""
+    layout = pool.layout()
+    mode = resolve_mode(len(layout), mode)
+    if mode != "alias" or not layout.total:
+        final_angle = rng.uniform(720, 1440)
+        relative = relative_angle_of(final_angle)
+        index = layout.index_at(relative)
+        return SpinResult("angle", index, layout.winner_at(relative), final_angle, relative, True)
+
+    index = pool.alias_table().draw(rng)
+    start, end = layout.sector(index)
+    # 섹터 안 균등 각도 → 원판 회전 각도 (2~4바퀴 범위 720~1440 유지)
+    target = start + rng.random() * (end - start)
+    final_angle = 720 + 360 * rng.randrange(2) + (360 - target) % 360
+    relative = relative_angle_of(final_angle)
+    landed = layout.index_at(relative) == index
+    if not landed:
+        # 왕복 계산 오차로 이웃 섹터에 걸리면 섹터 가운데로 (당첨자는 별칭 테이블 결과 그대로)
+        final_angle = 720 + 360 * rng.randrange(2) + (360 - (start + end) / 2) % 360
+        relative = relative_angle_of(final_angle)
+        landed = layout.index_at(relative) == index
+    return SpinResult("alias", index, layout.labels[index], final_angle, relative, landed)
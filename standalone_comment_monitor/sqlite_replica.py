@@ -0,0 +1,416 @@
+"""posts/participants/commenters 의 로컬 SQLite(WAL) 읽기 복제본. Supabase 가 원본이며 여기는 조회 전용 사본이다."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS posts (
+        event_id   TEXT PRIMARY KEY,
+        is_active  INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT,
+        data       TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS participants (
+        event_id   TEXT NOT NULL,
+        author     TEXT NOT NULL,
+        count      INTEGER,
+        created_at TEXT,
+        row_id     TEXT,
+        PRIMARY KEY (event_id, author)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS commenters (
+        event_id   TEXT NOT NULL,
+        author     TEXT NOT NULL,
+        created_at TEXT,
+        row_id     TEXT,
+        PRIMARY KEY (event_id, author)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_posts_updated_at ON posts (updated_at)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+# event_id 가 10자리 숫자(YYYYMMDDNN)인지 (storage.event_sort_key 와 같은 규칙)
+_NUMERIC_KEY_SQL = "(length(event_id) = 10 AND event_id NOT GLOB '*[^0-9]*')"
+
+
+def _row_id(v: Any) -> Optional[str]:
+    return None if v is None else str(v)
+
+
+def _restore_id(v: Optional[str]) -> Any:
+    """정수 id 는 정수로 되돌린다 (uuid 는 문자열 그대로)."""
+    if v is not None and v.isdigit():
+        return int(v)
+    return v
+
+
+class SQLiteReplica:
+    """
+    - 연결 1개 + 락. 조회는 로컬 파일 I/O 뿐이라 마이크로초 단위.
+    - 이벤트별 버전: 원격 조회 도중 로컬 쓰기가 반영되면(버전 불일치) 조회 결과로 덮어쓰지 않는다.
+    - gunicorn preload 후 fork 된 프로세스에서는 연결을 새로 연다 (pid 확인).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._versions: Dict[str, int] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self.reads = 0
+        self._open()
+
+    def _open(self) -> None:
+        d = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(d, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+        self._conn = conn
+        self._pid = os.getpid()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._lock = threading.RLock()
+            self._open()
+        return self._conn
+
+    # ----- 메타 -----
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: Optional[str]) -> None:
+        with self._lock:
+            self._db().execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def is_hydrated(self) -> bool:
+        return self.get_meta("hydrated_at") is not None
+
+    def version(self, event_id: str) -> int:
+        with self._lock:
+            return self._versions.get(event_id, 0)
+
+    def _bump(self, event_id: str) -> None:
+        self._versions[event_id] = self._versions.get(event_id, 0) + 1
+
+    # ----- 일괄 적재 -----
+    def hydrate(
+        self,
+        posts: Dict[str, Dict[str, Any]],
+        participants: Dict[str, List[Dict[str, Any]]],
+        commenters: Dict[str, List[Dict[str, Any]]],
+        cursor: Optional[str],
+    ) -> None:
+        """원격 전체 스냅샷으로 로컬 사본을 통째로 교체한다 (트랜잭션 1회)."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("DELETE FROM posts")
+                db.execute("DELETE FROM participants")
+                db.execute("DELETE FROM commenters")
+                for event_id, row in posts.items():
+                    self._put_post(db, event_id, row)
+                for event_id, rows in participants.items():
+                    self._put_participants(db, event_id, rows)
+                for event_id, rows in commenters.items():
+                    self._put_commenters(db, event_id, rows)
+                db.execute(
+                    "INSERT INTO meta (key, value) VALUES ('cursor', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (cursor,),
+                )
+                db.execute(
+                    "INSERT INTO meta (key, value) VALUES ('hydrated_at', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (str(time.time()),),
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            for event_id in set(posts) | set(participants) | set(commenters):
+                self._bump(event_id)
+
+    def store_event(
+        self,
+        event_id: str,
+        post_row: Dict[str, Any],
+        p_rows: List[Dict[str, Any]],
+        c_rows: Optional[List[Dict[str, Any]]],
+        token: Optional[int] = None,
+    ) -> bool:
+        """원격에서 다시 읽은 이벤트 1건으로 교체. c_rows=None 이면 commenters 는 그대로 둔다."""
+        with self._lock:
+            if token is not None and self._versions.get(event_id, 0) != token:
+                return False
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                self._put_post(db, event_id, post_row)
+                db.execute("DELETE FROM participants WHERE event_id = ?", (event_id,))
+                self._put_participants(db, event_id, p_rows)
+                if c_rows is not None:
+                    db.execute("DELETE FROM commenters WHERE event_id = ?", (event_id,))
+                    self._put_commenters(db, event_id, c_rows)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            self._bump(event_id)
+            return True
+
+    @staticmethod
+    def _put_post(db: sqlite3.Connection, event_id: str, row: Dict[str, Any]) -> None:
+        updated = row.get("updated_at")
+        db.execute(
+            "INSERT INTO posts (event_id, is_active, updated_at, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(event_id) DO UPDATE SET is_active = excluded.is_active, "
+            "updated_at = excluded.updated_at, data = excluded.data",
+            (
+                event_id,
+                1 if row.get("is_active") else 0,
+                None if updated is None else str(updated),
+                json.dumps(row, ensure_ascii=False, default=str),
+            ),
+        )
+
+    @staticmethod
+    def _put_participants(db: sqlite3.Connection, event_id: str, rows: List[Dict[str, Any]]) -> None:
+        db.executemany(
+            "INSERT INTO participants (event_id, author, count, created_at, row_id) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(event_id, author) DO UPDATE SET count = excluded.count, "
+            "created_at = COALESCE(participants.created_at, excluded.created_at), "
+            "row_id = COALESCE(excluded.row_id, participants.row_id)",
+            [
+                (event_id, r["author"], r.get("count"), r.get("created_at"), _row_id(r.get("id")))
+                for r in rows
+                if r.get("author") is not None
+            ],
+        )
+
+    @staticmethod
+    def _put_commenters(db: sqlite3.Connection, event_id: str, rows: List[Dict[str, Any]]) -> None:
+        db.executemany(
+            "INSERT INTO commenters (event_id, author, created_at, row_id) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(event_id, author) DO NOTHING",
+            [
+                (event_id, r["author"], r.get("created_at"), _row_id(r.get("id")))
+                for r in rows
+                if r.get("author") is not None
+            ],
+        )
+
+    # ----- 로컬 쓰기 반영 (원격 쓰기 성공 후) -----
+    def apply_save(
+        self,
+        event_id: str,
+        post_data: Dict[str, Any],
+        participants: Optional[List[Dict[str, Any]]] = None,
+        commenters: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        post_data: 원격에 보낸 posts 필드(기존 행에 병합).
+        participants: 전체 참가자 집합 [{"author","count","created_at"}] (없는 작성자는 삭제). None 이면 유지.
+        commenters: 추가된 댓글 작성자 (이미 있으면 무시).
+        """
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = db.execute("SELECT data FROM posts WHERE event_id = ?", (event_id,)).fetchone()
+                row = json.loads(cur[0]) if cur else {}
+                row.update(post_data)
+                self._put_post(db, event_id, row)
+                if participants is not None:
+                    keep = [r["author"] for r in participants]
+                    db.execute("CREATE TEMP TABLE IF NOT EXISTS _keep (author TEXT PRIMARY KEY)")
+                    db.execute("DELETE FROM _keep")
+                    db.executemany("INSERT OR IGNORE INTO _keep (author) VALUES (?)", [(a,) for a in keep])
+                    db.execute(
+                        "DELETE FROM participants WHERE event_id = ? AND author NOT IN (SELECT author FROM _keep)",
+                        (event_id,),
+                    )
+                    self._put_participants(db, event_id, participants)
+                if commenters:
+                    self._put_commenters(db, event_id, commenters)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            self._bump(event_id)
+
+    def delete_participant(self, event_id: str, author: str) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM participants WHERE event_id = ? AND author = ?", (event_id, author))
+            self._bump(event_id)
+
+    def append_winner(self, event_id: str, winner: str) -> None:
+        """posts.winners 끝에 덧붙인다 (원격 winners 트리거와 같은 규칙)."""
+        with self._lock:
+            db = self._db()
+            cur = db.execute("SELECT data FROM posts WHERE event_id = ?", (event_id,)).fetchone()
+            if not cur:
+                return
+            row = json.loads(cur[0])
+            w = row.get("winners") or ""
+            row["winners"] = f"{w},{winner}" if w else winner
+            self._put_post(db, event_id, row)
+            self._bump(event_id)
+
+    def clear_event(self, event_id: str, token: Optional[int] = None) -> bool:
+        """이벤트 행을 모두 지운다. token 이 있으면 그 사이 로컬 쓰기가 없었을 때만 (store_event 와 같은 규칙)."""
+        with self._lock:
+            if token is not None and self._versions.get(event_id, 0) != token:
+                return False
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("DELETE FROM participants WHERE event_id = ?", (event_id,))
+                db.execute("DELETE FROM commenters WHERE event_id = ?", (event_id,))
+                db.execute("DELETE FROM posts WHERE event_id = ?", (event_id,))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            self._bump(event_id)
+            return True
+
+    def set_active(self, event_id: Optional[str]) -> None:
+        with self._lock:
+            db = self._db()
+            rows = db.execute(
+                "SELECT event_id, data FROM posts WHERE is_active = 1 OR event_id = ?", (event_id,)
+            ).fetchall()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                for ek, data in rows:
+                    row = json.loads(data)
+                    row["is_active"] = ek == event_id
+                    self._put_post(db, ek, row)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    # ----- 조회 -----
+    def event_rows(
+        self, event_id: str, include_commenters: bool = True
+    ) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """(posts rows, participants rows, commenters rows). 로컬에 없는 이벤트면 None."""
+        with self._lock:
+            db = self._db()
+            cur = db.execute("SELECT data FROM posts WHERE event_id = ?", (event_id,)).fetchone()
+            if not cur:
+                return None
+            p_rows = [
+                {"author": a, "count": c, "created_at": ct, "id": _restore_id(rid)}
+                for a, c, ct, rid in db.execute(
+                    "SELECT author, count, created_at, row_id FROM participants WHERE event_id = ? ORDER BY rowid",
+                    (event_id,),
+                )
+            ]
+            c_rows: List[Dict[str, Any]] = []
+            if include_commenters:
+                c_rows = [
+                    {"author": a, "created_at": ct, "id": _restore_id(rid)}
+                    for a, ct, rid in db.execute(
+                        "SELECT author, created_at, row_id FROM commenters WHERE event_id = ? ORDER BY rowid",
+                        (event_id,),
+                    )
+                ]
+            self.reads += 1
+        return [json.loads(cur[0])], p_rows, c_rows
+
+    def list_event_page(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        이벤트 목록 한 페이지: 10자리 숫자 ID 최신순 → 레거시 키 순 (list_events_page RPC 와 같은 정렬/커서).
+        목록 컬럼 + participant_count / winner_count 만 돌려준다.
+        """
+        with self._lock:
+            db = self._db()
+            if before:
+                rows = db.execute(
+                    f"SELECT event_id, data FROM posts WHERE ({_NUMERIC_KEY_SQL}, event_id) < (?, ?) "
+                    f"ORDER BY {_NUMERIC_KEY_SQL} DESC, event_id DESC LIMIT ?",
+                    (int(len(before) == 10 and before.isdigit()), before, int(limit)),
+                ).fetchall()
+            else:
+                rows = db.execute(
+                    f"SELECT event_id, data FROM posts ORDER BY {_NUMERIC_KEY_SQL} DESC, event_id DESC LIMIT ?",
+                    (int(limit),),
+                ).fetchall()
+            ids = [r[0] for r in rows]
+            counts: Dict[str, int] = {}
+            if ids:
+                marks = ",".join("?" * len(ids))
+                counts = dict(
+                    db.execute(
+                        f"SELECT event_id, COUNT(*) FROM participants WHERE event_id IN ({marks}) GROUP BY event_id",
+                        ids,
+                    ).fetchall()
+                )
+            self.reads += 1
+        out: List[Dict[str, Any]] = []
+        for event_id, data in rows:
+            post = json.loads(data)
+            winners = [w for w in str(post.get("winners") or "").split(",") if w.strip()]
+            out.append(
+                {
+                    "id": event_id,
+                    "title": post.get("title"),
+                    "event_at": post.get("event_at"),
+                    "updated_at": post.get("updated_at"),
+                    "is_active": post.get("is_active"),
+                    "allow_duplicates": post.get("allow_duplicates"),
+                    "participant_count": counts.get(event_id, 0),
+                    "winner_count": len(winners),
+                }
+            )
+        return out
+
+    def event_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._db().execute("SELECT event_id FROM posts").fetchall()
+            self.reads += 1
+        return [r[0] for r in rows]
+
+    def active_event_id(self) -> Optional[str]:
+        with self._lock:
+            row = self._db().execute("SELECT event_id FROM posts WHERE is_active = 1 LIMIT 1").fetchone()
+            self.reads += 1
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            db = self._db()
+            posts = db.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+            parts = db.execute("SELECT COUNT(*) FROM participants").fetchone()[0]
+            comms = db.execute("SELECT COUNT(*) FROM commenters").fetchone()[0]
+        return {
+            "path": self.path,
+            "posts": posts,
+            "participants": parts,
+            "commenters": comms,
+            "reads": self.reads,
+            "cursor": self.get_meta("cursor"),
+            "hydrated_at": self.get_meta("hydrated_at"),
+            "last_pull_at": self.get_meta("last_pull_at"),
+        }
@@ -0,0 +1,630 @@
+"""
+이벤트 저장소 인터페이스와 로컬 구현.
+
+- EventStorage: comment_dart.py / operator_routes.py / event_utils.get_allowed_list 가 쓰는 메서드 모음.
+- CommentDatabase(db_handler.py): Supabase 구현 (운영 기본값).
+- InMemoryStorage: 프로세스 메모리. 네트워크 없이 소켓·렌더 경로를 프로파일링/부하 테스트할 때.
+- SQLiteStorage: 로컬 파일 하나. 소규모 현장용 오프라인 모드.
+
+ROULETTE_STORAGE=supabase|memory|sqlite 로 고르고 create_storage() 로 만든다.
+create_storage() 가 만든 저장소는 공개 메서드마다 지연 지표(metrics.py)를 남기고,
+보관된 지난 이벤트(event_archive.py)는 압축 파일에서 읽는다.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from event_utils import event_at_to_date_prefix_ymd
+
+from .metrics import instrument_storage
+from .snapshot_cache import empty_snapshot, snapshot_to_tuple
+from .sqlite_replica import SQLiteReplica
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 저장소 종류: supabase(기본) | memory | sqlite
+_STORAGE_BACKEND = os.getenv("ROULETTE_STORAGE", "supabase").strip().lower()
+# sqlite 저장소 파일
+_STORAGE_SQLITE_PATH = os.getenv("ROULETTE_SQLITE_PATH", os.path.join(_BASE_DIR, "roulette_local.sqlite3"))
+
+# list_events 가 돌려주는 행에 항상 있어야 하는 키 (프론트 기대값). 목록 화면에 쓰는 컬럼만 조회한다.
+_EVENT_LIST_FIELDS = [
+    "event_at",
+    "title",
+    "updated_at",
+    "is_active",
+    "allow_duplicates",
+    "participant_count",
+    "winner_count",
+]
+# 이벤트 목록 한 페이지 최대 행 수
+EVENT_PAGE_MAX = 500
+
+EventTuple = Tuple[Dict, str, List, str, str, str, str, bool, str, Optional[str]]
+
+# get_many 가 posts 와 함께 읽을 수 있는 자식 데이터
+GET_MANY_FIELDS = ("participants", "commenters")
+
+
+def split_winners(winners: Optional[str]) -> List[str]:
+    """posts.winners(쉼표 구분) → 이름 목록 (빈 항목 제외)."""
+    return [w.strip() for w in str(winners or "").split(",") if w and w.strip()]
+
+
+def event_sort_key(event_id: Any) -> Tuple[bool, str]:
+    """
+    이벤트 목록 정렬 키 (내림차순으로 쓴다): 10자리 숫자 ID(YYYYMMDDNN) 최신순, 그 뒤에 레거시 키.
+    list_events_page RPC 의 ORDER BY 와 같은 규칙이라 커서(직전 페이지 마지막 id) 비교에도 쓴다.
+    """
+    v = str(event_id or "")
+    return (len(v) == 10 and v.isdigit(), v)
+
+
+def get_many_fields(fields: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """get_many 의 fields 인자 검증. None 이면 전부."""
+    if fields is None:
+        return frozenset(GET_MANY_FIELDS)
+    wanted = frozenset(fields)
+    unknown = wanted - set(GET_MANY_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown get_many fields: {sorted(unknown)} (allowed: {list(GET_MANY_FIELDS)})")
+    return wanted
+
+
+def trim_event_tuple(data: EventTuple, wanted: FrozenSet[str]) -> EventTuple:
+    """fields 에 없는 자식 데이터는 빈 값으로 (캐시에서 꺼낸 전체 스냅샷을 요청 모양에 맞출 때)."""
+    participants = data[0] if "participants" in wanted else {}
+    commenters = data[2] if "commenters" in wanted else []
+    return (participants, data[1], commenters) + tuple(data[3:])
+
+
+def next_event_cursor(rows: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """한 페이지가 가득 찼으면 다음 페이지 커서(마지막 행 id), 아니면 None(마지막 페이지)."""
+    if not rows or len(rows) < limit:
+        return None
+    return rows[-1].get("id") or rows[-1].get("url") or None
+
+
+class EventStorage:
+    """저장소 공통 인터페이스. 하위 클래스는 NotImplementedError 메서드를 구현한다."""
+
+    backend = "abstract"
+    # Supabase 구현만 클라이언트를 가진다 (/debug 등에서 존재 여부 확인용)
+    supabase = None
+    # create_storage() 가 붙이는 지난 이벤트 보관소 (event_archive.EventArchive)
+    archive = None
+
+    # ----- 조회 -----
+    def get_data(self, event_id: str, include_commenters: bool = True) -> EventTuple:
+        raise NotImplementedError
+
+    def get_post_snapshot(self, event_id: str) -> Tuple:
+        """(last_comment_id, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at)"""
+        _, last_id, _, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at = self.get_data(
+            event_id, include_commenters=False
+        )
+        return (last_id, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at)
+
+    def get_many(self, event_ids: Iterable[str], fields: Optional[Iterable[str]] = None) -> Dict[str, EventTuple]:
+        """
+        여러 이벤트를 한 번에: event_id → get_data 튜플. 없는 이벤트는 결과에서 빠진다.
+        fields 는 함께 읽을 자식 데이터(GET_MANY_FIELDS 의 부분집합, 기본 전부)이며 빠진 항목은 빈 값이다.
+        기본 구현은 get_data 반복 (로컬 저장소는 왕복 비용이 없다).
+        """
+        wanted = get_many_fields(fields)
+        known = set(self.get_all_event_ids())
+        out: Dict[str, EventTuple] = {}
+        for ek in dict.fromkeys(str(e) for e in event_ids if e):
+            if ek in known:
+                out[ek] = trim_event_tuple(self.get_data(ek, include_commenters="commenters" in wanted), wanted)
+        return out
+
+    def get_active_event_id(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def get_all_event_ids(self) -> List[str]:
+        raise NotImplementedError
+
+    def list_events(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        이벤트 ID 내림차순 한 페이지. before 는 직전 페이지 마지막 id(keyset 커서, event_sort_key 기준).
+        행에는 목록 컬럼과 participant_count / winner_count 만 담는다.
+        """
+        raise NotImplementedError
+
+    # ----- 쓰기 -----
+    def save_data(
+        self,
+        event_id: str,
+        participants_dict,
+        last_comment_id,
+        all_commenters=None,
+        title=None,
+        prizes=None,
+        memo=None,
+        winners=None,
+        allow_duplicates=None,
+        allowed_list=None,
+        event_at=None,
+    ):
+        self.save_data_blocking(
+            event_id,
+            participants_dict,
+            last_comment_id,
+            all_commenters,
+            title,
+            prizes,
+            memo,
+            winners,
+            allow_duplicates,
+            allowed_list,
+            event_at,
+        )
+
+    def save_data_blocking(
+        self,
+        event_id: str,
+        participants_dict,
+        last_comment_id,
+        all_commenters=None,
+        title=None,
+        prizes=None,
+        memo=None,
+        winners=None,
+        allow_duplicates=None,
+        allowed_list=None,
+        event_at=None,
+    ) -> Tuple[bool, Optional[str]]:
+        raise NotImplementedError
+
+    def clear_data(self, event_id: str):
+        self.clear_data_blocking(event_id)
+
+    def clear_data_blocking(self, event_id: str) -> Tuple[bool, Optional[str]]:
+        raise NotImplementedError
+
+    def delete_participant(self, event_id: str, author: str):
+        raise NotImplementedError
+
+    def set_active_event_id(self, event_id: Optional[str]):
+        self.set_active_event_id_blocking(event_id)
+
+    def set_active_event_id_blocking(self, event_id: Optional[str]) -> Tuple[bool, Optional[str]]:
+        raise NotImplementedError
+
+    def update_timestamp(self, event_id: str):
+        pass
+
+    def flush_writes(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+    # ----- 당첨자 기록 -----
+    # 기본 구현은 posts.winners 문자열을 읽어 고쳐 다시 저장한다 (로컬 저장소·winners 테이블 없는 Supabase).
+    # 기록 행 id 는 문자열 안 순번(1부터)이다.
+    def append_winner(
+        self, event_id: str, winner: str, round_id: Optional[str] = None, angle: Optional[float] = None
+    ):
+        """라운드 당첨자 1건 추가 (백그라운드 반영)."""
+        names = split_winners(self.get_post_snapshot(event_id)[4])
+        names.append(winner)
+        self.save_data(event_id, None, None, winners=",".join(names))
+
+    def confirm_winner(
+        self, event_id: str, winner: str, round_id: Optional[str] = None, angle: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        당첨 확정: 기록 1건 추가 + 중복 당첨 비허용이면 참가자에서 제거.
+        반환 (확정 후 상태, 실패하면 None):
+        {"inserted", "participants", "winners", "allow_duplicates", "title", "prizes", "memo", "allowed_list", "commenters"}
+        — 발표 브로드캐스트에 필요한 값을 모두 담아 호출부가 따로 읽지 않게 한다.
+        """
+        participants, _, commenters, title, prizes, memo, winners, allow_duplicates, allowed_list, _ = self.get_data(
+            event_id
+        )
+        participants = dict(participants or {})
+        if not allow_duplicates and winner in participants:
+            del participants[winner]
+            self.delete_participant(event_id, winner)
+        self.append_winner(event_id, winner, round_id=round_id, angle=angle)
+        return {
+            "inserted": True,
+            "participants": participants,
+            "winners": ",".join(split_winners(winners) + [winner]),
+            "allow_duplicates": bool(allow_duplicates),
+            "title": title,
+            "prizes": prizes,
+            "memo": memo,
+            "allowed_list": allowed_list,
+            "commenters": list(commenters or []),
+        }
+
+    def get_winners(self, event_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """당첨 기록 [{"id", "event_id", "round_id", "winner", "angle", "created_at"}] (id 오름차순, after_id 초과만)."""
+        rows = []
+        for i, name in enumerate(split_winners(self.get_post_snapshot(event_id)[4]), start=1):
+            if i > after_id:
+                rows.append(
+                    {"id": i, "event_id": event_id, "round_id": None, "winner": name, "angle": None, "created_at": None}
+                )
+        return rows
+
+    def delete_winner_blocking(self, event_id: str, winner_id: int) -> Tuple[bool, Optional[str]]:
+        names = split_winners(self.get_post_snapshot(event_id)[4])
+        if not 1 <= int(winner_id) <= len(names):
+            return False, f"winner id {winner_id} not found"
+        del names[int(winner_id) - 1]
+        return self.save_data_blocking(event_id, None, None, winners=",".join(names))
+
+    def clear_winners_blocking(self, event_id: str) -> Tuple[bool, Optional[str]]:
+        return self.save_data_blocking(event_id, None, None, winners="")
+
+    def import_winners_blocking(self, event_id: str, rows: List[Dict[str, Any]]) -> Tuple[bool, Optional[str]]:
+        """기록 행 [{"winner", "round_id", "angle", "created_at"}] 을 순서대로 덧붙인다 (보관 이벤트 복원용)."""
+        if not rows:
+            return True, None
+        names = split_winners(self.get_post_snapshot(event_id)[4]) + [str(r["winner"]) for r in rows]
+        return self.save_data_blocking(event_id, None, None, winners=",".join(names))
+
+    # ----- 관측 (없으면 None) -----
+    def snapshot_cache_stats(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def write_queue_stats(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def replica_stats(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def transport_stats(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    # ----- 공통 구현 -----
+    def set_active_url(self, url: Optional[str]):
+        """하위 호환: 활성 이벤트 id 설정."""
+        self.set_active_event_id(url)
+
+    def get_active_url(self) -> Optional[str]:
+        return self.get_active_event_id()
+
+    def get_all_urls(self) -> List[str]:
+        return self.get_all_event_ids()
+
+    def next_event_id(self, event_at_iso: Optional[str] = None) -> str:
+        """오늘 날짜(YYYYMMDD) + 2자리 일련번호. event_at 은 ID 에 반영하지 않는다."""
+        _ = event_at_iso
+        prefix = event_at_to_date_prefix_ymd(None)
+        max_serial = 0
+        for uid in self.get_all_event_ids():
+            uid = str(uid or "")
+            if len(uid) == 10 and uid.startswith(prefix) and uid[8:].isdigit():
+                max_serial = max(max_serial, int(uid[8:]))
+        return f"{prefix}{(max_serial + 1):02d}"
+
+    def next_event_code(self) -> str:
+        return self.next_event_id(None)
+
+    def create_internal_event(
+        self, template_key: str = None, event_at_iso: Optional[str] = None
+    ) -> Optional[str]:
+        title, prizes, memo, winners = "새 룰렛 이벤트", "", "", ""
+        allow_duplicates, allowed_list_str = False, None
+        template_event_at = event_at_iso
+        if template_key:
+            # 템플릿은 posts 필드만 쓴다 (참가자·댓글 작성자 행은 읽지 않음)
+            template = self.get_many([template_key], fields=()).get(str(template_key))
+            _, _, _, t0, pr, m0, w0, ad0, al0, ea0 = template or snapshot_to_tuple(empty_snapshot())
+            title = (t0 or "이벤트").strip() + " (복사)"
+            prizes = pr or ""
+            memo = m0 or ""
+            winners = ""
+            allow_duplicates = bool(ad0) if ad0 is not None else False
+            allowed_list_str = al0
+            if template_event_at is None:
+                template_event_at = ea0
+        key = self.next_event_id(template_event_at)
+        save_event_at = template_event_at or datetime.now().replace(microsecond=0).isoformat()
+        ok_save, _ = self.save_data_blocking(
+            key,
+            None,
+            "",
+            title=title,
+            prizes=prizes,
+            memo=memo,
+            winners=winners,
+            allow_duplicates=allow_duplicates,
+            allowed_list=allowed_list_str,
+            event_at=save_event_at,
+        )
+        if not ok_save:
+            return None
+        ok_act, _ = self.set_active_event_id_blocking(key)
+        if not ok_act:
+            return None
+        return key
+
+    @staticmethod
+    def _finalize_event_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """list_events 응답 모양 맞추기: id/url 채움, 누락 키 None, ID(YYYYMMDDNN) 최신순 정렬(이미 정렬돼 있으면 그대로)."""
+        for r in rows:
+            rid = r.get("id") or r.get("url")
+            r["id"] = rid
+            r["url"] = rid
+            for c in _EVENT_LIST_FIELDS:
+                r.setdefault(c, None)
+            # event_at 컬럼이 없는 프로젝트에서는 updated_at으로 대체 표시
+            if not r.get("event_at") and r.get("updated_at"):
+                r["event_at"] = r.get("updated_at")
+
+        def _id_num(row: Dict[str, Any]) -> int:
+            v = str((row or {}).get("id") or (row or {}).get("url") or "")
+            return int(v) if (len(v) == 10 and v.isdigit()) else 0
+
+        rows.sort(key=_id_num, reverse=True)
+        return rows
+
+
+def _post_fields(
+    event_id,
+    last_comment_id,
+    title,
+    prizes,
+    memo,
+    winners,
+    allow_duplicates,
+    allowed_list,
+    event_at,
+) -> Dict[str, Any]:
+    """save_data 인자 중 지정된(None 아님) posts 필드. Supabase 구현과 같은 병합 규칙."""
+    row: Dict[str, Any] = {"id": event_id, "updated_at": datetime.now().isoformat()}
+    for k, v in (
+        ("title", title),
+        ("prizes", prizes),
+        ("memo", memo),
+        ("winners", winners),
+        ("allowed_list", allowed_list),
+        ("allow_duplicates", allow_duplicates),
+        ("last_comment_id", last_comment_id),
+        ("event_at", event_at),
+    ):
+        if v is not None:
+            row[k] = v
+    return row
+
+
+def _event_tuple(post: Dict[str, Any], p_rows, c_rows) -> EventTuple:
+    snap = empty_snapshot()
+    snap["participants"] = {p["author"]: (p.get("count"), p.get("created_at")) for p in p_rows}
+    snap["commenters"] = [{"name": c["author"], "created_at": c.get("created_at")} for c in c_rows]
+    for k in ("last_comment_id", "title", "prizes", "memo", "allowed_list"):
+        snap[k] = post.get(k)
+    snap["winners"] = post.get("winners", "")
+    snap["allow_duplicates"] = bool(post.get("allow_duplicates", False))
+    ea = post.get("event_at") or post.get("updated_at")
+    snap["event_at"] = None if ea is None else str(ea)
+    return snapshot_to_tuple(snap)
+
+
+class InMemoryStorage(EventStorage):
+    """프로세스 메모리 저장소. 재시작하면 비워진다."""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._posts: Dict[str, Dict[str, Any]] = {}
+        self._participants: Dict[str, Dict[str, Tuple[Any, Any]]] = {}
+        self._commenters: Dict[str, List[Dict[str, Any]]] = {}
+        print("DEBUG: [Storage] in-memory (no persistence)")
+
+    def get_data(self, event_id: str, include_commenters: bool = True) -> EventTuple:
+        with self._lock:
+            post = self._posts.get(event_id)
+            if post is None:
+                return snapshot_to_tuple(empty_snapshot())
+            p_rows = [
+                {"author": a, "count": v[0], "created_at": v[1]}
+                for a, v in self._participants.get(event_id, {}).items()
+            ]
+            c_rows = (
+                [{"author": c["name"], "created_at": c["created_at"]} for c in self._commenters.get(event_id, [])]
+                if include_commenters
+                else []
+            )
+            return _event_tuple(post, p_rows, c_rows)
+
+    def get_active_event_id(self) -> Optional[str]:
+        with self._lock:
+            for ek, post in self._posts.items():
+                if post.get("is_active"):
+                    return ek
+        return None
+
+    def get_all_event_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._posts.keys())
+
+    def list_events(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        limit = max(1, min(int(limit), EVENT_PAGE_MAX))
+        with self._lock:
+            keys = sorted(self._posts.keys(), key=event_sort_key, reverse=True)
+            if before:
+                cursor = event_sort_key(before)
+                keys = [k for k in keys if event_sort_key(k) < cursor]
+            rows = []
+            for ek in keys[:limit]:
+                post = self._posts[ek]
+                row = {c: post.get(c) for c in _EVENT_LIST_FIELDS}
+                row["id"] = ek
+                row["participant_count"] = len(self._participants.get(ek, {}))
+                row["winner_count"] = len(split_winners(post.get("winners")))
+                rows.append(row)
+        return self._finalize_event_rows(rows)
+
+    def save_data_blocking(
+        self,
+        event_id: str,
+        participants_dict,
+        last_comment_id,
+        all_commenters=None,
+        title=None,
+        prizes=None,
+        memo=None,
+        winners=None,
+        allow_duplicates=None,
+        allowed_list=None,
+        event_at=None,
+    ) -> Tuple[bool, Optional[str]]:
+        now_iso = datetime.now().isoformat()
+        fields = _post_fields(
+            event_id, last_comment_id, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at
+        )
+        with self._lock:
+            self._posts.setdefault(event_id, {}).update(fields)
+            if participants_dict:
+                cur = self._participants.get(event_id, {})
+                nxt = {}
+                for author, v in participants_dict.items():
+                    count = v[0] if isinstance(v, (tuple, list)) else v
+                    prev = cur.get(author)
+                    nxt[author] = (count, prev[1] if prev and prev[1] is not None else now_iso)
+                self._participants[event_id] = nxt
+            if all_commenters:
+                lst = self._commenters.setdefault(event_id, [])
+                known = {c["name"] for c in lst}
+                for item in all_commenters:
+                    name = item["name"] if isinstance(item, dict) else item
+                    if name not in known:
+                        lst.append({"name": name, "created_at": now_iso})
+                        known.add(name)
+        return True, None
+
+    def clear_data_blocking(self, event_id: str) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            self._posts.pop(event_id, None)
+            self._participants.pop(event_id, None)
+            self._commenters.pop(event_id, None)
+        return True, None
+
+    def delete_participant(self, event_id: str, author: str):
+        with self._lock:
+            self._participants.get(event_id, {}).pop(author, None)
+
+    def set_active_event_id_blocking(self, event_id: Optional[str]) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            for ek, post in self._posts.items():
+                post["is_active"] = ek == event_id
+        return True, None
+
+
+class SQLiteStorage(EventStorage):
+    """로컬 SQLite 파일 저장소 (Supabase 읽기 복제본과 같은 테이블 구성)."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = None):
+        self.path = path or _STORAGE_SQLITE_PATH
+        self._db = SQLiteReplica(self.path)
+        print(f"DEBUG: [Storage] SQLite: {self.path}")
+
+    def get_data(self, event_id: str, include_commenters: bool = True) -> EventTuple:
+        try:
+            rows = self._db.event_rows(event_id, include_commenters)
+        except Exception as e:
+            print(f"DEBUG: [get_data SQLite Error] {e}")
+            rows = None
+        if rows is None:
+            return snapshot_to_tuple(empty_snapshot())
+        post_rows, p_rows, c_rows = rows
+        return _event_tuple(post_rows[0], p_rows, c_rows)
+
+    def get_active_event_id(self) -> Optional[str]:
+        return self._db.active_event_id()
+
+    def get_all_event_ids(self) -> List[str]:
+        return self._db.event_ids()
+
+    def list_events(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        limit = max(1, min(int(limit), EVENT_PAGE_MAX))
+        return self._finalize_event_rows(self._db.list_event_page(limit, before))
+
+    def _write(self, fn) -> Tuple[bool, Optional[str]]:
+        try:
+            fn()
+            return True, None
+        except Exception as e:
+            print(f"DEBUG: [SQLiteStorage] write failed: {e}")
+            return False, str(e)
+
+    def save_data_blocking(
+        self,
+        event_id: str,
+        participants_dict,
+        last_comment_id,
+        all_commenters=None,
+        title=None,
+        prizes=None,
+        memo=None,
+        winners=None,
+        allow_duplicates=None,
+        allowed_list=None,
+        event_at=None,
+    ) -> Tuple[bool, Optional[str]]:
+        now_iso = datetime.now().isoformat()
+        fields = _post_fields(
+            event_id, last_comment_id, title, prizes, memo, winners, allow_duplicates, allowed_list, event_at
+        )
+        p_rows = None
+        if participants_dict:
+            p_rows = [
+                {"author": a, "count": v[0] if isinstance(v, (tuple, list)) else v, "created_at": now_iso}
+                for a, v in participants_dict.items()
+            ]
+        c_rows = None
+        if all_commenters:
+            c_rows = [
+                {"author": item["name"] if isinstance(item, dict) else item, "created_at": now_iso}
+                for item in all_commenters
+            ]
+        return self._write(lambda: self._db.apply_save(event_id, fields, p_rows, c_rows))
+
+    def clear_data_blocking(self, event_id: str) -> Tuple[bool, Optional[str]]:
+        return self._write(lambda: self._db.clear_event(event_id))
+
+    def delete_participant(self, event_id: str, author: str):
+        self._write(lambda: self._db.delete_participant(event_id, author))
+
+    def set_active_event_id_blocking(self, event_id: Optional[str]) -> Tuple[bool, Optional[str]]:
+        return self._write(lambda: self._db.set_active(event_id))
+
+    def replica_stats(self) -> Optional[Dict[str, Any]]:
+        return self._db.stats()
+
+
+def storage_api_methods() -> List[str]:
+    """지연 지표를 남길 EventStorage 공개 메서드 (관측용 *_stats 제외)."""
+    return sorted(
+        name
+        for name, fn in vars(EventStorage).items()
+        if callable(fn) and not name.startswith("_") and not name.endswith("_stats")
+    )
+
+
+def create_storage(backend: Optional[str] = None) -> EventStorage:
+    """ROULETTE_STORAGE(또는 backend 인자)에 맞는 저장소를 만든다."""
+    kind = (backend or _STORAGE_BACKEND or "supabase").strip().lower()
+    if kind == "memory":
+        storage: EventStorage = InMemoryStorage()
+    elif kind == "sqlite":
+        storage = SQLiteStorage()
+    elif kind == "supabase":
+        # supabase 패키지/환경변수는 이 백엔드에서만 필요하다.
+        from .db_handler import CommentDatabase
+
+        storage = CommentDatabase()
+    else:
+        raise ValueError(f"unknown ROULETTE_STORAGE: {kind} (supabase|memory|sqlite)")
+    from .event_archive import EventArchive, attach_archive
+
+    attach_archive(storage, EventArchive())
+    return instrument_storage(storage, storage_api_methods())
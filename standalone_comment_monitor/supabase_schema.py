@@ -0,0 +1,581 @@
+"""CommentDatabase(동기)와 AsyncCommentDatabase(비동기)가 함께 쓰는 스키마 감지 결과·행 변환 도우미 (I/O 없음)."""
+import unicodedata
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .storage import event_sort_key, split_winners
+
+# 스키마 감지가 채우는 속성 (스키마 캐시에 저장되는 항목)
+SCHEMA_PROFILE_ATTRS = (
+    "_post_key_col",
+    "_participant_fk_col",
+    "_commenter_fk_col",
+    "_post_has_id_col",
+    "_post_has_url_col",
+    "_post_has_is_active_col",
+    "_post_opt_cols",
+    "_participant_has_id_col",
+    "_commenter_has_id_col",
+    "_participant_has_created_at_col",
+    "_commenter_has_created_at_col",
+    "_participant_id_sql_type",
+    "_commenter_id_sql_type",
+    "_has_winners_table",
+)
+
+# posts 선택 컬럼 후보
+POST_OPT_COL_CANDIDATES = ["event_at", "title", "updated_at", "prizes", "winners", "is_active", "memo", "allow_duplicates"]
+
+# 이벤트 목록(list_events)에 필요한 posts 컬럼. winners 는 winner_count 계산용으로만 읽는다.
+EVENT_LIST_POST_COLS = ["title", "event_at", "updated_at", "is_active", "allow_duplicates", "winners"]
+# 숫자 이벤트 ID(YYYYMMDDNN) 판정 — event_sort_key / list_events_page RPC / SQLite 복제본과 같은 "정확히 10자리 숫자" 규칙.
+# 그 밖의 키(8자리 ID, url 등 레거시 키)는 레거시 구간이다. PostgREST match(~) / not.match 필터로 쓴다.
+NUMERIC_EVENT_KEY_PATTERN = "^[0-9]{10}$"
+
+# 스키마 프로브 대상 (table, column). 비동기 프로브는 한 번에 모두 확인한다.
+PROBE_COLUMNS: Tuple[Tuple[str, str], ...] = tuple(
+    dict.fromkeys(
+        [("posts", "id"), ("posts", "url"), ("posts", "is_active")]
+        + [("posts", c) for c in POST_OPT_COL_CANDIDATES]
+        + [
+            ("participants", "event_id"),
+            ("participants", "url"),
+            ("commenters", "event_id"),
+            ("commenters", "url"),
+            ("participants", "id"),
+            ("commenters", "id"),
+            ("participants", "created_at"),
+            ("commenters", "created_at"),
+            ("winners", "id"),
+        ]
+    )
+)
+
+
+def profile_from_columns(has: Callable[[str, str], bool], id_type: Callable[[str], str]) -> Dict[str, Any]:
+    """컬럼 존재 여부 has(table, column)와 자식 테이블 id 타입 id_type(table)으로 스키마 프로필을 만든다."""
+    prof: Dict[str, Any] = {
+        "_post_key_col": "id",
+        "_participant_fk_col": "event_id",
+        "_commenter_fk_col": "event_id",
+        "_participant_id_sql_type": "int",
+        "_commenter_id_sql_type": "int",
+    }
+    # posts: id(신규) 또는 url(레거시)
+    prof["_post_has_id_col"] = has("posts", "id")
+    prof["_post_has_url_col"] = has("posts", "url")
+    if not prof["_post_has_id_col"] and prof["_post_has_url_col"]:
+        prof["_post_key_col"] = "url"
+    prof["_post_has_is_active_col"] = has("posts", "is_active")
+    prof["_post_opt_cols"] = [c for c in POST_OPT_COL_CANDIDATES if has("posts", c)]
+    # participants/commenters: event_id(신규) 또는 url(레거시)
+    if not has("participants", "event_id") and has("participants", "url"):
+        prof["_participant_fk_col"] = "url"
+    if not has("commenters", "event_id") and has("commenters", "url"):
+        prof["_commenter_fk_col"] = "url"
+    prof["_participant_has_id_col"] = has("participants", "id")
+    prof["_commenter_has_id_col"] = has("commenters", "id")
+    prof["_participant_has_created_at_col"] = has("participants", "created_at")
+    prof["_commenter_has_created_at_col"] = has("commenters", "created_at")
+    if prof["_participant_has_id_col"]:
+        prof["_participant_id_sql_type"] = id_type("participants")
+    if prof["_commenter_has_id_col"]:
+        prof["_commenter_id_sql_type"] = id_type("commenters")
+    # 당첨 기록 테이블 (20261018110000_winners_log.sql)
+    prof["_has_winners_table"] = has("winners", "id")
+    return prof
+
+
+def id_sql_type_from_rows(rows: List[Dict[str, Any]]) -> str:
+    """id 컬럼 실제 타입 추정. 정수 PK면 신규 행에 UUID를 넣으면 안 됨(22P02)."""
+    row = (rows or [None])[0]
+    if not row:
+        return "int"
+    v = row.get("id")
+    if isinstance(v, int) and not isinstance(v, bool):
+        return "int"
+    if v is not None:
+        return "uuid"
+    return "int"
+
+
+def fill_integer_ids(batch: List[Dict[str, Any]], current_max: int) -> None:
+    """id 가 비어 있는 행에 current_max 뒤 순번을 채운다 (batch 안의 기존 id 와 겹치지 않게)."""
+    cur = current_max
+    used: set = set()
+    for row in batch:
+        rid = row.get("id")
+        if rid is None:
+            continue
+        try:
+            iv = int(rid)
+            cur = max(cur, iv)
+            used.add(iv)
+        except (TypeError, ValueError):
+            pass
+    for row in batch:
+        if row.get("id") is not None:
+            continue
+        cur += 1
+        while cur in used:
+            cur += 1
+        row["id"] = cur
+        used.add(cur)
+
+
+class SupabaseSchemaMixin:
+    """감지된 스키마 속성(SCHEMA_PROFILE_ATTRS)에 의존하는 도우미. _snapshot_apply_save 는 self._snapshots 를 쓴다."""
+
+    def _init_schema_defaults(self) -> None:
+        self._post_key_col = "id"
+        self._participant_fk_col = "event_id"
+        self._commenter_fk_col = "event_id"
+        self._post_has_id_col = False
+        self._post_has_url_col = False
+        self._post_has_is_active_col = False
+        self._post_opt_cols: List[str] = []
+        self._participant_has_id_col = False
+        self._commenter_has_id_col = False
+        self._participant_has_created_at_col = False
+        self._commenter_has_created_at_col = False
+        self._participant_id_sql_type = "int"
+        self._commenter_id_sql_type = "int"
+        self._has_winners_table = False
+
+    @staticmethod
+    def _norm_author_key(name: Any) -> str:
+        return unicodedata.normalize("NFC", str(name).strip())
+
+    def _row_event_key(self, row: Dict[str, Any]) -> Optional[str]:
+        if not isinstance(row, dict):
+            return None
+        rid = row.get("id")
+        rurl = row.get("url")
+        rk = row.get(self._post_key_col)
+        return rid or rurl or rk
+
+    def _post_select_cols(self, extra: Optional[List[str]] = None) -> str:
+        cols: List[str] = []
+        if self._post_has_id_col:
+            cols.append("id")
+        if self._post_has_url_col:
+            cols.append("url")
+        if not cols:
+            cols.append(self._post_key_col)
+        if extra:
+            cols.extend(extra)
+        return ",".join(cols)
+
+    def _row_map(self, rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """원격 행 → 정규화 작성자 키 기준 기준선."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for r in rows or []:
+            a = r.get("author")
+            if a is None:
+                continue
+            out[self._norm_author_key(a)] = {
+                "author": a,
+                "id": r.get("id"),
+                "count": r.get("count"),
+                "created_at": r.get("created_at"),
+            }
+        return out
+
+    @staticmethod
+    def _best_post_row(rows):
+        """중복 rows가 있을 때 가장 최신/완전한 행을 고른다."""
+        if not rows:
+            return None
+        if len(rows) == 1:
+            return rows[0]
+
+        def _score(r):
+            title_len = len(str(r.get("title") or "").strip())
+            prizes_len = len(str(r.get("prizes") or "").strip())
+            memo_len = len(str(r.get("memo") or "").strip())
+            winners_len = len(str(r.get("winners") or "").strip())
+            allowed_len = len(str(r.get("allowed_list") or "").strip())
+            active_bonus = 1 if bool(r.get("is_active", False)) else 0
+            updated = str(r.get("updated_at") or r.get("event_at") or "")
+            # 완성도 우선 + 최신성 보조
+            return (
+                winners_len + prizes_len + memo_len + title_len + allowed_len,
+                active_bonus,
+                updated,
+            )
+
+        return max(rows, key=_score)
+
+    @staticmethod
+    def _is_on_conflict_constraint_error(err: Exception) -> bool:
+        msg = str(err).lower()
+        return (
+            "42p10" in msg
+            or (
+                "on conflict" in msg
+                and ("no unique" in msg or "no unique or exclusion constraint" in msg)
+            )
+        )
+
+    @staticmethod
+    def _is_missing_function_error(err: Exception) -> bool:
+        msg = str(err).lower()
+        return "pgrst202" in msg or "42883" in msg or "could not find the function" in msg
+
+    def _schema_profile(self) -> Dict[str, Any]:
+        return {a: getattr(self, a) for a in SCHEMA_PROFILE_ATTRS}
+
+    def _apply_schema_profile(self, profile: Dict[str, Any]) -> None:
+        for a in SCHEMA_PROFILE_ATTRS:
+            if a in profile:
+                setattr(self, a, profile[a])
+
+    def _print_schema(self, source: str) -> None:
+        print(
+            f"DEBUG: [Supabase schema:{source}] "
+            f"posts.{self._post_key_col}, "
+            f"participants.{self._participant_fk_col}, "
+            f"commenters.{self._commenter_fk_col}, "
+            f"posts_cols={self._post_opt_cols}, "
+            f"participant_row_id={self._participant_has_id_col}, "
+            f"commenter_row_id={self._commenter_has_id_col}, "
+            f"participant_id_type={self._participant_id_sql_type}, "
+            f"commenter_id_type={self._commenter_id_sql_type}, "
+            f"winners_table={self._has_winners_table}"
+        )
+
+    def _group_post_rows(self, rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            k = self._row_event_key(r)
+            if k:
+                grouped.setdefault(str(k), []).append(r)
+        return {k: self._best_post_row(v) for k, v in grouped.items()}
+
+    def _post_alt_key_col(self) -> Optional[str]:
+        """id/url 컬럼이 둘 다 있는 스키마에서 키 컬럼이 아닌 쪽 (없으면 None)."""
+        if self._post_has_id_col and self._post_has_url_col:
+            return "url" if self._post_key_col == "id" else "id"
+        return None
+
+    def _pick_posts_many(
+        self, requested: List[str], rows: List[Dict[str, Any]], col: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """get_many: in 필터로 읽은 posts 행 → 요청 키별 대표 행. col 을 주면 그 컬럼 값으로 묶는다."""
+        want = set(requested)
+        if col is None:
+            return {k: v for k, v in self._group_post_rows(rows).items() if k in want}
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            k = str(r.get(col))
+            if k in want:
+                grouped.setdefault(k, []).append(r)
+        return {k: self._best_post_row(v) for k, v in grouped.items()}
+
+    def _child_tables_many(self, wanted, event_ids: List[str]) -> List[Tuple[Optional[str], str, Optional[str]]]:
+        """get_many 자식 조회 대상 [(table 또는 None, fk, 정렬 컬럼)] — participants, commenters 순서 고정."""
+        out: List[Tuple[Optional[str], str, Optional[str]]] = []
+        for table, fk, has_id in (
+            ("participants", self._participant_fk_col, self._participant_has_id_col),
+            ("commenters", self._commenter_fk_col, self._commenter_has_id_col),
+        ):
+            out.append((table if table in wanted and event_ids else None, fk, "id" if has_id else None))
+        return out
+
+    @staticmethod
+    def _group_child_rows(rows: List[Dict[str, Any]], fk: str) -> Dict[str, List[Dict[str, Any]]]:
+        by_event: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            if r.get(fk) is not None:
+                by_event.setdefault(str(r.get(fk)), []).append(r)
+        return by_event
+
+    def _event_list_rpc_usable(self) -> bool:
+        """list_events_page RPC 도 신규 스키마(posts.id / participants.event_id) 기준."""
+        return (
+            self._event_list_rpc_available is not False
+            and self._post_key_col == "id"
+            and self._participant_fk_col == "event_id"
+        )
+
+    def _confirm_rpc_usable(self) -> bool:
+        """confirm_winner RPC 는 winners 테이블 + 신규 스키마(posts.id / participants·commenters.event_id) 기준이다."""
+        return (
+            self._confirm_rpc_available is not False
+            and self._has_winners_table
+            and self._post_key_col == "id"
+            and self._participant_fk_col == "event_id"
+            and self._commenter_fk_col == "event_id"
+        )
+
+    def _event_list_select_cols(self) -> str:
+        return self._post_select_cols([c for c in EVENT_LIST_POST_COLS if c in self._post_opt_cols])
+
+    @staticmethod
+    def _event_list_ranges(before: Optional[str]) -> List[Tuple[bool, Optional[str]]]:
+        """
+        RPC 없이 posts 를 직접 조회할 때의 구간 (숫자 ID 구간 여부, lt) 목록. 앞 구간부터 채운다.
+        숫자 ID 구간 내림차순 → 레거시 키 구간 내림차순 = event_sort_key 순서 (커서도 같은 규칙으로 구간을 고른다).
+        """
+        if not before:
+            return [(True, None), (False, None)]
+        if event_sort_key(before)[0]:
+            return [(True, before), (False, None)]
+        return [(False, before)]
+
+    def _event_list_range_filter(self, q, numeric: bool, lt: Optional[str]):
+        """_event_list_ranges 구간 하나를 posts select 에 적용."""
+        q = q.filter(self._post_key_col, "match" if numeric else "not.match", NUMERIC_EVENT_KEY_PATTERN)
+        if lt is not None:
+            q = q.lt(self._post_key_col, lt)
+        return q.order(self._post_key_col, desc=True)
+
+    def _event_list_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """posts 직접 조회 행 → 목록 행. 참여자 수는 RPC 없이는 모른다(None)."""
+        out = {c: row.get(c) for c in EVENT_LIST_POST_COLS if c != "winners"}
+        out["id"] = self._row_event_key(row)
+        out["participant_count"] = None
+        out["winner_count"] = len(split_winners(row.get("winners")))
+        return out
+
+    @staticmethod
+    def _event_list_rows_from_rpc(data: Any) -> List[Dict[str, Any]]:
+        """list_events_page 응답(JSONB 배열, 드물게 [{"list_events_page": [...]}]) → 목록 행."""
+        if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict) and "list_events_page" in data[0]:
+            data = data[0]["list_events_page"]
+        return [dict(r) for r in (data or []) if isinstance(r, dict)]
+
+    def _build_post_data(
+        self,
+        event_id,
+        last_comment_id,
+        title,
+        prizes,
+        memo,
+        winners,
+        allow_duplicates,
+        allowed_list,
+        event_at,
+        is_active: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        save 인자 → posts upsert 행. 지정된(None 아님) 필드만 담는다.
+        winners 테이블이 있으면 posts.winners 는 트리거가 관리하는 파생 값이라 쓰지 않는다
+        (읽어 둔 값을 다시 쓰면 그 사이 확정된 당첨자가 빠짐). 초기화는 clear_winners_blocking 이 기록을 지워서 한다.
+        """
+        post_data = {self._post_key_col: event_id, "updated_at": datetime.now().isoformat()}
+        if self._post_has_id_col:
+            post_data["id"] = event_id
+        if self._post_has_url_col:
+            post_data["url"] = event_id
+        if is_active is not None and self._post_has_is_active_col:
+            post_data["is_active"] = is_active
+        if title is not None:
+            post_data["title"] = title
+        if prizes is not None:
+            post_data["prizes"] = prizes
+        if memo is not None:
+            post_data["memo"] = memo
+        if winners is not None and not self._has_winners_table:
+            post_data["winners"] = winners
+        if allowed_list is not None:
+            post_data["allowed_list"] = allowed_list
+        if allow_duplicates is not None:
+            post_data["allow_duplicates"] = allow_duplicates
+        if last_comment_id is not None:
+            post_data["last_comment_id"] = last_comment_id
+        # event_at 저장 정책
+        # 1) event_at 컬럼이 있으면 정상 저장
+        # 2) 컬럼이 없으면 updated_at에 대체 저장하여 운영자가 수정한 행사 시간이 유지되게 함
+        if event_at is not None:
+            if "event_at" in self._post_opt_cols:
+                post_data["event_at"] = event_at
+            elif "updated_at" in self._post_opt_cols:
+                post_data["updated_at"] = event_at
+        return post_data
+
+    def _event_tuple_from_rows(
+        self, post_rows, p_rows, c_rows, include_commenters: bool
+    ) -> Tuple[Dict, str, List, str, str, str, str, bool, str, Optional[str]]:
+        """(posts rows, participants rows, commenters rows) → get_data 반환 튜플."""
+        participants = {}
+        all_commenters = []
+        last_id, title, prizes, memo, winners, allowed_list_str = None, None, None, None, "", None
+        allow_duplicates = False
+        event_at_str: Optional[str] = None
+        if post_rows:
+            post = self._best_post_row(post_rows)
+            last_id = post.get("last_comment_id")
+            title = post.get("title")
+            prizes = post.get("prizes")
+            memo = post.get("memo")
+            winners = post.get("winners", "")
+            allow_duplicates = bool(post.get("allow_duplicates", False))
+            allowed_list_str = post.get("allowed_list")
+            ea = post.get("event_at")
+            if ea is not None:
+                event_at_str = str(ea) if not isinstance(ea, str) else ea
+            elif post.get("updated_at") is not None:
+                # event_at 미구성 스키마 대응: 화면 표시용 fallback
+                u = post.get("updated_at")
+                event_at_str = str(u) if not isinstance(u, str) else u
+
+            for p in p_rows:
+                participants[p["author"]] = (p["count"], p.get("created_at"))
+
+            if include_commenters:
+                for c in c_rows:
+                    all_commenters.append(
+                        {"name": c["author"], "created_at": c.get("created_at")}
+                    )
+        return (
+            participants,
+            last_id,
+            all_commenters,
+            title,
+            prizes,
+            memo,
+            winners,
+            allow_duplicates,
+            allowed_list_str,
+            event_at_str,
+        )
+
+    def _plan_participant_delta(
+        self, event_id: str, participants_dict: Dict[str, Any], persisted: Dict[str, Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[str], int]:
+        """
+        participants_dict 를 이벤트의 전체 참가자 집합으로 보고 기준선(persisted)과 비교한다.
+        반환: (upsert 할 행: 새 작성자/티켓 수 변경, 삭제할 정규화 작성자 키, 원하는 작성자 수)
+        """
+        fk = self._participant_fk_col
+        now_iso = datetime.now().isoformat()
+        wanted: set = set()
+        p_batch: List[Dict[str, Any]] = []
+        for author, v in participants_dict.items():
+            count = v[0] if isinstance(v, (tuple, list)) else v
+            sk = self._norm_author_key(author)
+            wanted.add(sk)
+            prev = persisted.get(sk)
+            if prev is not None and prev.get("count") == count:
+                continue
+            row: Dict[str, Any] = {fk: event_id, "author": author, "count": count}
+            if self._participant_has_id_col:
+                pid = prev.get("id") if prev else None
+                if pid is not None:
+                    row["id"] = pid
+                elif self._participant_id_sql_type == "uuid":
+                    row["id"] = str(uuid.uuid4())
+            if self._participant_has_created_at_col:
+                ct = prev.get("created_at") if prev else None
+                row["created_at"] = ct if ct is not None else now_iso
+            p_batch.append(row)
+        removed = [sk for sk in persisted if sk not in wanted]
+        return p_batch, removed, len(wanted)
+
+    def _plan_commenter_inserts(
+        self, event_id: str, all_commenters: List[Any], persisted: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """댓글 작성자는 누적 목록이므로 기준선에 없는 작성자만 insert 대상."""
+        fk = self._commenter_fk_col
+        now_iso = datetime.now().isoformat()
+        seen = set(persisted.keys())
+        c_batch: List[Dict[str, Any]] = []
+        for item in all_commenters:
+            name = item["name"] if isinstance(item, dict) else item
+            sk = self._norm_author_key(name)
+            if sk in seen:
+                continue
+            seen.add(sk)
+            crow: Dict[str, Any] = {fk: event_id, "author": name}
+            if self._commenter_has_id_col and self._commenter_id_sql_type == "uuid":
+                crow["id"] = str(uuid.uuid4())
+            if self._commenter_has_created_at_col:
+                crow["created_at"] = now_iso
+            c_batch.append(crow)
+        return c_batch
+
+    @staticmethod
+    def _save_payload(
+        event_id,
+        participants_dict,
+        last_comment_id,
+        all_commenters,
+        title,
+        prizes,
+        memo,
+        winners,
+        allow_duplicates,
+        allowed_list,
+        event_at,
+        is_active: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """쓰기 큐에 넣을 save 인자. 호출부가 넘긴 컨테이너는 복사해 이후 변경의 영향을 받지 않게 한다."""
+        return {
+            "event_id": event_id,
+            "participants_dict": dict(participants_dict) if participants_dict else participants_dict,
+            "last_comment_id": last_comment_id,
+            "all_commenters": list(all_commenters) if all_commenters else all_commenters,
+            "title": title,
+            "prizes": prizes,
+            "memo": memo,
+            "winners": winners,
+            "allow_duplicates": allow_duplicates,
+            "allowed_list": allowed_list,
+            "event_at": event_at,
+            "is_active": is_active,
+        }
+
+    def _snapshot_apply_save(
+        self,
+        event_id,
+        participants_dict,
+        last_comment_id,
+        all_commenters,
+        title,
+        prizes,
+        memo,
+        winners,
+        allow_duplicates,
+        allowed_list,
+        event_at,
+    ) -> None:
+        """_sync_save_supabase_core 와 같은 병합 규칙으로 스냅샷 캐시에 반영."""
+        fields: Dict[str, Any] = {}
+        if title is not None:
+            fields["title"] = title
+        if prizes is not None:
+            fields["prizes"] = prizes
+        if memo is not None:
+            fields["memo"] = memo
+        if winners is not None and not self._has_winners_table:
+            fields["winners"] = winners
+        if allowed_list is not None:
+            fields["allowed_list"] = allowed_list
+        if allow_duplicates is not None:
+            fields["allow_duplicates"] = bool(allow_duplicates)
+        if last_comment_id is not None:
+            fields["last_comment_id"] = last_comment_id
+        if event_at is not None and ("event_at" in self._post_opt_cols or "updated_at" in self._post_opt_cols):
+            fields["event_at"] = event_at
+        elif "event_at" not in self._post_opt_cols and "updated_at" in self._post_opt_cols:
+            # event_at 컬럼이 없으면 get_data 는 updated_at 을 표시하므로 저장 시각으로 맞춘다.
+            fields["event_at"] = datetime.now().isoformat()
+
+        now_iso = datetime.now().isoformat()
+        p_upd = None
+        if participants_dict:
+            p_ct = now_iso if self._participant_has_created_at_col else None
+            p_upd = {}
+            for author, v in participants_dict.items():
+                count = v[0] if isinstance(v, (tuple, list)) else v
+                p_upd[author] = (count, p_ct)
+        c_add = None
+        if all_commenters:
+            c_ct = now_iso if self._commenter_has_created_at_col else None
+            c_add = []
+            for item in all_commenters:
+                name = item["name"] if isinstance(item, dict) else item
+                c_add.append({"name": name, "created_at": c_ct})
+        self._snapshots.apply_save(event_id, fields, p_upd, c_add)
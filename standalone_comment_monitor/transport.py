@@ -0,0 +1,299 @@
+"""Supabase(PostgREST) 호출용 HTTP 전송 계층: keep-alive 풀, 읽기/쓰기 분리 타임아웃, keep-warm, 호스트별 연결 지표, 서킷 브레이커."""
+import importlib.util
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from .circuit_breaker import AsyncBreakerTransport, BreakerRegistry, BreakerTransport
+
+# 풀 크기 (gunicorn 스레드 수 + 쓰기 워커 + keep-warm 여유)
+_HTTP_POOL_SIZE = int(os.getenv("SUPABASE_HTTP_POOL_SIZE", "10"))
+# 유휴 연결 유지 시간. httpx 기본 5초라 잠깐만 쉬어도 TLS 핸드셰이크를 다시 한다.
+_HTTP_KEEPALIVE_SEC = float(os.getenv("SUPABASE_HTTP_KEEPALIVE_SEC", "120"))
+# HTTP/2: auto(h2 설치 시 사용) | 1 | 0
+_HTTP2_MODE = os.getenv("SUPABASE_HTTP2", "auto").strip().lower()
+_CONNECT_TIMEOUT_SEC = float(os.getenv("SUPABASE_CONNECT_TIMEOUT_SEC", "5"))
+# 조회는 짧게 끊고 폴백(캐시·복제본)으로 넘어가고, 쓰기는 반영될 때까지 조금 더 기다린다.
+_READ_TIMEOUT_SEC = float(os.getenv("SUPABASE_READ_TIMEOUT_SEC", "10"))
+_WRITE_TIMEOUT_SEC = float(os.getenv("SUPABASE_WRITE_TIMEOUT_SEC", "30"))
+# 유휴 풀을 살려 두는 ping 간격(초). 0 이면 끄기. keep-alive 시간보다 짧아야 의미가 있다.
+_KEEPWARM_SEC = float(os.getenv("SUPABASE_KEEPWARM_SEC", "45"))
+
+ROLE_TIMEOUTS = {"read": _READ_TIMEOUT_SEC, "write": _WRITE_TIMEOUT_SEC}
+
+
+def _http2_enabled() -> bool:
+    if _HTTP2_MODE in ("0", "false", "no", "off"):
+        return False
+    # httpx[http2] 선택 의존성: import 하지 않고 설치 여부만 확인
+    if importlib.util.find_spec("h2") is None:
+        if _HTTP2_MODE in ("1", "true", "yes", "on"):
+            print("DEBUG: [transport] SUPABASE_HTTP2=1 but 'h2' is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _pool_limits(pool_size: int, keepalive_sec: float) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=keepalive_sec,
+    )
+
+
+class TransportMetrics:
+    """호스트별 요청 수·오류·지연, 새 연결(TCP)·TLS 핸드셰이크 수와 소요 시간."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._last_by_pool: Dict[str, float] = {}
+
+    def _host(self, host: str) -> Dict[str, Any]:
+        h = self._hosts.get(host)
+        if h is None:
+            h = {
+                "requests": 0,
+                "errors": 0,
+                "latency_total_sec": 0.0,
+                "latency_max_sec": 0.0,
+                "connects": 0,
+                "connect_total_sec": 0.0,
+                "tls_handshakes": 0,
+                "tls_total_sec": 0.0,
+                "last_request_at": 0.0,
+            }
+            self._hosts[host] = h
+        return h
+
+    def record_phase(self, host: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            h = self._host(host)
+            if phase == "connect":
+                h["connects"] += 1
+                h["connect_total_sec"] += seconds
+            elif phase == "tls":
+                h["tls_handshakes"] += 1
+                h["tls_total_sec"] += seconds
+
+    def record_response(self, host: str, seconds: float, ok: bool, pool: str = "") -> None:
+        with self._lock:
+            self._last_by_pool[pool] = time.time()
+            h = self._host(host)
+            h["requests"] += 1
+            if not ok:
+                h["errors"] += 1
+            h["latency_total_sec"] += seconds
+            h["latency_max_sec"] = max(h["latency_max_sec"], seconds)
+            h["last_request_at"] = time.time()
+
+    def last_request_at(self, pool: str = "") -> float:
+        with self._lock:
+            return self._last_by_pool.get(pool, 0.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for host, h in self._hosts.items():
+                d = dict(h)
+                n = d["requests"]
+                d["latency_avg_sec"] = d["latency_total_sec"] / n if n else 0.0
+                # 연결 재사용률: 요청 대비 새 연결이 적을수록 높다
+                d["reuse_ratio"] = (1.0 - d["connects"] / n) if n else 0.0
+                out[host] = d
+            return out
+
+
+class _RequestTrace:
+    """httpcore trace 확장: 연결 수립/TLS 단계 시간을 잰다. 응답 훅에서 전체 지연도 기록."""
+
+    __slots__ = ("metrics", "host", "pool", "t0", "_phase_t0")
+
+    def __init__(self, metrics: TransportMetrics, host: str, pool: str):
+        self.metrics = metrics
+        self.host = host
+        self.pool = pool
+        self.t0 = time.perf_counter()
+        self._phase_t0: Dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self._phase_t0["connect"] = time.perf_counter()
+        elif event_name == "connection.connect_tcp.complete":
+            self.metrics.record_phase(self.host, "connect", time.perf_counter() - self._phase_t0.get("connect", self.t0))
+        elif event_name == "connection.start_tls.started":
+            self._phase_t0["tls"] = time.perf_counter()
+        elif event_name == "connection.start_tls.complete":
+            self.metrics.record_phase(self.host, "tls", time.perf_counter() - self._phase_t0.get("tls", self.t0))
+
+
+def build_http_client(
+    timeout_sec: float,
+    metrics: Optional[TransportMetrics] = None,
+    pool_size: int = _HTTP_POOL_SIZE,
+    keepalive_sec: float = _HTTP_KEEPALIVE_SEC,
+    http2: Optional[bool] = None,
+    pool_name: str = "",
+    breakers: Optional[BreakerRegistry] = None,
+) -> httpx.Client:
+    """keep-alive 풀 + 타임아웃 + (선택) 지표 훅·서킷 브레이커가 걸린 httpx 클라이언트."""
+    hooks: Dict[str, list] = {}
+    if metrics is not None:
+
+        def _on_request(request: httpx.Request) -> None:
+            request.extensions["trace"] = _RequestTrace(metrics, request.url.host, pool_name)
+
+        def _on_response(response: httpx.Response) -> None:
+            tr = response.request.extensions.get("trace")
+            if isinstance(tr, _RequestTrace):
+                metrics.record_response(
+                    tr.host, time.perf_counter() - tr.t0, response.status_code < 500, tr.pool
+                )
+
+        hooks = {"request": [_on_request], "response": [_on_response]}
+
+    # transport 를 직접 넘기면 Client 의 limits/http2 인자는 무시되므로 전송 객체에 설정한다.
+    transport: httpx.BaseTransport = httpx.HTTPTransport(
+        limits=_pool_limits(pool_size, keepalive_sec),
+        http2=_http2_enabled() if http2 is None else http2,
+    )
+    if breakers is not None:
+        transport = BreakerTransport(transport, breakers)
+    return httpx.Client(
+        timeout=httpx.Timeout(timeout_sec, connect=min(_CONNECT_TIMEOUT_SEC, timeout_sec)),
+        transport=transport,
+        follow_redirects=True,
+        event_hooks=hooks,
+    )
+
+
+class _AsyncRequestTrace(_RequestTrace):
+    """httpx.AsyncClient 용: httpcore 비동기 경로는 trace 콜백을 await 한다."""
+
+    __slots__ = ()
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        super().__call__(event_name, info)
+
+
+def build_async_http_client(
+    timeout_sec: float,
+    metrics: Optional[TransportMetrics] = None,
+    pool_size: int = _HTTP_POOL_SIZE,
+    keepalive_sec: float = _HTTP_KEEPALIVE_SEC,
+    http2: Optional[bool] = None,
+    pool_name: str = "",
+    breakers: Optional[BreakerRegistry] = None,
+) -> httpx.AsyncClient:
+    """build_http_client 의 비동기 버전 (AsyncCommentDatabase 용)."""
+    hooks: Dict[str, list] = {}
+    if metrics is not None:
+
+        async def _on_request(request: httpx.Request) -> None:
+            request.extensions["trace"] = _AsyncRequestTrace(metrics, request.url.host, pool_name)
+
+        async def _on_response(response: httpx.Response) -> None:
+            tr = response.request.extensions.get("trace")
+            if isinstance(tr, _RequestTrace):
+                metrics.record_response(
+                    tr.host, time.perf_counter() - tr.t0, response.status_code < 500, tr.pool
+                )
+
+        hooks = {"request": [_on_request], "response": [_on_response]}
+
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+        limits=_pool_limits(pool_size, keepalive_sec),
+        http2=_http2_enabled() if http2 is None else http2,
+    )
+    if breakers is not None:
+        transport = AsyncBreakerTransport(transport, breakers)
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout_sec, connect=min(_CONNECT_TIMEOUT_SEC, timeout_sec)),
+        transport=transport,
+        follow_redirects=True,
+        event_hooks=hooks,
+    )
+
+
+class SupabaseTransport:
+    """
+    역할(read/write)별 httpx 풀과 keep-warm 스레드.
+    - 프로세스가 바뀌면(gunicorn preload 후 fork) 부모가 연 소켓을 쓰지 않도록 풀을 새로 만든다.
+    - keep-warm: 풀별로 마지막 요청 이후 _KEEPWARM_SEC 이상 조용하면 ping 콜백으로 각 풀의 연결을 살려 둔다.
+    """
+
+    def __init__(self, keepwarm_sec: float = _KEEPWARM_SEC):
+        self.keepwarm_sec = float(keepwarm_sec)
+        self.metrics = TransportMetrics()
+        # 테이블·작업별 서킷 브레이커 + 재시도 예산 (읽기/쓰기 풀 공유)
+        self.breakers = BreakerRegistry()
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.Client] = {}
+        self._pid = os.getpid()
+        self._warm_thread: Optional[threading.Thread] = None
+        self._warm_pid: Optional[int] = None
+        self._ping: Optional[Callable[[str], None]] = None
+        self.pings = 0
+        self.ping_errors = 0
+
+    def http_client(self, role: str) -> httpx.Client:
+        with self._lock:
+            if self._pid != os.getpid():
+                # 부모 프로세스의 소켓은 닫지 않고 버린다 (부모 쪽 연결에 영향 없음).
+                self._clients = {}
+                self._pid = os.getpid()
+            c = self._clients.get(role)
+            if c is None:
+                c = build_http_client(
+                    ROLE_TIMEOUTS.get(role, _READ_TIMEOUT_SEC), self.metrics, pool_name=role, breakers=self.breakers
+                )
+                self._clients[role] = c
+            return c
+
+    def forked(self) -> bool:
+        return self._pid != os.getpid()
+
+    def start_keepwarm(self, ping: Callable[[str], None]) -> None:
+        """ping(role): 해당 역할 풀로 가벼운 요청 1건. 첫 요청 경로에서 호출해도 되도록 멱등."""
+        if self.keepwarm_sec <= 0:
+            return
+        self._ping = ping
+        if self._warm_pid == os.getpid() and self._warm_thread is not None and self._warm_thread.is_alive():
+            return
+        with self._lock:
+            if self._warm_pid == os.getpid() and self._warm_thread is not None and self._warm_thread.is_alive():
+                return
+            self._warm_pid = os.getpid()
+            self._warm_thread = threading.Thread(target=self._keepwarm_loop, name="supabase-keepwarm", daemon=True)
+            self._warm_thread.start()
+
+    def _keepwarm_loop(self) -> None:
+        while True:
+            time.sleep(max(1.0, self.keepwarm_sec / 3))
+            for role in list(self._clients.keys()):
+                if time.time() - self.metrics.last_request_at(role) < self.keepwarm_sec:
+                    continue
+                try:
+                    self._ping(role)
+                    self.pings += 1
+                except Exception as e:
+                    self.ping_errors += 1
+                    print(f"DEBUG: [transport] keep-warm ping ({role}) failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "roles": sorted(self._clients.keys()),
+            "timeouts_sec": dict(ROLE_TIMEOUTS),
+            "pool_size": _HTTP_POOL_SIZE,
+            "keepalive_sec": _HTTP_KEEPALIVE_SEC,
+            "http2": _http2_enabled(),
+            "keepwarm_sec": self.keepwarm_sec,
+            "keepwarm_alive": bool(self._warm_thread and self._warm_thread.is_alive()),
+            "pings": self.pings,
+            "ping_errors": self.ping_errors,
+            "hosts": self.metrics.snapshot(),
+            "breakers": self.breakers.stats(),
+        }
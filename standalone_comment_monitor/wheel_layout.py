@@ -0,0 +1,162 @@
+"""
+원판 배치(WheelLayout): 섹터 경계 누적 각도를 한 번 계산해 두고 화살표 각도 → 당첨자를 이진 탐색으로 찾는다.
+
+- 각도: 0도 = 12시 방향, 시계 방향 증가 (Chart.js doughnut rotation -90° 와 같은 기준).
+- 섹터 i 는 [ends[i-1], ends[i]) — 시작 경계 포함, 끝 경계 제외. 폭 0 섹터(티켓 0)는 당첨되지 않는다.
+- 누적 오차로 마지막 경계가 360 보다 조금 작을 때 그 틈에 걸린 각도는 첫 번째 참가자 (기존 calculate_winner_at_angle 규칙).
+- 경계는 기존 함수와 같은 순서로 (cnt / total) * 360.0 을 더해 만들어 부동소수점 결과까지 같다.
+
+ParticipantPool.layout() 이 풀마다 한 번 만들어 캐시하므로, 같은 참가자 집합이면 스핀마다 다시 만들지 않는다.
+
+WheelLayoutRegistry: 배치를 내용 해시(이름·티켓·색·경계)로 한 번 게시해 두고, 소켓 메시지는 명단 대신 해시만
+보낸다. 클라이언트는 처음 보는 해시일 때만 GET /api/wheel/layout/<hash> 로 받아 캐시한다.
+"""
+import hashlib
+import json
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+
+class WheelLayout:
+    """불변. labels[i] 섹터의 끝 각도가 ends[i] (도, 누적)."""
+
+    __slots__ = ("labels", "tickets", "ends", "total", "_document")
+
+    def __init__(self, labels: Sequence[str], counts: Iterable[int]):
+        self.labels: Tuple[str, ...] = tuple(labels)
+        counts = list(counts)
+        self.tickets: Tuple[int, ...] = tuple(counts)
+        self.total = sum(counts)
+        self._document: Optional[Tuple[str, bytes]] = None
+        self.ends = array("d")
+        if self.total:
+            cumulative = 0.0
+            for cnt in counts:
+                cumulative += cnt / self.total * 360.0
+                self.ends.append(cumulative)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]]) -> "WheelLayout":
+        """[(이름, 티켓 수, ...), ...] — load_participants / start_game participants 형식."""
+        rows = list(rows)
+        return cls([r[0] for r in rows], [r[1] for r in rows])
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def index_at(self, angle: float) -> int:
+        """화살표 각도가 가리키는 섹터 번호. 참가자가 없으면 -1."""
+        if not self.labels:
+            return -1
+        if not self.total:
+            return 0
+        # ends[i] > a 인 첫 i. ends[i-1] <= a 이므로 a 는 [ends[i-1], ends[i]) 안 (폭 0 섹터는 자연히 건너뜀)
+        i = bisect_right(self.ends, angle % 360)
+        return i if i < len(self.ends) else 0
+
+    def winner_at(self, angle: float) -> str:
+        i = self.index_at(angle)
+        return self.labels[i] if i >= 0 else "N/A"
+
+    def sector(self, index: int) -> Tuple[float, float]:
+        """(시작, 끝) 각도."""
+        if not self.total:
+            return (0.0, 360.0 if index == 0 else 0.0)
+        start = self.ends[index - 1] if index > 0 else 0.0
+        return (start, self.ends[index])
+
+    def sectors(self) -> List[Tuple[str, float, float]]:
+        """[(이름, 시작, 끝), ...] — 디버그/검증용."""
+        return [(name,) + self.sector(i) for i, name in enumerate(self.labels)]
+
+    def document(self) -> Tuple[str, bytes]:
+        """(내용 해시, JSON 본문). 본문: names / tickets / colors / bounds(섹터 끝 각도). 한 번만 직렬화."""
+        if self._document is None:
+            n = len(self.labels)
+            body = json.dumps(
+                {
+                    "names": list(self.labels),
+                    "tickets": list(self.tickets),
+                    "colors": [sector_color(i, n) for i in range(n)],
+                    "bounds": list(self.ends),
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            self._document = (hashlib.sha256(body).hexdigest()[:20], body)
+        return self._document
+
+
+def sector_color(index: int, count: int) -> str:
+    """클라이언트 generateColors 와 같은 색 (`hsl(${i * 360 / count}, 70%, 50%)`, 정수면 소수점 없이)."""
+    h = index * 360 / count if count else 0
+    return f"hsl({int(h) if h == int(h) else h}, 70%, 50%)"
+
+
+EMPTY_LAYOUT = WheelLayout([], [])
+
+
+class WheelLayoutRegistry:
+    """게시된 배치 본문 (해시 → JSON). 최근 max_layouts 개만 유지. 스레드 안전.
+
+    같은 배치를 다시 게시하면 해시만 돌려준다 (직렬화는 WheelLayout 에 캐시).
+    pin() 으로 고정한 해시(진행 중 게임의 원판)는 LRU 에서 빼지 않는다 — 댓글 동기화마다 새 배치가 게시돼도
+    중간 합류자의 start_game 이 가리키는 배치는 게임이 끝날 때까지 받을 수 있다.
+    """
+
+    def __init__(self, max_layouts: int = 32):
+        self.max_layouts = max(1, int(max_layouts))
+        self._lock = threading.Lock()
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._pinned: FrozenSet[str] = frozenset()
+        self.published = 0
+        self.served = 0
+        self.misses = 0
+
+    def publish(self, layout: Optional[WheelLayout]) -> str:
+        digest, body = (layout if layout is not None else EMPTY_LAYOUT).document()
+        with self._lock:
+            if digest not in self._bodies:
+                self.published += 1
+            self._bodies[digest] = body
+            self._bodies.move_to_end(digest)
+            self._evict()
+        return digest
+
+    def pin(self, digests: Iterable[Optional[str]]) -> None:
+        """고정 집합을 digests 로 바꾼다 (이전 고정은 풀림). 게시되지 않은 해시는 무시."""
+        with self._lock:
+            self._pinned = frozenset(d for d in digests if d)
+            self._evict()
+
+    def _evict(self) -> None:
+        # 고정되지 않은 것 중 오래된 것부터. 고정 수가 max_layouts 를 넘으면 고정분만 남는다.
+        excess = len(self._bodies) - self.max_layouts
+        if excess <= 0:
+            return
+        for digest in [d for d in self._bodies if d not in self._pinned][:excess]:
+            del self._bodies[digest]
+
+    def get(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._bodies.get(digest)
+            if body is None:
+                self.misses += 1
+                return None
+            self._bodies.move_to_end(digest)
+            self.served += 1
+            return body
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "layouts": len(self._bodies),
+                "pinned": sum(1 for d in self._pinned if d in self._bodies),
+                "bytes": sum(len(b) for b in self._bodies.values()),
+                "published": self.published,
+                "served": self.served,
+                "misses": self.misses,
+            }
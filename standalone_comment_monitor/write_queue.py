@@ -0,0 +1,265 @@
+"""이벤트별 순서를 보장하는 단일 워커 write-behind 큐 (연속 스냅샷 병합·재시도·역압)."""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .circuit_breaker import backoff_delay
+
+
+class WriteOp:
+    """큐에 쌓인 쓰기 1건. 병합되면 submissions 가 늘어난다."""
+
+    __slots__ = (
+        "kind",
+        "key",
+        "payload",
+        "max_attempts",
+        "attempts",
+        "retry_at",
+        "enqueued_at",
+        "submissions",
+        "waiters",
+        "done",
+        "ok",
+        "error",
+    )
+
+    def __init__(self, kind: str, key: str, payload: Any, max_attempts: int):
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.max_attempts = max(1, int(max_attempts))
+        self.attempts = 0
+        self.retry_at = 0.0
+        self.enqueued_at = time.time()
+        self.submissions = 1
+        self.waiters = 0
+        self.done = threading.Event()
+        self.ok = False
+        self.error: Optional[str] = None
+
+
+class WriteBehindQueue:
+    """
+    - 이벤트(key)마다 FIFO 큐를 두고 워커 1개가 key 간 라운드로빈으로 처리한다. 같은 key 안에서는 항상 제출 순서대로 반영.
+    - 아직 시작하지 않은 마지막 op 와 같은 종류의 op 가 들어오면 merge 함수로 하나로 합친다(대기 중인 호출자가 없을 때만).
+    - 실패한 op 는 해당 key 의 맨 앞에 남겨 지터 지수 백오프 후 재시도 (다른 key 는 계속 진행).
+      retry_budget(try_retry() 를 가진 객체)이 있으면 재시도마다 예산을 쓰고, 예산이 없으면 바로 최종 실패 처리한다.
+      오류에 retry_after(서킷 브레이커가 열린 남은 시간)가 있으면 그 전에는 다시 시도하지 않는다.
+    - 전체 대기 op 가 max_pending 을 넘으면 submit 이 put_timeout_sec 까지 대기(역압).
+    - 워커 스레드는 첫 submit 에서 띄운다. (gunicorn preload 후 fork 된 워커 프로세스에서도 동작하도록 pid 확인)
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, str, Any], None],
+        merge: Optional[Dict[str, Callable[[Any, Any], Any]]] = None,
+        on_done: Optional[Callable[[WriteOp], None]] = None,
+        max_pending: int = 200,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 4.0,
+        put_timeout_sec: float = 5.0,
+        name: str = "write-behind",
+        retry_budget: Any = None,
+    ):
+        self._handler = handler
+        self._merge = dict(merge or {})
+        self._on_done = on_done
+        self.max_pending = max(1, int(max_pending))
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.put_timeout_sec = float(put_timeout_sec)
+        self.name = name
+        self._retry_budget = retry_budget
+        self._reset_runtime()
+
+    def _reset_runtime(self) -> None:
+        self._cond = threading.Condition()
+        self._queues: "OrderedDict[str, Deque[WriteOp]]" = OrderedDict()
+        self._depth = 0
+        self._in_flight: Optional[WriteOp] = None
+        self._worker: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "completed": 0,
+            "failed": 0,
+            "retries": 0,
+            "retries_denied": 0,
+            "overflow": 0,
+            "last_flush_latency_sec": 0.0,
+            "avg_flush_latency_sec": 0.0,
+            "max_flush_latency_sec": 0.0,
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._pid != os.getpid():
+            # fork 이후: 부모의 스레드/락 상태는 쓸 수 없으므로 새로 만든다.
+            self._reset_runtime()
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._worker.start()
+
+    # ----- 제출 -----
+    def submit(
+        self,
+        kind: str,
+        key: str,
+        payload: Any,
+        wait: bool = False,
+        max_attempts: Optional[int] = None,
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        wait=False: 큐에 넣고 즉시 (True, None).
+        wait=True : 반영(또는 최종 실패)까지 기다린 뒤 (성공 여부, 마지막 오류).
+        """
+        self._ensure_worker()
+        attempts = self.max_attempts if max_attempts is None else max_attempts
+        with self._cond:
+            deadline = time.time() + self.put_timeout_sec
+            while self._depth >= self.max_pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self._stats["overflow"] += 1
+                    print(f"DEBUG: [{self.name}] queue full ({self._depth}); enqueue over limit")
+                    break
+                self._cond.wait(remaining)
+
+            self._stats["submitted"] += 1
+            q = self._queues.get(key)
+            if q is None:
+                q = deque()
+                self._queues[key] = q
+            last = q[-1] if q else None
+            merge_fn = self._merge.get(kind)
+            if (
+                not wait
+                and merge_fn is not None
+                and last is not None
+                and last is not self._in_flight
+                and last.kind == kind
+                and last.attempts == 0
+                and last.waiters == 0
+            ):
+                last.payload = merge_fn(last.payload, payload)
+                last.submissions += 1
+                self._stats["coalesced"] += 1
+                return True, None
+
+            op = WriteOp(kind, key, payload, attempts)
+            if wait:
+                op.waiters = 1
+            q.append(op)
+            self._depth += 1
+            self._cond.notify_all()
+
+        if not wait:
+            return True, None
+        op.done.wait()
+        return op.ok, op.error
+
+    # ----- 워커 -----
+    def _next_ready(self, now: float) -> Tuple[Optional[WriteOp], float]:
+        """처리 가능한 op 를 key 라운드로빈으로 고른다. 없으면 (None, 다음 재시도까지 남은 시간)."""
+        wait_for = 1.0
+        for key in list(self._queues.keys()):
+            q = self._queues[key]
+            if not q:
+                del self._queues[key]
+                continue
+            op = q[0]
+            if op.retry_at <= now:
+                # 공정성: 처리한 key 는 뒤로 보낸다.
+                self._queues.move_to_end(key)
+                return op, 0.0
+            wait_for = min(wait_for, op.retry_at - now)
+        return None, max(0.01, wait_for)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    op, wait_for = self._next_ready(time.time())
+                    if op is not None:
+                        break
+                    self._cond.wait(wait_for if self._queues else None)
+                self._in_flight = op
+
+            op.attempts += 1
+            err: Optional[str] = None
+            retry_after = 0.0
+            try:
+                self._handler(op.kind, op.key, op.payload)
+            except Exception as e:
+                err = str(e) or e.__class__.__name__
+                retry_after = float(getattr(e, "retry_after", 0.0) or 0.0)
+
+            retry = err is not None and op.attempts < op.max_attempts
+            if retry and self._retry_budget is not None and not self._retry_budget.try_retry():
+                retry = False
+                with self._cond:
+                    self._stats["retries_denied"] += 1
+                print(f"DEBUG: [{self.name}] retry budget exhausted; giving up {op.kind} {op.key}")
+
+            with self._cond:
+                self._in_flight = None
+                if retry:
+                    delay = max(backoff_delay(op.attempts, self.base_delay, self.max_delay), retry_after)
+                    op.retry_at = time.time() + delay
+                    self._stats["retries"] += 1
+                    self._cond.notify_all()
+                    continue
+                q = self._queues.get(op.key)
+                if q and q[0] is op:
+                    q.popleft()
+                    if not q:
+                        del self._queues[op.key]
+                self._depth -= 1
+                latency = time.time() - op.enqueued_at
+                st = self._stats
+                st["last_flush_latency_sec"] = latency
+                st["max_flush_latency_sec"] = max(st["max_flush_latency_sec"], latency)
+                st["avg_flush_latency_sec"] = (
+                    latency if st["completed"] + st["failed"] == 0 else st["avg_flush_latency_sec"] * 0.9 + latency * 0.1
+                )
+                if err is None:
+                    st["completed"] += 1
+                else:
+                    st["failed"] += 1
+                    print(f"DEBUG: [{self.name}] {op.kind} {op.key} failed after {op.attempts} tries: {err}")
+                self._cond.notify_all()
+
+            op.ok = err is None
+            op.error = err
+            if self._on_done is not None:
+                try:
+                    self._on_done(op)
+                except Exception as e:
+                    print(f"DEBUG: [{self.name}] on_done error: {e}")
+            op.done.set()
+
+    # ----- 관측 -----
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 쓰기가 모두 끝날 때까지 기다린다. 시간 내에 비면 True."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._depth > 0:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 1.0)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out = dict(self._stats)
+            out["depth"] = self._depth
+            out["in_flight"] = bool(self._in_flight)
+            out["per_key_depth"] = {k: len(q) for k, q in self._queues.items() if q}
+            out["worker_alive"] = bool(self._worker and self._worker.is_alive())
+        return out
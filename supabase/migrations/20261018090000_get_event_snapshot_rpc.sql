@@ -0,0 +1,36 @@
+-- get_data 단일 왕복 조회용 함수.
+-- posts 행(중복 행 포함) + participants + commenters 를 JSON 하나로 돌려준다.
+-- 앱(CommentDatabase)은 이 함수가 없으면 기존 순차 조회로 자동 폴백한다.
+-- 전제: 20260405_posts_id_event_at.sql 적용 후 스키마 (posts.id / participants.event_id / commenters.event_id).
+
+CREATE OR REPLACE FUNCTION public.get_event_snapshot(
+    p_event_id TEXT,
+    p_include_commenters BOOLEAN DEFAULT TRUE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'posts',
+        COALESCE(
+            (SELECT jsonb_agg(to_jsonb(p)) FROM public.posts p WHERE p.id::text = p_event_id),
+            '[]'::jsonb
+        ),
+        'participants',
+        COALESCE(
+            (SELECT jsonb_agg(to_jsonb(x)) FROM public.participants x WHERE x.event_id::text = p_event_id),
+            '[]'::jsonb
+        ),
+        'commenters',
+        CASE
+            WHEN p_include_commenters THEN COALESCE(
+                (SELECT jsonb_agg(to_jsonb(c)) FROM public.commenters c WHERE c.event_id::text = p_event_id),
+                '[]'::jsonb
+            )
+            ELSE '[]'::jsonb
+        END
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_event_snapshot(TEXT, BOOLEAN) TO anon, authenticated, service_role;
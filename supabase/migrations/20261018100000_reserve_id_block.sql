@@ -0,0 +1,57 @@
+-- 정수 id 스키마(participants.id / commenters.id 가 default 없는 integer)용 블록 채번.
+-- 앱(IdBlockAllocator)은 reserve_id_block 으로 id 블록을 예약해 메모리에서 나눠 쓴다.
+-- 함수가 없으면 기존 방식(테이블 max(id) 조회 후 순번 부여)으로 자동 폴백한다.
+-- 주의: 배포 후에는 모든 쓰기 경로가 이 함수를 거쳐야 한다. 직접 id 를 넣는 스크립트가 있다면
+--       카운터를 max(id) 뒤로 맞춰 두세요:
+--       UPDATE public.id_counters c SET next_id = GREATEST(c.next_id, (SELECT COALESCE(MAX(id), 0) + 1 FROM public.participants))
+--       WHERE c.name = 'participants';
+
+CREATE TABLE IF NOT EXISTS public.id_counters (
+    name TEXT PRIMARY KEY,
+    next_id BIGINT NOT NULL
+);
+
+-- p_count 개의 연속 id 를 예약하고 첫 id 를 돌려준다. [반환값, 반환값 + p_count)
+CREATE OR REPLACE FUNCTION public.reserve_id_block(p_table TEXT, p_count INTEGER)
+RETURNS BIGINT
+LANGUAGE plpgsql
+VOLATILE
+-- id_counters 에 RLS 가 걸려 있어도 anon 키로 예약할 수 있도록
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_start BIGINT;
+    v_max BIGINT;
+BEGIN
+    IF p_table NOT IN ('participants', 'commenters') THEN
+        RAISE EXCEPTION 'reserve_id_block: unsupported table %', p_table;
+    END IF;
+    IF p_count IS NULL OR p_count < 1 OR p_count > 100000 THEN
+        RAISE EXCEPTION 'reserve_id_block: invalid count %', p_count;
+    END IF;
+
+    UPDATE public.id_counters
+       SET next_id = next_id + p_count
+     WHERE name = p_table
+    RETURNING next_id - p_count INTO v_start;
+
+    IF v_start IS NULL THEN
+        -- 첫 호출: 테이블 max(id) 뒤에서 시작. 동시 첫 호출은 advisory lock 으로 한 번만 초기화.
+        PERFORM pg_advisory_xact_lock(hashtext('reserve_id_block:' || p_table));
+        UPDATE public.id_counters
+           SET next_id = next_id + p_count
+         WHERE name = p_table
+        RETURNING next_id - p_count INTO v_start;
+        IF v_start IS NULL THEN
+            EXECUTE format('SELECT COALESCE(MAX(id), 0) FROM public.%I', p_table) INTO v_max;
+            v_start := v_max + 1;
+            INSERT INTO public.id_counters (name, next_id) VALUES (p_table, v_start + p_count);
+        END IF;
+    END IF;
+
+    RETURN v_start;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.reserve_id_block(TEXT, INTEGER) TO anon, authenticated, service_role;
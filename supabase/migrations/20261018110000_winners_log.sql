@@ -0,0 +1,87 @@
+-- 당첨자 기록: 라운드마다 1행 추가(append-only). 당첨 확정은 INSERT 1회.
+-- posts.winners(쉼표 구분 문자열)는 구 클라이언트용 파생 값으로 트리거가 맞춰 둔다.
+-- (updated_at 도 갱신해 다른 워커의 SQLite 복제본 pull 이 변경을 가져가게 한다.)
+-- 앱(CommentDatabase)은 winners 테이블이 없으면 기존 방식(posts.winners 문자열 재저장)으로 동작한다.
+-- 전제: 20260405_posts_id_event_at.sql 적용 후 스키마 (posts.id).
+
+CREATE TABLE IF NOT EXISTS public.winners (
+    id BIGSERIAL PRIMARY KEY,
+    event_id TEXT NOT NULL,
+    round_id TEXT,
+    winner TEXT NOT NULL,
+    angle DOUBLE PRECISION,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    -- 같은 라운드 confirm 이 여러 탭/워커에서 들어와도 1행만 (round_id 가 NULL 인 행끼리는 충돌하지 않음)
+    CONSTRAINT winners_event_round_key UNIQUE (event_id, round_id)
+);
+
+-- 증분 조회: WHERE event_id = ? AND id > ? ORDER BY id
+CREATE INDEX IF NOT EXISTS winners_event_id_id_idx ON public.winners (event_id, id);
+
+-- 기존 posts.winners 문자열을 기록으로 옮긴다 (트리거 생성 전이라 posts 는 건드리지 않음).
+INSERT INTO public.winners (event_id, winner, created_at)
+SELECT p.id::text, btrim(w.name), COALESCE(p.updated_at, now())
+FROM public.posts p
+CROSS JOIN LATERAL unnest(string_to_array(p.winners, ',')) WITH ORDINALITY AS w(name, ord)
+WHERE COALESCE(p.winners, '') <> ''
+  AND btrim(w.name) <> ''
+  AND NOT EXISTS (SELECT 1 FROM public.winners x WHERE x.event_id = p.id::text)
+ORDER BY p.id, w.ord;
+
+-- INSERT: 문자열 끝에 덧붙이기만 한다 (기록 전체를 다시 읽지 않음).
+CREATE OR REPLACE FUNCTION public.winners_project_insert()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE public.posts
+       SET winners = CASE WHEN COALESCE(winners, '') = '' THEN NEW.winner ELSE winners || ',' || NEW.winner END,
+           updated_at = now()
+     WHERE id::text = NEW.event_id;
+    RETURN NEW;
+END;
+$$;
+
+-- DELETE(개별 삭제·초기화): 남은 기록으로 다시 만든다.
+CREATE OR REPLACE FUNCTION public.winners_project_delete()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE public.posts p
+       SET winners = COALESCE(
+           (SELECT string_agg(w.winner, ',' ORDER BY w.id) FROM public.winners w WHERE w.event_id = p.id::text),
+           ''
+       ),
+           updated_at = now()
+     WHERE p.id::text IN (SELECT DISTINCT event_id FROM old_rows);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS winners_project_insert ON public.winners;
+CREATE TRIGGER winners_project_insert
+AFTER INSERT ON public.winners
+FOR EACH ROW EXECUTE FUNCTION public.winners_project_insert();
+
+DROP TRIGGER IF EXISTS winners_project_delete ON public.winners;
+CREATE TRIGGER winners_project_delete
+AFTER DELETE ON public.winners
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.winners_project_delete();
+
+-- 이벤트 삭제 시 기록도 정리
+CREATE OR REPLACE FUNCTION public.winners_cleanup_post()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM public.winners WHERE event_id = OLD.id::text;
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS winners_cleanup_post ON public.posts;
+CREATE TRIGGER winners_cleanup_post
+AFTER DELETE ON public.posts
+FOR EACH ROW EXECUTE FUNCTION public.winners_cleanup_post();
@@ -0,0 +1,62 @@
+-- 운영 패널 히스토리 목록: 이벤트 ID(YYYYMMDDNN) 내림차순 keyset 페이지 + 참여자/당첨자 수.
+-- 앱(CommentDatabase.list_events)은 이 함수가 없으면 posts 직접 조회(id 내림차순 + id < 커서)로 폴백한다.
+-- 정렬 키: (10자리 숫자 ID 여부, id) 내림차순 → 숫자 ID 최신순, 그 뒤에 레거시 키(url 등).
+-- 커서는 직전 페이지 마지막 행의 id. 첫 페이지는 p_before = NULL.
+-- 전제: 20260405_posts_id_event_at.sql 적용 후 스키마 (posts.id / participants.event_id).
+
+-- 참여자 수 집계(event_id = ANY(...))용. UNIQUE (event_id, author) 가 이미 있으면 그 인덱스로 충분하다.
+CREATE INDEX IF NOT EXISTS participants_event_id_idx ON public.participants (event_id);
+
+CREATE OR REPLACE FUNCTION public.list_events_page(
+    p_before TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 50
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH page AS (
+        SELECT p.id::text AS id,
+               p.title,
+               p.event_at,
+               p.updated_at,
+               p.is_active,
+               p.allow_duplicates,
+               p.winners,
+               (p.id::text ~ '^[0-9]{10}$') AS is_num
+          FROM public.posts p
+         WHERE p_before IS NULL
+            OR ((p.id::text ~ '^[0-9]{10}$'), p.id::text) < ((p_before ~ '^[0-9]{10}$'), p_before)
+         ORDER BY is_num DESC, id DESC
+         LIMIT LEAST(GREATEST(COALESCE(p_limit, 50), 1), 500)
+    ),
+    counts AS (
+        SELECT x.event_id::text AS event_id, count(*) AS n
+          FROM public.participants x
+         WHERE x.event_id::text IN (SELECT id FROM page)
+         GROUP BY x.event_id
+    )
+    SELECT COALESCE(
+        jsonb_agg(
+            jsonb_build_object(
+                'id', page.id,
+                'title', page.title,
+                'event_at', page.event_at,
+                'updated_at', page.updated_at,
+                'is_active', page.is_active,
+                'allow_duplicates', page.allow_duplicates,
+                'participant_count', COALESCE(counts.n, 0),
+                'winner_count', COALESCE(
+                    array_length(array_remove(string_to_array(NULLIF(page.winners, ''), ','), ''), 1),
+                    0
+                )
+            )
+            ORDER BY page.is_num DESC, page.id DESC
+        ),
+        '[]'::jsonb
+    )
+      FROM page
+      LEFT JOIN counts ON counts.event_id = page.id;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.list_events_page(TEXT, INTEGER) TO anon, authenticated, service_role;
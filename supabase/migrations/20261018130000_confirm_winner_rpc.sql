@@ -0,0 +1,69 @@
+-- 당첨 확정 1회 왕복: 당첨 기록 추가 + (중복 당첨 비허용이면) 참가자 제거 + 새 상태 반환을 한 트랜잭션으로.
+-- 새 상태 = posts 행 + participants + commenters(author, created_at) — 발표 브로드캐스트가 따로 읽지 않도록.
+-- 같은 이벤트의 confirm 은 posts 행 잠금으로 직렬화되고, 같은 round_id 는 한 번만 기록된다 (inserted=false).
+-- posts.winners 는 winners 트리거가 덧붙이므로 반환하는 posts 행에 이미 반영되어 있다.
+-- 앱(CommentDatabase.confirm_winner)은 이 함수가 없으면 기존 방식(winners INSERT + participants DELETE)으로 폴백한다.
+-- 전제: 20260405_posts_id_event_at.sql, 20261018110000_winners_log.sql 적용 후 스키마 (commenters.event_id 포함).
+
+CREATE OR REPLACE FUNCTION public.confirm_winner(
+    p_event_id TEXT,
+    p_winner TEXT,
+    p_round_id TEXT DEFAULT NULL,
+    p_angle DOUBLE PRECISION DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_allow_duplicates BOOLEAN;
+    v_inserted BOOLEAN := FALSE;
+    v_removed BOOLEAN := FALSE;
+BEGIN
+    SELECT COALESCE(p.allow_duplicates, FALSE)
+      INTO v_allow_duplicates
+      FROM public.posts p
+     WHERE p.id::text = p_event_id
+     ORDER BY p.updated_at DESC NULLS LAST
+     LIMIT 1
+       FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'event % not found', p_event_id USING ERRCODE = 'P0002';
+    END IF;
+
+    INSERT INTO public.winners (event_id, round_id, winner, angle)
+    VALUES (p_event_id, NULLIF(p_round_id, ''), p_winner, p_angle)
+    ON CONFLICT (event_id, round_id) DO NOTHING;
+    v_inserted := FOUND;
+
+    IF v_inserted AND NOT v_allow_duplicates THEN
+        DELETE FROM public.participants x
+         WHERE x.event_id::text = p_event_id
+           AND x.author = p_winner;
+        v_removed := FOUND;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'inserted', v_inserted,
+        'removed', v_removed,
+        'posts',
+        COALESCE(
+            (SELECT jsonb_agg(to_jsonb(p)) FROM public.posts p WHERE p.id::text = p_event_id),
+            '[]'::jsonb
+        ),
+        'participants',
+        COALESCE(
+            (SELECT jsonb_agg(to_jsonb(x)) FROM public.participants x WHERE x.event_id::text = p_event_id),
+            '[]'::jsonb
+        ),
+        'commenters',
+        COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object('author', c.author, 'created_at', c.created_at))
+               FROM public.commenters c
+              WHERE c.event_id::text = p_event_id),
+            '[]'::jsonb
+        )
+    );
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.confirm_winner(TEXT, TEXT, TEXT, DOUBLE PRECISION) TO anon, authenticated, service_role;
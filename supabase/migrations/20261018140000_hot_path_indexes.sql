@@ -0,0 +1,138 @@
+-- 핫 경로 인덱스·제약 (앱이 전제하는 것들을 명시적으로 만든다).
+--
+--   쿼리 (CommentDatabase)                                  지원 인덱스
+--   posts  WHERE is_active = true (활성 조회·비활성화 UPDATE)   posts_one_active_idx  (부분 UNIQUE: 활성 행은 최대 1개)
+--   posts  WHERE id = ? / id::text = ? (RPC)                   PK 또는 posts_id_pattern_idx
+--   posts  WHERE id LIKE 'YYYYMMDD%' (next_event_id)           posts_id_pattern_idx  (text_pattern_ops)
+--   posts  WHERE updated_at > ? ORDER BY updated_at (복제본 pull) posts_updated_at_idx
+--   participants / commenters WHERE event_id = ?               (event_id, author) UNIQUE — upsert on_conflict 대상이기도 함
+--
+-- 중복 데이터가 있으면 UNIQUE 생성이 실패하므로 먼저 정리한다:
+--   · participants: 같은 (event_id, author) 중 count 가 가장 큰 행(같으면 먼저 만든 행)만 남김
+--   · commenters:   같은 (event_id, author) 중 먼저 만든 행만 남김
+--   · posts.is_active: 여러 행이 true 면 가장 최근 updated_at 행만 남김
+-- posts.id 자체가 중복인 프로젝트(get_event_snapshot 주석 참고)에서는 활성 부분 UNIQUE 를 만들지 않고 NOTICE 만 남긴다
+-- (같은 id 의 여러 행을 한꺼번에 활성화하면 제약 위반이 되므로, 중복 정리 후 이 파일을 다시 실행).
+-- 활성 부분 UNIQUE 가 있으면 활성 이벤트 변경은 반드시 "다른 행 끄기 → 대상 행 켜기" 순서여야 한다
+-- (CommentDatabase / AsyncCommentDatabase 의 active 쓰기가 이 순서로 한다).
+--
+-- 전제: 20260405_posts_id_event_at.sql 적용 후 스키마 (posts.id / participants.event_id / commenters.event_id).
+-- 행이 아주 많은 프로젝트는 SQL 편집기 대신 psql 에서 CREATE INDEX CONCURRENTLY 로 하나씩 만들어도 된다 (이름 동일).
+-- 로컬 Postgres 에서 계획·지연 비교: python bench_query_plans.py --dsn postgresql://...
+
+-- 1) participants (event_id, author) UNIQUE
+DELETE FROM public.participants x
+ USING (
+    SELECT ctid,
+           row_number() OVER (
+               PARTITION BY event_id, author
+               ORDER BY count DESC NULLS LAST, created_at ASC NULLS LAST
+           ) AS rn
+      FROM public.participants
+ ) d
+ WHERE x.ctid = d.ctid
+   AND d.rn > 1;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+          FROM pg_index i
+          JOIN pg_class t ON t.oid = i.indrelid
+          JOIN pg_namespace n ON n.oid = t.relnamespace
+         WHERE n.nspname = 'public'
+           AND t.relname = 'participants'
+           AND i.indisunique
+           AND i.indnkeyatts = 2
+           AND (
+               SELECT array_agg(a.attname::text ORDER BY k.ord)
+                 FROM unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+                 JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+           ) = ARRAY['event_id', 'author']
+    ) THEN
+        ALTER TABLE public.participants
+            ADD CONSTRAINT participants_event_id_author_key UNIQUE (event_id, author);
+    END IF;
+END;
+$$;
+
+-- 2) commenters (event_id, author) UNIQUE
+DELETE FROM public.commenters x
+ USING (
+    SELECT ctid,
+           row_number() OVER (PARTITION BY event_id, author ORDER BY created_at ASC NULLS LAST) AS rn
+      FROM public.commenters
+ ) d
+ WHERE x.ctid = d.ctid
+   AND d.rn > 1;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+          FROM pg_index i
+          JOIN pg_class t ON t.oid = i.indrelid
+          JOIN pg_namespace n ON n.oid = t.relnamespace
+         WHERE n.nspname = 'public'
+           AND t.relname = 'commenters'
+           AND i.indisunique
+           AND i.indnkeyatts = 2
+           AND (
+               SELECT array_agg(a.attname::text ORDER BY k.ord)
+                 FROM unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+                 JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+           ) = ARRAY['event_id', 'author']
+    ) THEN
+        ALTER TABLE public.commenters
+            ADD CONSTRAINT commenters_event_id_author_key UNIQUE (event_id, author);
+    END IF;
+END;
+$$;
+
+-- (event_id, author) UNIQUE 의 앞 컬럼으로 event_id 조회가 되므로 단일 컬럼 인덱스는 쓰기 비용만 든다.
+DROP INDEX IF EXISTS public.participants_event_id_idx;
+
+-- 3) 활성 이벤트는 최대 1개
+WITH keep AS (
+    SELECT ctid
+      FROM public.posts
+     WHERE is_active
+     ORDER BY updated_at DESC NULLS LAST
+     LIMIT 1
+)
+UPDATE public.posts p
+   SET is_active = FALSE
+ WHERE p.is_active
+   AND p.ctid NOT IN (SELECT ctid FROM keep);
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM public.posts GROUP BY id HAVING count(*) > 1) THEN
+        RAISE NOTICE 'posts.id has duplicate rows; posts_one_active_idx not created (dedupe posts, then rerun)';
+    ELSE
+        CREATE UNIQUE INDEX IF NOT EXISTS posts_one_active_idx ON public.posts (is_active) WHERE is_active;
+    END IF;
+END;
+$$;
+
+-- 4) id 접두 LIKE / id::text 비교. text 컬럼이면 컬럼 자체, 아니면 id::text 식 인덱스.
+DO $$
+BEGIN
+    IF (
+        SELECT data_type
+          FROM information_schema.columns
+         WHERE table_schema = 'public' AND table_name = 'posts' AND column_name = 'id'
+    ) IN ('text', 'character varying') THEN
+        CREATE INDEX IF NOT EXISTS posts_id_pattern_idx ON public.posts (id text_pattern_ops);
+    ELSE
+        CREATE INDEX IF NOT EXISTS posts_id_pattern_idx ON public.posts ((id::text) text_pattern_ops);
+    END IF;
+END;
+$$;
+
+-- 5) 복제본 증분 pull: updated_at 커서 이후 updated_at 순
+CREATE INDEX IF NOT EXISTS posts_updated_at_idx ON public.posts (updated_at);
+
+ANALYZE public.posts;
+ANALYZE public.participants;
+ANALYZE public.commenters;
@@ -1,3 +1,4 @@
+# 소규모 1회 동기화용. 대량·재개 가능한 이전은 migrate_sqlite_to_supabase.py 를 쓴다.
 import sqlite3
 import os
 from supabase import create_client, Client
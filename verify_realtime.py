@@ -17,7 +17,7 @@ received_updates = []
 
 @sio.on('update_participants')
 def on_update_participants(data):
-    print(f"Received update_participants: {len(data.get('participants', []))} participants, {data.get('total_comments')} comments")
+    print(f"Received update_participants: layout {data.get('layout_hash')}, {data.get('total_comments')} comments")
     received_updates.append(data)
 
 @sio.on('update_event_settings')